@@ -9,12 +9,16 @@ integrating with Umami analytics and serving real-time agent data.
 import json
 import os
 import sys
+import threading
+import time
 from datetime import datetime, timedelta
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 import subprocess
 import logging
 
+from sampling_profiler import ProfilerAdmin
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -22,6 +26,67 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Seconds between file checks on the Server-Sent Events stream
+STREAM_POLL_INTERVAL = 1.0
+
+# Seconds of silence before the stream sends a keep-alive comment
+STREAM_KEEPALIVE_INTERVAL = 15.0
+
+
+class ParsedFileCache:
+    """Shared cache of parsed JSON sources keyed on file mtime and size.
+
+    Each source is parsed once per change no matter how many requests or
+    streams read it, and an optional ``derive`` callable precomputes the
+    aggregates routes need so they are not rebuilt per request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._next_version = 0
+
+    def get(self, path, derive=None):
+        """Return ``(version, data, derived)`` for ``path``.
+
+        ``version`` is ``None`` and ``data`` is ``None`` when the file is missing.
+        """
+        try:
+            st = os.stat(path)
+            signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry["signature"] != signature:
+                data = None
+                if signature is not None:
+                    with open(path, "r") as f:
+                        data = json.load(f)
+                version = None
+                if signature is not None:
+                    self._next_version += 1
+                    version = self._next_version
+
+                entry = {
+                    "signature": signature,
+                    "version": version,
+                    "data": data,
+                    "derived": {},
+                }
+                self._entries[path] = entry
+
+            derived = None
+            if derive is not None:
+                # Derived aggregates are memoized per deriver until the file changes
+                if derive not in entry["derived"]:
+                    entry["derived"][derive] = derive(entry["data"])
+                derived = entry["derived"][derive]
+
+            return entry["version"], entry["data"], derived
+
+
 class AgentDashboardAPI:
     def __init__(self, workspace_root):
         self.workspace_root = workspace_root
@@ -37,9 +102,72 @@ class AgentDashboardAPI:
         )
         self.agent_status = os.path.join(workspace_root, "config", "agent_status.json")
         self.umami_config = os.path.join(workspace_root, "umami_config.json")
+        self.ml_metadata = os.path.join(
+            workspace_root, "models", "training_metadata.json"
+        )
+
+        self.file_cache = ParsedFileCache()
+        # On-demand sampling profiler; admin routes need PROFILER_ADMIN_TOKEN
+        self.profiler_admin = ProfilerAdmin()
 
         self.setup_routes()
 
+    def _derive_system_metrics(self, data):
+        """Precompute latest/history system metrics from the performance log"""
+        metrics = (data or {}).get("metrics", [])
+        if not metrics:
+            return None
+
+        latest = metrics[-1]
+        return {
+            "cpu_usage": float(latest.get("cpu_usage", 0)),
+            "memory_usage": float(latest.get("memory_usage", 0)),
+            "disk_usage": float(latest.get("disk_usage", 0)),
+            "process_count": self._safe_int_parse(latest.get("process_count", 0)),
+            "agent_count": self._safe_int_parse(latest.get("agent_count", 0)),
+            "timestamp": latest.get("timestamp"),
+            "history": metrics[-20:],
+        }
+
+    def _derive_task_analytics(self, data):
+        """Precompute task status counts from the execution history in one pass"""
+        data = data or {}
+        history = data.get("execution_history", [])
+        summary = data.get("summary", {})
+
+        counts = {"completed": 0, "failed": 0, "in_progress": 0}
+        for task in history:
+            status = task.get("status")
+            if status in counts:
+                counts[status] += 1
+
+        return {
+            "total_tasks": len(history),
+            "completed": counts["completed"],
+            "failed": counts["failed"],
+            "running": counts["in_progress"],
+            "success_rate": summary.get("success_rate", 0),
+            "avg_duration": summary.get("average_duration", 0),
+            "total_files_processed": summary.get("total_files_processed", 0),
+            "total_issues_found": summary.get("total_issues_found", 0),
+        }
+
+    def _derive_agent_count(self, data):
+        return len((data or {}).get("agents", {}))
+
+    def _stream_sources(self):
+        """Sources pushed over the event stream, as (name, path, derive)"""
+        return [
+            ("system_metrics", self.performance_log, self._derive_system_metrics),
+            ("agent_status", self.agent_status, None),
+            ("task_analytics", self.task_history, self._derive_task_analytics),
+        ]
+
+    def _stream_payload(self, name, data, derived):
+        if name == "agent_status":
+            return data
+        return derived
+
     def _safe_int_parse(self, value, default=0):
         """Safely parse integer values, handling malformed data"""
         try:
@@ -64,35 +192,11 @@ class AgentDashboardAPI:
         def get_system_metrics():
             """Get current system performance metrics"""
             try:
-                # Read performance metrics
-                if os.path.exists(self.performance_log):
-                    with open(self.performance_log, "r") as f:
-                        data = json.load(f)
-                        metrics = data.get("metrics", [])
-
-                        if metrics:
-                            # Get latest metrics
-                            latest = metrics[-1]
-                            # Get last 20 metrics for history
-                            history = metrics[-20:] if len(metrics) > 20 else metrics
-
-                            return jsonify(
-                                {
-                                    "cpu_usage": float(latest.get("cpu_usage", 0)),
-                                    "memory_usage": float(
-                                        latest.get("memory_usage", 0)
-                                    ),
-                                    "disk_usage": float(latest.get("disk_usage", 0)),
-                                    "process_count": self._safe_int_parse(
-                                        latest.get("process_count", 0)
-                                    ),
-                                    "agent_count": self._safe_int_parse(
-                                        latest.get("agent_count", 0)
-                                    ),
-                                    "timestamp": latest.get("timestamp"),
-                                    "history": history,
-                                }
-                            )
+                _, _, system_metrics = self.file_cache.get(
+                    self.performance_log, self._derive_system_metrics
+                )
+                if system_metrics:
+                    return jsonify(system_metrics)
 
                 return jsonify(
                     {
@@ -114,10 +218,9 @@ class AgentDashboardAPI:
         def get_agent_status():
             """Get current agent status"""
             try:
-                if os.path.exists(self.agent_status):
-                    with open(self.agent_status, "r") as f:
-                        data = json.load(f)
-                        return jsonify(data)
+                _, data, _ = self.file_cache.get(self.agent_status)
+                if data is not None:
+                    return jsonify(data)
                 else:
                     return jsonify({"agents": {}, "last_update": 0})
 
@@ -129,39 +232,11 @@ class AgentDashboardAPI:
         def get_task_analytics():
             """Get task execution analytics"""
             try:
-                if os.path.exists(self.task_history):
-                    with open(self.task_history, "r") as f:
-                        data = json.load(f)
-                        history = data.get("execution_history", [])
-                        summary = data.get("summary", {})
-
-                        # Calculate additional metrics
-                        completed = len(
-                            [t for t in history if t.get("status") == "completed"]
-                        )
-                        failed = len(
-                            [t for t in history if t.get("status") == "failed"]
-                        )
-                        running = len(
-                            [t for t in history if t.get("status") == "in_progress"]
-                        )
-
-                        return jsonify(
-                            {
-                                "total_tasks": len(history),
-                                "completed": completed,
-                                "failed": failed,
-                                "running": running,
-                                "success_rate": summary.get("success_rate", 0),
-                                "avg_duration": summary.get("average_duration", 0),
-                                "total_files_processed": summary.get(
-                                    "total_files_processed", 0
-                                ),
-                                "total_issues_found": summary.get(
-                                    "total_issues_found", 0
-                                ),
-                            }
-                        )
+                _, data, analytics = self.file_cache.get(
+                    self.task_history, self._derive_task_analytics
+                )
+                if data is not None:
+                    return jsonify(analytics)
                 else:
                     return jsonify(
                         {
@@ -184,28 +259,22 @@ class AgentDashboardAPI:
         def get_ml_analytics():
             """Get ML model performance analytics"""
             try:
-                models_dir = os.path.join(self.workspace_root, "models")
-                metadata_file = os.path.join(models_dir, "training_metadata.json")
+                _, metadata, _ = self.file_cache.get(self.ml_metadata)
 
-                if os.path.exists(metadata_file):
-                    with open(metadata_file, "r") as f:
-                        metadata = json.load(f)
-
-                        return jsonify(
-                            {
-                                "accuracy": metadata.get("failure_accuracy", 0),
-                                "execution_time_rmse": metadata.get(
-                                    "execution_time_rmse", 0
-                                ),
-                                "predictions_count": 0,  # Would need to track this separately
-                                "last_training": metadata.get(
-                                    "training_date", "Unknown"
-                                ),
-                                "dataset_size": metadata.get("dataset_size", 0),
-                                "avg_predicted_time": 0,  # Would need to calculate from recent predictions
-                                "avg_failure_prob": 0,  # Would need to calculate from recent predictions
-                            }
-                        )
+                if metadata is not None:
+                    return jsonify(
+                        {
+                            "accuracy": metadata.get("failure_accuracy", 0),
+                            "execution_time_rmse": metadata.get(
+                                "execution_time_rmse", 0
+                            ),
+                            "predictions_count": 0,  # Would need to track this separately
+                            "last_training": metadata.get("training_date", "Unknown"),
+                            "dataset_size": metadata.get("dataset_size", 0),
+                            "avg_predicted_time": 0,  # Would need to calculate from recent predictions
+                            "avg_failure_prob": 0,  # Would need to calculate from recent predictions
+                        }
+                    )
                 else:
                     return jsonify(
                         {
@@ -279,6 +348,22 @@ class AgentDashboardAPI:
                 logger.error(f"Error refreshing dashboard: {e}")
                 return jsonify({"error": str(e)}), 500
 
+        @self.app.route("/admin/profiler/<action>", methods=["GET", "POST"])
+        def profiler_admin(action):
+            """Start/stop the sampling profiler and fetch its results"""
+            status, content_type, body = self.profiler_admin.handle(
+                request.method,
+                request.path,
+                request.query_string.decode(),
+                request.headers,
+            )
+            return Response(
+                body,
+                status=status,
+                content_type=content_type,
+                headers={"Cache-Control": "no-store"},
+            )
+
         @self.app.route("/health", methods=["GET"])
         def health_check():
             """Health check endpoint"""
@@ -294,46 +379,20 @@ class AgentDashboardAPI:
         def get_metrics():
             """Get metrics in Prometheus format"""
             try:
-                # Get system metrics
-                system_metrics = {}
-                if os.path.exists(self.performance_log):
-                    with open(self.performance_log, "r") as f:
-                        data = json.load(f)
-                        metrics = data.get("metrics", [])
-                        if metrics:
-                            latest = metrics[-1]
-                            system_metrics = {
-                                "cpu_usage": float(latest.get("cpu_usage", 0)),
-                                "memory_usage": float(latest.get("memory_usage", 0)),
-                                "disk_usage": float(latest.get("disk_usage", 0)),
-                                "process_count": self._safe_int_parse(
-                                    latest.get("process_count", 0)
-                                ),
-                                "agent_count": self._safe_int_parse(
-                                    latest.get("agent_count", 0)
-                                ),
-                            }
+                _, _, system_metrics = self.file_cache.get(
+                    self.performance_log, self._derive_system_metrics
+                )
+                system_metrics = system_metrics or {}
 
-                # Get agent status
-                agent_count = 0
-                if os.path.exists(self.agent_status):
-                    with open(self.agent_status, "r") as f:
-                        data = json.load(f)
-                        agent_count = len(data.get("agents", {}))
+                _, _, agent_count = self.file_cache.get(
+                    self.agent_status, self._derive_agent_count
+                )
 
-                # Get task analytics
-                task_completed = 0
-                task_failed = 0
-                if os.path.exists(self.task_history):
-                    with open(self.task_history, "r") as f:
-                        data = json.load(f)
-                        history = data.get("execution_history", [])
-                        task_completed = len(
-                            [t for t in history if t.get("status") == "completed"]
-                        )
-                        task_failed = len(
-                            [t for t in history if t.get("status") == "failed"]
-                        )
+                _, _, task_analytics = self.file_cache.get(
+                    self.task_history, self._derive_task_analytics
+                )
+                task_completed = task_analytics["completed"]
+                task_failed = task_analytics["failed"]
 
                 # Format as Prometheus metrics
                 metrics_output = f"""# HELP agent_dashboard_cpu_usage CPU usage percentage
@@ -379,10 +438,49 @@ agent_dashboard_tasks_failed {task_failed}
                     {"Content-Type": "text/plain"},
                 )
 
+        @self.app.route("/api/stream", methods=["GET"])
+        def stream_updates():
+            """Server-Sent Events stream pushing sources as their files change"""
+
+            def generate():
+                seen = {}
+                last_sent = time.monotonic()
+                while True:
+                    for name, path, derive in self._stream_sources():
+                        try:
+                            version, data, derived = self.file_cache.get(path, derive)
+                        except (OSError, ValueError) as e:
+                            logger.warning(f"Stream source {name} unreadable: {e}")
+                            continue
+                        if version is None or seen.get(name) == version:
+                            continue
+                        seen[name] = version
+                        payload = json.dumps(
+                            {
+                                "source": name,
+                                "version": version,
+                                "data": self._stream_payload(name, data, derived),
+                            }
+                        )
+                        last_sent = time.monotonic()
+                        yield f"event: update\nid: {name}:{version}\ndata: {payload}\n\n"
+
+                    if time.monotonic() - last_sent >= STREAM_KEEPALIVE_INTERVAL:
+                        last_sent = time.monotonic()
+                        yield ": keep-alive\n\n"
+
+                    time.sleep(STREAM_POLL_INTERVAL)
+
+            return Response(
+                stream_with_context(generate()),
+                mimetype="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+
     def run(self, host="0.0.0.0", port=5000, debug=False):
         """Run the Flask application"""
         logger.info(f"Starting Agent Dashboard API on {host}:{port}")
-        self.app.run(host=host, port=port, debug=debug)
+        self.app.run(host=host, port=port, debug=debug, threaded=True)
 
 
 def main():
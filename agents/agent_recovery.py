@@ -5,11 +5,15 @@ Usage examples:
   python3 agent_recovery.py --summary
   python3 agent_recovery.py --apply --verbose
   python3 agent_recovery.py --apply --scale agent_build.sh=2 --scale agent_debug.sh=1
+
+When process_supervisor.py is running it owns the agent processes, so restarts
+and --scale requests are handed to it instead of being applied here.
 """
 from __future__ import annotations
 
 import argparse
 import json
+import math
 import os
 import signal
 import subprocess
@@ -31,6 +35,9 @@ STOP_STATUSES = {"stopped", "offline", "error", "failed", "crashed"}
 PROGRESS_STATUSES = {"queued", "pending", "waiting"}
 STALE_SECONDS = 300
 BACKLOG_THRESHOLD = 1000
+TASKS_PER_WORKER = 250
+MAX_EXTRA_WORKERS = 4
+TARGET_DRAIN_MINUTES = 30
 DEFAULT_EXTRA_WORKERS = {
     "agent_build.sh": 1,
     "agent_debug.sh": 1,
@@ -185,6 +192,19 @@ def load_drain_rate() -> Optional[float]:
     return None
 
 
+def auto_scale_plan(queued_count: int, distribution: Dict[str, int], drain_rate: Optional[float], threshold: int = BACKLOG_THRESHOLD) -> Dict[str, int]:
+    """Extra workers per agent for the backlog; empty while it drains in time."""
+    if queued_count < threshold:
+        return {}
+    if drain_rate is not None and drain_rate > 0 and queued_count / drain_rate <= TARGET_DRAIN_MINUTES:
+        return {}
+    plan: Dict[str, int] = {}
+    for agent, extra in DEFAULT_EXTRA_WORKERS.items():
+        depth = sum(distribution.get(key, 0) for key in related_keys(agent))
+        plan[agent] = max(extra, min(MAX_EXTRA_WORKERS, math.ceil(depth / TASKS_PER_WORKER)))
+    return plan
+
+
 def stop_process(pid: Optional[int], verbose: bool = False) -> None:
     if not is_process_running(pid):
         return
@@ -206,22 +226,26 @@ def stop_process(pid: Optional[int], verbose: bool = False) -> None:
         return
 
 
-def launch_agent(script: Path, log_prefix: str, dry_run: bool, verbose: bool) -> Optional[int]:
+def spawn_agent(script: Path, log_prefix: str) -> subprocess.Popen:
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
     log_path = LOGS_DIR / f"{log_prefix}.out"
     err_path = LOGS_DIR / f"{log_prefix}.err"
-    if dry_run:
-        if verbose:
-            print(f"Dry run: would launch {script} (logs: {log_path})")
-        return None
     with log_path.open("a", encoding="utf-8") as stdout, err_path.open("a", encoding="utf-8") as stderr:
-        process = subprocess.Popen(
+        return subprocess.Popen(
             ["bash", str(script)],
             cwd=str(AGENTS_DIR),
             stdout=stdout,
             stderr=stderr,
             start_new_session=True,
         )
+
+
+def launch_agent(script: Path, log_prefix: str, dry_run: bool, verbose: bool) -> Optional[int]:
+    if dry_run:
+        if verbose:
+            print(f"Dry run: would launch {script} (logs: {LOGS_DIR / log_prefix}.out)")
+        return None
+    process = spawn_agent(script, log_prefix)
     if verbose:
         print(f"Launched {script.name} (pid {process.pid})")
     return process.pid
@@ -401,6 +425,29 @@ def main() -> None:
             continue
         scale_plan[agent] = count_int
 
+    from process_supervisor import send_to_supervisor
+
+    supervisor = send_to_supervisor({"control": "status"})
+    if supervisor is not None:
+        if args.verbose or args.summary or not args.apply:
+            print(f"Supervisor: pid {supervisor['pid']} (restarts and scaling are event-driven)")
+            for name, agent in sorted(supervisor["agents"].items()):
+                states = ", ".join(f"{worker['state']}:{worker['pid']}" for worker in agent["workers"])
+                print(f"  {format_agent_label(name):25s} {agent['desired']} workers [{states}]")
+        if args.summary and not args.apply:
+            return
+        if not args.apply:
+            print("Dry run complete. Re-run with --apply to restart agents.")
+            return
+        # The supervisor owns the processes and scales on queue depth itself
+        names = [target["name"] for target in restart_targets]
+        if names:
+            print(json.dumps(send_to_supervisor({"control": "restart", "agents": names})))
+        for agent, count in scale_plan.items():
+            print(json.dumps(send_to_supervisor({"control": "scale", "agent": agent, "extra": count})))
+        return
+
+    # Without a supervisor keep the fixed clone counts; auto_scale_plan is its policy
     auto_scale_needed = queued_count >= args.threshold and (drain_rate is None or drain_rate <= 0)
     if auto_scale_needed:
         for agent, extra in DEFAULT_EXTRA_WORKERS.items():
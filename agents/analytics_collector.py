@@ -19,23 +19,49 @@ Outputs:
 - Tools/Automation/agents/knowledge/analytics.json (summary)
 - Optional HTML report (via --html)
 
+Append-only sources (predictions, failure analysis) are folded in
+incrementally: analytics_state.json keeps the byte offset of the last
+processed array element and the running aggregates, so a refresh only
+decodes records appended since the previous one. The other sources,
+including fix history (a dict the decision engine rewrites in place), are
+re-summarized only when their size or mtime changes.
+
 CLI:
   analytics_collector.py collect [--out <summary.json>] [--html <report.html>]
+                                 [--rebuild]
 """
+
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import os
+import re
 import statistics
 import time
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
 AGENTS_DIR = os.path.join(ROOT, "Tools", "Automation", "agents")
 KNOWLEDGE_DIR = os.path.join(AGENTS_DIR, "knowledge")
+STATE_PATH = os.path.join(KNOWLEDGE_DIR, "analytics_state.json")
+
+STATE_FORMAT = 2
+# Bytes before the stored offset that must be unchanged for an append-only
+# read; anything else means the file was rewritten and is reprocessed
+GUARD_BYTES = 256
+VELOCITY_WINDOW = timedelta(days=7)
+
+# Accepted layouts: %Y-%m-%dT%H:%M:%SZ, %Y-%m-%d %H:%M:%S and %Y-%m-%d
+_TIMESTAMP_RE = re.compile(
+    r"(\d{4})-(\d{1,2})-(\d{1,2})"
+    r"(?:T(\d{1,2}):(\d{1,2}):(\d{1,2})Z| (\d{1,2}):(\d{1,2}):(\d{1,2}))?"
+)
+_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
 
 
 def _load_json(path: str, default: Any) -> Any:
@@ -57,24 +83,187 @@ def _mean_safe(values: List[float], default: float = 0.0) -> float:
     return float(statistics.fmean(clean)) if clean else default
 
 
-def collect_metrics() -> Dict[str, Any]:
-    # Load inputs (best-effort)
-    predictions = _load_json(os.path.join(KNOWLEDGE_DIR, "predictions.json"), [])
-    proactive_metrics = _load_json(
-        os.path.join(KNOWLEDGE_DIR, "proactive_metrics.json"), {}
-    )
-    proactive_alerts = _load_json(
-        os.path.join(KNOWLEDGE_DIR, "proactive_alerts.json"), []
-    )
-    strategies = _load_json(os.path.join(KNOWLEDGE_DIR, "strategies.json"), [])
-    central_hub = _load_json(os.path.join(KNOWLEDGE_DIR, "central_hub.json"), {})
-    emergencies = _load_json(os.path.join(KNOWLEDGE_DIR, "emergencies.json"), [])
-    failure_analysis = _load_json(
-        os.path.join(KNOWLEDGE_DIR, "failure_analysis.json"), []
-    )
-    fix_history = _load_json(os.path.join(KNOWLEDGE_DIR, "fix_history.json"), [])
+def _parse_timestamp(raw: str) -> Optional[float]:
+    """Epoch seconds for a record timestamp (assumed UTC), or None."""
+    match = _TIMESTAMP_RE.fullmatch(raw)
+    if not match:
+        return None
+    fields = [int(g) if g else 0 for g in match.groups()]
+    hour, minute, second = fields[3:6] if match.group(4) else fields[6:9]
+    try:
+        return datetime(
+            fields[0], fields[1], fields[2], hour, minute, second, tzinfo=timezone.utc
+        ).timestamp()
+    except ValueError:
+        return None
 
-    # Overall success rate and average resolution time from strategies
+
+def _file_version(path: str) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _decode_elements(
+    text: str, pos: int, first: bool
+) -> Optional[Tuple[List[Any], int]]:
+    """
+    Decode JSON array elements from ``pos`` up to the closing bracket.
+
+    Returns the elements and the index just past the last one, or None if
+    the text is not the remainder of an array.
+    """
+    elements: List[Any] = []
+    end = pos
+    while True:
+        pos = _WHITESPACE_RE.match(text, pos).end()
+        if text.startswith("]", pos):
+            return elements, end
+        if not first:
+            if not text.startswith(",", pos):
+                return None
+            pos = _WHITESPACE_RE.match(text, pos + 1).end()
+        try:
+            value, pos = _DECODER.raw_decode(text, pos)
+        except ValueError:
+            return None
+        elements.append(value)
+        end = pos
+        first = False
+
+
+def _guard(f, offset: int) -> str:
+    f.seek(max(0, offset - GUARD_BYTES))
+    return hashlib.sha256(f.read(min(offset, GUARD_BYTES))).hexdigest()
+
+
+def _read_new_elements(path: str, entry: Dict[str, Any]) -> Tuple[List[Any], bool]:
+    """
+    Array elements of a JSON list file that were not processed yet.
+
+    Returns (elements, reset); reset means the file was rewritten, truncated
+    or is not a list, and elements then holds everything it contains.
+    """
+    try:
+        with open(path, "rb") as f:
+            offset = entry.get("offset")
+            if isinstance(offset, int) and _guard(f, offset) == entry.get("guard"):
+                f.seek(offset)
+                tail = f.read().decode("utf-8")
+                decoded = _decode_elements(tail, 0, first=False)
+                if decoded is not None:
+                    elements, end = decoded
+                    offset += len(tail[:end].encode("utf-8"))
+                    entry["offset"], entry["guard"] = offset, _guard(f, offset)
+                    return elements, False
+
+            f.seek(0)
+            text = f.read().decode("utf-8")
+            start = _WHITESPACE_RE.match(text).end()
+            decoded = None
+            if text.startswith("[", start):
+                decoded = _decode_elements(text, start + 1, first=True)
+            if decoded is None:
+                entry.pop("offset", None)
+                return [], True
+            elements, end = decoded
+            offset = len(text[:end].encode("utf-8"))
+            entry["offset"], entry["guard"] = offset, _guard(f, offset)
+            return elements, True
+    except (OSError, ValueError):
+        entry.pop("offset", None)
+        return [], True
+
+
+def _refresh_appended(
+    state: Dict[str, Any],
+    name: str,
+    initial: Callable[[], Dict[str, Any]],
+    fold: Callable[[Dict[str, Any], List[Any]], None],
+) -> Dict[str, Any]:
+    """Fold records appended to an array file into its running summary."""
+    path = os.path.join(KNOWLEDGE_DIR, name)
+    entry = state["sources"].setdefault(name, {})
+    version = _file_version(path)
+    if "summary" in entry and entry.get("file_version") == version:
+        return entry["summary"]
+
+    elements, reset = _read_new_elements(path, entry)
+    if reset or "summary" not in entry:
+        entry["summary"] = initial()
+    fold(entry["summary"], elements)
+    entry["file_version"] = version
+    return entry["summary"]
+
+
+def _refresh_snapshot(
+    state: Dict[str, Any], name: str, summarize: Callable[[Any], Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Summary of a source that may change in place; recomputed on change."""
+    path = os.path.join(KNOWLEDGE_DIR, name)
+    entry = state["sources"].setdefault(name, {})
+    version = _file_version(path)
+    if "summary" not in entry or entry.get("file_version") != version:
+        entry["summary"] = summarize(_load_json(path, None))
+        entry["file_version"] = version
+    return entry["summary"]
+
+
+def _fold_count(summary: Dict[str, Any], records: List[Any]) -> None:
+    summary["count"] += len(records)
+
+
+def _fold_fixes(summary: Dict[str, Any], records: List[Any]) -> None:
+    # Per-second buckets within the velocity window; older records can never
+    # count towards a later window
+    horizon = (datetime.now(timezone.utc) - VELOCITY_WINDOW).timestamp()
+    recent = summary["recent"]
+    for record in records:
+        summary["total"] += 1
+        if not isinstance(record, dict):
+            continue
+        raw = record.get("timestamp") or record.get("time") or record.get("date")
+        ts = _parse_timestamp(raw) if isinstance(raw, str) else None
+        if ts is None:
+            continue
+        summary["dated"] += 1
+        if ts >= horizon:
+            bucket = str(int(ts))
+            recent[bucket] = recent.get(bucket, 0) + 1
+
+
+def _summarize_fixes(fix_history: Any) -> Dict[str, Any]:
+    # DecisionEngine keeps a dict keyed by fix id and compacts it in place;
+    # only a list of records carries timestamps, otherwise fixes are counted
+    summary = {"total": 0, "dated": 0, "recent": {}}
+    if isinstance(fix_history, list):
+        _fold_fixes(summary, fix_history)
+    elif isinstance(fix_history, dict):
+        summary["total"] = len(fix_history)
+    return summary
+
+
+def _fold_failures(summary: Dict[str, Any], records: List[Any]) -> None:
+    signatures = summary["signatures"]
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        sig = (
+            record.get("signature")
+            or record.get("pattern")
+            or record.get("error")
+            or ""
+        )
+        if not isinstance(sig, str):
+            sig = json.dumps(sig, sort_keys=True)
+        signatures[sig] = signatures.get(sig, 0) + 1
+        if signatures[sig] == 2:
+            summary["repeats"] += 1
+
+
+def _summarize_strategies(strategies: Any) -> Dict[str, Any]:
     success_rates = []
     avg_times = []
     if isinstance(strategies, list):
@@ -86,43 +275,17 @@ def collect_metrics() -> Dict[str, Any]:
                     success_rates.append(float(sr))
                 if isinstance(at, (int, float)):
                     avg_times.append(float(at))
+    return {
+        "count": len(strategies) if isinstance(strategies, list) else 0,
+        "success_rate": _mean_safe(success_rates),
+        "avg_time": _mean_safe(avg_times),
+    }
 
-    overall_success_rate = _mean_safe(success_rates)
-    average_resolution_time = _mean_safe(avg_times)
-
-    # Learning velocity: fixes/week based on timestamps when present; else count
-    def _timestamps(items: Any) -> List[datetime]:
-        ts = []
-        if isinstance(items, list):
-            for it in items:
-                if isinstance(it, dict):
-                    raw = it.get("timestamp") or it.get("time") or it.get("date")
-                    if isinstance(raw, str):
-                        for fmt in (
-                            "%Y-%m-%dT%H:%M:%SZ",
-                            "%Y-%m-%d %H:%M:%S",
-                            "%Y-%m-%d",
-                        ):
-                            try:
-                                parsed = datetime.strptime(raw, fmt)
-                                # Make timezone-aware by assuming UTC
-                                ts.append(parsed.replace(tzinfo=timezone.utc))
-                                break
-                            except Exception:
-                                continue
-        return ts
-
-    now = datetime.now(timezone.utc)
-    week_ago = now - timedelta(days=7)
-    fixes_ts = _timestamps(fix_history)
-    fixes_last_week = (
-        len([t for t in fixes_ts if t >= week_ago]) if fixes_ts else len(fix_history)
-    )
-    learning_velocity = fixes_last_week  # per week
 
-    # Autonomy level: 1 - (emergencies requiring human / total)
+def _summarize_emergencies(emergencies: Any) -> Dict[str, Any]:
+    # Escalations are appended to existing records, so this is not append-only
     human_flags = 0
-    if isinstance(emergencies, list) and emergencies:
+    if isinstance(emergencies, list):
         for e in emergencies:
             if isinstance(e, dict):
                 sev = (e.get("severity") or "").lower()
@@ -136,32 +299,13 @@ def collect_metrics() -> Dict[str, Any]:
                 )
                 if sev == "critical" or reached_human:
                     human_flags += 1
-        autonomy_level = 1.0 - (human_flags / max(1.0, float(len(emergencies))))
-    else:
-        autonomy_level = 1.0
-
-    # Error recurrence rate: naive ratio of repeated failure signatures
-    recurrence_rate = 0.0
-    if isinstance(failure_analysis, list) and failure_analysis:
-        sig_counts: Dict[str, int] = {}
-        for fa in failure_analysis:
-            if isinstance(fa, dict):
-                sig = fa.get("signature") or fa.get("pattern") or fa.get("error") or ""
-                sig_counts[sig] = sig_counts.get(sig, 0) + 1
-        repeats = sum(1 for k, v in sig_counts.items() if v > 1)
-        recurrence_rate = float(repeats) / max(1.0, float(len(sig_counts)))
+    return {
+        "count": len(emergencies) if isinstance(emergencies, list) else 0,
+        "human_flags": human_flags,
+    }
 
-    # Cross-agent collaboration score: based on present insight counts
-    collaboration_score = 0.0
-    if isinstance(central_hub, dict):
-        insights = central_hub.get("cross_agent_insights") or []
-        best_practices = central_hub.get("best_practices") or []
-        # Simple bounded score
-        collaboration_score = min(
-            1.0, (len(insights) + 0.5 * len(best_practices)) / 20.0
-        )
 
-    # Proactive monitoring snapshot
+def _summarize_alerts(proactive_alerts: Any) -> Dict[str, Any]:
     open_alerts = 0
     if isinstance(proactive_alerts, list):
         open_alerts = len(
@@ -171,20 +315,99 @@ def collect_metrics() -> Dict[str, Any]:
                 if isinstance(a, dict) and a.get("status", "active") == "active"
             ]
         )
+    return {"open": open_alerts}
+
+
+def _summarize_hub(central_hub: Any) -> Dict[str, Any]:
+    insights = best_practices = 0
+    if isinstance(central_hub, dict):
+        insights = len(central_hub.get("cross_agent_insights") or [])
+        best_practices = len(central_hub.get("best_practices") or [])
+    return {"insights": insights, "best_practices": best_practices}
+
+
+def _load_state(path: Optional[str]) -> Dict[str, Any]:
+    state = _load_json(path, {}) if path else {}
+    if not isinstance(state, dict) or state.get("format") != STATE_FORMAT:
+        return {"format": STATE_FORMAT, "sources": {}}
+    state.setdefault("sources", {})
+    return state
+
+
+def _save_state(path: str, state: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def collect_metrics(state_path: Optional[str] = STATE_PATH) -> Dict[str, Any]:
+    """
+    Refresh the materialized analytics state and derive the summary.
+
+    Pass ``state_path=None`` to compute from scratch without persisting state.
+    """
+    state = _load_state(state_path)
+
+    predictions = _refresh_appended(
+        state, "predictions.json", lambda: {"count": 0}, _fold_count
+    )
+    fixes = _refresh_snapshot(state, "fix_history.json", _summarize_fixes)
+    failures = _refresh_appended(
+        state,
+        "failure_analysis.json",
+        lambda: {"signatures": {}, "repeats": 0},
+        _fold_failures,
+    )
+    strategies = _refresh_snapshot(state, "strategies.json", _summarize_strategies)
+    emergencies = _refresh_snapshot(state, "emergencies.json", _summarize_emergencies)
+    alerts = _refresh_snapshot(state, "proactive_alerts.json", _summarize_alerts)
+    hub = _refresh_snapshot(state, "central_hub.json", _summarize_hub)
+
+    # Learning velocity: fixes/week based on timestamps when present; else count
+    week_ago = (datetime.now(timezone.utc) - VELOCITY_WINDOW).timestamp()
+    recent = fixes["recent"]
+    for bucket in [b for b in recent if int(b) < week_ago]:
+        del recent[bucket]
+    learning_velocity = sum(recent.values()) if fixes["dated"] else fixes["total"]
+
+    # Autonomy level: 1 - (emergencies requiring human / total)
+    autonomy_level = 1.0
+    if emergencies["count"]:
+        autonomy_level = 1.0 - (
+            emergencies["human_flags"] / max(1.0, float(emergencies["count"]))
+        )
+
+    # Error recurrence rate: naive ratio of repeated failure signatures
+    recurrence_rate = float(failures["repeats"]) / max(
+        1.0, float(len(failures["signatures"]))
+    )
+
+    # Cross-agent collaboration score: based on present insight counts
+    collaboration_score = min(
+        1.0, (hub["insights"] + 0.5 * hub["best_practices"]) / 20.0
+    )
+
+    if state_path:
+        try:
+            _save_state(state_path, state)
+        except OSError:
+            pass
 
     metrics = {
         "generated_at": _now_iso(),
-        "overall_success_rate": round(overall_success_rate, 4),
-        "average_resolution_time": round(average_resolution_time, 2),
+        "overall_success_rate": round(strategies["success_rate"], 4),
+        "average_resolution_time": round(strategies["avg_time"], 2),
         "learning_velocity_per_week": int(learning_velocity),
         "autonomy_level": round(autonomy_level, 4),
         "error_recurrence_rate": round(recurrence_rate, 4),
         "cross_agent_collaboration_score": round(collaboration_score, 4),
-        "proactive_open_alerts": int(open_alerts),
+        "proactive_open_alerts": int(alerts["open"]),
         "counts": {
-            "predictions": len(predictions) if isinstance(predictions, list) else 0,
-            "strategies": len(strategies) if isinstance(strategies, list) else 0,
-            "emergencies": len(emergencies) if isinstance(emergencies, list) else 0,
+            "predictions": predictions["count"],
+            "strategies": strategies["count"],
+            "emergencies": emergencies["count"],
         },
     }
 
@@ -257,12 +480,23 @@ def main() -> int:
         help="Path to write JSON summary",
     )
     p.add_argument("--html", default=None, help="Also write a simple HTML report")
+    p.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Discard the materialized state and reprocess all sources",
+    )
 
     args = parser.parse_args()
     if args.cmd != "collect":
         parser.print_help()
         return 1
 
+    if args.rebuild:
+        try:
+            os.remove(STATE_PATH)
+        except OSError:
+            pass
+
     data = collect_metrics()
     # Print to stdout
     print(json.dumps(data))
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+"""
+Check Pipeline - Dependency-ordered verification checks
+Runs independent checks concurrently, skips checks whose upstream checks
+failed, and caches file-scoped results by content hash and toolchain version.
+"""
+
+import hashlib
+import json
+import subprocess
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Configuration
+SCRIPT_DIR = Path(__file__).parent
+CHECK_CACHE_FILE = SCRIPT_DIR / "knowledge" / "check_cache.json"
+MAX_CACHE_ENTRIES = 1000
+MAX_WORKERS = 4
+
+# Check states
+PASSED = "passed"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class CheckPipeline:
+    """
+    A DAG of named checks, each returning True (passed) or False (failed).
+
+    Dependencies must be added before the checks that use them, so the graph
+    is acyclic by construction. A check runs as soon as all of its
+    dependencies passed and is skipped if any of them failed or was skipped.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        self.max_workers = max_workers
+        self.checks: Dict[str, Callable[[], bool]] = {}
+        self.depends_on: Dict[str, List[str]] = {}
+
+    def add(
+        self,
+        name: str,
+        check: Callable[[], bool],
+        depends_on: Optional[List[str]] = None,
+    ) -> "CheckPipeline":
+        depends_on = list(depends_on or [])
+        for dependency in depends_on:
+            if dependency not in self.checks:
+                raise ValueError(f"Unknown dependency {dependency} for check {name}")
+        self.checks[name] = check
+        self.depends_on[name] = depends_on
+        return self
+
+    def run(self) -> Dict[str, str]:
+        """Run all checks and return their states in insertion order."""
+        status: Dict[str, str] = {}
+        pending = dict(self.depends_on)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            while pending or running:
+                # Insertion order is topological, so skips cascade in one pass
+                for name, dependencies in list(pending.items()):
+                    states = [status.get(d) for d in dependencies]
+                    if any(s in (FAILED, SKIPPED) for s in states):
+                        status[name] = SKIPPED
+                        del pending[name]
+                    elif all(s == PASSED for s in states):
+                        running[executor.submit(self._run_check, name)] = name
+                        del pending[name]
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    status[running.pop(future)] = PASSED if future.result() else FAILED
+
+        return {name: status[name] for name in self.checks}
+
+    def _run_check(self, name: str) -> bool:
+        try:
+            return bool(self.checks[name]())
+        except Exception:
+            return False
+
+
+class CheckCache:
+    """Persistent results of file-scoped checks."""
+
+    def __init__(
+        self, path: Path = CHECK_CACHE_FILE, max_entries: int = MAX_CACHE_ENTRIES
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict] = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.path.with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(self.entries, f)
+        tmp_file.replace(self.path)
+
+    def key(self, check: str, file_path: Path, toolchain: str = "") -> Optional[str]:
+        """Cache key for a check on the current content of file_path."""
+        try:
+            digest = file_digest(file_path)
+        except OSError:
+            return None
+        return hashlib.sha256(f"{check}\0{toolchain}\0{digest}".encode()).hexdigest()
+
+    def get(self, key: Optional[str]) -> Optional[Dict]:
+        if key is None:
+            return None
+        with self.lock:
+            return self.entries.get(key)
+
+    def put(self, key: Optional[str], value: Dict):
+        if key is None:
+            return
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = value
+            # Dicts keep insertion order, so the first keys are the oldest
+            while len(self.entries) > self.max_entries:
+                del self.entries[next(iter(self.entries))]
+            try:
+                self._save()
+            except OSError:
+                pass
+
+
+def file_digest(file_path: Path) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def toolchain_version(*command: str) -> str:
+    """First line of a tool's version output, or "unavailable"."""
+    try:
+        result = subprocess.run(
+            list(command), capture_output=True, text=True, timeout=10
+        )
+    except Exception:
+        return "unavailable"
+    output = (result.stdout or result.stderr).strip()
+    return output.splitlines()[0] if output else "unavailable"
@@ -5,15 +5,24 @@ Decision Engine - Autonomous Action Selection System
 Evaluates situations, selects actions, and verifies outcomes with confidence scoring.
 """
 
+import atexit
+import bisect
 import json
 import sys
 import os
 import hashlib
 import subprocess
+import threading
+from contextlib import contextmanager
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import fcntl  # type: ignore
+except ImportError:  # pragma: no cover - fcntl should exist on macOS/Linux
+    fcntl = None  # type: ignore
+
 # Configuration
 SCRIPT_DIR = Path(__file__).parent
 KNOWLEDGE_DIR = SCRIPT_DIR / "knowledge"
@@ -21,6 +30,14 @@ ERROR_PATTERNS_FILE = KNOWLEDGE_DIR / "error_patterns.json"
 FIX_HISTORY_FILE = KNOWLEDGE_DIR / "fix_history.json"
 FAILURE_ANALYSIS_FILE = KNOWLEDGE_DIR / "failure_analysis.json"
 CORRELATION_MATRIX_FILE = KNOWLEDGE_DIR / "correlation_matrix.json"
+DECISION_JOURNAL_FILE = KNOWLEDGE_DIR / "decision_journal.jsonl"
+DECISION_LOCK_FILE = KNOWLEDGE_DIR / ".decision_journal.lock"
+
+# Fold journaled fix attempts into the JSON snapshots after this many entries
+JOURNAL_COMPACT_THRESHOLD = 200
+# ...or this many seconds after an attempt, so fix_history.json readers
+# (analytics_collector, knowledge_sync.sh) lag by at most this much
+JOURNAL_COMPACT_INTERVAL = 30.0
 
 # Confidence thresholds
 MIN_CONFIDENCE_AUTO_EXECUTE = 0.75
@@ -50,9 +67,20 @@ class DecisionEngine:
 
     def __init__(self):
         self.error_patterns = self._load_json(ERROR_PATTERNS_FILE)
-        self.fix_history = self._load_json(FIX_HISTORY_FILE)
         self.failure_analysis = self._load_json(FAILURE_ANALYSIS_FILE)
-        self.correlation_matrix = self._load_json(CORRELATION_MATRIX_FILE)
+
+        # fix_history/correlation_matrix are the JSON snapshots plus every
+        # fix attempt appended to the journal since the last compaction
+        self.fix_history: Dict[str, Dict] = {}
+        self.correlation_matrix: Dict[str, Dict] = {}
+        self._fix_index: Dict[str, List[Tuple]] = {}
+        self._fix_keys: Dict[str, Tuple] = {}
+        self._journal_id: Optional[Tuple[int, int]] = None
+        self._journal_offset = 0
+        self._journal_entries = 0
+
+        with self._journal_lock(shared=True):
+            self._reload_knowledge()
 
     def _load_json(self, filepath: Path) -> dict:
         """Load JSON file safely."""
@@ -72,6 +100,100 @@ class DecisionEngine:
             json.dump(data, f, indent=2)
         tmp_file.replace(filepath)
 
+    @contextmanager
+    def _journal_lock(self, shared: bool = False):
+        """Serialize journal appends and compaction across agent processes."""
+        if shared and not KNOWLEDGE_DIR.exists():
+            # Nothing to read yet; don't create the knowledge dir for a lookup
+            yield
+            return
+
+        DECISION_LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+        handle = open(DECISION_LOCK_FILE, "a")
+        try:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            yield
+        finally:
+            handle.close()
+
+    def _reload_knowledge(self):
+        """Rebuild fix state from the snapshots and the full journal."""
+        self.fix_history = self._load_json(FIX_HISTORY_FILE)
+        self.correlation_matrix = self._load_json(CORRELATION_MATRIX_FILE)
+        self._rebuild_fix_index()
+
+        self._journal_id = None
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._replay_journal(reset=True)
+
+    def _replay_journal(self, reset: bool = False) -> bool:
+        """
+        Apply journal entries appended since the last read.
+
+        Returns False if the journal was replaced by a compaction since it
+        was last read, in which case the caller must reload from scratch.
+        """
+        try:
+            handle = open(DECISION_JOURNAL_FILE, "rb")
+        except FileNotFoundError:
+            return reset or self._journal_id is None
+
+        with handle:
+            stat = os.fstat(handle.fileno())
+            journal_id = (stat.st_dev, stat.st_ino)
+            if reset:
+                self._journal_id = journal_id
+            elif journal_id != self._journal_id:
+                return False
+
+            handle.seek(self._journal_offset)
+            data = handle.read()
+
+        # A concurrent writer may not have finished its last line yet
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                delta = json.loads(line)
+            except ValueError:
+                continue
+            self._apply_fix_attempt(delta)
+            self._journal_entries += 1
+        self._journal_offset += end
+        return True
+
+    def _refresh(self, locked: bool = False):
+        """Pick up fix attempts recorded by other agents since the last read."""
+        if self._replay_journal():
+            return
+        if locked:
+            self._reload_knowledge()
+        else:
+            with self._journal_lock(shared=True):
+                self._reload_knowledge()
+
+    def _compact_locked(self):
+        """Write the snapshots and start an empty journal (lock must be held)."""
+        self._save_json(FIX_HISTORY_FILE, self.fix_history)
+        self._save_json(CORRELATION_MATRIX_FILE, self.correlation_matrix)
+
+        tmp_file = DECISION_JOURNAL_FILE.with_suffix(".tmp")
+        tmp_file.write_bytes(b"")
+        tmp_file.replace(DECISION_JOURNAL_FILE)
+
+        stat = DECISION_JOURNAL_FILE.stat()
+        self._journal_id = (stat.st_dev, stat.st_ino)
+        self._journal_offset = 0
+        self._journal_entries = 0
+
+    def compact(self) -> int:
+        """Fold the journal into fix_history.json and correlation_matrix.json."""
+        with self._journal_lock():
+            self._refresh(locked=True)
+            self._compact_locked()
+        return len(self.fix_history)
+
     def _stable_hash(self, text: str) -> str:
         """Generate stable 8-character hash for text."""
         return hashlib.md5(text.encode()).hexdigest()[:8]
@@ -92,6 +214,7 @@ class DecisionEngine:
             }
         """
         context = context or {}
+        self._refresh()
 
         # Look up error in knowledge base
         error_hash = self._stable_hash(error_pattern.lower())
@@ -184,20 +307,41 @@ class DecisionEngine:
 
     def _get_successful_fixes(self, error_hash: str) -> List[Dict]:
         """Get successful fixes from history, sorted by success rate."""
-        fixes = []
+        return [
+            self.fix_history[key[-1]] for key in self._fix_index.get(error_hash, [])
+        ]
+
+    def _is_successful_fix(self, fix_data: Dict) -> bool:
+        return bool(fix_data.get("success", False) or fix_data.get("successes", 0))
 
+    def _rebuild_fix_index(self):
+        """Index successful fixes by error hash, best first."""
+        self._fix_index = {}
+        self._fix_keys = {}
         for fix_id, fix_data in self.fix_history.items():
-            if fix_data.get("error_hash") == error_hash and fix_data.get(
-                "success", False
-            ):
-                fixes.append(fix_data)
+            if isinstance(fix_data, dict):
+                self._index_fix(fix_id)
+
+    def _index_fix(self, fix_id: str):
+        """Insert or reposition one fix in the per-error index."""
+        fix_data = self.fix_history[fix_id]
+        entries = self._fix_index.setdefault(fix_data.get("error_hash"), [])
+
+        old_key = self._fix_keys.pop(fix_id, None)
+        if old_key is not None:
+            del entries[bisect.bisect_left(entries, old_key)]
+
+        if not self._is_successful_fix(fix_data):
+            return
 
         # Sort by success rate, then by times used
-        fixes.sort(
-            key=lambda x: (x.get("success_rate", 0), x.get("times_used", 0)),
-            reverse=True,
+        key = (
+            -fix_data.get("success_rate", 0),
+            -fix_data.get("times_used", 0),
+            fix_id,
         )
-        return fixes
+        bisect.insort(entries, key)
+        self._fix_keys[fix_id] = key
 
     def _heuristic_action_selection(
         self, category: str, severity: str, context: Dict
@@ -309,7 +453,36 @@ class DecisionEngine:
     ):
         """Record a fix attempt to build history and correlation data."""
         error_hash = self._stable_hash(error_pattern.lower())
-        fix_id = f"{error_hash}_{action}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        now = datetime.now()
+        delta = {
+            "fix_id": f"{error_hash}_{action}_{now.strftime('%Y%m%d_%H%M%S')}",
+            "error_hash": error_hash,
+            "action": action,
+            "success": success,
+            "duration": duration,
+            "timestamp": now.isoformat(),
+        }
+
+        # Append-only: one small write per attempt, snapshots rewritten on compaction
+        with self._journal_lock():
+            self._refresh(locked=True)
+            with open(DECISION_JOURNAL_FILE, "ab") as f:
+                f.write((json.dumps(delta) + "\n").encode())
+            self._refresh(locked=True)
+
+            if self._journal_entries >= JOURNAL_COMPACT_THRESHOLD:
+                self._compact_locked()
+            else:
+                schedule_compaction()
+
+    def _apply_fix_attempt(self, delta: Dict):
+        """Apply one journaled fix attempt to fix history and correlations."""
+        fix_id = delta["fix_id"]
+        error_hash = delta["error_hash"]
+        action = delta["action"]
+        success = delta["success"]
+        duration = delta.get("duration", 0.0)
+        timestamp = delta["timestamp"]
 
         # Update fix history
         if fix_id not in self.fix_history:
@@ -321,13 +494,13 @@ class DecisionEngine:
                 "failures": 0,
                 "success_rate": 0.0,
                 "avg_duration": 0.0,
-                "first_used": datetime.now().isoformat(),
-                "last_used": datetime.now().isoformat(),
+                "first_used": timestamp,
+                "last_used": timestamp,
             }
 
         fix_data = self.fix_history[fix_id]
         fix_data["times_used"] += 1
-        fix_data["last_used"] = datetime.now().isoformat()
+        fix_data["last_used"] = timestamp
 
         if success:
             fix_data["successes"] += 1
@@ -342,7 +515,7 @@ class DecisionEngine:
             times = fix_data["times_used"]
             fix_data["avg_duration"] = ((current_avg * (times - 1)) + duration) / times
 
-        self._save_json(FIX_HISTORY_FILE, self.fix_history)
+        self._index_fix(fix_id)
 
         # Update correlation matrix
         self._update_correlations(error_hash, action, success)
@@ -378,10 +551,39 @@ class DecisionEngine:
         else:
             corr_data["correlation_score"] = 0.3  # Low confidence for few samples
 
-        self._save_json(CORRELATION_MATRIX_FILE, self.correlation_matrix)
+
+_compact_timer: Optional[threading.Timer] = None
+_compact_timer_lock = threading.Lock()
 
 
-def main():
+def schedule_compaction():
+    """Compact the journal within JOURNAL_COMPACT_INTERVAL, or at exit."""
+    global _compact_timer
+    with _compact_timer_lock:
+        if _compact_timer is None:
+            _compact_timer = threading.Timer(JOURNAL_COMPACT_INTERVAL, _compact_pending)
+            _compact_timer.daemon = True
+            _compact_timer.start()
+
+
+def _compact_pending():
+    global _compact_timer
+    with _compact_timer_lock:
+        if _compact_timer is None:
+            return
+        _compact_timer.cancel()
+        _compact_timer = None
+    # A fresh engine, so the timer thread never touches a caller's state
+    try:
+        DecisionEngine().compact()
+    except OSError as e:
+        print(f"WARN: decision journal compaction failed: {e}", file=sys.stderr)
+
+
+atexit.register(_compact_pending)
+
+
+def main(engine: Optional[DecisionEngine] = None):
     """CLI interface for decision engine."""
     if len(sys.argv) < 2:
         print("Usage: decision_engine.py <command> [arguments]", file=sys.stderr)
@@ -398,10 +600,15 @@ def main():
             "  record <error_pattern> <action> <success> [duration] - Record fix attempt",
             file=sys.stderr,
         )
+        print(
+            "  compact                                  - Fold journal into knowledge files",
+            file=sys.stderr,
+        )
         sys.exit(1)
 
     command = sys.argv[1]
-    engine = DecisionEngine()
+    if engine is None:
+        engine = DecisionEngine()
 
     if command == "evaluate":
         if len(sys.argv) < 3:
@@ -444,10 +651,16 @@ def main():
         engine.record_fix_attempt(error_pattern, action, success, duration)
         print(json.dumps({"status": "recorded", "success": success}))
 
+    elif command == "compact":
+        fixes = engine.compact()
+        print(json.dumps({"status": "compacted", "fixes": fixes}))
+
     else:
         print(f"ERROR: Unknown command: {command}", file=sys.stderr)
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
+    from intelligence_client import dispatch
+
+    dispatch("decision_engine", main)
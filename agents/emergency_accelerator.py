@@ -6,9 +6,19 @@ Final Acceleration Burst - Maximize utilization of running agents
 import json
 import time
 import os
+import re
 import subprocess
+import sys
 import threading
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from process_supervisor import (  # noqa: E402
+    agent_running,
+    send_to_supervisor,
+    supervised_pids,
+)
+
 
 class FinalAccelerator:
     def __init__(self, workspace_root=None):
@@ -24,12 +34,6 @@ class FinalAccelerator:
         """Force restart all agents with maximum priority"""
         print("🚨 EMERGENCY AGENT RESTART")
 
-        # Kill all existing agents
-        subprocess.run(["pkill", "-f", "agent_.*.sh"], capture_output=True)
-        subprocess.run(["pkill", "-f", "quality_agent.sh"], capture_output=True)
-        time.sleep(2)
-
-        # Start agents with high priority
         agents_to_start = [
             "agent_analytics.sh",
             "agent_build.sh",
@@ -47,6 +51,34 @@ class FinalAccelerator:
             "testing_agent.sh",
         ]
 
+        # A running process supervisor owns the agents and restarts them itself
+        supervised = supervised_pids()
+        response = None
+        if supervised is not None:
+            # Agents it does not own yet would run twice once it adopts them
+            unowned = [agent for agent in agents_to_start if agent not in supervised]
+            for agent in unowned:
+                pattern = "(^|/)" + re.escape(agent) + "( |$)"
+                subprocess.run(["pkill", "-f", pattern], capture_output=True)
+            if unowned:
+                time.sleep(2)
+            try:
+                response = send_to_supervisor(
+                    {"control": "restart", "agents": agents_to_start}
+                )
+            except (ConnectionError, OSError):
+                response = None
+        if response is not None:
+            restarted = len(response.get("restarted", []))
+            print(f"✅ Supervisor restarted {restarted} agents")
+            return restarted
+
+        # Kill all existing agents
+        subprocess.run(["pkill", "-f", "agent_.*.sh"], capture_output=True)
+        subprocess.run(["pkill", "-f", "quality_agent.sh"], capture_output=True)
+        time.sleep(2)
+
+        # Start agents with high priority
         started = 0
         for agent in agents_to_start:
             agent_path = f"{self.agents_dir}/{agent}"
@@ -80,16 +112,12 @@ class FinalAccelerator:
         tasks = queue_data["tasks"]
         agents = agent_data["agents"]
 
-        # Get running agents
+        # Get running agents (the supervisor knows its children without probing)
+        live_pids = supervised_pids()
         running_agents = []
         for agent_name, agent_info in agents.items():
-            pid = agent_info.get("pid", 0)
-            if pid > 0:
-                try:
-                    os.kill(pid, 0)
-                    running_agents.append(agent_name)
-                except:
-                    pass
+            if agent_running(agent_name, agent_info.get("pid", 0), live_pids):
+                running_agents.append(agent_name)
 
         print(f"Running agents: {len(running_agents)}")
 
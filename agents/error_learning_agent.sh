@@ -96,25 +96,8 @@ is_error_line() {
 process_file() {
     local file="$1"
     [[ -f "$file" ]] || return 0
-    while IFS= read -r line || [[ -n "$line" ]]; do
-        if is_error_line "$line"; then
-            # Recognize pattern via Python, then update KB via Python
-            local json
-            if ! json="$(${PY_RECOGNIZER} --line "$line" 2>/dev/null)"; then
-                continue
-            fi
-            # Append example field for context
-            json=$(
-                python3 - "$json" "$line" <<'PY'
-import json,sys
-obj=json.loads(sys.argv[1])
-obj.setdefault('example', sys.argv[2])
-print(json.dumps(obj, ensure_ascii=False))
-PY
-            )
-            ${PY_UPDATER} --workspace "${ROOT_DIR}" --pattern-json "$json" --source "$file" >/dev/null 2>&1 || true
-        fi
-    done <"$file"
+    # Batch mode filters error lines, dedupes them and updates the KB in one write
+    ${PY_RECOGNIZER} --batch "$file" --workspace "${ROOT_DIR}" >/dev/null 2>&1 || true
 }
 
 scan_once() {
@@ -25,6 +25,8 @@ class FixSuggester:
     def __init__(self):
         self.mcp_available = MCP_CLIENT.exists() and self._check_mcp()
         self.decision_engine_available = DECISION_ENGINE.exists()
+        # Shared in-process DecisionEngine (injected by the intelligence daemon)
+        self.decision_engine = None
 
     def _check_mcp(self) -> bool:
         """Check if MCP client is functional."""
@@ -102,19 +104,15 @@ class FixSuggester:
     def _get_decision_engine_suggestion(
         self, error_pattern: str, context: Dict
     ) -> Dict:
-        """Get suggestion from decision engine."""
-        context_json = json.dumps(context)
-        result = subprocess.run(
-            [str(DECISION_ENGINE), "evaluate", error_pattern, context_json],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
+        """Get suggestion from decision engine (in-process, no subprocess)."""
+        if self.decision_engine is None:
+            if str(SCRIPT_DIR) not in sys.path:
+                sys.path.insert(0, str(SCRIPT_DIR))
+            from decision_engine import DecisionEngine
 
-        if result.returncode == 0:
-            return json.loads(result.stdout)
-        else:
-            raise RuntimeError(f"Decision engine failed: {result.stderr}")
+            self.decision_engine = DecisionEngine()
+
+        return self.decision_engine.evaluate_situation(error_pattern, context)
 
     def _get_mcp_suggestion(self, error_pattern: str, context: Dict) -> Optional[Dict]:
         """Get suggestion from MCP client (AI analysis)."""
@@ -332,7 +330,7 @@ class FixSuggester:
         )
 
 
-def main():
+def main(suggester: Optional[FixSuggester] = None):
     """CLI interface for fix suggester."""
     if len(sys.argv) < 2:
         print("Usage: fix_suggester.py <command> [arguments]", file=sys.stderr)
@@ -348,7 +346,8 @@ def main():
         sys.exit(1)
 
     command = sys.argv[1]
-    suggester = FixSuggester()
+    if suggester is None:
+        suggester = FixSuggester()
 
     if command == "suggest":
         if len(sys.argv) < 3:
@@ -381,4 +380,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    from intelligence_client import dispatch
+
+    dispatch("fix_suggester", main)
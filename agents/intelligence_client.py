@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+"""
+Intelligence Client - Thin CLI front-end for the agent intelligence daemon.
+
+The decision engine, strategy tracker, prediction engine, success verifier,
+validation framework and fix suggester CLIs hand their argv to the resident
+daemon, together with their working directory, environment and stdin, when
+it is running and replay its stdout/stderr/exit code, so shell agents keep the
+exact same contract. When the daemon is not reachable the
+CLI runs in-process as before.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sys
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+SCRIPT_DIR = Path(__file__).parent
+
+# Set to "0" to always run in-process
+DAEMON_ENV = "AGENT_INTELLIGENCE_DAEMON"
+SOCKET_ENV = "AGENT_INTELLIGENCE_SOCKET"
+CONNECT_TIMEOUT = 0.2
+
+
+def socket_path() -> str:
+    """Unix socket path for this checkout (overridable via environment)."""
+    override = os.environ.get(SOCKET_ENV)
+    if override:
+        return override
+    digest = hashlib.md5(str(SCRIPT_DIR.resolve()).encode()).hexdigest()[:8]
+    return os.path.join(tempfile.gettempdir(), f"agent-intelligence-{digest}.sock")
+
+
+def send_request(
+    payload: Dict,
+    timeout: Optional[float] = None,
+    path: Optional[str] = None,
+    fds: Sequence[int] = (),
+) -> Optional[Dict]:
+    """
+    Send one request to the daemon (or to another daemon listening on path).
+
+    ``fds`` are passed along with the request (SCM_RIGHTS), so the daemon
+    can use the caller's open files.
+
+    Returns None if the daemon is not reachable; raises ConnectionError if it
+    accepted the request but did not answer.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(path or socket_path())
+        except OSError:
+            return None
+
+        sock.settimeout(timeout)
+        data = json.dumps(payload).encode() + b"\n"
+        sent = socket.send_fds(sock, [data], list(fds)) if fds else 0
+        if sent < len(data):
+            sock.sendall(data[sent:])
+        sock.shutdown(socket.SHUT_WR)
+
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        sock.close()
+
+    try:
+        return json.loads(b"".join(chunks))
+    except ValueError:
+        raise ConnectionError("daemon returned no response")
+
+
+def _stdin_fds() -> List[int]:
+    """The caller's stdin descriptor, unless it is closed."""
+    try:
+        os.fstat(0)
+    except OSError:
+        return []
+    return [0]
+
+
+def dispatch(tool: str, main: Callable[[], None], argv: List[str] = None) -> None:
+    """Run a CLI through the daemon, falling back to in-process ``main()``."""
+    argv = sys.argv[1:] if argv is None else argv
+
+    if os.environ.get(DAEMON_ENV, "1") != "0":
+        try:
+            response = send_request(
+                {
+                    "tool": tool,
+                    "argv": argv,
+                    "cwd": os.getcwd(),
+                    "env": dict(os.environ),
+                },
+                fds=_stdin_fds(),
+            )
+        except (ConnectionError, OSError) as e:
+            # The request may already have been applied; do not run it twice
+            print(f"ERROR: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        if response is not None:
+            sys.stdout.write(response.get("stdout", ""))
+            sys.stderr.write(response.get("stderr", ""))
+            sys.stdout.flush()
+            sys.stderr.flush()
+            sys.exit(response.get("exit_code", 1))
+
+    main()
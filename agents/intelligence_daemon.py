@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+
+"""
+Intelligence Daemon - Resident host for the agent intelligence engines.
+
+Keeps DecisionEngine, StrategyTracker, FailurePredictor and FixSuggester
+loaded in memory and serves their CLIs over a Unix socket, so each call from
+a shell agent costs a socket round trip instead of an interpreter start plus
+a reload of the knowledge base. Cached engines are rebuilt whenever a file in
+the knowledge directory is changed by another process.
+"""
+
+import contextlib
+import importlib
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SCRIPT_DIR = Path(__file__).parent
+KNOWLEDGE_DIR = SCRIPT_DIR / "knowledge"
+
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from intelligence_client import send_request, socket_path  # noqa: E402
+
+# tool name -> (module, resident engine class or None for per-call state)
+TOOLS = {
+    "decision_engine": ("decision_engine", "DecisionEngine"),
+    "strategy_tracker": ("strategy_tracker", "StrategyTracker"),
+    "prediction_engine": ("prediction_engine", "FailurePredictor"),
+    "fix_suggester": ("fix_suggester", "FixSuggester"),
+    "success_verifier": ("success_verifier", None),
+    "validation_framework": ("validation_framework", None),
+}
+
+
+@contextlib.contextmanager
+def _environment(env: Optional[Dict[str, str]]) -> Iterator[None]:
+    """Temporarily replace os.environ (also inherited by child processes)."""
+    if env is None:
+        yield
+        return
+    previous = dict(os.environ)
+    os.environ.clear()
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(previous)
+
+
+@contextlib.contextmanager
+def _redirect_fd(fd: int, target: int) -> Iterator[None]:
+    """Point file descriptor fd at target, so child processes use it too."""
+    saved = os.dup(fd)
+    try:
+        os.dup2(target, fd)
+        yield
+    finally:
+        os.dup2(saved, fd)
+        os.close(saved)
+
+
+def _capture_file():
+    # Line buffered so Python writes interleave with child output on the fd
+    return tempfile.TemporaryFile("w+", buffering=1, encoding="utf-8", errors="replace")
+
+
+class IntelligenceHost:
+    """Runs tool CLIs in-process against cached engine instances."""
+
+    def __init__(self):
+        self.engines: Dict[str, object] = {}
+        self.knowledge_signature = self._knowledge_signature()
+        self.started_at = time.time()
+        self.stats: Dict[str, Dict[str, float]] = {}
+        # CLIs use process-wide state (argv, cwd, environment, stdout), so
+        # calls are serialized
+        self.lock = threading.Lock()
+
+    def _knowledge_signature(self) -> Tuple:
+        try:
+            with os.scandir(KNOWLEDGE_DIR) as entries:
+                return tuple(
+                    sorted(
+                        (e.name, e.stat().st_mtime_ns, e.stat().st_size)
+                        for e in entries
+                        if e.is_file()
+                    )
+                )
+        except OSError:
+            return ()
+
+    def _engine(self, tool: str):
+        module_name, class_name = TOOLS[tool]
+        if class_name is None:
+            return None
+        if tool not in self.engines:
+            module = importlib.import_module(module_name)
+            self.engines[tool] = getattr(module, class_name)()
+        return self.engines[tool]
+
+    def run(
+        self,
+        tool: str,
+        argv,
+        cwd: str,
+        env: Optional[Dict] = None,
+        stdin: Optional[int] = None,
+    ) -> Dict:
+        """Run ``<tool>.py <argv>`` and capture its CLI output and exit code.
+
+        ``env`` replaces the daemon's environment and ``stdin`` (the caller's
+        descriptor) its standard input for the call. Output is captured at
+        the file descriptor level, so child processes that inherit
+        stdout/stderr are captured as well.
+        """
+        if tool not in TOOLS:
+            return {
+                "stdout": "",
+                "stderr": f"ERROR: Unknown tool: {tool}\n",
+                "exit_code": 1,
+            }
+
+        exit_code = 0
+        started = time.monotonic()
+
+        with self.lock, _capture_file() as stdout, _capture_file() as stderr:
+            signature = self._knowledge_signature()
+            if signature != self.knowledge_signature:
+                # Another process changed the knowledge base; reload lazily
+                self.engines.clear()
+
+            previous_argv, previous_cwd = sys.argv, os.getcwd()
+            sys.argv = [str(SCRIPT_DIR / f"{tool}.py")] + list(argv)
+            sys.stdout.flush()
+            sys.stderr.flush()
+            try:
+                os.chdir(cwd)
+                with contextlib.ExitStack() as stack:
+                    stack.enter_context(_environment(env))
+                    if stdin is not None:
+                        stack.enter_context(_redirect_fd(0, stdin))
+                        previous_stdin = sys.stdin
+                        sys.stdin = stack.enter_context(open(0, closefd=False))
+                        stack.callback(setattr, sys, "stdin", previous_stdin)
+                    stack.enter_context(_redirect_fd(1, stdout.fileno()))
+                    stack.enter_context(_redirect_fd(2, stderr.fileno()))
+                    stack.enter_context(contextlib.redirect_stdout(stdout))
+                    stack.enter_context(contextlib.redirect_stderr(stderr))
+                    module = importlib.import_module(TOOLS[tool][0])
+                    engine = self._engine(tool)
+                    if tool == "fix_suggester":
+                        engine.decision_engine = self._engine("decision_engine")
+                    if engine is None:
+                        module.main()
+                    else:
+                        module.main(engine)
+            except SystemExit as e:
+                if isinstance(e.code, int):
+                    exit_code = e.code
+                elif e.code is None:
+                    exit_code = 0
+                else:
+                    stderr.write(f"{e.code}\n")
+                    exit_code = 1
+            except Exception as e:
+                stderr.write(f"ERROR: {tool} failed in daemon: {e}\n")
+                exit_code = 1
+                # Engine state may be inconsistent after an unexpected error
+                self.engines.pop(tool, None)
+            finally:
+                sys.argv = previous_argv
+                os.chdir(previous_cwd)
+                # Our own writes should not force a reload on the next call
+                self.knowledge_signature = self._knowledge_signature()
+
+            stdout.seek(0)
+            stderr.seek(0)
+            output, errors = stdout.read(), stderr.read()
+
+        elapsed_ms = (time.monotonic() - started) * 1000
+        tool_stats = self.stats.setdefault(tool, {"calls": 0, "total_ms": 0.0})
+        tool_stats["calls"] += 1
+        tool_stats["total_ms"] += elapsed_ms
+
+        return {"stdout": output, "stderr": errors, "exit_code": exit_code}
+
+    def status(self) -> Dict:
+        return {
+            "pid": os.getpid(),
+            "uptime_seconds": time.time() - self.started_at,
+            "resident_engines": sorted(self.engines),
+            "tools": {
+                tool: {
+                    "calls": int(s["calls"]),
+                    "avg_ms": s["total_ms"] / s["calls"] if s["calls"] else 0.0,
+                }
+                for tool, s in self.stats.items()
+            },
+        }
+
+
+def _receive_request(sock) -> Tuple[bytes, List[int]]:
+    """Read one request line plus any descriptors sent along with it."""
+    data, fds = b"", []
+    while not data.endswith(b"\n"):
+        chunk, received, _flags, _address = socket.recv_fds(sock, 65536, 1)
+        fds.extend(received)
+        if not chunk:
+            break
+        data += chunk
+    return data, fds
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        data, fds = _receive_request(self.connection)
+        try:
+            self._handle(data, fds)
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+    def _handle(self, data: bytes, fds: List[int]):
+        try:
+            request = json.loads(data)
+        except ValueError:
+            return
+
+        control = request.get("control")
+        if control == "status":
+            response = self.server.host.status()
+        elif control == "shutdown":
+            response = {"status": "stopping"}
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            response = self.server.host.run(
+                request.get("tool", ""),
+                request.get("argv", []),
+                request.get("cwd", os.getcwd()),
+                request.get("env"),
+                fds[0] if fds else None,
+            )
+
+        self.wfile.write(json.dumps(response).encode())
+
+
+class IntelligenceServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, host: IntelligenceHost):
+        self.host = host
+        super().__init__(path, _RequestHandler)
+
+
+def serve(path: Optional[str] = None) -> None:
+    """Run the daemon in the foreground."""
+    path = path or socket_path()
+
+    if os.path.exists(path):
+        if send_request({"control": "status"}) is not None:
+            print(f"Intelligence daemon already running on {path}", file=sys.stderr)
+            sys.exit(1)
+        os.unlink(path)  # stale socket from a crashed daemon
+
+    server = IntelligenceServer(path, IntelligenceHost())
+    os.chmod(path, 0o600)
+    print(f"Intelligence daemon listening on {path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        with contextlib.suppress(OSError):
+            os.unlink(path)
+
+
+def start(wait: float = 5.0) -> bool:
+    """Start the daemon in the background and wait until it answers."""
+    if send_request({"control": "status"}) is not None:
+        return True
+
+    subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "serve"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if send_request({"control": "status"}) is not None:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def main():
+    """CLI interface for the intelligence daemon."""
+    if len(sys.argv) < 2:
+        print("Usage: intelligence_daemon.py <command>", file=sys.stderr)
+        print("\nCommands:", file=sys.stderr)
+        print("  serve    - Run the daemon in the foreground", file=sys.stderr)
+        print("  start    - Start the daemon in the background", file=sys.stderr)
+        print("  stop     - Stop a running daemon", file=sys.stderr)
+        print("  status   - Show daemon status", file=sys.stderr)
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "serve":
+        serve()
+
+    elif command == "start":
+        started = start()
+        print(json.dumps({"status": "running" if started else "failed"}))
+        sys.exit(0 if started else 1)
+
+    elif command == "stop":
+        response = send_request({"control": "shutdown"})
+        print(json.dumps(response or {"status": "not_running"}))
+
+    elif command == "status":
+        response = send_request({"control": "status"})
+        print(json.dumps(response or {"status": "not_running"}, indent=2))
+        sys.exit(0 if response else 1)
+
+    else:
+        print(f"ERROR: Unknown command: {command}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
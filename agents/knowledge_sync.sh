@@ -61,6 +61,9 @@ collect_agent_insights() {
 
     log "Collecting insights from agent knowledge bases..."
 
+    # Fold journaled fix attempts into fix_history.json / correlation_matrix.json
+    python3 "$SCRIPT_DIR/decision_engine.py" compact >/dev/null 2>&1 || true
+
     # Collect from error patterns
     if [ -f "$KNOWLEDGE_DIR/error_patterns.json" ]; then
         local pattern_count
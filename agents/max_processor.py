@@ -8,9 +8,14 @@ import json
 import time
 import os
 import subprocess
+import sys
 import threading
 from concurrent.futures import ThreadPoolExecutor
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from process_supervisor import agent_running, supervised_pids  # noqa: E402
+
 
 class MaxParallelProcessor:
     def __init__(self, workspace_root=None):
@@ -37,19 +42,14 @@ class MaxParallelProcessor:
         tasks = queue_data["tasks"]
         agents = agent_data["agents"]
 
-        # Get all available agents
+        # Get all available agents (the supervisor knows its children without probing)
+        live_pids = supervised_pids()
         available_agents = []
         for agent_name, agent_info in agents.items():
             pid = agent_info.get("pid", 0)
             status = agent_info.get("status", "unknown")
 
-            is_running = False
-            if pid > 0:
-                try:
-                    os.kill(pid, 0)
-                    is_running = True
-                except OSError:
-                    is_running = False
+            is_running = agent_running(agent_name, pid, live_pids)
 
             if is_running and status in ["available", "idle", "running"]:
                 available_agents.append(agent_name)
@@ -5,15 +5,30 @@ Error pattern recognizer (Phase 1 prototype)
 Input: a single error line via --line or stdin
 Output: JSON with { pattern, category, severity, hash }
 
+Batch mode (--batch FILE_OR_DIR ...) streams whole log files, keeps the
+error-worthy lines, dedupes them by coarse pattern hash and prints one JSON
+object per pattern with its count. Large inputs are split into byte ranges
+and scanned in parallel; --workspace merges the result into the knowledge
+base in one write.
+
 No external network calls. Pure local heuristics with safe fallbacks.
 """
 from __future__ import annotations
 import argparse
 import hashlib
 import json
+import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, asdict
+from pathlib import Path
+
+# Batch mode: byte range per worker task, and the input size below which
+# starting worker processes costs more than it saves
+CHUNK_SIZE = 32 * 1024 * 1024
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+MAX_EXAMPLES = 5
 
 
 @dataclass
@@ -32,25 +47,39 @@ ERROR_HINTS = [
     (r"dependency|package|resolve|pod|spm", ("dependency", "medium")),
 ]
 
+_HINTS = [(re.compile(pattern), hint) for pattern, hint in ERROR_HINTS]
+# One pass tells whether any hint can match; most lines match none
+_ANY_HINT = re.compile("|".join(f"(?:{pattern})" for pattern, _ in ERROR_HINTS))
+
+_ANSI = re.compile(r"\x1b\[[0-9;]*m")
+_TIMESTAMP = re.compile(r"^\[[0-9: \-]+\]\s*")
+_ICONS = re.compile(
+    r"[\u2705\u274c\u26a0\ufe0f\u2b50\u2699\ufe0f\ud83d\udd27\ud83d\udd0d\ud83d\udca1]"
+)
+_SPACES = re.compile(r"\s+")
+_LINE_COLUMN = re.compile(r":\d+")
+_LINE_NUMBER = re.compile(r"line \d+", re.I)
+
+# Same heuristic as is_error_line in error_learning_agent.sh
+ERROR_LINE = re.compile(rb"\[ERROR\]|" + "\u274c".encode("utf-8") + rb"|[Ff]ailed")
+
 
 def normalize_message(msg: str) -> str:
     # Collapse multiple spaces, strip timestamps and emojis/icons, trim paths
-    m = re.sub(r"\x1b\[[0-9;]*m", "", msg)  # strip ANSI
-    m = re.sub(r"^\[[0-9: \-]+\]\s*", "", m)  # leading timestamps like [16:34:02]
-    m = re.sub(
-        r"[\u2705\u274c\u26a0\ufe0f\u2b50\u2699\ufe0f\ud83d\udd27\ud83d\udd0d\ud83d\udca1]",
-        "",
-        m,
-    )
-    m = re.sub(r"\s+", " ", m).strip()
+    m = _ANSI.sub("", msg)  # strip ANSI
+    m = _TIMESTAMP.sub("", m)  # leading timestamps like [16:34:02]
+    m = _ICONS.sub("", m)
+    m = _SPACES.sub(" ", m).strip()
     return m
 
 
 def categorize(msg: str) -> tuple[str, str]:
     lm = msg.lower()
-    for pattern, (cat, sev) in ERROR_HINTS:
-        if re.search(pattern, lm):
-            return cat, sev
+    if _ANY_HINT.search(lm):
+        # First hint in list order wins, as before
+        for pattern, (cat, sev) in _HINTS:
+            if pattern.search(lm):
+                return cat, sev
     # Fallbacks
     if "error" in lm:
         return "general", "medium"
@@ -61,21 +90,160 @@ def stable_hash(s: str) -> str:
     return hashlib.sha1(s.encode("utf-8")).hexdigest()[:12]
 
 
-def recognize(line: str) -> Pattern:
+def coarse_pattern(line: str) -> str:
     norm = normalize_message(line)
     # Coarse normalization: drop volatile numbers in line/column references
-    coarse = re.sub(r":\d+", ":<n>", norm)
-    coarse = re.sub(r"line \d+", "line <n>", coarse, flags=re.I)
+    coarse = _LINE_COLUMN.sub(":<n>", norm)
+    return _LINE_NUMBER.sub("line <n>", coarse)
+
+
+def recognize(line: str) -> Pattern:
+    coarse = coarse_pattern(line)
     cat, sev = categorize(coarse)
     return Pattern(pattern=coarse, category=cat, severity=sev, hash=stable_hash(coarse))
 
 
+def _merge(into: dict, stats: dict) -> None:
+    """Merge per-pattern batch stats (keyed by hash) into ``into``."""
+    for key, entry in stats.items():
+        target = into.get(key)
+        if target is None:
+            into[key] = entry
+            continue
+        target["count"] += entry["count"]
+        for ex in entry["examples"]:
+            if len(target["examples"]) >= MAX_EXAMPLES:
+                break
+            if ex not in target["examples"]:
+                target["examples"].append(ex)
+        for f in entry["files"]:
+            if f not in target["files"]:
+                target["files"].append(f)
+
+
+def scan_range(task: tuple) -> dict:
+    """
+    Recognize the error lines starting in byte range [start, end) of a file.
+
+    Returns {hash: {pattern, category, severity, hash, count, examples, files}}.
+    """
+    path, start, end = task
+    stats: dict = {}
+    # Identical coarse patterns skip categorize() and hashing
+    recognized: dict = {}
+    with open(path, "rb") as f:
+        if start:
+            # The line straddling the boundary belongs to the previous range
+            f.seek(start - 1)
+            f.readline()
+        pos = f.tell()
+        while pos < end:
+            raw = f.readline()
+            if not raw:
+                break
+            pos += len(raw)
+            if not ERROR_LINE.search(raw):
+                continue
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            coarse = coarse_pattern(line)
+            key = recognized.get(coarse)
+            if key is None:
+                cat, sev = categorize(coarse)
+                key = stable_hash(coarse)
+                recognized[coarse] = key
+                if key not in stats:
+                    stats[key] = {
+                        "pattern": coarse,
+                        "category": cat,
+                        "severity": sev,
+                        "hash": key,
+                        "count": 0,
+                        "examples": [],
+                        "files": [path],
+                    }
+            entry = stats[key]
+            entry["count"] += 1
+            if len(entry["examples"]) < MAX_EXAMPLES and line not in entry["examples"]:
+                entry["examples"].append(line)
+    return stats
+
+
+def collect_log_files(paths: list, glob: str = "*.log") -> list:
+    """Expand directories (recursively, matching ``glob``) into log files."""
+    files = []
+    for p in paths:
+        path = Path(p)
+        if path.is_dir():
+            files.extend(str(f) for f in sorted(path.rglob(glob)) if f.is_file())
+        elif path.is_file():
+            files.append(str(path))
+    return files
+
+
+def recognize_files(files: list, jobs: int | None = None) -> list:
+    """
+    Batch-recognize error patterns in log files.
+
+    Returns aggregated patterns sorted by descending count. Inputs of at
+    least PARALLEL_THRESHOLD bytes are split into CHUNK_SIZE ranges and
+    scanned by a process pool unless ``jobs`` is 1.
+    """
+    tasks = []
+    total = 0
+    for path in files:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            continue
+        total += size
+        for start in range(0, size, CHUNK_SIZE):
+            tasks.append((path, start, min(start + CHUNK_SIZE, size)))
+
+    merged: dict = {}
+    if jobs != 1 and len(tasks) > 1 and total >= PARALLEL_THRESHOLD:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for stats in executor.map(scan_range, tasks):
+                _merge(merged, stats)
+    else:
+        for task in tasks:
+            _merge(merged, scan_range(task))
+
+    return sorted(merged.values(), key=lambda e: (-e["count"], e["hash"]))
+
+
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument(
         "--line", help="Error line to analyze; if omitted, read stdin", default=None
     )
+    ap.add_argument(
+        "--batch",
+        nargs="+",
+        metavar="PATH",
+        help="Log files or directories to scan in batch mode",
+    )
+    ap.add_argument(
+        "--glob", default="*.log", help="File pattern for --batch directories"
+    )
+    ap.add_argument(
+        "--jobs", type=int, default=None, help="Worker processes for --batch"
+    )
+    ap.add_argument(
+        "--workspace",
+        default=None,
+        help="Merge --batch results into this workspace's knowledge base",
+    )
     args = ap.parse_args()
+    if args.batch:
+        patterns = recognize_files(collect_log_files(args.batch, args.glob), args.jobs)
+        if args.workspace:
+            sys.path.insert(0, str(Path(__file__).parent))
+            from update_knowledge import update_error_patterns_bulk
+
+            update_error_patterns_bulk(args.workspace, patterns)
+        for p in patterns:
+            print(json.dumps(p, ensure_ascii=False))
+        return 0
     if args.line:
         line = args.line
     else:
@@ -8,6 +8,9 @@ import json
 import sys
 import os
 import re
+import subprocess
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
@@ -19,116 +22,67 @@ ERROR_PATTERNS_FILE = KNOWLEDGE_DIR / "error_patterns.json"
 FAILURE_ANALYSIS_FILE = KNOWLEDGE_DIR / "failure_analysis.json"
 PREDICTIONS_FILE = KNOWLEDGE_DIR / "predictions.json"
 
+# Oldest predictions are evicted beyond this many
+MAX_PREDICTIONS = 2000
 
-class FailurePredictor:
-    """Predicts potential failures based on code changes and patterns"""
-
-    def __init__(self):
-        self.error_patterns = self._load_error_patterns()
-        self.failure_analysis = self._load_failure_analysis()
-        self.predictions_history = self._load_predictions()
-
-    def _load_error_patterns(self) -> Dict:
-        """Load error patterns from knowledge base"""
-        if ERROR_PATTERNS_FILE.exists():
-            with open(ERROR_PATTERNS_FILE, "r") as f:
-                return json.load(f)
-        return {"patterns": []}
-
-    def _load_failure_analysis(self) -> Dict:
-        """Load failure analysis from knowledge base"""
-        if FAILURE_ANALYSIS_FILE.exists():
-            try:
-                with open(FAILURE_ANALYSIS_FILE, "r") as f:
-                    content = f.read().strip()
-                    # Handle multiple JSON objects - take the last valid one
-                    if content.count("{") > 1:
-                        # Split on }\n{ pattern and take last
-                        parts = content.split("}\n{")
-                        if len(parts) > 1:
-                            content = "{" + parts[-1]
-                    return json.loads(content)
-            except json.JSONDecodeError as e:
-                print(
-                    f"[Prediction] Warning: Could not parse failure_analysis.json: {e}",
-                    file=sys.stderr,
-                )
-                # Return minimal structure
-                return {"failures": []}
-        return {"failures": []}
-
-    def _load_predictions(self) -> Dict:
-        """Load prediction history"""
-        if PREDICTIONS_FILE.exists():
-            with open(PREDICTIONS_FILE, "r") as f:
-                return json.load(f)
-        return {"predictions": [], "accuracy": {"correct": 0, "incorrect": 0}}
-
-    def _save_predictions(self):
-        """Save predictions to file"""
-        PREDICTIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
-
-        # Atomic write
-        tmp_file = PREDICTIONS_FILE.with_suffix(".tmp")
-        with open(tmp_file, "w") as f:
-            json.dump(self.predictions_history, f, indent=2)
-        tmp_file.replace(PREDICTIONS_FILE)
-
-    def analyze_change(self, file_path: str, change_type: str = "modification") -> Dict:
-        """
-        Analyze a code change and predict potential failures
-
-        Args:
-            file_path: Path to the changed file
-            change_type: Type of change (modification, addition, deletion)
-
-        Returns:
-            Dictionary with risk score and predicted issues
-        """
-        print(
-            f"[Prediction] Analyzing {change_type} in {file_path}...", file=sys.stderr
-        )
+# Smaller batches are analyzed in-process; process start-up would dominate
+PARALLEL_THRESHOLD = 16
 
-        # Calculate risk score
-        risk_score = self._calculate_risk_score(file_path, change_type)
+# Token-level signals, collected in a single scan of the file content
+SIGNAL_PATTERN = re.compile(
+    r"(?P<func>func \w+\()"
+    r"|(?P<def>def \w+\()"
+    r"|(?P<force_unwrap>\w+!(?!=))"
+    r"|(?P<bare_except>except\s*:)"
+)
 
-        # Check against known failure patterns
-        predicted_issues = self._check_failure_patterns(file_path)
+GIT_CHANGE_TYPES = {"A": "addition", "D": "deletion"}
 
-        # Analyze code complexity
-        complexity_issues = self._analyze_complexity(file_path)
 
-        # Check for anti-patterns
-        anti_patterns = self._check_anti_patterns(file_path)
+class ChangeAnalyzer:
+    """Computes all risk signals for a changed file from a single read"""
 
-        # Combine all findings
-        all_issues = predicted_issues + complexity_issues + anti_patterns
+    def __init__(self, error_patterns: Dict, file_failures: Dict[str, int]):
+        self.file_failures = file_failures
+        self.patterns = []
+        for pattern_entry in error_patterns.get("patterns", []):
+            pattern = pattern_entry.get("pattern", "")
+            if not pattern:
+                continue
+            try:
+                compiled = re.compile(pattern, re.IGNORECASE)
+            except re.error:
+                continue
+            self.patterns.append((compiled, pattern_entry))
 
-        # Generate prevention strategies
-        preventions = self._suggest_preventions(all_issues, risk_score)
+    def analyze(self, file_path: str, change_type: str) -> Dict:
+        """Risk score and predicted issues for one change"""
+        issues = []
+        content = self._read(file_path)
+        if content is not None:
+            issues = self._check_failure_patterns(content) + self._scan_content(
+                file_path, content
+            )
 
-        # Create prediction record
-        prediction = {
-            "timestamp": datetime.now().isoformat(),
+        return {
             "file": file_path,
             "change_type": change_type,
-            "risk_score": risk_score,
-            "predicted_issues": all_issues,
-            "preventions": preventions,
-            "status": "pending",  # Will be updated when outcome is known
+            "risk_score": self._calculate_risk_score(file_path, change_type),
+            "predicted_issues": issues,
         }
 
-        # Save prediction
-        self.predictions_history["predictions"].append(prediction)
-        self._save_predictions()
-
-        return {
-            "risk_score": risk_score,
-            "risk_level": self._risk_level(risk_score),
-            "predicted_issues": all_issues,
-            "preventions": preventions,
-            "recommendation": self._get_recommendation(risk_score),
-        }
+    def _read(self, file_path: str) -> Optional[str]:
+        if not os.path.exists(file_path):
+            return None
+        try:
+            with open(file_path, "r") as f:
+                return f.read()
+        except Exception as e:
+            print(
+                f"[Prediction] Warning: Could not read {file_path}: {e}",
+                file=sys.stderr,
+            )
+            return None
 
     def _calculate_risk_score(self, file_path: str, change_type: str) -> float:
         """Calculate risk score for a change (0.0 - 1.0)"""
@@ -151,7 +105,7 @@ class FailurePredictor:
             risk += 0.15  # Shell scripts can be risky
 
         # Check if file has failure history
-        file_failures = self._get_file_failure_count(file_path)
+        file_failures = self.file_failures.get(file_path, 0)
         if file_failures > 0:
             risk += min(0.2, file_failures * 0.05)
 
@@ -163,40 +117,13 @@ class FailurePredictor:
 
         return min(1.0, risk)
 
-    def _get_file_failure_count(self, file_path: str) -> int:
-        """Get number of historical failures for a file"""
-        count = 0
-        for failure in self.failure_analysis.get("failures", []):
-            if failure.get("file") == file_path:
-                count += 1
-        return count
-
-    def _check_failure_patterns(self, file_path: str) -> List[Dict]:
-        """Check file against known failure patterns"""
+    def _check_failure_patterns(self, content: str) -> List[Dict]:
+        """Check file content against known failure patterns"""
         issues = []
 
-        # Read file content if it exists
-        if not os.path.exists(file_path):
-            return issues
-
-        try:
-            with open(file_path, "r") as f:
-                content = f.read()
-        except Exception as e:
-            print(
-                f"[Prediction] Warning: Could not read {file_path}: {e}",
-                file=sys.stderr,
-            )
-            return issues
-
         # Check against known error patterns
-        for pattern_entry in self.error_patterns.get("patterns", []):
-            pattern = pattern_entry.get("pattern", "")
-            if not pattern:
-                continue
-
-            # Check if pattern matches file content
-            if re.search(pattern, content, re.IGNORECASE):
+        for compiled, pattern_entry in self.patterns:
+            if compiled.search(content):
                 issues.append(
                     {
                         "type": "known_pattern",
@@ -209,20 +136,20 @@ class FailurePredictor:
 
         return issues
 
-    def _analyze_complexity(self, file_path: str) -> List[Dict]:
+    def _scan_content(self, file_path: str, content: str) -> List[Dict]:
+        """Complexity issues followed by anti-patterns"""
+        lines = content.split("\n")
+        counts = Counter(match.lastgroup for match in SIGNAL_PATTERN.finditer(content))
+        return self._analyze_complexity(
+            file_path, lines, counts
+        ) + self._check_anti_patterns(file_path, content, counts)
+
+    def _analyze_complexity(
+        self, file_path: str, lines: List[str], counts: Counter
+    ) -> List[Dict]:
         """Analyze code complexity and identify issues"""
         issues = []
 
-        if not os.path.exists(file_path):
-            return issues
-
-        try:
-            with open(file_path, "r") as f:
-                content = f.read()
-                lines = content.split("\n")
-        except Exception:
-            return issues
-
         # Check file size
         if len(lines) > 500:
             issues.append(
@@ -237,16 +164,14 @@ class FailurePredictor:
 
         # Check function length (simplified)
         if file_path.endswith((".swift", ".py")):
-            func_patterns = [r"func \w+\(", r"def \w+\("]
-            for pattern in func_patterns:
-                matches = list(re.finditer(pattern, content))
-                if len(matches) > 20:
+            for signal in ("func", "def"):
+                if counts[signal] > 20:
                     issues.append(
                         {
                             "type": "complexity",
                             "severity": "low",
                             "category": "maintainability",
-                            "description": f"File has {len(matches)} functions, consider splitting",
+                            "description": f"File has {counts[signal]} functions, consider splitting",
                             "confidence": 0.5,
                         }
                     )
@@ -271,19 +196,12 @@ class FailurePredictor:
 
         return issues
 
-    def _check_anti_patterns(self, file_path: str) -> List[Dict]:
+    def _check_anti_patterns(
+        self, file_path: str, content: str, counts: Counter
+    ) -> List[Dict]:
         """Check for known anti-patterns"""
         issues = []
 
-        if not os.path.exists(file_path):
-            return issues
-
-        try:
-            with open(file_path, "r") as f:
-                content = f.read()
-        except Exception:
-            return issues
-
         # Swift anti-patterns
         if file_path.endswith(".swift"):
             # Check for SwiftUI import in data models
@@ -306,7 +224,7 @@ class FailurePredictor:
 
             # Check for force unwrapping
             if "!" in content and "!=" not in content:
-                force_unwrap_count = len(re.findall(r"\w+!(?!=)", content))
+                force_unwrap_count = counts["force_unwrap"]
                 if force_unwrap_count > 5:
                     issues.append(
                         {
@@ -321,7 +239,7 @@ class FailurePredictor:
         # Python anti-patterns
         if file_path.endswith(".py"):
             # Check for bare except
-            if re.search(r"except\s*:", content):
+            if counts["bare_except"]:
                 issues.append(
                     {
                         "type": "anti_pattern",
@@ -348,6 +266,243 @@ class FailurePredictor:
 
         return issues
 
+
+# Process pool workers analyze with a copy of the parent's analyzer
+_worker_analyzer: Optional[ChangeAnalyzer] = None
+
+
+def _init_worker(analyzer: ChangeAnalyzer):
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+
+def _analyze_in_worker(change: Tuple[str, str]) -> Dict:
+    return _worker_analyzer.analyze(*change)
+
+
+def git_changed_files(rev: str = "HEAD") -> List[Tuple[str, str]]:
+    """(path, change_type) for files changed relative to rev, paths relative to cwd"""
+    result = subprocess.run(
+        ["git", "diff", "--name-status", "--relative", rev],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    changes = []
+    for line in result.stdout.splitlines():
+        fields = line.split("\t")
+        if len(fields) < 2:
+            continue
+        # Renames and copies list the new path last
+        changes.append(
+            (fields[-1], GIT_CHANGE_TYPES.get(fields[0][:1], "modification"))
+        )
+    return changes
+
+
+class FailurePredictor:
+    """Predicts potential failures based on code changes and patterns"""
+
+    def __init__(self):
+        self.error_patterns = self._load_error_patterns()
+        self.failure_analysis = self._load_failure_analysis()
+        self.predictions_history = self._load_predictions()
+        self.predictions_history["predictions"] = deque(
+            self.predictions_history.get("predictions", [])[-MAX_PREDICTIONS:]
+        )
+        self._prediction_index: Dict[str, Dict] = {}
+        for prediction in self.predictions_history["predictions"]:
+            self._index_prediction(prediction)
+
+        file_failures = Counter(
+            failure.get("file") for failure in self.failure_analysis.get("failures", [])
+        )
+        self.analyzer = ChangeAnalyzer(self.error_patterns, file_failures)
+
+    def _load_error_patterns(self) -> Dict:
+        """Load error patterns from knowledge base"""
+        if ERROR_PATTERNS_FILE.exists():
+            with open(ERROR_PATTERNS_FILE, "r") as f:
+                return json.load(f)
+        return {"patterns": []}
+
+    def _load_failure_analysis(self) -> Dict:
+        """Load failure analysis from knowledge base"""
+        if FAILURE_ANALYSIS_FILE.exists():
+            try:
+                with open(FAILURE_ANALYSIS_FILE, "r") as f:
+                    content = f.read().strip()
+                    # Handle multiple JSON objects - take the last valid one
+                    if content.count("{") > 1:
+                        # Split on }\n{ pattern and take last
+                        parts = content.split("}\n{")
+                        if len(parts) > 1:
+                            content = "{" + parts[-1]
+                    return json.loads(content)
+            except json.JSONDecodeError as e:
+                print(
+                    f"[Prediction] Warning: Could not parse failure_analysis.json: {e}",
+                    file=sys.stderr,
+                )
+                # Return minimal structure
+                return {"failures": []}
+        return {"failures": []}
+
+    def _load_predictions(self) -> Dict:
+        """Load prediction history"""
+        if PREDICTIONS_FILE.exists():
+            with open(PREDICTIONS_FILE, "r") as f:
+                return json.load(f)
+        return {"predictions": [], "accuracy": {"correct": 0, "incorrect": 0}}
+
+    def _save_predictions(self):
+        """Save predictions to file"""
+        PREDICTIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
+
+        # Atomic write
+        tmp_file = PREDICTIONS_FILE.with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(
+                {
+                    **self.predictions_history,
+                    "predictions": list(self.predictions_history["predictions"]),
+                },
+                f,
+                indent=2,
+            )
+        tmp_file.replace(PREDICTIONS_FILE)
+
+    def _prediction_keys(self, prediction: Dict) -> List[str]:
+        """Ids a prediction can be looked up by"""
+        keys = [
+            prediction["timestamp"],
+            hashlib.md5(prediction["timestamp"].encode()).hexdigest(),
+        ]
+        if "id" in prediction:
+            keys.append(prediction["id"])
+        return keys
+
+    def _index_prediction(self, prediction: Dict):
+        for key in self._prediction_keys(prediction):
+            self._prediction_index[key] = prediction
+
+    def _record_prediction(self, prediction: Dict):
+        """Append to the bounded history, evicting the oldest prediction"""
+        predictions = self.predictions_history["predictions"]
+        if len(predictions) >= MAX_PREDICTIONS:
+            evicted = predictions.popleft()
+            for key in self._prediction_keys(evicted):
+                if self._prediction_index.get(key) is evicted:
+                    del self._prediction_index[key]
+        predictions.append(prediction)
+        self._index_prediction(prediction)
+
+    def _complete_analysis(self, analysis: Dict) -> Dict:
+        """Record a prediction for an analysis and build the CLI result"""
+        risk_score = analysis["risk_score"]
+        all_issues = analysis["predicted_issues"]
+
+        # Generate prevention strategies
+        preventions = self._suggest_preventions(all_issues, risk_score)
+
+        # Create prediction record
+        timestamp = datetime.now().isoformat()
+        prediction_id = hashlib.md5(
+            f"{timestamp}:{analysis['file']}".encode()
+        ).hexdigest()[:12]
+        self._record_prediction(
+            {
+                "id": prediction_id,
+                "timestamp": timestamp,
+                "file": analysis["file"],
+                "change_type": analysis["change_type"],
+                "risk_score": risk_score,
+                "predicted_issues": all_issues,
+                "preventions": preventions,
+                "status": "pending",  # Will be updated when outcome is known
+            }
+        )
+
+        return {
+            "prediction_id": prediction_id,
+            "risk_score": risk_score,
+            "risk_level": self._risk_level(risk_score),
+            "predicted_issues": all_issues,
+            "preventions": preventions,
+            "recommendation": self._get_recommendation(risk_score),
+        }
+
+    def analyze_change(self, file_path: str, change_type: str = "modification") -> Dict:
+        """
+        Analyze a code change and predict potential failures
+
+        Args:
+            file_path: Path to the changed file
+            change_type: Type of change (modification, addition, deletion)
+
+        Returns:
+            Dictionary with risk score and predicted issues
+        """
+        print(
+            f"[Prediction] Analyzing {change_type} in {file_path}...", file=sys.stderr
+        )
+
+        result = self._complete_analysis(self.analyzer.analyze(file_path, change_type))
+        self._save_predictions()
+        return result
+
+    def analyze_batch(
+        self, changes: List[Tuple[str, str]], jobs: Optional[int] = None
+    ) -> Dict:
+        """
+        Analyze many changed files at once
+
+        Args:
+            changes: (file_path, change_type) pairs
+            jobs: Worker processes (default: CPU count)
+
+        Returns:
+            Per-file results plus a summary; predictions are saved once
+        """
+        print(
+            f"[Prediction] Analyzing {len(changes)} changed files...", file=sys.stderr
+        )
+
+        if len(changes) < PARALLEL_THRESHOLD or jobs == 1:
+            analyses = [self.analyzer.analyze(*change) for change in changes]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_worker,
+                initargs=(self.analyzer,),
+            ) as executor:
+                analyses = list(executor.map(_analyze_in_worker, changes, chunksize=8))
+
+        files = []
+        for analysis in analyses:
+            result = self._complete_analysis(analysis)
+            files.append(
+                {
+                    "file": analysis["file"],
+                    "change_type": analysis["change_type"],
+                    **result,
+                }
+            )
+        self._save_predictions()
+
+        max_risk = max((f["risk_score"] for f in files), default=0.0)
+        return {
+            "files": sorted(files, key=lambda f: f["risk_score"], reverse=True),
+            "summary": {
+                "total_files": len(files),
+                "max_risk_score": max_risk,
+                "risk_level": self._risk_level(max_risk),
+                "risk_levels": dict(Counter(f["risk_level"] for f in files)),
+                "total_issues": sum(len(f["predicted_issues"]) for f in files),
+                "recommendation": self._get_recommendation(max_risk),
+            },
+        }
+
     def _suggest_preventions(self, issues: List[Dict], risk_score: float) -> List[Dict]:
         """Suggest prevention strategies based on predicted issues"""
         preventions = []
@@ -448,46 +603,41 @@ class FailurePredictor:
         Update prediction with actual outcome
 
         Args:
-            prediction_id: ID of the prediction (timestamp or hash)
+            prediction_id: ID of the prediction (prediction_id, timestamp or hash)
             outcome: "success" or "failure"
             actual_issues: List of actual issues that occurred
         """
         # Find prediction
-        for pred in self.predictions_history["predictions"]:
+        pred = self._prediction_index.get(prediction_id)
+        if pred is not None:
+            pred["status"] = "completed"
+            pred["outcome"] = outcome
+            pred["actual_issues"] = actual_issues
+
+            # Update accuracy
+            predicted_issue_types = set(
+                issue["type"] for issue in pred["predicted_issues"]
+            )
+            actual_issue_types = set(actual_issues)
+
             if (
-                pred["timestamp"] == prediction_id
-                or hashlib.md5(pred["timestamp"].encode()).hexdigest() == prediction_id
+                outcome == "failure"
+                and len(predicted_issue_types & actual_issue_types) > 0
             ):
-                pred["status"] = "completed"
-                pred["outcome"] = outcome
-                pred["actual_issues"] = actual_issues
-
-                # Update accuracy
-                predicted_issue_types = set(
-                    issue["type"] for issue in pred["predicted_issues"]
-                )
-                actual_issue_types = set(actual_issues)
-
-                if (
-                    outcome == "failure"
-                    and len(predicted_issue_types & actual_issue_types) > 0
-                ):
-                    # We predicted at least one issue that occurred
-                    self.predictions_history["accuracy"]["correct"] += 1
-                elif outcome == "success" and len(pred["predicted_issues"]) == 0:
-                    # We predicted no issues and there were none
-                    self.predictions_history["accuracy"]["correct"] += 1
-                elif (
-                    outcome == "failure"
-                    and len(predicted_issue_types & actual_issue_types) == 0
-                ):
-                    # We failed to predict the failure
-                    self.predictions_history["accuracy"]["incorrect"] += 1
-                else:
-                    # False positive (predicted issues but none occurred)
-                    self.predictions_history["accuracy"]["incorrect"] += 1
-
-                break
+                # We predicted at least one issue that occurred
+                self.predictions_history["accuracy"]["correct"] += 1
+            elif outcome == "success" and len(pred["predicted_issues"]) == 0:
+                # We predicted no issues and there were none
+                self.predictions_history["accuracy"]["correct"] += 1
+            elif (
+                outcome == "failure"
+                and len(predicted_issue_types & actual_issue_types) == 0
+            ):
+                # We failed to predict the failure
+                self.predictions_history["accuracy"]["incorrect"] += 1
+            else:
+                # False positive (predicted issues but none occurred)
+                self.predictions_history["accuracy"]["incorrect"] += 1
 
         self._save_predictions()
 
@@ -518,7 +668,7 @@ class FailurePredictor:
         }
 
 
-def main():
+def main(predictor: Optional[FailurePredictor] = None):
     """Main entry point"""
     if len(sys.argv) < 2:
         print("Usage: prediction_engine.py <command> [args...]", file=sys.stderr)
@@ -527,6 +677,10 @@ def main():
             "  analyze <file_path> [change_type]  - Analyze file and predict failures",
             file=sys.stderr,
         )
+        print(
+            "  analyze-batch [--jobs N] [--git [rev] | <file>... | -]  - Analyze a change set",
+            file=sys.stderr,
+        )
         print(
             "  update <prediction_id> <outcome> [issues...]  - Update prediction outcome",
             file=sys.stderr,
@@ -535,7 +689,8 @@ def main():
         sys.exit(1)
 
     command = sys.argv[1]
-    predictor = FailurePredictor()
+    if predictor is None:
+        predictor = FailurePredictor()
 
     if command == "analyze":
         if len(sys.argv) < 3:
@@ -548,6 +703,41 @@ def main():
         result = predictor.analyze_change(file_path, change_type)
         print(json.dumps(result, indent=2))
 
+    elif command == "analyze-batch":
+        args = sys.argv[2:]
+        jobs = None
+        if args[:1] == ["--jobs"]:
+            try:
+                jobs = int(args[1])
+            except (IndexError, ValueError):
+                jobs = 0
+            if jobs < 1:
+                print("Error: --jobs requires a number", file=sys.stderr)
+                sys.exit(1)
+            args = args[2:]
+
+        if args[:1] == ["--git"]:
+            rev = args[1] if len(args) > 1 else "HEAD"
+            try:
+                changes = git_changed_files(rev)
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f"Error: git diff failed: {e}", file=sys.stderr)
+                sys.exit(1)
+        elif args == ["-"]:
+            changes = [
+                (line.strip(), "modification") for line in sys.stdin if line.strip()
+            ]
+        elif args:
+            changes = [(file_path, "modification") for file_path in args]
+        else:
+            print(
+                "Error: analyze-batch requires --git, file paths or -", file=sys.stderr
+            )
+            sys.exit(1)
+
+        result = predictor.analyze_batch(changes, jobs)
+        print(json.dumps(result, indent=2))
+
     elif command == "update":
         if len(sys.argv) < 4:
             print("Error: update requires prediction_id and outcome", file=sys.stderr)
@@ -578,4 +768,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    from intelligence_client import dispatch
+
+    dispatch("prediction_engine", main)
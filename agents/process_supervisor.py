@@ -0,0 +1,547 @@
+#!/usr/bin/env python3
+
+"""
+Process Supervisor - Event-driven owner of the automation agent processes.
+
+Agents run as direct children of the supervisor, so an exit is reported the
+moment it happens through a pidfd (or SIGCHLD where pidfds are unavailable)
+instead of being found by a later pidfile and ``kill -0`` sweep. Crashed
+agents are restarted with exponential backoff, extra workers follow the queue
+depth and drain rate reported by agent_recovery, and the live state is served
+over a Unix socket using the intelligence daemon's one-line JSON protocol.
+"""
+
+import contextlib
+import functools
+import hashlib
+import json
+import os
+import selectors
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+SCRIPT_DIR = Path(__file__).parent
+
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from agent_recovery import (  # noqa: E402
+    BACKLOG_THRESHOLD,
+    CRITICAL_AGENTS,
+    METRICS_STATE_PATH,
+    QUEUE_PATH,
+    auto_scale_plan,
+    load_drain_rate,
+    load_queue_summary,
+    related_keys,
+    resolve_script,
+    spawn_agent,
+    update_agent_status,
+)
+from intelligence_client import send_request  # noqa: E402
+
+SOCKET_ENV = "AGENT_SUPERVISOR_SOCKET"
+
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+# A worker that stayed up this long is healthy again and restarts immediately
+STABLE_SECONDS = 30.0
+STOP_TIMEOUT = 5.0
+# Queue and drain-rate files are re-read only when their size or mtime change
+QUEUE_CHECK_INTERVAL = 2.0
+REQUEST_TIMEOUT = 1.0
+
+
+def socket_path() -> str:
+    """Unix socket path for this checkout (overridable via environment)."""
+    override = os.environ.get(SOCKET_ENV)
+    if override:
+        return override
+    digest = hashlib.md5(str(SCRIPT_DIR.resolve()).encode()).hexdigest()[:8]
+    return os.path.join(tempfile.gettempdir(), f"agent-supervisor-{digest}.sock")
+
+
+def send_to_supervisor(
+    payload: Dict, timeout: Optional[float] = None
+) -> Optional[Dict]:
+    """Send one request to the supervisor; None if it is not running."""
+    return send_request(payload, timeout, path=socket_path())
+
+
+def supervised_pids() -> Optional[Dict[str, Set[int]]]:
+    """
+    PIDs of running workers per supervised agent, or None without a supervisor.
+
+    Every status-file spelling of an agent name (see related_keys) is a key.
+    """
+    try:
+        state = send_to_supervisor({"control": "status"}, timeout=REQUEST_TIMEOUT)
+    except (ConnectionError, OSError):
+        return None
+    if state is None:
+        return None
+    pids: Dict[str, Set[int]] = {}
+    for agent, info in state.get("agents", {}).items():
+        running = {
+            worker["pid"] for worker in info.get("workers", []) if worker.get("pid")
+        }
+        for key in related_keys(agent):
+            pids.setdefault(key, set()).update(running)
+    return pids
+
+
+def agent_running(
+    agent: str, pid: Optional[int], supervised: Optional[Dict[str, Set[int]]]
+) -> bool:
+    """Whether an agent's recorded pid is alive; asks the supervisor if it owns it."""
+    if not pid or pid <= 0:
+        return False
+    if supervised is not None and agent in supervised:
+        return pid in supervised[agent]
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+
+def _file_signature(path: Path):
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _signal_group(process: subprocess.Popen, sig: int) -> None:
+    # Agents are started in their own session, so the group id is their pid
+    with contextlib.suppress(ProcessLookupError, PermissionError):
+        os.killpg(process.pid, sig)
+
+
+@dataclass
+class Worker:
+    agent: str
+    index: int
+    script: Path
+    process: Optional[subprocess.Popen] = None
+    pidfd: Optional[int] = None
+    started_at: float = 0.0
+    restart_at: Optional[float] = None
+    kill_at: Optional[float] = None
+    failures: int = 0
+    starts: int = 0
+    last_exit: Optional[int] = None
+    retiring: bool = False
+    restart_requested: bool = False
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    @property
+    def state(self) -> str:
+        if self.running:
+            return "stopping" if self.kill_at is not None else "running"
+        return "backoff" if self.restart_at is not None else "stopped"
+
+
+class ProcessSupervisor:
+    """Owns one primary worker per agent plus queue-driven extra workers."""
+
+    def __init__(self, agents: List[str], threshold: int = BACKLOG_THRESHOLD):
+        self.threshold = threshold
+        self.selector = selectors.DefaultSelector()
+        self.use_pidfd = hasattr(os, "pidfd_open")
+        self.workers: Dict[str, List[Worker]] = {}
+        self.scripts: Dict[str, Path] = {}
+        self.auto_extra: Dict[str, int] = {}
+        self.manual_extra: Dict[str, int] = {}
+        self.queue_signature = None
+        self.queue: Dict = {"queued": 0, "drain_rate": None}
+        self.next_queue_check = 0.0
+        self.stopping = False
+        self.started_at = time.time()
+        for agent in agents:
+            self.add_agent(agent)
+
+    def add_agent(self, agent: str) -> bool:
+        if agent in self.scripts:
+            return True
+        script = resolve_script(agent)
+        if script is None:
+            print(f"Warning: no script found for {agent}", file=sys.stderr)
+            return False
+        self.scripts[agent] = script
+        self.workers[agent] = []
+        return True
+
+    def desired(self, agent: str) -> int:
+        extra = self.manual_extra.get(agent, self.auto_extra.get(agent, 0))
+        return 1 + max(0, extra)
+
+    # Process lifecycle
+
+    def _start(self, worker: Worker) -> None:
+        now = time.monotonic()
+        worker.restart_at = None
+        log_prefix = worker.agent.replace(".sh", "").replace("/", "_")
+        if worker.index:
+            log_prefix = f"{log_prefix}_extra_{worker.index}"
+        try:
+            worker.process = spawn_agent(worker.script, log_prefix)
+        except OSError as e:
+            print(f"Failed to start {worker.agent}: {e}", file=sys.stderr)
+            worker.process = None
+            self._schedule_restart(worker, now)
+            return
+
+        worker.started_at = now
+        if self.use_pidfd:
+            worker.pidfd = os.pidfd_open(worker.process.pid)
+            self.selector.register(
+                worker.pidfd,
+                selectors.EVENT_READ,
+                functools.partial(self._on_exit, worker),
+            )
+        if worker.starts and worker.index == 0:
+            update_agent_status(
+                related_keys(worker.agent), "restarting", worker.process.pid
+            )
+        worker.starts += 1
+
+    def _stop(self, worker: Worker) -> None:
+        if worker.running and worker.kill_at is None:
+            _signal_group(worker.process, signal.SIGTERM)
+            worker.kill_at = time.monotonic() + STOP_TIMEOUT
+
+    def _schedule_restart(self, worker: Worker, now: float) -> None:
+        if worker.restart_requested:
+            worker.restart_requested = False
+            worker.failures = 0
+        elif worker.process is not None and now - worker.started_at >= STABLE_SECONDS:
+            worker.failures = 0
+        else:
+            worker.failures += 1
+        if worker.failures:
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (worker.failures - 1))
+        else:
+            delay = 0.0
+        worker.restart_at = now + delay
+
+    def _on_exit(self, worker: Worker) -> None:
+        if worker.process is None or worker.process.poll() is None:
+            return
+
+        if worker.pidfd is not None:
+            self.selector.unregister(worker.pidfd)
+            os.close(worker.pidfd)
+            worker.pidfd = None
+        worker.kill_at = None
+        worker.last_exit = worker.process.returncode
+        print(
+            f"{worker.agent}[{worker.index}] exited with {worker.last_exit}",
+            file=sys.stderr,
+        )
+
+        workers = self.workers.get(worker.agent, [])
+        if self.stopping or worker.retiring:
+            if worker in workers:
+                workers.remove(worker)
+        else:
+            self._schedule_restart(worker, time.monotonic())
+        worker.process = None
+
+    # Scaling
+
+    def _refresh_queue(self, force: bool = False) -> None:
+        self.next_queue_check = time.monotonic() + QUEUE_CHECK_INTERVAL
+        signature = (_file_signature(QUEUE_PATH), _file_signature(METRICS_STATE_PATH))
+        if signature == self.queue_signature and not force:
+            return
+        self.queue_signature = signature
+
+        queued_count, distribution = load_queue_summary()
+        drain_rate = load_drain_rate()
+        self.queue = {"queued": queued_count, "drain_rate": drain_rate}
+        plan = auto_scale_plan(queued_count, distribution, drain_rate, self.threshold)
+        self.auto_extra = {
+            agent: extra for agent, extra in plan.items() if agent in self.scripts
+        }
+
+    def reconcile(self) -> None:
+        """Bring every agent to its desired worker count and fire due timers."""
+        now = time.monotonic()
+        if now >= self.next_queue_check:
+            self._refresh_queue()
+
+        for agent, workers in self.workers.items():
+            desired = self.desired(agent)
+            indexes = {worker.index for worker in workers}
+            for index in range(desired):
+                if index not in indexes:
+                    worker = Worker(agent, index, self.scripts[agent], restart_at=now)
+                    workers.append(worker)
+            workers.sort(key=lambda worker: worker.index)
+
+            for worker in list(workers):
+                if worker.index >= desired and not worker.retiring:
+                    worker.retiring = True
+                    if not worker.running:
+                        workers.remove(worker)
+                        continue
+                    self._stop(worker)
+                if worker.kill_at is not None and now >= worker.kill_at:
+                    _signal_group(worker.process, signal.SIGKILL)
+                    worker.kill_at = None
+                if (
+                    not worker.running
+                    and not worker.retiring
+                    and worker.restart_at is not None
+                    and now >= worker.restart_at
+                ):
+                    self._start(worker)
+
+    def next_timeout(self) -> float:
+        deadlines = [self.next_queue_check]
+        for workers in self.workers.values():
+            for worker in workers:
+                if worker.restart_at is not None and not worker.running:
+                    deadlines.append(worker.restart_at)
+                if worker.kill_at is not None:
+                    deadlines.append(worker.kill_at)
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    # Control requests
+
+    def restart(self, agents: List[str]) -> Dict:
+        restarted, unknown = [], []
+        for agent in agents:
+            if not self.add_agent(agent):
+                unknown.append(agent)
+                continue
+            for worker in self.workers[agent]:
+                if worker.running:
+                    worker.restart_requested = True
+                    self._stop(worker)
+            restarted.append(agent)
+        return {"restarted": restarted, "unknown": unknown}
+
+    def scale(self, agent: str, extra: Optional[int]) -> Dict:
+        if not self.add_agent(agent):
+            return {"error": f"no script found for {agent}"}
+        if extra is None or extra < 0:
+            # Hand the agent back to queue-driven scaling
+            self.manual_extra.pop(agent, None)
+        else:
+            self.manual_extra[agent] = int(extra)
+        return {"agent": agent, "desired": self.desired(agent)}
+
+    def status(self) -> Dict:
+        now = time.monotonic()
+        agents = {}
+        for agent, workers in self.workers.items():
+            agents[agent] = {
+                "desired": self.desired(agent),
+                "manual": agent in self.manual_extra,
+                "workers": [
+                    {
+                        "index": worker.index,
+                        "state": worker.state,
+                        "pid": worker.process.pid if worker.running else None,
+                        "uptime_seconds": (
+                            now - worker.started_at if worker.running else 0.0
+                        ),
+                        "restarts": max(0, worker.starts - 1),
+                        "failures": worker.failures,
+                        "last_exit": worker.last_exit,
+                        "restart_in": (
+                            max(0.0, worker.restart_at - now)
+                            if worker.restart_at is not None and not worker.running
+                            else None
+                        ),
+                    }
+                    for worker in workers
+                ],
+            }
+        return {
+            "pid": os.getpid(),
+            "uptime_seconds": time.time() - self.started_at,
+            "exit_notification": "pidfd" if self.use_pidfd else "sigchld",
+            "queue": self.queue,
+            "agents": agents,
+        }
+
+    def handle_request(self, request: Dict) -> Dict:
+        control = request.get("control")
+        if control == "status":
+            return self.status()
+        if control == "restart":
+            return self.restart(list(request.get("agents", [])))
+        if control == "scale":
+            return self.scale(str(request.get("agent", "")), request.get("extra"))
+        if control == "rescale":
+            self._refresh_queue(force=True)
+            return {"queue": self.queue, "auto_extra": self.auto_extra}
+        if control == "shutdown":
+            self.stopping = True
+            return {"status": "stopping"}
+        return {"error": f"Unknown control: {control}"}
+
+    # Event loop
+
+    def _on_connection(self, listener: socket.socket) -> None:
+        try:
+            conn, _ = listener.accept()
+        except OSError:
+            return
+        with conn:
+            conn.settimeout(REQUEST_TIMEOUT)
+            try:
+                with conn.makefile("rb") as reader:
+                    request = json.loads(reader.readline())
+                if not isinstance(request, dict):
+                    return
+                conn.sendall(json.dumps(self.handle_request(request)).encode())
+            except (OSError, ValueError):
+                return
+
+    def _on_wakeup(self, wakeup_fd: int) -> None:
+        with contextlib.suppress(BlockingIOError):
+            while os.read(wakeup_fd, 512):
+                pass
+        if not self.use_pidfd:
+            # SIGCHLD does not say which child exited
+            for workers in list(self.workers.values()):
+                for worker in list(workers):
+                    self._on_exit(worker)
+
+    def _request_stop(self, signum, frame) -> None:
+        self.stopping = True
+
+    def run(self, listener: socket.socket) -> None:
+        wakeup_r, wakeup_w = os.pipe()
+        os.set_blocking(wakeup_r, False)
+        os.set_blocking(wakeup_w, False)
+        signal.set_wakeup_fd(wakeup_w)
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        if not self.use_pidfd:
+            signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+        listener.setblocking(False)
+        self.selector.register(
+            listener,
+            selectors.EVENT_READ,
+            functools.partial(self._on_connection, listener),
+        )
+        self.selector.register(
+            wakeup_r, selectors.EVENT_READ, functools.partial(self._on_wakeup, wakeup_r)
+        )
+
+        try:
+            while not self.stopping:
+                self.reconcile()
+                for key, _ in self.selector.select(self.next_timeout()):
+                    key.data()
+        finally:
+            self.selector.unregister(listener)
+            self.shutdown()
+            signal.set_wakeup_fd(-1)
+            os.close(wakeup_r)
+            os.close(wakeup_w)
+
+    def shutdown(self) -> None:
+        """Stop every worker, escalating to SIGKILL after STOP_TIMEOUT."""
+        self.stopping = True
+        workers = [w for group in self.workers.values() for w in group if w.running]
+        for worker in workers:
+            _signal_group(worker.process, signal.SIGTERM)
+        deadline = time.monotonic() + STOP_TIMEOUT
+        for worker in workers:
+            try:
+                worker.process.wait(max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                _signal_group(worker.process, signal.SIGKILL)
+                worker.process.wait()
+            self._on_exit(worker)
+
+
+def serve(agents: List[str], path: Optional[str] = None) -> None:
+    """Run the supervisor in the foreground."""
+    path = path or socket_path()
+
+    if os.path.exists(path):
+        if send_to_supervisor({"control": "status"}) is not None:
+            print(f"Process supervisor already running on {path}", file=sys.stderr)
+            sys.exit(1)
+        os.unlink(path)  # stale socket from a crashed supervisor
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    os.chmod(path, 0o600)
+    listener.listen(16)
+    print(f"Process supervisor listening on {path}", file=sys.stderr)
+    try:
+        ProcessSupervisor(agents).run(listener)
+    finally:
+        listener.close()
+        with contextlib.suppress(OSError):
+            os.unlink(path)
+
+
+def main():
+    """CLI interface for the process supervisor."""
+    if len(sys.argv) < 2:
+        print("Usage: process_supervisor.py <command> [args]", file=sys.stderr)
+        print("\nCommands:", file=sys.stderr)
+        print(
+            "  serve [agent...]        - Supervise agents in the foreground",
+            file=sys.stderr,
+        )
+        print("  status                  - Show supervised workers", file=sys.stderr)
+        print("  restart <agent...>      - Restart (or adopt) agents", file=sys.stderr)
+        print(
+            "  scale <agent> <extra>   - Pin extra workers (-1 = automatic)",
+            file=sys.stderr,
+        )
+        print("  rescale                 - Re-read the queue now", file=sys.stderr)
+        print(
+            "  stop                    - Stop the supervisor and its agents",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "serve":
+        serve(sys.argv[2:] or CRITICAL_AGENTS)
+        return
+
+    if command == "status":
+        request = {"control": "status"}
+    elif command == "restart" and len(sys.argv) > 2:
+        request = {"control": "restart", "agents": sys.argv[2:]}
+    elif command == "scale" and len(sys.argv) == 4:
+        request = {"control": "scale", "agent": sys.argv[2], "extra": int(sys.argv[3])}
+    elif command == "rescale":
+        request = {"control": "rescale"}
+    elif command == "stop":
+        request = {"control": "shutdown"}
+    else:
+        print(f"ERROR: Invalid command: {' '.join(sys.argv[1:])}", file=sys.stderr)
+        sys.exit(1)
+
+    response = send_to_supervisor(request)
+    print(json.dumps(response or {"status": "not_running"}, indent=2))
+    sys.exit(0 if response else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,24 +5,159 @@ Tracks success rates, execution times, and adaptations for each strategy
 """
 
 import json
+import os
 import sys
+import time
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import statistics
 
+try:
+    import fcntl  # type: ignore
+except ImportError:  # pragma: no cover - fcntl should exist on macOS/Linux
+    fcntl = None  # type: ignore
+
 # Configuration
 KNOWLEDGE_DIR = Path(__file__).parent / "knowledge"
 STRATEGIES_FILE = KNOWLEDGE_DIR / "strategies.json"
 STRATEGY_HISTORY_FILE = KNOWLEDGE_DIR / "strategy_history.json"
+STRATEGY_JOURNAL_FILE = KNOWLEDGE_DIR / "strategy_journal.jsonl"
+STRATEGY_LOCK_FILE = KNOWLEDGE_DIR / ".strategy_journal.lock"
+
+HISTORY_LIMIT = 1000  # executions kept in strategy_history.json
+RECENT_EXECUTIONS = 20  # per-strategy window for recent success rate
+
+# Journaled executions are folded into the JSON files after this many
+# entries or this many seconds, whichever comes first
+JOURNAL_COMPACT_THRESHOLD = 500
+FLUSH_INTERVAL = 60
 
 
 class StrategyTracker:
     """Tracks and analyzes strategy performance over time"""
 
     def __init__(self):
+        # strategies/history are the JSON snapshots plus every execution
+        # appended to the journal since the last flush
+        self.strategies: Dict = {}
+        self.history: Dict = {"executions": deque(maxlen=HISTORY_LIMIT)}
+        self._by_id: Dict[str, Dict] = {}
+        self._recent: Dict[str, deque] = {}
+        self._rankings: Dict[str, Dict[str, List]] = {}
+        self._journal_id: Optional[Tuple[int, int]] = None
+        self._journal_offset = 0
+        self._journal_entries = 0
+
+        with self._journal_lock(shared=True):
+            self._reload()
+
+    @contextmanager
+    def _journal_lock(self, shared: bool = False):
+        """Serialize journal appends and flushes across agent processes"""
+        STRATEGY_LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+        handle = open(STRATEGY_LOCK_FILE, "a")
+        try:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            yield
+        finally:
+            handle.close()
+
+    def _reload(self):
+        """Rebuild state from the JSON files and the full journal"""
         self.strategies = self._load_strategies()
-        self.history = self._load_history()
+        self._by_id = {s["id"]: s for s in self.strategies.get("strategies", [])}
+        self._rankings = {}
+
+        history = self._load_history()
+        self.history = {
+            "executions": deque(history.get("executions", []), maxlen=HISTORY_LIMIT)
+        }
+        self._recent = {}
+        for record in self.history["executions"]:
+            self._remember(record)
+
+        self._journal_id = None
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._replay_journal(reset=True)
+
+    def _replay_journal(self, reset: bool = False) -> bool:
+        """
+        Apply journaled executions appended since the last read
+
+        Returns False if another process flushed (replaced) the journal in
+        the meantime, in which case the caller must reload.
+        """
+        try:
+            handle = open(STRATEGY_JOURNAL_FILE, "rb")
+        except FileNotFoundError:
+            return reset or self._journal_id is None
+
+        with handle:
+            stat = os.fstat(handle.fileno())
+            journal_id = (stat.st_dev, stat.st_ino)
+            if reset:
+                self._journal_id = journal_id
+            elif journal_id != self._journal_id:
+                return False
+
+            handle.seek(self._journal_offset)
+            data = handle.read()
+
+        # Skip a trailing line another agent is still writing
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            self._apply_execution(record)
+            self._journal_entries += 1
+        self._journal_offset += end
+        return True
+
+    def _refresh(self, locked: bool = False):
+        """Pick up executions recorded by other agents"""
+        if self._replay_journal():
+            return
+        if locked:
+            self._reload()
+        else:
+            with self._journal_lock(shared=True):
+                self._reload()
+
+    def _flush_locked(self):
+        """Write strategies and history, then start an empty journal"""
+        self._save_strategies()
+        self._save_history()
+
+        tmp_file = STRATEGY_JOURNAL_FILE.with_suffix(".tmp")
+        tmp_file.write_bytes(b"")
+        tmp_file.replace(STRATEGY_JOURNAL_FILE)
+
+        stat = STRATEGY_JOURNAL_FILE.stat()
+        self._journal_id = (stat.st_dev, stat.st_ino)
+        self._journal_offset = 0
+        self._journal_entries = 0
+
+    def _flush_due(self) -> bool:
+        if self._journal_entries >= JOURNAL_COMPACT_THRESHOLD:
+            return True
+        try:
+            last_flush = STRATEGY_HISTORY_FILE.stat().st_mtime
+        except FileNotFoundError:
+            return True
+        return time.time() - last_flush >= FLUSH_INTERVAL
+
+    def flush(self):
+        """Fold the execution journal into strategies.json and strategy_history.json"""
+        with self._journal_lock():
+            self._refresh(locked=True)
+            self._flush_locked()
 
     def _load_strategies(self) -> Dict:
         """Load strategy definitions"""
@@ -136,7 +271,11 @@ class StrategyTracker:
         # Atomic write
         tmp_file = STRATEGY_HISTORY_FILE.with_suffix(".tmp")
         with open(tmp_file, "w") as f:
-            json.dump(self.history, f, indent=2)
+            json.dump(
+                {**self.history, "executions": list(self.history["executions"])},
+                f,
+                indent=2,
+            )
         tmp_file.replace(STRATEGY_HISTORY_FILE)
 
     def record_execution(
@@ -162,32 +301,43 @@ class StrategyTracker:
             file=sys.stderr,
         )
 
-        # Find strategy
-        strategy = self._find_strategy(strategy_id)
-        if not strategy:
-            print(
-                f"[Strategy Tracker] Warning: Strategy {strategy_id} not found",
-                file=sys.stderr,
-            )
-            # Still record in history even for unknown strategies
-            execution_record = {
-                "timestamp": datetime.now().isoformat(),
-                "strategy_id": strategy_id,
-                "context": context,
-                "success": success,
-                "execution_time": execution_time,
-                "details": details or {},
-            }
-            self.history["executions"].append(execution_record)
+        execution_record = {
+            "timestamp": datetime.now().isoformat(),
+            "strategy_id": strategy_id,
+            "context": context,
+            "success": success,
+            "execution_time": execution_time,
+            "details": details or {},
+        }
 
-            # Keep last 1000 executions
-            if len(self.history["executions"]) > 1000:
-                self.history["executions"] = self.history["executions"][-1000:]
+        # Append-only: the JSON files are rewritten on flush, not per execution
+        with self._journal_lock():
+            self._refresh(locked=True)
+            if strategy_id not in self._by_id:
+                print(
+                    f"[Strategy Tracker] Warning: Strategy {strategy_id} not found",
+                    file=sys.stderr,
+                )
+            with open(STRATEGY_JOURNAL_FILE, "ab") as f:
+                f.write((json.dumps(execution_record) + "\n").encode())
+            self._refresh(locked=True)
 
-            # Save history
-            self._save_history()
+            if self._flush_due():
+                self._flush_locked()
+
+    def _apply_execution(self, execution_record: Dict):
+        """Apply one journaled execution to the aggregates and history"""
+        # Unknown strategies are still recorded in history
+        self.history["executions"].append(execution_record)
+        self._remember(execution_record)
+
+        strategy = self._by_id.get(execution_record["strategy_id"])
+        if not strategy:
             return
 
+        success = execution_record["success"]
+        execution_time = execution_record["execution_time"]
+
         # Update strategy stats
         strategy["total_attempts"] += 1
         if success:
@@ -210,24 +360,15 @@ class StrategyTracker:
                 alpha * execution_time + (1 - alpha) * strategy["avg_execution_time"]
             )
 
-        # Record in history
-        execution_record = {
-            "timestamp": datetime.now().isoformat(),
-            "strategy_id": strategy_id,
-            "context": context,
-            "success": success,
-            "execution_time": execution_time,
-            "details": details or {},
-        }
-        self.history["executions"].append(execution_record)
+        self._invalidate_rankings(strategy)
 
-        # Keep last 1000 executions
-        if len(self.history["executions"]) > 1000:
-            self.history["executions"] = self.history["executions"][-1000:]
-
-        # Save
-        self._save_strategies()
-        self._save_history()
+    def _remember(self, execution_record: Dict):
+        """Keep the last RECENT_EXECUTIONS executions per strategy"""
+        recent = self._recent.get(execution_record["strategy_id"])
+        if recent is None:
+            recent = deque(maxlen=RECENT_EXECUTIONS)
+            self._recent[execution_record["strategy_id"]] = recent
+        recent.append(execution_record)
 
     def record_adaptation(self, strategy_id: str, change: str, impact: str):
         """
@@ -242,35 +383,34 @@ class StrategyTracker:
             f"[Strategy Tracker] Recording adaptation: {strategy_id}", file=sys.stderr
         )
 
-        strategy = self._find_strategy(strategy_id)
-        if not strategy:
-            return
+        with self._journal_lock():
+            self._refresh(locked=True)
+            strategy = self._find_strategy(strategy_id)
+            if not strategy:
+                return
+
+            adaptation = {
+                "date": datetime.now().isoformat(),
+                "change": change,
+                "impact": impact,
+                "success_rate_before": strategy["success_rate"],
+            }
 
-        adaptation = {
-            "date": datetime.now().isoformat(),
-            "change": change,
-            "impact": impact,
-            "success_rate_before": strategy["success_rate"],
-        }
+            if "adaptations" not in strategy:
+                strategy["adaptations"] = []
 
-        if "adaptations" not in strategy:
-            strategy["adaptations"] = []
-
-        strategy["adaptations"].append(adaptation)
-        self._save_strategies()
+            strategy["adaptations"].append(adaptation)
+            self._flush_locked()
 
     def get_strategy_performance(self, strategy_id: str) -> Dict:
         """Get performance metrics for a strategy"""
+        self._refresh()
         strategy = self._find_strategy(strategy_id)
         if not strategy:
             return {"error": "Strategy not found"}
 
-        # Get recent executions
-        recent_executions = [
-            e for e in self.history["executions"] if e["strategy_id"] == strategy_id
-        ][
-            -20:
-        ]  # Last 20 executions
+        # Last RECENT_EXECUTIONS executions
+        recent_executions = self._recent.get(strategy_id, ())
 
         # Calculate recent success rate
         recent_success_rate = 0.0
@@ -299,14 +439,36 @@ class StrategyTracker:
 
     def get_best_strategy(self, context: str) -> Optional[Dict]:
         """Get the best strategy for a given context"""
+        self._refresh()
+        candidates = self._ranking(context)["best"]
+        return candidates[0] if candidates else None
+
+    def _ranking(self, context: str) -> Dict[str, List]:
+        """Per-context rankings, recomputed only after a candidate changed"""
+        ranking = self._rankings.get(context)
+        if ranking is None:
+            ranking = {
+                "best": self._rank_best(context),
+                "recommendations": self._rank_recommendations(context),
+            }
+            self._rankings[context] = ranking
+        return ranking
+
+    def _invalidate_rankings(self, strategy: Dict):
+        contexts = strategy.get("contexts")
+        if not contexts:
+            # Context-free strategies are candidates for every context
+            self._rankings.clear()
+            return
+        for context in contexts:
+            self._rankings.pop(context, None)
+
+    def _rank_best(self, context: str) -> List[Dict]:
         # Filter strategies by context
         candidates = [
             s for s in self.strategies["strategies"] if context in s.get("contexts", [])
         ]
 
-        if not candidates:
-            return None
-
         # Sort by success rate (descending) and execution time (ascending)
         candidates.sort(
             key=lambda s: (
@@ -319,7 +481,7 @@ class StrategyTracker:
             )
         )
 
-        return candidates[0] if candidates else None
+        return candidates
 
     def get_all_strategies(self) -> List[Dict]:
         """Get all strategies with performance metrics"""
@@ -352,6 +514,10 @@ class StrategyTracker:
 
     def get_strategy_recommendations(self, context: str) -> List[Dict]:
         """Get recommended strategies for a context, ranked by performance"""
+        self._refresh()
+        return [dict(r) for r in self._ranking(context)["recommendations"]]
+
+    def _rank_recommendations(self, context: str) -> List[Dict]:
         candidates = [
             s
             for s in self.strategies["strategies"]
@@ -397,10 +563,7 @@ class StrategyTracker:
 
     def _find_strategy(self, strategy_id: str) -> Optional[Dict]:
         """Find strategy by ID"""
-        for strategy in self.strategies["strategies"]:
-            if strategy["id"] == strategy_id:
-                return strategy
-        return None
+        return self._by_id.get(strategy_id)
 
     def add_strategy(
         self,
@@ -412,38 +575,42 @@ class StrategyTracker:
         estimated_time: int,
     ):
         """Add a new strategy"""
-        # Check if already exists
-        if self._find_strategy(strategy_id):
-            print(
-                f"[Strategy Tracker] Strategy {strategy_id} already exists",
-                file=sys.stderr,
-            )
-            return False
-
-        strategy = {
-            "id": strategy_id,
-            "name": name,
-            "description": description,
-            "contexts": contexts,
-            "base_risk": risk,
-            "estimated_time": estimated_time,
-            "success_rate": 0.0,
-            "total_attempts": 0,
-            "successful_attempts": 0,
-            "failed_attempts": 0,
-            "avg_execution_time": 0,
-            "adaptations": [],
-            "created_at": datetime.now().isoformat(),
-        }
+        with self._journal_lock():
+            self._refresh(locked=True)
+            # Check if already exists
+            if self._find_strategy(strategy_id):
+                print(
+                    f"[Strategy Tracker] Strategy {strategy_id} already exists",
+                    file=sys.stderr,
+                )
+                return False
+
+            strategy = {
+                "id": strategy_id,
+                "name": name,
+                "description": description,
+                "contexts": contexts,
+                "base_risk": risk,
+                "estimated_time": estimated_time,
+                "success_rate": 0.0,
+                "total_attempts": 0,
+                "successful_attempts": 0,
+                "failed_attempts": 0,
+                "avg_execution_time": 0,
+                "adaptations": [],
+                "created_at": datetime.now().isoformat(),
+            }
 
-        self.strategies["strategies"].append(strategy)
-        self._save_strategies()
+            self.strategies["strategies"].append(strategy)
+            self._by_id[strategy_id] = strategy
+            self._invalidate_rankings(strategy)
+            self._flush_locked()
 
         print(f"[Strategy Tracker] Added strategy: {strategy_id}", file=sys.stderr)
         return True
 
 
-def main():
+def main(tracker: Optional[StrategyTracker] = None):
     """Main entry point"""
     if len(sys.argv) < 2:
         print("Usage: strategy_tracker.py <command> [args...]", file=sys.stderr)
@@ -458,6 +625,7 @@ def main():
         print("  list", file=sys.stderr)
         print("  compare <strategy_id1> <strategy_id2> [...]", file=sys.stderr)
         print("  recommend <context>", file=sys.stderr)
+        print("  flush", file=sys.stderr)
         print(
             "  add <strategy_id> <name> <description> <contexts> <risk> <time>",
             file=sys.stderr,
@@ -465,7 +633,8 @@ def main():
         sys.exit(1)
 
     command = sys.argv[1]
-    tracker = StrategyTracker()
+    if tracker is None:
+        tracker = StrategyTracker()
 
     if command == "record":
         if len(sys.argv) < 6:
@@ -564,10 +733,16 @@ def main():
             )
         )
 
+    elif command == "flush":
+        tracker.flush()
+        print(json.dumps({"status": "flushed"}))
+
     else:
         print(f"Error: Unknown command '{command}'", file=sys.stderr)
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
+    from intelligence_client import dispatch
+
+    dispatch("strategy_tracker", main)
@@ -15,6 +15,24 @@ from typing import Dict, List, Tuple, Optional
 SCRIPT_DIR = Path(__file__).parent
 ROOT_DIR = SCRIPT_DIR.parent.parent
 
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from check_pipeline import (  # noqa: E402
+    PASSED,
+    SKIPPED,
+    CheckCache,
+    CheckPipeline,
+    file_digest,
+    toolchain_version,
+)
+
+# Syntax checker and version command per file type
+SYNTAX_CHECKERS = {
+    ".swift": (["swiftc", "-typecheck"], 30, ("swiftc", "--version")),
+    ".py": (["python3", "-m", "py_compile"], 10, ("python3", "--version")),
+    ".sh": (["bash", "-n"], 5, ("bash", "--version")),
+}
+
 
 class SuccessVerifier:
     """Comprehensive success verification for agent operations."""
@@ -22,6 +40,8 @@ class SuccessVerifier:
     def __init__(self):
         self.checks_passed = []
         self.checks_failed = []
+        self.checks_skipped = []
+        self.check_cache = CheckCache()
 
     def verify_codegen_success(self, file_path: str, context: Dict = None) -> bool:
         """
@@ -37,53 +57,117 @@ class SuccessVerifier:
         context = context or {}
         file_path = Path(file_path)
 
-        checks = [
-            self._check_syntax_valid(file_path),
-            self._check_compiles_successfully(file_path, context),
-            self._check_tests_pass(context),
-            self._check_no_regressions(context),
-            self._check_meets_quality_gates(file_path),
-        ]
+        pipeline = CheckPipeline()
+        pipeline.add("syntax_valid", lambda: self._check_syntax_valid(file_path))
+        pipeline.add(
+            "compiles_successfully",
+            lambda: self._check_compiles_successfully(file_path, context),
+            depends_on=["syntax_valid"],
+        )
+        pipeline.add(
+            "tests_pass",
+            lambda: self._check_tests_pass(context),
+            depends_on=["compiles_successfully"],
+        )
+        pipeline.add("no_regressions", lambda: self._check_no_regressions(context))
+        pipeline.add(
+            "meets_quality_gates", lambda: self._check_meets_quality_gates(file_path)
+        )
 
-        return all(checks)
+        return self._run_pipeline(pipeline)
 
     def verify_build_success(self, context: Dict = None) -> bool:
         """Verify build operation success."""
         context = context or {}
 
-        checks = [
-            self._check_build_completes(context),
-            self._check_no_build_errors(context),
-            self._check_dependencies_resolved(context),
-            self._check_build_artifacts_exist(context),
-        ]
+        pipeline = CheckPipeline()
+        pipeline.add("build_completes", lambda: self._check_build_completes(context))
+        pipeline.add(
+            "no_build_errors",
+            lambda: self._check_no_build_errors(context),
+            depends_on=["build_completes"],
+        )
+        pipeline.add(
+            "dependencies_resolved", lambda: self._check_dependencies_resolved(context)
+        )
+        pipeline.add(
+            "build_artifacts_exist",
+            lambda: self._check_build_artifacts_exist(context),
+            depends_on=["build_completes"],
+        )
 
-        return all(checks)
+        return self._run_pipeline(pipeline)
 
     def verify_test_success(self, context: Dict = None) -> bool:
         """Verify test operation success."""
         context = context or {}
 
-        checks = [
-            self._check_tests_execute(context),
-            self._check_all_tests_pass(context),
-            self._check_no_test_timeouts(context),
-            self._check_coverage_maintained(context),
-        ]
+        # xcodebuild runs in the same project can't overlap, so they form a chain
+        pipeline = CheckPipeline()
+        pipeline.add("tests_execute", lambda: self._check_tests_execute(context))
+        pipeline.add(
+            "all_tests_pass",
+            lambda: self._check_all_tests_pass(context),
+            depends_on=["tests_execute"],
+        )
+        pipeline.add(
+            "no_test_timeouts",
+            lambda: self._check_no_test_timeouts(context),
+            depends_on=["tests_execute"],
+        )
+        pipeline.add(
+            "coverage_maintained", lambda: self._check_coverage_maintained(context)
+        )
 
-        return all(checks)
+        return self._run_pipeline(pipeline)
 
     def verify_fix_success(self, error_pattern: str, context: Dict = None) -> bool:
         """Verify fix operation success."""
         context = context or {}
 
-        checks = [
-            self._check_error_resolved(error_pattern, context),
-            self._check_no_new_errors(context),
-            self._check_functionality_preserved(context),
-        ]
+        pipeline = CheckPipeline()
+        pipeline.add(
+            "error_resolved", lambda: self._check_error_resolved(error_pattern, context)
+        )
+        pipeline.add("no_new_errors", lambda: self._check_no_new_errors(context))
+        pipeline.add(
+            "functionality_preserved",
+            lambda: self._check_functionality_preserved(context),
+            depends_on=["error_resolved"],
+        )
+
+        return self._run_pipeline(pipeline)
 
-        return all(checks)
+    def _run_pipeline(self, pipeline: CheckPipeline) -> bool:
+        """Run a check pipeline and record checks skipped after a failure."""
+        status = pipeline.run()
+        for name, state in status.items():
+            if state == SKIPPED:
+                self.checks_skipped.append(
+                    {"check": name, "reason": "upstream check failed"}
+                )
+        return all(state == PASSED for state in status.values())
+
+    def _cached_check(
+        self, check_name: str, file_path: Path, toolchain: str, compute
+    ) -> bool:
+        """
+        Run a file-scoped check, reusing the result for unchanged content.
+
+        compute() returns (passed, entry, cacheable); timeouts and tool
+        errors are not cacheable.
+        """
+        key = self.check_cache.key(check_name, file_path, toolchain)
+        cached = self.check_cache.get(key)
+        if cached is not None:
+            passed, entry = cached["passed"], dict(cached["entry"], cached=True)
+        else:
+            passed, entry, cacheable = compute()
+            if cacheable:
+                self.check_cache.put(key, {"passed": passed, "entry": entry})
+
+        (self.checks_passed if passed else self.checks_failed).append(entry)
+        return passed
 
     def get_verification_report(self) -> Dict:
         """Generate verification report."""
@@ -96,6 +180,7 @@ class SuccessVerifier:
             "failed": len(self.checks_failed),
             "checks_passed": self.checks_passed,
             "checks_failed": self.checks_failed,
+            "checks_skipped": self.checks_skipped,
             "pass_rate": (
                 len(self.checks_passed) / total_checks if total_checks > 0 else 0
             ),
@@ -112,47 +197,38 @@ class SuccessVerifier:
             return False
 
         # Determine language and check syntax
-        suffix = file_path.suffix.lower()
+        checker = SYNTAX_CHECKERS.get(file_path.suffix.lower())
+        if checker is None:
+            # Unknown type, assume valid
+            self.checks_passed.append(
+                {"check": check_name, "result": "skipped (unknown type)"}
+            )
+            return True
 
-        try:
-            if suffix == ".swift":
-                result = subprocess.run(
-                    ["swiftc", "-typecheck", str(file_path)],
-                    capture_output=True,
-                    timeout=30,
-                )
-            elif suffix == ".py":
-                result = subprocess.run(
-                    ["python3", "-m", "py_compile", str(file_path)],
-                    capture_output=True,
-                    timeout=10,
-                )
-            elif suffix == ".sh":
+        command, timeout, version_command = checker
+
+        def compute():
+            try:
                 result = subprocess.run(
-                    ["bash", "-n", str(file_path)], capture_output=True, timeout=5
-                )
-            else:
-                # Unknown type, assume valid
-                self.checks_passed.append(
-                    {"check": check_name, "result": "skipped (unknown type)"}
+                    command + [str(file_path)], capture_output=True, timeout=timeout
                 )
-                return True
+            except Exception as e:
+                return False, {"check": check_name, "reason": str(e)}, False
 
             if result.returncode == 0:
-                self.checks_passed.append({"check": check_name, "result": "valid"})
-                return True
-            else:
-                self.checks_failed.append(
-                    {
-                        "check": check_name,
-                        "reason": f"Syntax errors: {result.stderr.decode()[:200]}",
-                    }
-                )
-                return False
+                return True, {"check": check_name, "result": "valid"}, True
+            return (
+                False,
+                {
+                    "check": check_name,
+                    "reason": f"Syntax errors: {result.stderr.decode()[:200]}",
+                },
+                True,
+            )
 
-        except Exception as e:
-            self.checks_failed.append({"check": check_name, "reason": str(e)})
-            return False
+        return self._cached_check(
+            check_name, file_path, toolchain_version(*version_command), compute
+        )
 
     def _check_compiles_successfully(self, file_path: Path, context: Dict) -> bool:
         """Check if file compiles successfully."""
@@ -260,7 +336,28 @@ class SuccessVerifier:
         """Check quality gates."""
         check_name = "meets_quality_gates"
 
+        if not file_path.exists():
+            # Nothing to hash; run uncached
+            passed, entry, _ = self._quality_gates_result(check_name, file_path)
+            (self.checks_passed if passed else self.checks_failed).append(entry)
+            return passed
+
+        # Lint results depend on the SwiftLint version and configuration
+        toolchain = toolchain_version("swiftlint", "version")
+        config = ROOT_DIR / ".swiftlint.yml"
+        if config.exists():
+            toolchain += f" config:{file_digest(config)}"
+
+        return self._cached_check(
+            check_name,
+            file_path,
+            toolchain,
+            lambda: self._quality_gates_result(check_name, file_path),
+        )
+
+    def _quality_gates_result(self, check_name: str, file_path: Path):
         issues = []
+        cacheable = True
 
         # Check file size
         if file_path.exists():
@@ -286,19 +383,14 @@ class SuccessVerifier:
                 errors = result.stdout.decode().count("error:")
                 if errors > 0:
                     issues.append(f"{errors} lint errors")
+        except subprocess.TimeoutExpired:
+            cacheable = False
         except:
             pass  # SwiftLint not available
 
         if issues:
-            self.checks_failed.append(
-                {"check": check_name, "reason": "; ".join(issues)}
-            )
-            return False
-        else:
-            self.checks_passed.append(
-                {"check": check_name, "result": "quality gates met"}
-            )
-            return True
+            return False, {"check": check_name, "reason": "; ".join(issues)}, cacheable
+        return True, {"check": check_name, "result": "quality gates met"}, cacheable
 
     def _check_build_completes(self, context: Dict) -> bool:
         """Check if build completes."""
@@ -529,4 +621,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    from intelligence_client import dispatch
+
+    dispatch("success_verifier", main)
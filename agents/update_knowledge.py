@@ -31,17 +31,21 @@ def save_json(path: str, obj) -> None:
     os.replace(tmp, path)
 
 
-def update_error_patterns(
-    base_dir: str, pattern_obj: dict, source_file: str | None = None
-) -> None:
-    path = os.path.join(
+def _error_patterns_path(base_dir: str) -> str:
+    return os.path.join(
         base_dir, "Tools", "Automation", "agents", "knowledge", "error_patterns.json"
     )
-    db = load_json(path, {})
-    key = pattern_obj.get("hash") or pattern_obj.get("pattern")
-    if not key:
-        return
-    now = datetime.now(timezone.utc).isoformat() + "Z"
+
+
+def _merge_pattern(
+    db: dict,
+    key: str,
+    pattern_obj: dict,
+    now: str,
+    count: int = 1,
+    examples: list | None = None,
+    files: list | None = None,
+) -> None:
     entry = db.get(key) or {
         "pattern": pattern_obj.get("pattern", ""),
         "category": pattern_obj.get("category", "general"),
@@ -52,13 +56,14 @@ def update_error_patterns(
         "first_seen": now,
         "last_seen": now,
     }
-    entry["count"] = int(entry.get("count", 0)) + 1
+    entry["count"] = int(entry.get("count", 0)) + count
     entry["last_seen"] = now
-    ex = pattern_obj.get("example") or pattern_obj.get("pattern")
-    if ex and ex not in entry["examples"]:
-        entry["examples"].append(ex)
-    if source_file and source_file not in entry["files"]:
-        entry["files"].append(source_file)
+    for ex in examples or []:
+        if ex and ex not in entry["examples"]:
+            entry["examples"].append(ex)
+    for source_file in files or []:
+        if source_file and source_file not in entry["files"]:
+            entry["files"].append(source_file)
     # Update category/severity if new is higher priority
     entry["category"] = (
         pattern_obj.get("category", entry["category"]) or entry["category"]
@@ -67,9 +72,56 @@ def update_error_patterns(
         pattern_obj.get("severity", entry["severity"]) or entry["severity"]
     )
     db[key] = entry
+
+
+def update_error_patterns(
+    base_dir: str, pattern_obj: dict, source_file: str | None = None
+) -> None:
+    path = _error_patterns_path(base_dir)
+    db = load_json(path, {})
+    key = pattern_obj.get("hash") or pattern_obj.get("pattern")
+    if not key:
+        return
+    now = datetime.now(timezone.utc).isoformat() + "Z"
+    ex = pattern_obj.get("example") or pattern_obj.get("pattern")
+    _merge_pattern(db, key, pattern_obj, now, examples=[ex], files=[source_file])
     save_json(path, db)
 
 
+def update_error_patterns_bulk(base_dir: str, patterns: list) -> int:
+    """
+    Merge many aggregated patterns with a single load and save.
+
+    Each pattern may carry "count", "examples" and "files" (as produced by
+    pattern_recognizer.py --batch) in addition to the single-pattern fields.
+    Returns the number of patterns merged.
+    """
+    path = _error_patterns_path(base_dir)
+    db = load_json(path, {})
+    now = datetime.now(timezone.utc).isoformat() + "Z"
+    merged = 0
+    for pattern_obj in patterns:
+        key = pattern_obj.get("hash") or pattern_obj.get("pattern")
+        if not key:
+            continue
+        examples = pattern_obj.get("examples") or [
+            pattern_obj.get("example") or pattern_obj.get("pattern")
+        ]
+        _merge_pattern(
+            db,
+            key,
+            pattern_obj,
+            now,
+            count=int(pattern_obj.get("count", 1)),
+            examples=examples,
+            files=pattern_obj.get("files"),
+        )
+        merged += 1
+    if merged:
+        save_json(path, db)
+    return merged
+
+
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument(
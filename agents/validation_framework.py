@@ -10,6 +10,7 @@ import sys
 import os
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
@@ -19,6 +20,23 @@ from enum import Enum
 SCRIPT_DIR = Path(__file__).parent
 ROOT_DIR = SCRIPT_DIR.parent.parent
 
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from check_pipeline import (  # noqa: E402
+    MAX_WORKERS,
+    SKIPPED,
+    CheckCache,
+    CheckPipeline,
+    toolchain_version,
+)
+
+# Version command per syntax checker, part of the syntax cache key
+TOOLCHAIN_VERSION_COMMANDS = {
+    "swift": ("swiftc", "--version"),
+    "python": ("python3", "--version"),
+    "bash": ("bash", "--version"),
+}
+
 
 class ValidationLayer(Enum):
     """Validation layers with timing."""
@@ -57,6 +75,7 @@ class ValidationFramework:
     def __init__(self, operation_type: str = "general"):
         self.operation_type = operation_type
         self.results: List[ValidationResult] = []
+        self.check_cache = CheckCache()
 
     def validate_syntax(
         self, file_path: str, language: str = "auto"
@@ -87,6 +106,25 @@ class ValidationFramework:
             }
             language = language_map.get(suffix, "unknown")
 
+        # Unchanged content checked with the same toolchain is not re-run
+        cache_key = None
+        if language in TOOLCHAIN_VERSION_COMMANDS:
+            cache_key = self.check_cache.key(
+                f"syntax:{language}",
+                file_path,
+                toolchain_version(*TOOLCHAIN_VERSION_COMMANDS[language]),
+            )
+            cached = self.check_cache.get(cache_key)
+            if cached is not None:
+                validation = ValidationResult(
+                    ValidationLayer.SYNTAX,
+                    cached["passed"],
+                    cached["message"],
+                    dict(cached["details"], cached=True),
+                )
+                self.results.append(validation)
+                return validation
+
         # Syntax check based on language
         try:
             if language == "swift":
@@ -135,6 +173,9 @@ class ValidationFramework:
             validation = ValidationResult(
                 ValidationLayer.SYNTAX, passed, message, details
             )
+            self.check_cache.put(
+                cache_key, {"passed": passed, "message": message, "details": details}
+            )
             self.results.append(validation)
             return validation
 
@@ -183,10 +224,9 @@ class ValidationFramework:
         # Check 2: Dependencies met
         if context.get("requires_dependencies"):
             deps = context.get("dependencies", [])
-            missing_deps = []
-            for dep in deps:
-                if not self._check_dependency(dep):
-                    missing_deps.append(dep)
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                available = list(executor.map(self._check_dependency, deps))
+            missing_deps = [dep for dep, ok in zip(deps, available) if not ok]
 
             if missing_deps:
                 logical_checks.append(
@@ -237,22 +277,49 @@ class ValidationFramework:
         """
         time.sleep(30)  # Deliberate delay for integration validation
 
-        integration_checks = []
+        outcomes: Dict[str, Tuple[bool, str]] = {}
+
+        def check(name, run):
+            def run_check() -> bool:
+                try:
+                    outcomes[name] = run(context)
+                except Exception as e:
+                    outcomes[name] = (False, f"{name} check crashed: {e}")
+                return outcomes[name][0]
+
+            return run_check
+
+        # Lint runs alongside build/test; tests reuse the build, so they wait
+        # for it and are skipped if it fails
+        pipeline = CheckPipeline()
 
         # Check 1: Build succeeds if code change
         if context.get("affects_build", False):
-            build_result = self._run_build_check(context)
-            integration_checks.append(("build", build_result[0], build_result[1]))
+            pipeline.add("build", check("build", self._run_build_check))
 
         # Check 2: Tests pass if test-affecting change
         if context.get("affects_tests", False):
-            test_result = self._run_test_check(context)
-            integration_checks.append(("tests", test_result[0], test_result[1]))
+            pipeline.add(
+                "tests",
+                check("tests", self._run_test_check),
+                depends_on=["build"] if "build" in pipeline.checks else None,
+            )
 
         # Check 3: Lint passes if code change
         if context.get("affects_code", False):
-            lint_result = self._run_lint_check(context)
-            integration_checks.append(("lint", lint_result[0], lint_result[1]))
+            pipeline.add("lint", check("lint", self._run_lint_check))
+
+        status = pipeline.run()
+        # Skipped checks count as failed: a check they depend on did not pass
+        integration_checks = [
+            (
+                (name, *outcomes[name])
+                if name in outcomes
+                else (name, False, f"{name} check {state}: a dependency failed")
+            )
+            for name, state in status.items()
+        ]
+        skipped = [name for name, state in status.items() if state == SKIPPED]
 
         # Evaluate overall integration
         failed_checks = [c for c in integration_checks if not c[1]]
@@ -265,16 +332,17 @@ class ValidationFramework:
         else:
             message = f"Integration validation failed: {len(failed_checks)}/{len(integration_checks)} checks failed"
 
+        details = {
+            "checks": [
+                {"name": c[0], "passed": c[1], "message": c[2]}
+                for c in integration_checks
+            ]
+        }
+        if skipped:
+            details["skipped"] = skipped
+
         validation = ValidationResult(
-            ValidationLayer.INTEGRATION,
-            passed,
-            message,
-            {
-                "checks": [
-                    {"name": c[0], "passed": c[1], "message": c[2]}
-                    for c in integration_checks
-                ]
-            },
+            ValidationLayer.INTEGRATION, passed, message, details
         )
         self.results.append(validation)
         return validation
@@ -600,4 +668,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    from intelligence_client import dispatch
+
+    dispatch("validation_framework", main)
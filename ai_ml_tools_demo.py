@@ -202,7 +202,7 @@ def main():
     print("🎉 All demonstrations completed!")
     print("\nNext steps:")
     print("1. Access Umami analytics at: http://localhost:3000")
-    print("2. Review generated analytics files: umami_events.log, umami_websites.json")
+    print("2. Review generated analytics files: umami_events/, umami_websites.json")
     print("3. Check performance data in agent_performance_analyzer.py output")
     print("4. Integrate these tools into your agent workflows")
 
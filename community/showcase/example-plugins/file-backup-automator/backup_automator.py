@@ -2,16 +2,25 @@
 """
 File Backup Automator Plugin
 Automatically backs up files to cloud storage with configurable schedules.
+
+Backups are incremental and content-addressed: files are split into
+content-defined chunks, each chunk is stored once (compressed, keyed by its
+SHA-256) and every run writes a snapshot manifest listing the chunks of each
+file. Files whose size and mtime did not change since the last run are not
+read again, so a run only costs the changed bytes.
 """
 
 import os
 import json
+import hashlib
 import logging
 import schedule
 import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 
 try:
     import boto3
@@ -21,6 +30,13 @@ try:
 except ImportError:
     BOTO3_AVAILABLE = False
 
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 # Plugin metadata
 PLUGIN_INFO = {
     "name": "File Backup Automator",
@@ -29,6 +45,236 @@ PLUGIN_INFO = {
     "author": "Tools Automation Community",
 }
 
+# Content-defined chunking: cut where the rolling gear hash has its low
+# CHUNK_MASK bits clear (about every 256 KiB), within MIN/MAX bounds
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 1024 * 1024
+CHUNK_MASK = (1 << 18) - 1
+READ_SIZE = 4 * 1024 * 1024
+COMPRESSION_LEVEL = 6
+
+# Changed bytes below which chunking runs in-process
+PARALLEL_THRESHOLD = 8 * 1024 * 1024
+UPLOAD_WORKERS = 8
+MAX_PENDING_UPLOADS = 64
+
+SNAPSHOT_PREFIX = "snapshots/"
+CHUNK_PREFIX = "chunks/"
+SNAPSHOT_FORMAT = "backup-%Y-%m-%d-%H-%M-%S"
+
+# Deterministic, so chunk boundaries (and dedup) are stable across runs
+GEAR = [
+    int.from_bytes(hashlib.sha256(bytes([i])).digest()[:4], "big") & CHUNK_MASK
+    for i in range(256)
+]
+# Bytes shifted left this often fall out of the masked hash, so the hash
+# at any offset only depends on the last HASH_WINDOW bytes
+HASH_WINDOW = CHUNK_MASK.bit_length()
+
+if NUMPY_AVAILABLE:
+    GEAR_ARRAY = np.array(GEAR, dtype=np.uint32)
+
+
+def _gear_zeros(data: bytes) -> Optional["np.ndarray"]:
+    """Offsets whose full-window gear hash is zero (None without numpy)."""
+    if not NUMPY_AVAILABLE:
+        return None
+    # hashes[i] covers the ``width`` bytes ending at i; a window of a + b
+    # bytes is the last a bytes' hash plus the earlier b bytes' shifted by a.
+    # uint32 wraparound leaves the masked low bits intact.
+    hashes = GEAR_ARRAY[np.frombuffer(data, dtype=np.uint8)]
+    width = 1
+    partial = {}
+    while width < HASH_WINDOW:
+        step = width
+        while width + step > HASH_WINDOW:
+            step //= 2
+        partial[width] = hashes
+        combined = partial[step].copy()
+        combined[step:] += hashes[:-step] << np.uint32(step)
+        hashes = combined
+        width += step
+    return np.flatnonzero((hashes & CHUNK_MASK) == 0)
+
+
+def _scan_cut(data, begin: int, end: int, gear=GEAR) -> Optional[int]:
+    """First cut in data[begin:end] with the hash restarted at ``begin``."""
+    h = 0
+    # Only the masked bits decide a cut, so h is kept masked
+    for offset, byte in enumerate(data[begin:end]):
+        h = ((h << 1) + gear[byte]) & CHUNK_MASK
+        if not h:
+            return begin + offset + 1
+    return None
+
+
+def cut_points(data: bytes, eof: bool) -> List[int]:
+    """End offsets of the complete chunks in ``data``.
+
+    Without ``eof`` the trailing bytes that may still grow into a longer
+    chunk are left for the caller to carry into the next read.
+    """
+    cuts = []
+    start = 0
+    size = len(data)
+    view = memoryview(data)
+    zeros = _gear_zeros(data) if size > MIN_CHUNK_SIZE else None
+    while start < size:
+        end = min(start + MAX_CHUNK_SIZE, size)
+        begin = start + MIN_CHUNK_SIZE
+        if zeros is None:
+            cut = _scan_cut(view, begin, end)
+        else:
+            # Until the hash has seen a full window it differs from the
+            # precomputed one, so those few offsets are scanned directly
+            cut = _scan_cut(view, begin, min(begin + HASH_WINDOW - 1, end))
+            if cut is None:
+                first = zeros.searchsorted(begin + HASH_WINDOW - 1)
+                if first < len(zeros) and zeros[first] < end:
+                    cut = int(zeros[first]) + 1
+        if cut is None:
+            if end - start == MAX_CHUNK_SIZE or eof:
+                cut = end
+            else:
+                break
+        cuts.append(cut)
+        start = cut
+    return cuts
+
+
+def chunk_file(path: str) -> Tuple[str, str, List[Tuple[str, int, bytes]]]:
+    """Split a file into compressed chunks.
+
+    Returns (path, file sha256, [(chunk sha256, size, compressed data)]).
+    """
+    file_hash = hashlib.sha256()
+    chunks = []
+    buffer = b""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < MIN_CHUNK_SIZE:
+            # Too small to cut: the whole file is one chunk
+            data = f.read()
+            file_hash.update(data)
+            if data:
+                chunks.append(
+                    (
+                        hashlib.sha256(data).hexdigest(),
+                        len(data),
+                        zlib.compress(data, COMPRESSION_LEVEL),
+                    )
+                )
+            return path, file_hash.hexdigest(), chunks
+        while True:
+            block = f.read(READ_SIZE)
+            eof = not block
+            file_hash.update(block)
+            buffer += block
+            start = 0
+            for cut in cut_points(buffer, eof):
+                data = buffer[start:cut]
+                chunks.append(
+                    (
+                        hashlib.sha256(data).hexdigest(),
+                        len(data),
+                        zlib.compress(data, COMPRESSION_LEVEL),
+                    )
+                )
+                start = cut
+            buffer = buffer[start:]
+            if eof:
+                break
+    return path, file_hash.hexdigest(), chunks
+
+
+def _chunk_file_or_error(path: str) -> Tuple[str, Any, Any, Optional[str]]:
+    """chunk_file() for worker processes: errors are returned, not raised,
+    so one unreadable file does not end the result stream."""
+    try:
+        return chunk_file(path) + (None,)
+    except OSError as e:
+        return path, None, None, str(e)
+
+
+class StorageBackend:
+    """Key/value store for chunks and snapshot manifests."""
+
+    def put(self, key: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    def get(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    def list(self, prefix: str) -> List[str]:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class LocalDirectoryBackend(StorageBackend):
+    """Stores backups under a local (or mounted) directory."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root).expanduser()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        tmp_path.replace(path)
+
+    def get(self, key: str) -> bytes:
+        with open(self.root / key, "rb") as f:
+            return f.read()
+
+    def list(self, prefix: str) -> List[str]:
+        base = self.root / prefix
+        if not base.exists():
+            return []
+        return sorted(
+            str(path.relative_to(self.root))
+            for path in base.rglob("*")
+            if path.is_file() and not path.name.endswith(".tmp")
+        )
+
+    def delete(self, key: str) -> None:
+        try:
+            (self.root / key).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class S3Backend(StorageBackend):
+    """Stores backups in an S3 bucket."""
+
+    def __init__(self, client, bucket_name: str):
+        self.client = client
+        self.bucket_name = bucket_name
+
+    def put(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket_name, Key=key, Body=data)
+
+    def get(self, key: str) -> bytes:
+        response = self.client.get_object(Bucket=self.bucket_name, Key=key)
+        return response["Body"].read()
+
+    def list(self, prefix: str) -> List[str]:
+        keys = []
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            keys.extend(obj["Key"] for obj in page.get("Contents", []))
+        return keys
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket_name, Key=key)
+
+
+def chunk_key(digest: str) -> str:
+    return f"{CHUNK_PREFIX}{digest[:2]}/{digest}"
+
 
 class FileBackupAutomator:
     """Main plugin class for file backup automation."""
@@ -43,6 +289,11 @@ class FileBackupAutomator:
         self.retention_days = config.get("retention_days", 30)
         self.cloud_provider = config.get("cloud_provider", "aws_s3")
         self.bucket_name = config.get("bucket_name", "backups")
+        self.max_workers = config.get("max_workers") or os.cpu_count() or 1
+        self.state_dir = Path(
+            config.get("state_dir", "~/.tools-automation/file-backup-automator")
+        ).expanduser()
+        self.state_file = self.state_dir / "manifest.json"
 
         # Initialize cloud client
         self.cloud_client = None
@@ -51,6 +302,15 @@ class FileBackupAutomator:
         elif self.cloud_provider == "aws_s3":
             self.logger.warning("boto3 not available. Cloud backup disabled.")
 
+        # Storage for chunks and snapshots
+        self.storage: Optional[StorageBackend] = None
+        if self.cloud_provider == "local":
+            self.storage = LocalDirectoryBackend(
+                config.get("backup_dir", self.state_dir / "store")
+            )
+        elif self.cloud_client:
+            self.storage = S3Backend(self.cloud_client, self.bucket_name)
+
     def validate_config(self) -> bool:
         """Validate plugin configuration."""
         if not self.backup_paths:
@@ -65,6 +325,26 @@ class FileBackupAutomator:
 
         return True
 
+    def scan_files(self, base_path: Path) -> Iterable[Tuple[str, os.stat_result]]:
+        """Yield (path, stat) for every regular file under base_path."""
+        stack = [str(base_path)]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                yield entry.path, entry.stat(follow_symlinks=False)
+                        except OSError as e:
+                            self.logger.warning(f"Could not stat {entry.path}: {e}")
+            except PermissionError as e:
+                self.logger.warning(f"Permission denied accessing {directory}: {e}")
+            except OSError as e:
+                self.logger.error(f"Error scanning {directory}: {e}")
+
     def get_files_to_backup(self, base_path: Path) -> List[Path]:
         """Get list of files to backup from a base path."""
         files = []
@@ -91,8 +371,8 @@ class FileBackupAutomator:
             with tarfile.open(archive_path, "w:gz") as tar:
                 for file_path in files:
                     try:
-                        # Add file to archive with relative path
-                        tar.add(file_path, arcname=file_path.name)
+                        # Keep the full path so files sharing a name do not collide
+                        tar.add(file_path, arcname=str(file_path).lstrip(os.sep))
                     except (PermissionError, OSError) as e:
                         self.logger.warning(f"Could not add {file_path} to backup: {e}")
 
@@ -125,88 +405,227 @@ class FileBackupAutomator:
             self.logger.error(f"Unexpected error during cloud upload: {e}")
             return False
 
-    def cleanup_old_backups(self):
-        """Clean up backups older than retention period."""
-        if not self.cloud_client:
+    def _load_state(self) -> Dict[str, Any]:
+        """Local change manifest from the previous run."""
+        try:
+            with open(self.state_file, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = None
+
+        if not state or state.get("storage") != self._storage_id():
+            # No usable local state: learn which chunks the target already has
+            chunks = [key.rsplit("/", 1)[-1] for key in self.storage.list(CHUNK_PREFIX)]
+            state = {"storage": self._storage_id(), "files": {}, "chunks": chunks}
+        return state
+
+    def _save_state(self, state: Dict[str, Any]):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.state_file.with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(state, f)
+        tmp_file.replace(self.state_file)
+
+    def _storage_id(self) -> str:
+        if isinstance(self.storage, LocalDirectoryBackend):
+            return f"local:{self.storage.root}"
+        return f"{self.cloud_provider}:{self.bucket_name}"
+
+    def list_snapshots(self) -> List[str]:
+        """Snapshot names, oldest first."""
+        if not self.storage:
+            return []
+        return sorted(
+            key[len(SNAPSHOT_PREFIX) : -len(".json")]
+            for key in self.storage.list(SNAPSHOT_PREFIX)
+            if key.endswith(".json")
+        )
+
+    def load_snapshot(self, name: str) -> Dict[str, Any]:
+        return json.loads(self.storage.get(f"{SNAPSHOT_PREFIX}{name}.json"))
+
+    def restore_snapshot(self, name: str, target_dir: str) -> int:
+        """Restore a snapshot under target_dir; returns the number of files."""
+        snapshot = self.load_snapshot(name)
+        target = Path(target_dir).expanduser()
+        for path, entry in snapshot["files"].items():
+            destination = target / path.lstrip(os.sep)
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            with open(destination, "wb") as f:
+                for digest in entry["chunks"]:
+                    f.write(zlib.decompress(self.storage.get(chunk_key(digest))))
+            os.utime(destination, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+        return len(snapshot["files"])
+
+    def cleanup_old_backups(self, state: Dict[str, Any] = None):
+        """Delete snapshots older than the retention period and the chunks
+        no remaining snapshot references."""
+        if not self.storage:
             return
 
         try:
             cutoff_date = datetime.now() - timedelta(days=self.retention_days)
-
-            if self.cloud_provider == "aws_s3":
-                # List objects in bucket
-                response = self.cloud_client.list_objects_v2(Bucket=self.bucket_name)
-
-                if "Contents" in response:
-                    for obj in response["Contents"]:
-                        # Parse backup date from object key
-                        try:
-                            # Assuming format: backup-YYYY-MM-DD-HH-MM-SS.tar.gz
-                            key_parts = obj["Key"].split("-")
-                            if len(key_parts) >= 6:
-                                backup_date = datetime(
-                                    int(key_parts[1]),
-                                    int(key_parts[2]),
-                                    int(key_parts[3]),
-                                    int(key_parts[4]),
-                                    int(key_parts[5]),
-                                    int(key_parts[6].split(".")[0]),
-                                )
-
-                                if backup_date < cutoff_date:
-                                    self.cloud_client.delete_object(
-                                        Bucket=self.bucket_name, Key=obj["Key"]
-                                    )
-                                    self.logger.info(
-                                        f"Deleted old backup: {obj['Key']}"
-                                    )
-                        except (ValueError, IndexError):
-                            continue
+            snapshots = self.list_snapshots()
+            expired = []
+            # The newest snapshot is always kept
+            for name in snapshots[:-1]:
+                try:
+                    if datetime.strptime(name, SNAPSHOT_FORMAT) < cutoff_date:
+                        expired.append(name)
+                except ValueError:
+                    continue
+
+            if not expired:
+                return
+
+            for name in expired:
+                self.storage.delete(f"{SNAPSHOT_PREFIX}{name}.json")
+                self.logger.info(f"Deleted old backup: {name}")
+
+            # Mark and sweep chunks
+            referenced = set()
+            for name in snapshots:
+                if name in expired:
+                    continue
+                for entry in self.load_snapshot(name)["files"].values():
+                    referenced.update(entry["chunks"])
+
+            removed = 0
+            for key in self.storage.list(CHUNK_PREFIX):
+                if key.rsplit("/", 1)[-1] not in referenced:
+                    self.storage.delete(key)
+                    removed += 1
+            if state is not None:
+                state["chunks"] = [d for d in state["chunks"] if d in referenced]
+            self.logger.info(f"Pruned {removed} unreferenced chunks")
 
         except Exception as e:
             self.logger.error(f"Failed to cleanup old backups: {e}")
 
-    def perform_backup(self):
-        """Perform the backup operation."""
+    def perform_backup(self) -> Optional[Dict[str, Any]]:
+        """Perform an incremental backup and return its statistics."""
         self.logger.info("Starting backup operation")
 
-        total_files = 0
-        total_size = 0
+        if not self.storage:
+            self.logger.error("No storage backend available; backup skipped")
+            return None
 
-        # Collect all files to backup
-        all_files = []
-        for base_path in self.backup_paths:
-            if base_path.exists():
-                files = self.get_files_to_backup(base_path)
-                all_files.extend(files)
-                self.logger.info(f"Found {len(files)} files in {base_path}")
+        started = time.time()
+        state = self._load_state()
+        previous = state["files"]
+        known_chunks = set(state["chunks"])
 
-        if not all_files:
+        # Walk the backup paths and find files whose size or mtime changed
+        files: Dict[str, Dict[str, Any]] = {}
+        changed: List[str] = []
+        changed_bytes = 0
+        for base_path in self.backup_paths:
+            if not base_path.exists():
+                continue
+            count = 0
+            for path, st in self.scan_files(base_path):
+                count += 1
+                entry = previous.get(path)
+                if (
+                    entry
+                    and entry["size"] == st.st_size
+                    and entry["mtime_ns"] == st.st_mtime_ns
+                ):
+                    files[path] = entry
+                else:
+                    files[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+                    changed.append(path)
+                    changed_bytes += st.st_size
+            self.logger.info(f"Found {count} files in {base_path}")
+
+        if not files:
             self.logger.warning("No files found to backup")
-            return
-
-        # Create backup archive
-        timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
-        backup_name = f"backup-{timestamp}.tar.gz"
+            return None
+
+        stats = {
+            "files": len(files),
+            "changed_files": len(changed),
+            "changed_bytes": changed_bytes,
+            "new_chunks": 0,
+            "uploaded_bytes": 0,
+        }
+
+        # Chunk and compress changed files in parallel, upload new chunks
+        if changed_bytes >= PARALLEL_THRESHOLD and self.max_workers > 1:
+            pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            results = pool.map(_chunk_file_or_error, changed, chunksize=4)
+        else:
+            pool = None
+            results = map(_chunk_file_or_error, changed)
 
         try:
-            archive_path = self.create_backup_archive(all_files, backup_name)
-
-            # Upload to cloud
-            if self.upload_to_cloud(archive_path, backup_name):
-                self.logger.info("Backup completed successfully")
-            else:
-                self.logger.error("Backup upload failed")
-
-            # Clean up local archive
-            if os.path.exists(archive_path):
-                os.unlink(archive_path)
-
+            with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as uploader:
+                uploads = []
+                for result in results:
+                    path, file_digest, chunks, error = result
+                    if error is not None:
+                        # Unreadable now; keep the previous version if any
+                        self.logger.warning(f"Could not back up {path}: {error}")
+                        if path in previous:
+                            files[path] = previous[path]
+                        else:
+                            del files[path]
+                        continue
+
+                    for digest, size, data in chunks:
+                        if digest not in known_chunks:
+                            known_chunks.add(digest)
+                            # Bound the compressed data waiting for upload
+                            if len(uploads) >= MAX_PENDING_UPLOADS:
+                                uploads.pop(0).result()
+                            uploads.append(
+                                uploader.submit(
+                                    self.storage.put, chunk_key(digest), data
+                                )
+                            )
+                            stats["new_chunks"] += 1
+                            stats["uploaded_bytes"] += len(data)
+                    files[path]["sha256"] = file_digest
+                    files[path]["chunks"] = [digest for digest, _, _ in chunks]
+
+                for upload in uploads:
+                    upload.result()
         except Exception as e:
             self.logger.error(f"Backup operation failed: {e}")
+            return None
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        # Snapshot manifest last, so it only references stored chunks
+        backup_name = datetime.now().strftime(SNAPSHOT_FORMAT)
+        snapshot = {
+            "created_at": datetime.now().isoformat(),
+            "backup_paths": [str(p) for p in self.backup_paths],
+            "files": files,
+        }
+        try:
+            self.storage.put(
+                f"{SNAPSHOT_PREFIX}{backup_name}.json", json.dumps(snapshot).encode()
+            )
+        except Exception as e:
+            self.logger.error(f"Backup upload failed: {e}")
+            return None
+
+        state["files"] = files
+        state["chunks"] = sorted(known_chunks)
 
         # Cleanup old backups
-        self.cleanup_old_backups()
+        self.cleanup_old_backups(state)
+        self._save_state(state)
+
+        stats["snapshot"] = backup_name
+        stats["duration_seconds"] = round(time.time() - started, 2)
+        self.logger.info(
+            f"Backup {backup_name} completed: {stats['changed_files']} changed files, "
+            f"{stats['new_chunks']} new chunks, {stats['uploaded_bytes']} bytes uploaded"
+        )
+        return stats
 
     def schedule_backups(self):
         """Set up backup scheduling."""
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Controller Liveness - Heartbeat table with an expiry wheel for MCP controllers
+
+A heartbeat only overwrites the agent's timestamp in place. Each live agent
+sits in exactly one bucket of a timer wheel keyed by coarse ticks; when a
+bucket comes due, agents that beat since they were filed are moved to the
+bucket of their new deadline and the rest are marked stale. Heartbeats are
+therefore O(1), and only real liveness transitions (an agent appearing,
+going stale, coming back or switching project) bump the table version that
+readers and event subscribers care about.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+DEFAULT_STALE_AFTER = 30.0
+DEFAULT_TICK = 1.0
+
+# Reasons returned by LivenessTable.beat()
+NEW = "new"
+REVIVED = "revived"
+PROJECT_CHANGED = "project_changed"
+
+
+class LivenessTable:
+    """Per-agent heartbeat timestamps with stale detection"""
+
+    def __init__(
+        self, stale_after: float = DEFAULT_STALE_AFTER, tick: float = DEFAULT_TICK
+    ):
+        if stale_after <= 0 or tick <= 0:
+            raise ValueError("stale_after and tick must be positive")
+        self.stale_after = stale_after
+        self.tick = tick
+        # agent -> {agent, project, last_heartbeat, alive}
+        self.entries: Dict[str, Dict] = {}
+        # Bumped on every liveness transition, not on plain heartbeats
+        self.version = 0
+        self.alive = 0
+        self._wheel: Dict[int, Set[str]] = {}
+        # Next tick whose bucket has not been expired yet
+        self._cursor: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _deadline_tick(self, last_heartbeat: float) -> int:
+        return int((last_heartbeat + self.stale_after) // self.tick)
+
+    def _file(self, agent: str, last_heartbeat: float) -> None:
+        slot = self._deadline_tick(last_heartbeat)
+        if self._cursor is not None and slot < self._cursor:
+            slot = self._cursor
+        self._wheel.setdefault(slot, set()).add(agent)
+
+    def beat(
+        self, agent: str, project: Optional[str] = None, now: Optional[float] = None
+    ) -> Optional[str]:
+        """Record a heartbeat; returns the transition it caused, if any."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self.entries.get(agent)
+            if entry is None:
+                self.entries[agent] = {
+                    "agent": agent,
+                    "project": project,
+                    "last_heartbeat": now,
+                    "alive": True,
+                }
+                self._file(agent, now)
+                self.alive += 1
+                change = NEW
+            else:
+                entry["last_heartbeat"] = now
+                if not entry["alive"]:
+                    entry["alive"] = True
+                    entry["project"] = project
+                    self._file(agent, now)
+                    self.alive += 1
+                    change = REVIVED
+                elif entry["project"] != project:
+                    entry["project"] = project
+                    change = PROJECT_CHANGED
+                else:
+                    # Still filed under an earlier deadline; advance() refiles it
+                    return None
+            self.version += 1
+            return change
+
+    def advance(self, now: Optional[float] = None) -> List[Dict]:
+        """Expire due wheel buckets; returns copies of agents that went stale."""
+        now = time.time() if now is None else now
+        current = int(now // self.tick)
+        expired = []
+        with self._lock:
+            if self._cursor is None:
+                self._cursor = current
+            if current < self._cursor or not self._wheel:
+                self._cursor = max(self._cursor, current)
+                return expired
+            if current - self._cursor < len(self._wheel):
+                due = range(self._cursor, current)
+            else:
+                # Long idle gap: visit only occupied buckets
+                due = sorted(slot for slot in self._wheel if slot < current)
+            self._cursor = current
+            for slot in due:
+                for agent in self._wheel.pop(slot, ()):
+                    entry = self.entries.get(agent)
+                    if entry is None or not entry["alive"]:
+                        continue
+                    if self._deadline_tick(entry["last_heartbeat"]) >= current:
+                        # Beat since it was filed here
+                        self._file(agent, entry["last_heartbeat"])
+                    else:
+                        entry["alive"] = False
+                        self.alive -= 1
+                        expired.append(dict(entry))
+            if expired:
+                self.version += 1
+        return expired
+
+    def controllers(self) -> List[Dict]:
+        """Snapshot of every known controller"""
+        with self._lock:
+            return [dict(entry) for entry in self.entries.values()]
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -11,6 +11,12 @@ import urllib.error
 import json
 import datetime
 from pathlib import Path
+from urllib.parse import urlparse
+
+from sampling_profiler import ProfilerAdmin
+
+# On-demand sampling profiler; admin routes need PROFILER_ADMIN_TOKEN
+PROFILER_ADMIN = ProfilerAdmin()
 
 
 class ProxyHTTPRequestHandler(http.server.BaseHTTPRequestHandler):
@@ -39,7 +45,25 @@ class ProxyHTTPRequestHandler(http.server.BaseHTTPRequestHandler):
         except (ValueError, TypeError):
             return default
 
+    def handle_profiler_admin(self):
+        """Serve /admin/profiler/* routes; returns False for other paths"""
+        parsed = urlparse(self.path)
+        if not PROFILER_ADMIN.matches(parsed.path):
+            return False
+        status, content_type, body = PROFILER_ADMIN.handle(
+            self.command, parsed.path, parsed.query, self.headers
+        )
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+        return True
+
     def do_GET(self):
+        if self.handle_profiler_admin():
+            return
+
         # Handle root path
         if self.path == "/":
             self.send_response(200)
@@ -1130,6 +1154,9 @@ class ProxyHTTPRequestHandler(http.server.BaseHTTPRequestHandler):
             self.send_error(500, "Internal server error")
 
     def do_POST(self):
+        if self.handle_profiler_admin():
+            return
+
         # Handle API proxy requests for POST
         if self.path.startswith("/api/"):
             if self.path == "/api/dashboard/refresh":
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Compact rolling test outcome history.
+
+Each test keeps two bitsets over the last ``window`` runs: one bit per run
+that failed and one per run that passed (bit 0 is the most recent run).
+Runs in which a test did not report (skipped, errored, missing, not
+collected) set neither bit, so failure and pass rates are popcounts divided
+by the number of recorded runs.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_WINDOW = 50
+
+
+def _popcount(value: int) -> int:
+    return bin(value).count("1")
+
+
+class OutcomeHistory:
+    """Per-test failure/pass bitsets over a rolling window of runs."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self.mask = (1 << window) - 1
+        self.runs = 0
+        # test id -> [failed bits, passed bits]
+        self.tests: Dict[str, List[int]] = {}
+
+    def record(self, outcomes: Dict[str, str]) -> None:
+        """Add one run's {test id: outcome} to the history."""
+        for test_id in outcomes:
+            self.tests.setdefault(test_id, [0, 0])
+
+        stale = []
+        for test_id, bits in self.tests.items():
+            outcome = outcomes.get(test_id)
+            failed = (bits[0] << 1) & self.mask
+            passed = (bits[1] << 1) & self.mask
+            if outcome == "failed":
+                failed |= 1
+            elif outcome == "passed":
+                passed |= 1
+            if failed or passed:
+                bits[0], bits[1] = failed, passed
+            else:
+                stale.append(test_id)
+
+        # Tests with no outcome left in the window are dropped
+        for test_id in stale:
+            del self.tests[test_id]
+
+        self.runs = min(self.runs + 1, self.window)
+
+    def failures(self, test_id: str) -> int:
+        return _popcount(self.tests.get(test_id, (0, 0))[0])
+
+    def passes(self, test_id: str) -> int:
+        return _popcount(self.tests.get(test_id, (0, 0))[1])
+
+    def failure_rate(self, test_id: str) -> float:
+        return self.failures(test_id) / self.runs if self.runs else 0.0
+
+    def pass_rate(self, test_id: str) -> float:
+        return self.passes(test_id) / self.runs if self.runs else 0.0
+
+    def recent_outcomes(self, test_id: str, count: int = 10) -> List[str]:
+        """Outcomes of the last ``count`` runs, oldest first."""
+        failed, passed = self.tests.get(test_id, (0, 0))
+        outcomes = []
+        for bit in reversed(range(min(count, self.runs))):
+            if failed >> bit & 1:
+                outcomes.append("failed")
+            elif passed >> bit & 1:
+                outcomes.append("passed")
+            else:
+                outcomes.append("missing")
+        return outcomes
+
+    def suspects(self) -> List[str]:
+        """Tests that failed at least once within the window."""
+        return sorted(test_id for test_id, bits in self.tests.items() if bits[0])
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": 1,
+            "window": self.window,
+            "runs": self.runs,
+            "tests": {
+                test_id: [format(bits[0], "x"), format(bits[1], "x")]
+                for test_id, bits in self.tests.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, window: Optional[int] = None) -> "OutcomeHistory":
+        if data.get("version") != 1:
+            # Legacy format: {timestamp: {test id: outcome}}
+            history = cls(window or DEFAULT_WINDOW)
+            for timestamp in sorted(data):
+                if isinstance(data[timestamp], dict):
+                    history.record(data[timestamp])
+            return history
+
+        history = cls(window or data.get("window", DEFAULT_WINDOW))
+        history.runs = min(data.get("runs", 0), history.window)
+        for test_id, (failed, passed) in data.get("tests", {}).items():
+            bits = [int(failed, 16) & history.mask, int(passed, 16) & history.mask]
+            if bits[0] or bits[1]:
+                history.tests[test_id] = bits
+        return history
+
+    @classmethod
+    def load(cls, path: Path, window: Optional[int] = None) -> "OutcomeHistory":
+        path = Path(path)
+        if path.exists():
+            try:
+                with open(path, "r") as f:
+                    return cls.from_dict(json.load(f), window)
+            except (OSError, ValueError):
+                pass
+        return cls(window or DEFAULT_WINDOW)
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        tmp_path.replace(path)
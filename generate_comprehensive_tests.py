@@ -4,11 +4,17 @@ Advanced Test Generator for Python Functions
 Analyzes source code and generates real unit tests for functions and classes
 """
 
+import argparse
 import ast
+import hashlib
+import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+CACHE_FILENAME = ".generate_tests_cache.json"
 
 
 class CodeAnalyzer:
@@ -27,49 +33,35 @@ class CodeAnalyzer:
 
             tree = ast.parse(content, filename=self.file_path)
 
+            # ast.walk is breadth-first, so every node's parent is recorded
+            # before the node itself is visited
+            parents: Dict[ast.AST, ast.AST] = {}
+            class_methods: Dict[ast.AST, List[Dict[str, Any]]] = {}
+
             for node in ast.walk(tree):
+                for child in ast.iter_child_nodes(node):
+                    parents[child] = node
+
                 if isinstance(node, ast.FunctionDef) and not node.name.startswith("_"):
+                    info = self._function_info(node)
+
                     # Only include functions at module level (not inside classes)
-                    if not any(
-                        isinstance(parent, ast.ClassDef)
-                        for parent in self._get_parents(node, tree)
-                    ):
-                        self.functions.append(
-                            {
-                                "name": node.name,
-                                "args": [
-                                    arg.arg
-                                    for arg in node.args.args
-                                    if arg.arg != "self"
-                                ],
-                                "line": node.lineno,
-                                "docstring": self._get_docstring(node),
-                            }
-                        )
+                    if not isinstance(parents.get(node), ast.ClassDef):
+                        self.functions.append(info)
 
-                elif isinstance(node, ast.ClassDef):
-                    methods = []
-                    for child in ast.walk(node):
-                        if isinstance(
-                            child, ast.FunctionDef
-                        ) and not child.name.startswith("_"):
-                            methods.append(
-                                {
-                                    "name": child.name,
-                                    "args": [
-                                        arg.arg
-                                        for arg in child.args.args
-                                        if arg.arg != "self"
-                                    ],
-                                    "line": child.lineno,
-                                    "docstring": self._get_docstring(child),
-                                }
-                            )
+                    # Methods also cover functions nested anywhere in a class
+                    ancestor = parents.get(node)
+                    while ancestor is not None:
+                        if ancestor in class_methods:
+                            class_methods[ancestor].append(dict(info))
+                        ancestor = parents.get(ancestor)
 
+                elif isinstance(node, ast.ClassDef):
+                    class_methods[node] = []
                     self.classes.append(
                         {
                             "name": node.name,
-                            "methods": methods,
+                            "methods": class_methods[node],
                             "line": node.lineno,
                             "docstring": self._get_docstring(node),
                         }
@@ -78,15 +70,13 @@ class CodeAnalyzer:
         except Exception as e:
             print(f"Error analyzing {self.file_path}: {e}")
 
-    def _get_parents(self, node: ast.AST, tree: ast.AST) -> List[ast.AST]:
-        """Get all parent nodes of a given node"""
-        parents = []
-        for parent in ast.walk(tree):
-            for child in ast.iter_child_nodes(parent):
-                if child == node:
-                    parents.append(parent)
-                    break
-        return parents
+    def _function_info(self, node: ast.FunctionDef) -> Dict[str, Any]:
+        return {
+            "name": node.name,
+            "args": [arg.arg for arg in node.args.args if arg.arg != "self"],
+            "line": node.lineno,
+            "docstring": self._get_docstring(node),
+        }
 
     def _get_docstring(self, node: ast.AST) -> str:
         """Extract docstring from a function or class node"""
@@ -108,11 +98,16 @@ class TestGenerator:
         self.workspace_root = workspace_root
         self.tests_dir = tests_dir
 
-    def generate_test_for_file(self, pyfile: str) -> None:
-        """Generate comprehensive tests for a Python file"""
+    def test_file_for(self, pyfile: str) -> str:
+        """Path of the generated test file for a source file"""
         rel_path = os.path.relpath(pyfile, self.workspace_root)
         test_filename = f"test_{rel_path.replace('/', '_').replace('.py', '')}.py"
-        test_file = os.path.join(self.tests_dir, test_filename)
+        return os.path.join(self.tests_dir, test_filename)
+
+    def generate_test_for_file(self, pyfile: str) -> str:
+        """Generate comprehensive tests for a Python file"""
+        rel_path = os.path.relpath(pyfile, self.workspace_root)
+        test_file = self.test_file_for(pyfile)
 
         # Analyze the source code
         analyzer = CodeAnalyzer(pyfile)
@@ -133,6 +128,7 @@ class TestGenerator:
             f.write(test_content)
 
         print(f"✅ Generated comprehensive tests: {test_file}")
+        return test_file
 
     def _generate_test_content(
         self,
@@ -369,10 +365,84 @@ class Test{module_name}:
 '''
 
 
+class GenerationCache:
+    """Per-file record of the source content each test file was generated from"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, str] = {}
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            if data.get("generator") == _generator_digest():
+                self.entries = data.get("files", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"generator": _generator_digest(), "files": self.entries}, f)
+        os.replace(tmp_path, self.path)
+
+
+_GENERATOR_DIGEST: Optional[str] = None
+
+
+def _generator_digest() -> str:
+    """Hash of this script, so template changes invalidate the cache"""
+    global _GENERATOR_DIGEST
+    if _GENERATOR_DIGEST is None:
+        with open(__file__, "rb") as f:
+            _GENERATOR_DIGEST = hashlib.sha256(f.read()).hexdigest()
+    return _GENERATOR_DIGEST
+
+
+def _content_key(pyfile: str, workspace_root: str) -> Optional[str]:
+    """Cache key for a source file; generated tests embed the workspace root"""
+    try:
+        with open(pyfile, "rb") as f:
+            content = f.read()
+    except OSError:
+        return None
+    return hashlib.sha256(workspace_root.encode() + b"\0" + content).hexdigest()
+
+
+def _generate_worker(job: Tuple[str, str, str]) -> Tuple[str, Optional[str]]:
+    """Analyze one file and write its tests; runs in a worker process"""
+    workspace_root, tests_dir, pyfile = job
+    try:
+        TestGenerator(workspace_root, tests_dir).generate_test_for_file(pyfile)
+        return pyfile, None
+    except Exception as e:
+        return pyfile, str(e)
+
+
+def find_source_files(workspace_root: str) -> List[str]:
+    """Python files to generate tests for"""
+    files = []
+    for pyfile in Path(workspace_root).rglob("*.py"):
+        # Skip test files, cache files, and venv files
+        if any(skip in str(pyfile) for skip in ["/tests/", "/__pycache__/", "/.venv/"]):
+            continue
+        if "test" in pyfile.name:
+            continue
+        files.append(str(pyfile))
+    return files
+
+
 def main():
-    # Dynamically resolve workspace root (prefer git)
-    from pathlib import Path
+    parser = argparse.ArgumentParser(description="Generate comprehensive tests")
+    parser.add_argument(
+        "--jobs", type=int, default=None, help="Worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Regenerate tests for unchanged files"
+    )
+    args = parser.parse_args()
 
+    # Dynamically resolve workspace root (prefer git)
     candidate = Path(__file__).resolve().parent
     for parent in [candidate] + list(candidate.parents):
         if (parent / ".git").exists():
@@ -385,16 +455,42 @@ def main():
     print("🔍 Analyzing Python files and generating comprehensive tests...")
 
     generator = TestGenerator(workspace_root, tests_dir)
-
-    # Find Python files with functions but no corresponding test files
-    for pyfile in Path(workspace_root).rglob("*.py"):
-        # Skip test files, cache files, and venv files
-        if any(skip in str(pyfile) for skip in ["/tests/", "/__pycache__/", "/.venv/"]):
+    cache = GenerationCache(os.path.join(tests_dir, CACHE_FILENAME))
+
+    # Only modules whose content changed (or whose test file is gone) are redone
+    keys: Dict[str, str] = {}
+    changed = []
+    for pyfile in find_source_files(workspace_root):
+        rel_path = os.path.relpath(pyfile, workspace_root)
+        key = _content_key(pyfile, workspace_root)
+        if key is None:
             continue
-        if "test" in pyfile.name:
-            continue
-
-        generator.generate_test_for_file(str(pyfile))
+        keys[rel_path] = key
+        if (
+            args.force
+            or cache.entries.get(rel_path) != key
+            or not os.path.exists(generator.test_file_for(pyfile))
+        ):
+            changed.append(pyfile)
+
+    print(f"📦 {len(changed)} of {len(keys)} files changed since the last run")
+
+    # Largest files first so they do not end up as the tail of the run
+    changed.sort(key=lambda f: os.path.getsize(f), reverse=True)
+    jobs = [(workspace_root, tests_dir, pyfile) for pyfile in changed]
+
+    failed = set()
+    if jobs:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            for pyfile, error in executor.map(_generate_worker, jobs):
+                if error:
+                    failed.add(os.path.relpath(pyfile, workspace_root))
+                    print(f"❌ Failed to generate tests for {pyfile}: {error}")
+
+    cache.entries = {
+        rel_path: key for rel_path, key in keys.items() if rel_path not in failed
+    }
+    cache.save()
 
     print("")
     print("🎯 Comprehensive test generation complete!")
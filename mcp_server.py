@@ -5,9 +5,14 @@ Minimal local MCP coordinator server.
 Provides simple JSON HTTP endpoints for agents to register and request allowed workspace tasks.
 
 Endpoints:
-  GET /status -> {"ok": true, "agents": [...], "tasks": [...]}
+  GET /status -> {"ok": true, "agents": [...], "tasks": [...], "controllers": [...]}
+  GET /controllers -> {"ok": true, "controllers": [...], "alive": 1, "liveness_version": 3}
+  POST /heartbeat -> {"agent": "name", "project": "HabitQuest"}
   POST /register -> {"agent": "name", "capabilities": [...]}
   POST /run -> {"agent": "name", "command": "analyze", "project": "HabitQuest", "execute": false}
+  POST /bulk/register -> {"agents": [<register payload>, ...]}
+  POST /bulk/run -> {"tasks": [<run payload>, ...]}
+  POST /bulk/status -> {"task_ids": ["id", ...]}
 
 This server intentionally restricts executable actions to a small allowlist and runs them
 from the workspace root to avoid arbitrary command execution.
@@ -16,6 +21,7 @@ import hashlib
 import hmac
 import json
 import os
+import queue
 import subprocess
 import threading
 import time
@@ -29,6 +35,10 @@ import redis
 import sys
 import importlib.util
 
+from controller_liveness import LivenessTable
+from request_telemetry import RequestTelemetry
+from sampling_profiler import ADMIN_PREFIX, ProfilerAdmin
+
 # AI Service Manager Integration
 try:
     from ai_service_manager import ai_manager, AIRequest
@@ -398,10 +408,8 @@ def cached_response(ttl_seconds, cache_key_prefix="api"):
             cached_result = cache.get(cache_key)
             if cached_result:
                 try:
-                    # Parse cached JSON and return as response
-                    cached_data = json.loads(cached_result)
-                    self._send_json(cached_data)
-                    return
+                    # Parse cached JSON; the caller sends it like a fresh result
+                    return json.loads(cached_result)
                 except Exception:
                     # Invalid cache, continue to generate fresh response
                     pass
@@ -457,10 +465,15 @@ CACHE_TTL_STATUS = int(
     os.environ.get("CACHE_TTL_STATUS", "30")
 )  # 30 seconds for status
 CACHE_TTL_HEALTH = int(os.environ.get("CACHE_TTL_HEALTH", "60"))  # 1 minute for health
-CACHE_TTL_CONTROLLERS = int(
-    os.environ.get("CACHE_TTL_CONTROLLERS", "15")
-)  # 15 seconds for controllers
+# Controllers that miss heartbeats for this long are reported as stale
+CONTROLLER_STALE_SECONDS = float(os.environ.get("MCP_CONTROLLER_STALE_SECONDS", "30"))
 CACHE_ENABLED = os.environ.get("CACHE_ENABLED", "true").lower() == "true"
+# Optional span export: "jsonl:<path>" or "otlp:http://localhost:4318/v1/traces"
+TRACE_EXPORT = os.environ.get("MCP_TRACE_EXPORT")
+# Items accepted per /bulk/* request
+MAX_BULK_ITEMS = int(os.environ.get("MCP_MAX_BULK_ITEMS", "500"))
+# Threads running `execute: true` items from /bulk/run; the rest wait queued
+BULK_EXECUTE_WORKERS = int(os.environ.get("MCP_BULK_EXECUTE_WORKERS", "4"))
 ALLOWED_COMMANDS = {
     "analyze": ["./Tools/Automation/ai_enhancement_system.sh", "analyze"],
     "analyze-all": ["./Tools/Automation/ai_enhancement_system.sh", "analyze-all"],
@@ -522,6 +535,50 @@ ALLOWED_COMMANDS = {
     "modify-fail": ["sh", "-c", "echo 'modify-fail executed'; exit 1"],
 }
 
+# Paths served by MCPHandler, used as bounded route labels in telemetry
+ROUTES = frozenset(
+    [
+        "/metrics",
+        "/status",
+        "/health",
+        "/v1/health",
+        "/controllers",
+        "/quantum_status",
+        "/api/agents/status",
+        "/api/tasks/analytics",
+        "/api/metrics/system",
+        "/api/ml/analytics",
+        "/api/umami/stats",
+        "/api/ai/status",
+        "/api/extensions/status",
+        "/register",
+        "/bulk/register",
+        "/bulk/run",
+        "/bulk/status",
+        "/heartbeat",
+        "/run",
+        "/workflow_alert",
+        "/github_webhook",
+        "/execute_task",
+        "/api/dashboard/refresh",
+        "/quantum_entangle",
+        "/multiverse_navigate",
+        "/consciousness_expand",
+        "/dimensional_compute",
+        "/quantum_orchestrate",
+        "/reality_simulate",
+        "/api/ai/analyze_code",
+        "/api/ai/predict_performance",
+        "/api/ai/generate_code",
+    ]
+    + [ADMIN_PREFIX + action for action in ("start", "stop", "status", "collapsed")]
+)
+
+
+def known_route(path):
+    """Whether a request path is a built-in route or a plugin webhook"""
+    return path in ROUTES or path in plugin_manager.webhooks
+
 
 class MCPHandler(BaseHTTPRequestHandler):
     server_version = "MCP-Local/0.1"
@@ -584,6 +641,186 @@ class MCPHandler(BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(body)
 
+    def _register_agent(self, agent, caps):
+        """Record an agent's capabilities (caller invalidates the status cache)"""
+        self.server.agents[agent] = {"capabilities": caps}
+
+        # Trigger agent registration event
+        trigger_event(
+            "agent_registered",
+            {"agent_name": agent, "capabilities": caps, "timestamp": time.time()},
+        )
+
+    def _queue_run_task(self, body):
+        """Validate a /run payload and queue its task.
+
+        Returns (task, cmd, None, 200) on success or (None, None, error, status).
+        The caller invalidates the status cache and starts execution.
+        """
+        agent = body.get("agent")
+        command = body.get("command")
+        project = body.get("project")
+
+        if not agent or not command:
+            return None, None, {"error": "agent_and_command_required"}, 400
+
+        if command not in ALLOWED_COMMANDS:
+            error = {
+                "error": "command_not_allowed",
+                "allowed": list(ALLOWED_COMMANDS.keys()),
+            }
+            return None, None, error, 403
+
+        # Prepare invocation
+        cmd = list(ALLOWED_COMMANDS[command])
+        if project:
+            cmd.append(project)
+
+        task_id = str(uuid.uuid4())
+        task = {
+            "id": task_id,
+            "agent": agent,
+            "command": command,
+            "project": project,
+            "status": "queued",
+            "queued_at": time.time(),
+            "correlation_id": getattr(self, "correlation_id", None),
+        }
+        self.server.tasks.append(task)
+        try:
+            self.server.metrics["tasks_queued"] += 1
+        except Exception:
+            pass
+
+        # Trigger task queued event
+        trigger_event(
+            "task_queued",
+            {
+                "task_id": task_id,
+                "agent": agent,
+                "command": command,
+                "project": project,
+                "timestamp": time.time(),
+            },
+        )
+        return task, cmd, None, 200
+
+    def _claim_task(self, task):
+        """Mark a queued task running; False if someone else already started it"""
+        # mark queued -> running under server-level lock to avoid races
+        # multiple controllers may attempt to execute same task concurrently
+        try:
+            with self.server.task_lock:
+                if task.get("status") != "queued":
+                    return False
+                task["status"] = "running"
+        except Exception:
+            # if lock isn't present for some reason, fall back to best-effort
+            task["status"] = "running"
+        return True
+
+    def _start_task(self, task, cmd):
+        """Run a queued task in a background thread"""
+        if self._claim_task(task):
+            threading.Thread(
+                target=self._execute_task, args=(task, cmd), daemon=True
+            ).start()
+
+    def _execute_if_queued(self, task, cmd):
+        if self._claim_task(task):
+            self._execute_task(task, cmd)
+
+    def _handle_bulk(self, path, body):
+        """Batch variants of /register, /run and task status lookup.
+
+        Each request carries up to MAX_BULK_ITEMS items, is answered with one
+        result per item in request order and invalidates the status cache at
+        most once.
+        """
+        key = {
+            "/bulk/register": "agents",
+            "/bulk/run": "tasks",
+            "/bulk/status": "task_ids",
+        }[path]
+        items = body.get(key)
+        if not isinstance(items, list):
+            self._send_json({"error": f"{key}_list_required"}, status=400)
+            return
+        if len(items) > MAX_BULK_ITEMS:
+            self._send_json(
+                {"error": "too_many_items", "max_items": MAX_BULK_ITEMS}, status=413
+            )
+            return
+
+        if path == "/bulk/status":
+            if not all(isinstance(task_id, str) for task_id in items):
+                self._send_json({"error": "task_ids_must_be_strings"}, status=400)
+                return
+            # One pass over the task list instead of one lookup per id
+            wanted = set(items)
+            found = {t.get("id"): t for t in self.server.tasks if t.get("id") in wanted}
+            self._send_json(
+                {
+                    "ok": True,
+                    "tasks": {task_id: found.get(task_id) for task_id in items},
+                }
+            )
+            return
+
+        results = []
+        changed = False
+        if path == "/bulk/register":
+            for item in items:
+                agent = item.get("agent") if isinstance(item, dict) else None
+                if not agent:
+                    results.append({"ok": False, "error": "agent_required"})
+                    continue
+                self._register_agent(agent, item.get("capabilities", []))
+                results.append({"ok": True, "registered": agent})
+                changed = True
+        else:
+            to_start = []
+            for item in items:
+                if not isinstance(item, dict):
+                    item = {}
+                task, cmd, error, status = self._queue_run_task(item)
+                if error is not None:
+                    results.append(dict(error, ok=False, status=status))
+                    continue
+                results.append({"ok": True, "task_id": task["id"], "queued": True})
+                if item.get("execute", False):
+                    to_start.append((task, cmd))
+                changed = True
+
+        if changed:
+            self._invalidate_status_cache()
+        self._send_json(
+            {"ok": True, "results": results, "succeeded": sum(r["ok"] for r in results)}
+        )
+        if path == "/bulk/run":
+            # A bounded pool runs them, instead of one thread per item
+            for task, cmd in to_start:
+                self.server.bulk_tasks.put((self._execute_if_queued, task, cmd))
+
+    def _handle_profiler_admin(self, parsed):
+        """Serve /admin/profiler/* routes; returns False for other paths"""
+        admin = getattr(self.server, "profiler_admin", None)
+        if admin is None or not admin.matches(parsed.path):
+            return False
+        status, content_type, body = admin.handle(
+            self.command, parsed.path, parsed.query, self.headers
+        )
+        self.send_response(status)
+        self.send_header("X-Content-Type-Options", "nosniff")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if hasattr(self, "correlation_id"):
+            self.send_header("X-Correlation-ID", self.correlation_id)
+        self.end_headers()
+        self.wfile.write(body)
+        return True
+
     def _get_detailed_health(self):
         """Detailed health check with system metrics"""
         import shutil
@@ -663,7 +900,8 @@ class MCPHandler(BaseHTTPRequestHandler):
                 "uptime": True,
                 "agents": {
                     "registered": agent_count,
-                    "controllers": len(self.server.controllers),
+                    "controllers": len(self.server.liveness),
+                    "controllers_alive": self.server.liveness.alive,
                 },
                 "tasks": {
                     "total": queue_depth,
@@ -704,12 +942,11 @@ class MCPHandler(BaseHTTPRequestHandler):
 
     @cached_response(CACHE_TTL_STATUS, "status")
     def _get_status_data(self):
-        """Get status data (cached)"""
+        """Get status data (cached); controllers are added from the liveness table"""
         return {
             "ok": True,
             "agents": list(self.server.agents.keys()),
             "tasks": list(self.server.tasks),
-            "controllers": list(self.server.controllers.values()),
         }
 
     @cached_response(CACHE_TTL_HEALTH, "health")
@@ -717,28 +954,81 @@ class MCPHandler(BaseHTTPRequestHandler):
         """Get detailed health data (cached)"""
         return self._get_detailed_health()
 
-    @cached_response(CACHE_TTL_CONTROLLERS, "controllers")
+    def _controller_liveness(self):
+        """Liveness table with stale controllers expired and announced"""
+        liveness = self.server.liveness
+        for entry in liveness.advance():
+            trigger_event(
+                "agent_stale",
+                {
+                    "agent_name": entry["agent"],
+                    "project": entry["project"],
+                    "last_heartbeat": entry["last_heartbeat"],
+                },
+            )
+        return liveness
+
     def _get_controllers_data(self):
-        """Get controllers data (cached)"""
-        return {"ok": True, "controllers": list(self.server.controllers.values())}
+        """Get controllers data from the liveness table"""
+        liveness = self._controller_liveness()
+        return {
+            "ok": True,
+            "controllers": liveness.controllers(),
+            "alive": liveness.alive,
+            "liveness_version": liveness.version,
+        }
 
     def _invalidate_status_cache(self):
         """Invalidate status-related caches"""
         cache = get_cache()
         cache.delete("status:_get_status_data")
-        cache.delete("controllers:_get_controllers_data")
 
     def _invalidate_health_cache(self):
         """Invalidate health cache"""
         cache = get_cache()
         cache.delete("health:_get_health_data")
 
+    def send_response(self, code, message=None):
+        # Remember the status for request telemetry
+        self._response_status = code
+        super().send_response(code, message)
+
+    def _instrumented(self, handler):
+        """Run a request handler, recording route latency and a request span"""
+        start_ns = time.time_ns()
+        started = time.perf_counter_ns()
+        self._response_status = None
+        # Extract or generate correlation ID for request tracing
+        self.correlation_id = self.headers.get("X-Correlation-ID") or str(uuid.uuid4())
+        try:
+            handler()
+        finally:
+            telemetry = getattr(self.server, "telemetry", None)
+            if telemetry is not None:
+                # Status 0 means the handler sent no response at all
+                telemetry.observe_request(
+                    self.command,
+                    urlparse(self.path).path,
+                    self._response_status or 0,
+                    start_ns,
+                    time.perf_counter_ns() - started,
+                    self.correlation_id,
+                )
+
     def do_GET(self):
+        self._instrumented(self._handle_get)
+
+    def do_POST(self):
+        self._instrumented(self._handle_post)
+
+    def _handle_get(self):
         try:
             if self._is_rate_limited():
                 self._send_json({"error": "rate_limited"}, status=429)
                 return
             parsed = urlparse(self.path)
+            if self._handle_profiler_admin(parsed):
+                return
             if parsed.path == "/metrics":
                 # Expose simple metrics in Prometheus text format
                 try:
@@ -764,12 +1054,20 @@ class MCPHandler(BaseHTTPRequestHandler):
                         lines.append(f"# TYPE {k} counter")
                         lines.append(f"{k} {int(v)}")
                     body = "\n".join(lines) + "\n"
+                    # Per-route latency and task lifecycle histograms
+                    telemetry = getattr(self.server, "telemetry", None)
+                    if telemetry is not None:
+                        body += telemetry.render()
                     self.wfile.write(body.encode("utf-8"))
                 except Exception:
                     self._send_json({"error": "metrics_error"}, status=500)
                 return
             if parsed.path == "/status":
-                return self._get_status_data()
+                # Cached agents/tasks plus the current controller liveness
+                status = dict(self._get_status_data())
+                status.update(self._get_controllers_data())
+                self._send_json(status)
+                return
 
             if parsed.path == "/health" or parsed.path == "/v1/health":
                 # Detailed health check for external supervisors
@@ -780,7 +1078,8 @@ class MCPHandler(BaseHTTPRequestHandler):
 
             if parsed.path == "/controllers":
                 # return registered controllers with last heartbeat
-                return self._get_controllers_data()
+                self._send_json(self._get_controllers_data())
+                return
 
             # Quantum-enhanced GET endpoints
             if parsed.path == "/quantum_status":
@@ -801,8 +1100,8 @@ class MCPHandler(BaseHTTPRequestHandler):
                 agents_status = {
                     "total_agents": len(self.server.agents),
                     "registered_agents": list(self.server.agents.keys()),
-                    "active_controllers": len(self.server.controllers),
-                    "controller_details": list(self.server.controllers.values()),
+                    "active_controllers": self._controller_liveness().alive,
+                    "controller_details": self.server.liveness.controllers(),
                     "timestamp": time.time(),
                 }
                 self._send_json({"ok": True, "agents": agents_status})
@@ -972,16 +1271,12 @@ class MCPHandler(BaseHTTPRequestHandler):
         self.send_header("Access-Control-Max-Age", "86400")  # 24 hours
         self.end_headers()
 
-    def do_POST(self):
+    def _handle_post(self):
         try:
             if self._is_rate_limited():
                 self._send_json({"error": "rate_limited"}, status=429)
                 return
 
-            # Extract or generate correlation ID for request tracing
-            correlation_id = self.headers.get("X-Correlation-ID", str(uuid.uuid4()))
-            self.correlation_id = correlation_id
-
             parsed = urlparse(self.path)
             length = int(self.headers.get("Content-Length", 0))
             raw_bytes = self.rfile.read(length) if length else b""
@@ -992,6 +1287,9 @@ class MCPHandler(BaseHTTPRequestHandler):
                 self._send_json({"error": "invalid_json"}, status=400)
                 return
 
+            if self._handle_profiler_admin(parsed):
+                return
+
             # Check for plugin webhooks first
             if parsed.path in plugin_manager.webhooks:
                 webhook_info = plugin_manager.webhooks[parsed.path]
@@ -1015,117 +1313,57 @@ class MCPHandler(BaseHTTPRequestHandler):
 
             if parsed.path == "/register":
                 agent = body.get("agent")
-                caps = body.get("capabilities", [])
                 if not agent:
                     self._send_json({"error": "agent_required"}, status=400)
                     return
-                self.server.agents[agent] = {"capabilities": caps}
+                self._register_agent(agent, body.get("capabilities", []))
                 # Invalidate status cache since agents changed
                 self._invalidate_status_cache()
 
-                # Trigger agent registration event
-                trigger_event(
-                    "agent_registered",
-                    {"agent_name": agent, "capabilities": caps, "timestamp": time.time()},
-                )
-
                 self._send_json({"ok": True, "registered": agent})
                 return
 
+            if parsed.path in ("/bulk/register", "/bulk/run", "/bulk/status"):
+                self._handle_bulk(parsed.path, body)
+                return
+
             if parsed.path == "/heartbeat":
                 # controllers POST {'agent': 'name', 'project': 'X'} to announce liveness
                 agent = body.get("agent")
                 proj = body.get("project")
-                ts = __import__("time").time()
+                ts = time.time()
                 if not agent:
                     self._send_json({"error": "agent_required"}, status=400)
                     return
-                entry = {"agent": agent, "project": proj, "last_heartbeat": ts}
-                # store or update
-                self.server.controllers[agent] = entry
-                # Invalidate status and controllers cache since controllers changed
-                self._invalidate_status_cache()
-
-                # Trigger agent heartbeat event
-                trigger_event(
-                    "agent_heartbeat",
-                    {"agent_name": agent, "project": proj, "timestamp": ts},
-                )
+                # Routine beats only touch the timestamp; /status reads it live
+                change = self._controller_liveness().beat(agent, proj, ts)
+                if change is not None:
+                    trigger_event(
+                        "agent_heartbeat",
+                        {
+                            "agent_name": agent,
+                            "project": proj,
+                            "timestamp": ts,
+                            "change": change,
+                        },
+                    )
 
                 self._send_json({"ok": True, "heartbeat": True, "agent": agent})
                 return
 
             if parsed.path == "/run":
-                agent = body.get("agent")
-                command = body.get("command")
-                project = body.get("project")
-                execute = bool(body.get("execute", False))
-
-                if not agent or not command:
-                    self._send_json({"error": "agent_and_command_required"}, status=400)
-                    return
-
-                if command not in ALLOWED_COMMANDS:
-                    self._send_json(
-                        {
-                            "error": "command_not_allowed",
-                            "allowed": list(ALLOWED_COMMANDS.keys()),
-                        },
-                        status=403,
-                    )
+                task, cmd, error, status = self._queue_run_task(body)
+                if error is not None:
+                    self._send_json(error, status=status)
                     return
-
-                # Prepare invocation
-                cmd = list(ALLOWED_COMMANDS[command])
-                if project:
-                    cmd.append(project)
-
-                task_id = str(uuid.uuid4())
-                task = {
-                    "id": task_id,
-                    "agent": agent,
-                    "command": command,
-                    "project": project,
-                    "status": "queued",
-                }
-                self.server.tasks.append(task)
-                try:
-                    self.server.metrics["tasks_queued"] += 1
-                except Exception:
-                    pass
                 # Invalidate status cache since tasks changed
                 self._invalidate_status_cache()
 
-                # Trigger task queued event
-                trigger_event(
-                    "task_queued",
-                    {
-                        "task_id": task_id,
-                        "agent": agent,
-                        "command": command,
-                        "project": project,
-                        "timestamp": time.time(),
-                    },
-                )
-
-                self._send_json({"ok": True, "task_id": task_id, "queued": True})
+                self._send_json({"ok": True, "task_id": task["id"], "queued": True})
 
                 # Execute in background thread if execute requested
-                if execute:
-                    # mark queued -> running under server-level lock to avoid races
-                    # multiple controllers may attempt to execute same task concurrently
-                    try:
-                        with self.server.task_lock:
-                            if task.get("status") != "queued":
-                                return
-                            task["status"] = "running"
-                    except Exception:
-                        # if lock isn't present for some reason, fall back to best-effort
-                        task["status"] = "running"
-
-                    threading.Thread(
-                        target=self._execute_task, args=(task, cmd), daemon=True
-                    ).start()
+                if body.get("execute", False):
+                    self._start_task(task, cmd)
                 return
 
             if parsed.path == "/workflow_alert":
@@ -1153,6 +1391,8 @@ class MCPHandler(BaseHTTPRequestHandler):
                     "command": "ci-check",
                     "project": head_branch or "workspace",
                     "status": "queued",
+                    "queued_at": time.time(),
+                    "correlation_id": getattr(self, "correlation_id", None),
                     "meta": {
                         "workflow": workflow,
                         "conclusion": conclusion,
@@ -1221,6 +1461,8 @@ class MCPHandler(BaseHTTPRequestHandler):
                         "command": cmd,
                         "project": proj,
                         "status": "queued",
+                        "queued_at": time.time(),
+                        "correlation_id": getattr(self, "correlation_id", None),
                         "meta": {
                             "event": "repository_dispatch",
                             "action": action_name,
@@ -1271,6 +1513,8 @@ class MCPHandler(BaseHTTPRequestHandler):
                             "command": "ci-check",
                             "project": head_branch or "workspace",
                             "status": "queued",
+                            "queued_at": time.time(),
+                            "correlation_id": getattr(self, "correlation_id", None),
                             "meta": {
                                 "workflow": workflow_run.get("name"),
                                 "conclusion": conclusion,
@@ -1607,6 +1851,9 @@ class MCPHandler(BaseHTTPRequestHandler):
 
     def _execute_task(self, task, cmd):
         task["status"] = "running"
+        telemetry = getattr(self.server, "telemetry", None)
+        if telemetry is not None:
+            telemetry.task_started(task)
 
         # Trigger task started event
         trigger_event(
@@ -1667,6 +1914,8 @@ class MCPHandler(BaseHTTPRequestHandler):
                     self.server.metrics["tasks_failed"] += 1
             except Exception:
                 pass
+            if telemetry is not None:
+                telemetry.task_finished(task)
 
             # Trigger task completed event
             trigger_event(
@@ -2117,6 +2366,8 @@ Task {{
                 "command": "quantum_orchestrate",
                 "project": workflow_name,
                 "status": "queued",
+                "queued_at": time.time(),
+                "correlation_id": getattr(self, "correlation_id", None),
                 "execution_mode": execution_mode,
                 "quantum_requirements": {
                     "entanglement": True,
@@ -2172,6 +2423,16 @@ Task {{
             return {"error": f"reality_simulation_failed: {str(e)}"}
 
 
+def _bulk_task_worker(work):
+    """Run tasks queued by /bulk/run one at a time"""
+    while True:
+        execute, task, cmd = work.get()
+        try:
+            execute(task, cmd)
+        except Exception as e:
+            print(f"Bulk task {task.get('id')} failed: {e}")
+
+
 def run_server(host=HOST, port=PORT):
     httpd = HTTPServer((host, port), MCPHandler)
     httpd.agents = {}
@@ -2184,10 +2445,25 @@ def run_server(host=HOST, port=PORT):
         "tasks_failed": 0,
         "tasks_dlq": 0,
     }
-    # Controllers registry: maps agent -> {agent, project, last_heartbeat}
-    httpd.controllers = {}
+    # Per-route latency, task lifecycle timing and optional span export
+    httpd.telemetry = RequestTelemetry(
+        span_target=TRACE_EXPORT, known_route=known_route
+    )
+    # On-demand sampling profiler; admin routes need PROFILER_ADMIN_TOKEN
+    httpd.profiler_admin = ProfilerAdmin()
+    # Controllers registry: agent -> {agent, project, last_heartbeat, alive}
+    httpd.liveness = LivenessTable(stale_after=CONTROLLER_STALE_SECONDS)
     # Lock to protect queued->running transitions
     httpd.task_lock = threading.Lock()
+    # Executed /bulk/run items share a fixed set of worker threads
+    httpd.bulk_tasks = queue.Queue()
+    for i in range(max(1, BULK_EXECUTE_WORKERS)):
+        threading.Thread(
+            target=_bulk_task_worker,
+            args=(httpd.bulk_tasks,),
+            name=f"bulk-task-{i}",
+            daemon=True,
+        ).start()
     # Rate limiting state
     httpd.request_counters = {}
     httpd.rate_limit_lock = threading.Lock()
@@ -2259,6 +2535,8 @@ def run_server(host=HOST, port=PORT):
     except KeyboardInterrupt:
         print("Shutting down MCP server")
         plugin_manager.shutdown_plugins()
+        if httpd.telemetry.exporter is not None:
+            httpd.telemetry.exporter.shutdown()
 
 
 if __name__ == "__main__":
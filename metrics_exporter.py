@@ -2,81 +2,41 @@
 """
 Tools Automation Metrics Exporter
 Provides comprehensive Prometheus metrics for agent monitoring and SLO tracking
+
+Agent, alert and SLO metrics are built by a background thread whenever one of
+the source files changes and served to scrapers from a pre-rendered buffer,
+so scrape latency does not depend on agent count or file size.
 """
 
+import logging
+import threading
 import time
 import json
 import os
 from flask import Flask, Response
 from prometheus_client import (
-    Gauge,
+    REGISTRY,
     Counter,
     Histogram,
-    Summary,
     generate_latest,
     CONTENT_TYPE_LATEST,
 )
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
 
 app = Flask(__name__)
+logger = logging.getLogger(__name__)
 
-# Agent status metrics
-AGENT_STATUS = Gauge(
-    "agent_status", "Agent operational status", ["agent_name", "agent_type"]
-)
-AGENT_UPTIME = Gauge("agent_uptime_seconds", "Agent uptime in seconds", ["agent_name"])
-AGENT_HEALTH_SCORE = Gauge(
-    "agent_health_score", "Agent health score (0-1)", ["agent_name"]
-)
+# Seconds between source file checks by the background refresher
+REFRESH_INTERVAL = float(os.environ.get("METRICS_REFRESH_INTERVAL", "5"))
+# Agents exported per refresh; bounds the label cardinality of agent metrics
+MAX_AGENTS = int(os.environ.get("METRICS_MAX_AGENTS", "1000"))
 
-# Task metrics
-AGENT_TASKS_COMPLETED = Counter(
-    "agent_tasks_completed_total",
-    "Total tasks completed by agent",
-    ["agent_name", "task_type"],
-)
-AGENT_TASKS_FAILED = Counter(
-    "agent_tasks_failed_total",
-    "Total tasks failed by agent",
-    ["agent_name", "task_type"],
-)
-AGENT_TASKS_QUEUED = Gauge(
-    "agent_tasks_queued", "Number of tasks queued for agent", ["agent_name"]
-)
-AGENT_TASKS_PROCESSING = Gauge(
-    "agent_tasks_processing", "Number of tasks currently processing", ["agent_name"]
-)
+SEVERITIES = ["critical", "high", "medium", "low"]
 
-# Performance metrics
+# Event-driven metrics, updated by callers rather than from status files
 AGENT_RESPONSE_TIME = Histogram(
     "agent_response_time_seconds", "Agent response time", ["agent_name", "endpoint"]
 )
-AGENT_MEMORY_USAGE = Gauge(
-    "agent_memory_usage_bytes", "Agent memory usage", ["agent_name"]
-)
-AGENT_CPU_USAGE = Gauge("agent_cpu_usage_percent", "Agent CPU usage", ["agent_name"])
-
-# SLO metrics
-AGENT_SLO_UPTIME = Gauge(
-    "agent_slo_uptime_percent", "Agent SLO uptime percentage", ["agent_name"]
-)
-AGENT_SLO_LATENCY = Gauge(
-    "agent_slo_latency_ms", "Agent SLO latency target", ["agent_name"]
-)
-AGENT_SLO_ERROR_RATE = Gauge(
-    "agent_slo_error_rate_percent", "Agent SLO error rate target", ["agent_name"]
-)
-
-# System-wide metrics
-SYSTEM_AGENTS_TOTAL = Gauge("system_agents_total", "Total number of registered agents")
-SYSTEM_AGENTS_RUNNING = Gauge("system_agents_running", "Number of running agents")
-SYSTEM_TASKS_QUEUED = Gauge("system_tasks_queued", "Number of tasks in queue")
-SYSTEM_TASKS_PROCESSING = Gauge(
-    "system_tasks_processing", "Number of tasks currently processing"
-)
-SYSTEM_HEALTH_SCORE = Gauge("system_health_score", "Overall system health score (0-1)")
-
-# Alert metrics
-ALERTS_ACTIVE = Gauge("alerts_active", "Number of active alerts", ["severity"])
 ALERTS_TRIGGERED = Counter(
     "alerts_triggered_total", "Total alerts triggered", ["severity", "source"]
 )
@@ -173,118 +133,354 @@ def load_alerts():
     return alerts
 
 
-def update_metrics():
-    """Update Prometheus metrics based on current agent status"""
-    agents = load_agent_status()
+def source_signature():
+    """Sizes and mtimes of every file the exporter reads"""
+    base_dir = os.path.dirname(__file__)
+    signature = []
+
+    for name in ("agent_status.json", "alert_config.json"):
+        try:
+            st = os.stat(os.path.join(base_dir, name))
+            signature.append((name, st.st_size, st.st_mtime_ns))
+        except OSError:
+            signature.append((name, None, None))
+
+    try:
+        with os.scandir(os.path.join(base_dir, "agents")) as entries:
+            signature.extend(
+                sorted(
+                    (e.name, e.stat().st_size, e.stat().st_mtime_ns)
+                    for e in entries
+                    if e.name.endswith("_status.json")
+                )
+            )
+    except OSError:
+        pass
+
+    # load_alerts() only counts alert files
+    try:
+        with os.scandir(os.path.join(base_dir, "alerts")) as entries:
+            signature.append(("alerts", sum(e.name.endswith(".json") for e in entries)))
+    except OSError:
+        signature.append(("alerts", None))
+
+    return tuple(signature)
+
+
+def build_snapshot():
+    """Derive all file-based metric values from the current source files"""
+    # agent_status.json also carries bookkeeping keys such as "last_update"
+    agents = {
+        name: data
+        for name, data in load_agent_status().items()
+        if isinstance(data, dict)
+    }
     alert_config = load_alert_config()
     alerts = load_alerts()
 
-    # Reset gauges
-    SYSTEM_AGENTS_TOTAL.set(len(agents))
+    custom_thresholds = alert_config.get("custom_thresholds", {})
+    env = custom_thresholds.get("current_environment", "development")
+    env_thresholds = custom_thresholds.get("environments", {}).get(env, {})
+    tool_thresholds = custom_thresholds.get("tools", {})
 
-    total_running = 0
-    total_queued = 0
-    total_processing = 0
-    total_health_score = 0.0
-
-    current_time = time.time()
+    rows = []
+    totals = {"running": 0, "queued": 0, "processing": 0, "health": 0.0}
+    health_scores = {}
 
     for agent_name, agent_data in agents.items():
-        # Agent status (1 = running, 0 = stopped)
+        health_score = calculate_health_score(agent_data)
+        health_scores[agent_name] = health_score
         status = 1 if agent_data.get("status") == "running" else 0
-        if status == 1:
-            total_running += 1
+        queued = agent_data.get("tasks_queued", 0)
+        processing = agent_data.get("tasks_processing", 0)
 
-        agent_type = agent_data.get("type", "unknown")
-        AGENT_STATUS.labels(agent_name=agent_name, agent_type=agent_type).set(status)
+        totals["running"] += status
+        totals["queued"] += queued
+        totals["processing"] += processing
+        totals["health"] += health_score
 
-        # Calculate and set uptime
+        # Parsed once per change; uptime itself is derived at render time
         last_seen = agent_data.get("last_seen")
+        last_seen_epoch = None
         if last_seen:
             try:
-                # Simple uptime calculation (would be more sophisticated in production)
-                uptime = current_time - time.mktime(
+                last_seen_epoch = time.mktime(
                     time.strptime(last_seen, "%Y-%m-%dT%H:%M:%SZ")
                 )
-                AGENT_UPTIME.labels(agent_name=agent_name).set(uptime)
             except (ValueError, TypeError):
-                AGENT_UPTIME.labels(agent_name=agent_name).set(0)
+                last_seen_epoch = "invalid"
 
-        # Health score
-        health_score = calculate_health_score(agent_data)
-        AGENT_HEALTH_SCORE.labels(agent_name=agent_name).set(health_score)
-        total_health_score += health_score
+        # Use tool-specific thresholds, fall back to environment defaults
+        thresholds = {**env_thresholds, **tool_thresholds.get(agent_name, {})}
+
+        rows.append(
+            {
+                "name": agent_name,
+                "type": agent_data.get("type", "unknown"),
+                "status": status,
+                "last_seen": last_seen_epoch,
+                "health_score": health_score,
+                "completed": agent_data.get("tasks_completed", 0),
+                "failed": agent_data.get("tasks_failed", 0),
+                "queued": queued,
+                "processing": processing,
+                "memory_bytes": agent_data.get("memory_usage", 50) * 1024 * 1024,
+                "cpu_percent": agent_data.get("cpu_usage", 5),
+                "slo_uptime": thresholds.get("uptime_percent", 99.5),
+                "slo_latency": thresholds.get("response_time_ms", 1000),
+                "slo_error_rate": thresholds.get("error_rate_percent", 5),
+            }
+        )
+
+    # Agents beyond the cap are dropped by name order; system totals still
+    # cover every agent
+    rows.sort(key=lambda row: row["name"])
+    dropped = max(0, len(rows) - MAX_AGENTS)
+
+    return {
+        "agents": agents,
+        "environment": env,
+        "health_scores": health_scores,
+        "rows": rows[:MAX_AGENTS],
+        "dropped_agents": dropped,
+        "totals": totals,
+        "alerts": alerts,
+    }
 
-        # Task metrics
-        completed = agent_data.get("tasks_completed", 0)
-        failed = agent_data.get("tasks_failed", 0)
-        queued = agent_data.get("tasks_queued", 0)
-        processing = agent_data.get("tasks_processing", 0)
 
-        AGENT_TASKS_COMPLETED.labels(agent_name=agent_name, task_type="all")._value.set(
-            completed
+class AgentMetricsCollector:
+    """Yields agent, system and alert metrics from the exporter's snapshot"""
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+
+    def collect(self):
+        exporter = self.exporter
+        snapshot = exporter.snapshot
+        rows = snapshot["rows"]
+        now = time.time()
+
+        def per_agent(name, documentation, key):
+            family = GaugeMetricFamily(name, documentation, labels=["agent_name"])
+            for row in rows:
+                family.add_metric([row["name"]], key(row))
+            return family
+
+        status = GaugeMetricFamily(
+            "agent_status",
+            "Agent operational status",
+            labels=["agent_name", "agent_type"],
         )
-        AGENT_TASKS_FAILED.labels(agent_name=agent_name, task_type="all")._value.set(
-            failed
+        uptime = GaugeMetricFamily(
+            "agent_uptime_seconds", "Agent uptime in seconds", labels=["agent_name"]
+        )
+        completed = CounterMetricFamily(
+            "agent_tasks_completed_total",
+            "Total tasks completed by agent",
+            labels=["agent_name", "task_type"],
+        )
+        failed = CounterMetricFamily(
+            "agent_tasks_failed_total",
+            "Total tasks failed by agent",
+            labels=["agent_name", "task_type"],
+        )
+        for row in rows:
+            status.add_metric([row["name"], row["type"]], row["status"])
+            if row["last_seen"] == "invalid":
+                uptime.add_metric([row["name"]], 0)
+            elif row["last_seen"] is not None:
+                # Simple uptime calculation (would be more sophisticated in production)
+                uptime.add_metric([row["name"]], now - row["last_seen"])
+            completed.add_metric([row["name"], "all"], row["completed"])
+            failed.add_metric([row["name"], "all"], row["failed"])
+
+        yield status
+        yield uptime
+        yield per_agent(
+            "agent_health_score",
+            "Agent health score (0-1)",
+            lambda r: r["health_score"],
+        )
+        yield completed
+        yield failed
+        yield per_agent(
+            "agent_tasks_queued",
+            "Number of tasks queued for agent",
+            lambda r: r["queued"],
+        )
+        yield per_agent(
+            "agent_tasks_processing",
+            "Number of tasks currently processing",
+            lambda r: r["processing"],
+        )
+        yield per_agent(
+            "agent_memory_usage_bytes",
+            "Agent memory usage",
+            lambda r: r["memory_bytes"],
+        )
+        yield per_agent(
+            "agent_cpu_usage_percent", "Agent CPU usage", lambda r: r["cpu_percent"]
+        )
+        yield per_agent(
+            "agent_slo_uptime_percent",
+            "Agent SLO uptime percentage",
+            lambda r: r["slo_uptime"],
+        )
+        yield per_agent(
+            "agent_slo_latency_ms",
+            "Agent SLO latency target",
+            lambda r: r["slo_latency"],
+        )
+        yield per_agent(
+            "agent_slo_error_rate_percent",
+            "Agent SLO error rate target",
+            lambda r: r["slo_error_rate"],
         )
-        AGENT_TASKS_QUEUED.labels(agent_name=agent_name).set(queued)
-        AGENT_TASKS_PROCESSING.labels(agent_name=agent_name).set(processing)
-
-        total_queued += queued
-        total_processing += processing
 
-        # Resource usage
-        memory_mb = agent_data.get("memory_usage", 50)
-        cpu_percent = agent_data.get("cpu_usage", 5)
-        AGENT_MEMORY_USAGE.labels(agent_name=agent_name).set(memory_mb * 1024 * 1024)
-        AGENT_CPU_USAGE.labels(agent_name=agent_name).set(cpu_percent)
+        # System-wide metrics
+        agents_total = len(snapshot["agents"])
+        totals = snapshot["totals"]
+        yield GaugeMetricFamily(
+            "system_agents_total",
+            "Total number of registered agents",
+            value=agents_total,
+        )
+        yield GaugeMetricFamily(
+            "system_agents_running",
+            "Number of running agents",
+            value=totals["running"],
+        )
+        yield GaugeMetricFamily(
+            "system_tasks_queued", "Number of tasks in queue", value=totals["queued"]
+        )
+        yield GaugeMetricFamily(
+            "system_tasks_processing",
+            "Number of tasks currently processing",
+            value=totals["processing"],
+        )
+        yield GaugeMetricFamily(
+            "system_health_score",
+            "Overall system health score (0-1)",
+            value=totals["health"] / agents_total if agents_total else 0.0,
+        )
 
-        # SLO metrics (from alert config)
-        env = alert_config.get("custom_thresholds", {}).get(
-            "current_environment", "development"
+        # Alert metrics
+        alerts_active = GaugeMetricFamily(
+            "alerts_active", "Number of active alerts", labels=["severity"]
+        )
+        for severity in SEVERITIES:
+            alerts_active.add_metric([severity], snapshot["alerts"].get(severity, 0))
+        yield alerts_active
+
+        # Exporter self-monitoring
+        yield GaugeMetricFamily(
+            "metrics_exporter_refresh_duration_seconds",
+            "Duration of the last rebuild from source files",
+            value=exporter.refresh_seconds,
+        )
+        yield GaugeMetricFamily(
+            "metrics_exporter_last_refresh_timestamp_seconds",
+            "Unix time of the last rebuild from source files",
+            value=exporter.last_refresh,
         )
-        agent_thresholds = (
-            alert_config.get("custom_thresholds", {})
-            .get("environments", {})
-            .get(env, {})
+        yield CounterMetricFamily(
+            "metrics_exporter_refreshes_total",
+            "Rebuilds triggered by source file changes",
+            value=exporter.refreshes,
         )
-        tool_thresholds = (
-            alert_config.get("custom_thresholds", {})
-            .get("tools", {})
-            .get(agent_name, {})
+        yield GaugeMetricFamily(
+            "metrics_exporter_dropped_agents",
+            f"Agents not exported because of the {MAX_AGENTS} agent label limit",
+            value=snapshot["dropped_agents"],
         )
 
-        # Use tool-specific thresholds, fall back to environment defaults
-        thresholds = {**agent_thresholds, **tool_thresholds}
 
-        slo_uptime = thresholds.get("uptime_percent", 99.5)
-        slo_latency = thresholds.get("response_time_ms", 1000)
-        slo_error_rate = thresholds.get("error_rate_percent", 5)
+class MetricsExporter:
+    """Keeps a snapshot and rendered exposition current in the background"""
+
+    def __init__(self, registry=REGISTRY, interval=REFRESH_INTERVAL):
+        self.registry = registry
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.signature = None
+        self.snapshot = {
+            "agents": {},
+            "environment": "development",
+            "health_scores": {},
+            "rows": [],
+            "dropped_agents": 0,
+            "totals": {"running": 0, "queued": 0, "processing": 0, "health": 0.0},
+            "alerts": {},
+        }
+        self.exposition = b""
+        self.refresh_seconds = 0.0
+        self.last_refresh = 0.0
+        self.refreshes = 0
+        self._thread = None
+        self._stop = threading.Event()
+        registry.register(AgentMetricsCollector(self))
+
+    def refresh(self, force=False):
+        """Rebuild the snapshot if a source file changed, then re-render"""
+        with self.lock:
+            signature = source_signature()
+            if force or signature != self.signature:
+                started = time.perf_counter()
+                self.snapshot = build_snapshot()
+                self.signature = signature
+                self.refresh_seconds = time.perf_counter() - started
+                self.last_refresh = time.time()
+                self.refreshes += 1
+            # Uptime moves with the clock, so the buffer is re-rendered every tick
+            self.exposition = generate_latest(self.registry)
+
+    def current(self):
+        """Latest snapshot, refreshing synchronously only before the first one"""
+        self.start()
+        if self.signature is None:
+            self.refresh()
+        return self.snapshot
+
+    def render(self):
+        self.current()
+        return self.exposition
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self.lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="metrics-refresh", daemon=True
+                )
+                self._thread.start()
 
-        AGENT_SLO_UPTIME.labels(agent_name=agent_name).set(slo_uptime)
-        AGENT_SLO_LATENCY.labels(agent_name=agent_name).set(slo_latency)
-        AGENT_SLO_ERROR_RATE.labels(agent_name=agent_name).set(slo_error_rate)
+    def stop(self):
+        self._stop.set()
 
-    # System-wide metrics
-    SYSTEM_AGENTS_RUNNING.set(total_running)
-    SYSTEM_TASKS_QUEUED.set(total_queued)
-    SYSTEM_TASKS_PROCESSING.set(total_processing)
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Metrics refresh failed")
+            if self._stop.wait(self.interval):
+                return
 
-    # Overall system health score
-    if agents:
-        avg_health_score = total_health_score / len(agents)
-        SYSTEM_HEALTH_SCORE.set(avg_health_score)
 
-    # Alert metrics
-    for severity in ["critical", "high", "medium", "low"]:
-        ALERTS_ACTIVE.labels(severity=severity).set(alerts.get(severity, 0))
+EXPORTER = MetricsExporter()
+
+
+def update_metrics():
+    """Rebuild metrics from the current agent status immediately"""
+    EXPORTER.refresh(force=True)
 
 
 @app.route("/metrics")
 def metrics():
     """Prometheus metrics endpoint"""
-    update_metrics()
-    return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+    return Response(EXPORTER.render(), mimetype=CONTENT_TYPE_LATEST)
 
 
 @app.route("/health")
@@ -296,20 +492,16 @@ def health():
 @app.route("/slo")
 def slo_status():
     """SLO status endpoint"""
-    agents = load_agent_status()
-    alert_config = load_alert_config()
+    snapshot = EXPORTER.current()
 
     slo_data = {
-        "environment": alert_config.get("custom_thresholds", {}).get(
-            "current_environment", "development"
-        ),
+        "environment": snapshot["environment"],
         "agents": {},
     }
 
-    for agent_name, agent_data in agents.items():
-        health_score = calculate_health_score(agent_data)
+    for agent_name, agent_data in snapshot["agents"].items():
         slo_data["agents"][agent_name] = {
-            "health_score": health_score,
+            "health_score": snapshot["health_scores"][agent_name],
             "status": agent_data.get("status"),
             "tasks_completed": agent_data.get("tasks_completed", 0),
             "tasks_failed": agent_data.get("tasks_failed", 0),
@@ -321,14 +513,13 @@ def slo_status():
 @app.route("/")
 def index():
     """Basic info page"""
-    agents = load_agent_status()
-    alerts = load_alerts()
+    snapshot = EXPORTER.current()
 
     return {
         "service": "Tools Automation Metrics Exporter",
         "version": "1.0.0",
-        "agents_monitored": len(agents),
-        "alerts_active": alerts.get("total", 0),
+        "agents_monitored": len(snapshot["agents"]),
+        "alerts_active": snapshot["alerts"].get("total", 0),
         "endpoints": {"metrics": "/metrics", "health": "/health", "slo": "/slo"},
         "timestamp": time.time(),
     }
@@ -340,4 +531,6 @@ if __name__ == "__main__":
     print("💚 Health check at: http://localhost:8080/health")
     print("🎯 SLO status at: http://localhost:8080/slo")
 
+    EXPORTER.start()
+
     app.run(host="0.0.0.0", port=8080, debug=False)
@@ -15,6 +15,11 @@ from datetime import datetime, timedelta
 from collections import defaultdict, Counter
 import argparse
 
+from flaky_test_history import OutcomeHistory
+
+# Runs kept in the rolling flakiness history
+HISTORY_WINDOW = 50
+
 
 class FlakyTestMonitor:
     """Monitor and quarantine flaky tests in CI/CD."""
@@ -81,69 +86,38 @@ class FlakyTestMonitor:
         """Update historical flakiness data."""
         history_file = self.test_results_dir / "flakiness_history.json"
 
-        # Load existing history
-        if history_file.exists():
-            try:
-                with open(history_file, "r") as f:
-                    history = json.load(f)
-            except json.JSONDecodeError:
-                history = {}
-        else:
-            history = {}
-
-        # Add current results
-        timestamp = datetime.now().isoformat()
-        history[timestamp] = current_results
-
-        # Keep only last 50 runs to prevent file from growing too large
-        if len(history) > 50:
-            sorted_timestamps = sorted(history.keys())
-            to_remove = sorted_timestamps[:-50]
-            for ts in to_remove:
-                del history[ts]
-
-        # Save updated history
-        with open(history_file, "w") as f:
-            json.dump(history, f, indent=2)
+        # Older per-run outcome maps are migrated to bitsets on load
+        history = OutcomeHistory.load(history_file, window=HISTORY_WINDOW)
+        history.record(current_results)
+        history.save(history_file)
 
         return history
 
     def detect_flaky_tests(self, history):
         """Detect flaky tests based on historical data."""
-        if len(history) < self.min_runs:
+        if history.runs < self.min_runs:
             print(
-                f"⚠️ Not enough test runs for flakiness analysis (need {self.min_runs}, have {len(history)})"
+                f"⚠️ Not enough test runs for flakiness analysis (need {self.min_runs}, have {history.runs})"
             )
             return {}
 
         flaky_tests = {}
 
-        # Analyze each test across all runs
-        all_tests = set()
-        for run_results in history.values():
-            all_tests.update(run_results.keys())
-
-        for test_id in all_tests:
-            outcomes = []
-            for run_results in history.values():
-                outcome = run_results.get(
-                    test_id, "missing"
-                )  # Treat missing as failure
-                outcomes.append(outcome)
-
-            if len(outcomes) >= self.min_runs:
-                failure_rate = outcomes.count("failed") / len(outcomes)
-                passed_rate = outcomes.count("passed") / len(outcomes)
-
-                # Consider flaky if high failure rate but some passes
-                if failure_rate >= self.flakiness_threshold and passed_rate > 0:
-                    flaky_tests[test_id] = {
-                        "failure_rate": failure_rate,
-                        "passed_rate": passed_rate,
-                        "total_runs": len(outcomes),
-                        "recent_outcomes": outcomes[-10:],  # Last 10 runs
-                        "detected_at": datetime.now().isoformat(),
-                    }
+        # Failure and pass rates come straight from the per-test bitsets;
+        # runs where a test is missing count towards neither
+        for test_id in history.suspects():
+            failure_rate = history.failure_rate(test_id)
+            passed_rate = history.pass_rate(test_id)
+
+            # Consider flaky if high failure rate but some passes
+            if failure_rate >= self.flakiness_threshold and passed_rate > 0:
+                flaky_tests[test_id] = {
+                    "failure_rate": failure_rate,
+                    "passed_rate": passed_rate,
+                    "total_runs": history.runs,
+                    "recent_outcomes": history.recent_outcomes(test_id, 10),
+                    "detected_at": datetime.now().isoformat(),
+                }
 
         return flaky_tests
 
@@ -4,12 +4,17 @@ AI Decision Engine
 Unified AI interface for autonomous agent decision-making with multi-provider support
 """
 
+import atexit
+import hashlib
 import json
 import os
 import sys
+import threading
 import time
 import subprocess
 import requests
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 import sqlite3
@@ -32,11 +37,41 @@ class AIDecisionEngine:
         }
     }
     
+    # Identical decisions (type, normalized context, options) reuse the AI
+    # answer for CACHE_TTL seconds instead of querying the provider again
+    CACHE_TTL = 300
+    CACHE_MAX_ENTRIES = 256
+    CACHE_IGNORED_CONTEXT_KEYS = ('timestamp',)
+    
+    # Decision rows are written in batches
+    WRITE_BATCH_SIZE = 20
+    WRITE_FLUSH_INTERVAL = 5.0
+    
     def __init__(self, provider: str = 'ollama', model: str = None, 
-                 history_db: str = None):
+                 history_db: str = None, cache_ttl: int = None):
         """Initialize AI decision engine"""
         self.provider = provider
         self.model = model or self.PROVIDERS[provider]['default_model']
+        self.cache_ttl = self.CACHE_TTL if cache_ttl is None else cache_ttl
+        
+        # Keep-alive connections to the AI provider
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=8)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        self._lock = threading.RLock()
+        self._pending_writes: List[Tuple[str, tuple]] = []
+        self._first_pending_at = 0.0
+        self._flush_timer: Optional[threading.Timer] = None
+        self._cache: 'OrderedDict[str, Tuple[float, Dict[str, Any], float]]' = OrderedDict()
+        self.cache_stats = {
+            'hits': 0,
+            'misses': 0,
+            'llm_calls': 0,
+            'llm_time_ms': 0.0,
+            'llm_time_saved_ms': 0.0
+        }
         
         # Initialize decision history database
         if history_db is None:
@@ -46,7 +81,15 @@ class AIDecisionEngine:
         
         os.makedirs(os.path.dirname(history_db), exist_ok=True)
         self.history_db = history_db
+        
+        # One connection for the engine's lifetime; WAL lets agents read
+        # while another process writes
+        self.conn = sqlite3.connect(self.history_db, timeout=10,
+                                    check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
         self._init_history_db()
+        atexit.register(self.close)
     
     def _discover_workspace(self) -> str:
         """Discover workspace root"""
@@ -67,7 +110,7 @@ class AIDecisionEngine:
     
     def _init_history_db(self):
         """Initialize decision history database"""
-        conn = sqlite3.connect(self.history_db)
+        conn = self.conn
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -97,8 +140,126 @@ class AIDecisionEngine:
             ON decisions(agent_name)
         """)
         
+        # Columns added for the decision cache
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(decisions)")}
+        if 'cache_hit' not in columns:
+            cursor.execute("ALTER TABLE decisions ADD COLUMN cache_hit INTEGER DEFAULT 0")
+        if 'llm_time_saved_ms' not in columns:
+            cursor.execute("ALTER TABLE decisions ADD COLUMN llm_time_saved_ms REAL DEFAULT 0")
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS decision_cache (
+                cache_key TEXT PRIMARY KEY,
+                decision TEXT NOT NULL,
+                llm_time_ms REAL,
+                created_at INTEGER NOT NULL
+            )
+        """)
+        
         conn.commit()
-        conn.close()
+    
+    def close(self):
+        """Flush pending writes and release the database and HTTP session"""
+        with self._lock:
+            if self.conn is None:
+                return
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self.flush()
+            self.conn.close()
+            self.conn = None
+        self.session.close()
+    
+    def flush(self):
+        """Write queued decision rows in one transaction"""
+        with self._lock:
+            if not self._pending_writes or self.conn is None:
+                return
+            with self.conn:
+                for sql, params in self._pending_writes:
+                    self.conn.execute(sql, params)
+                # Expire and bound the persisted decision cache; with caching
+                # disabled here, leave other processes' entries alone
+                if self.cache_ttl > 0:
+                    self.conn.execute(
+                        "DELETE FROM decision_cache WHERE created_at <= ?",
+                        (int(time.time() - self.cache_ttl),))
+                self.conn.execute("""
+                    DELETE FROM decision_cache WHERE cache_key NOT IN (
+                        SELECT cache_key FROM decision_cache
+                        ORDER BY created_at DESC LIMIT ?)
+                """, (self.CACHE_MAX_ENTRIES,))
+            self._pending_writes.clear()
+    
+    def _queue_write(self, sql: str, params: tuple):
+        """Queue a write, flushing once the batch is full or old enough"""
+        with self._lock:
+            if not self._pending_writes:
+                self._first_pending_at = time.time()
+            self._pending_writes.append((sql, params))
+            if (len(self._pending_writes) >= self.WRITE_BATCH_SIZE or
+                    time.time() - self._first_pending_at >= self.WRITE_FLUSH_INTERVAL):
+                self.flush()
+            elif self._flush_timer is None:
+                # An idle engine still writes its last decisions within the interval
+                self._flush_timer = threading.Timer(self.WRITE_FLUSH_INTERVAL,
+                                                    self._timed_flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def _timed_flush(self):
+        with self._lock:
+            self._flush_timer = None
+            self.flush()
+    
+    def _cache_key(self, decision_type: str, context: Dict[str, Any],
+                   options: List[str] = None) -> str:
+        """Cache key over provider, model, decision type, normalized context and options"""
+        normalized = {k: v for k, v in context.items()
+                      if k not in self.CACHE_IGNORED_CONTEXT_KEYS}
+        raw = json.dumps([self.provider, self.model, decision_type, normalized, options or []],
+                         sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Cached (decision_data, llm_time_ms), from memory or the database"""
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._cache.move_to_end(key)
+                    return dict(entry[1]), entry[2]
+                del self._cache[key]
+            
+            # Another process may have cached this decision
+            row = self.conn.execute("""
+                SELECT decision, llm_time_ms, created_at FROM decision_cache
+                WHERE cache_key = ? AND created_at > ?
+            """, (key, int(now - self.cache_ttl))).fetchone()
+            if row is None:
+                return None
+            decision_data = json.loads(row[0])
+            self._cache_put_local(key, decision_data, row[1] or 0.0, row[2] + self.cache_ttl)
+            return dict(decision_data), row[1] or 0.0
+    
+    def _cache_put_local(self, key: str, decision_data: Dict[str, Any],
+                         llm_time_ms: float, expires_at: float):
+        self._cache[key] = (expires_at, dict(decision_data), llm_time_ms)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.CACHE_MAX_ENTRIES:
+            self._cache.popitem(last=False)
+    
+    def _cache_put(self, key: str, decision_data: Dict[str, Any], llm_time_ms: float):
+        now = time.time()
+        with self._lock:
+            self._cache_put_local(key, decision_data, llm_time_ms, now + self.cache_ttl)
+            self._queue_write("""
+                INSERT OR REPLACE INTO decision_cache
+                (cache_key, decision, llm_time_ms, created_at)
+                VALUES (?, ?, ?, ?)
+            """, (key, json.dumps(decision_data), llm_time_ms, int(now)))
     
     def make_decision(self, agent_name: str, decision_type: str, 
                      context: Dict[str, Any], 
@@ -120,14 +281,37 @@ class AIDecisionEngine:
         # Build prompt based on decision type
         prompt = self._build_prompt(decision_type, context, options)
         
-        # Get AI response
-        try:
-            response = self._query_ai(prompt)
-            decision_data = self._parse_ai_response(response, options)
-        except Exception as e:
-            # Fallback to rule-based decision
-            decision_data = self._fallback_decision(decision_type, context, options)
-            decision_data['fallback_reason'] = str(e)
+        cache_key = self._cache_key(decision_type, context, options) if self.cache_ttl > 0 else None
+        cached = self._cache_get(cache_key) if cache_key else None
+        llm_time_saved = 0.0
+        
+        if cached is not None:
+            decision_data, llm_time_saved = cached
+            decision_data['cache_hit'] = True
+            with self._lock:
+                self.cache_stats['hits'] += 1
+                self.cache_stats['llm_time_saved_ms'] += llm_time_saved
+        else:
+            if cache_key:
+                with self._lock:
+                    self.cache_stats['misses'] += 1
+            
+            # Get AI response
+            try:
+                llm_start = time.time()
+                response = self._query_ai(prompt)
+                llm_time = (time.time() - llm_start) * 1000
+                with self._lock:
+                    self.cache_stats['llm_calls'] += 1
+                    self.cache_stats['llm_time_ms'] += llm_time
+                decision_data = self._parse_ai_response(response, options)
+                # Rule-based fallbacks are cheap and not cached
+                if cache_key:
+                    self._cache_put(cache_key, decision_data, llm_time)
+            except Exception as e:
+                # Fallback to rule-based decision
+                decision_data = self._fallback_decision(decision_type, context, options)
+                decision_data['fallback_reason'] = str(e)
         
         execution_time = (time.time() - start_time) * 1000
         
@@ -139,7 +323,9 @@ class AIDecisionEngine:
             prompt=prompt,
             decision=decision_data['decision'],
             confidence=decision_data['confidence'],
-            execution_time_ms=execution_time
+            execution_time_ms=execution_time,
+            cache_hit=cached is not None,
+            llm_time_saved_ms=llm_time_saved
         )
         
         decision_data['execution_time_ms'] = execution_time
@@ -210,7 +396,7 @@ Respond with: {"decision": "your_decision", "confidence": 0.0-1.0, "reasoning":
             }
         }
         
-        response = requests.post(endpoint, json=payload, timeout=timeout)
+        response = self.session.post(endpoint, json=payload, timeout=timeout)
         response.raise_for_status()
         
         result = response.json()
@@ -234,7 +420,7 @@ Respond with: {"decision": "your_decision", "confidence": 0.0-1.0, "reasoning":
             "temperature": 0.7
         }
         
-        response = requests.post(endpoint, headers=headers, json=payload, timeout=timeout)
+        response = self.session.post(endpoint, headers=headers, json=payload, timeout=timeout)
         response.raise_for_status()
         
         result = response.json()
@@ -318,16 +504,15 @@ Respond with: {"decision": "your_decision", "confidence": 0.0-1.0, "reasoning":
     
     def _record_decision(self, agent_name: str, decision_type: str,
                         context: str, prompt: str, decision: str,
-                        confidence: float, execution_time_ms: float):
-        """Record decision in history database"""
-        conn = sqlite3.connect(self.history_db)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
+                        confidence: float, execution_time_ms: float,
+                        cache_hit: bool = False, llm_time_saved_ms: float = 0.0):
+        """Queue decision for the history database"""
+        self._queue_write("""
             INSERT INTO decisions
             (timestamp, agent_name, decision_type, context, prompt, decision,
-             confidence, provider, model, execution_time_ms)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+             confidence, provider, model, execution_time_ms, cache_hit,
+             llm_time_saved_ms)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             int(time.time()),
             agent_name,
@@ -338,33 +523,26 @@ Respond with: {"decision": "your_decision", "confidence": 0.0-1.0, "reasoning":
             confidence,
             self.provider,
             self.model,
-            execution_time_ms
+            execution_time_ms,
+            1 if cache_hit else 0,
+            llm_time_saved_ms
         ))
-        
-        conn.commit()
-        conn.close()
     
     def record_outcome(self, decision_id: int, outcome: str, feedback: str = None):
         """Record outcome of a decision for learning"""
-        conn = sqlite3.connect(self.history_db)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            UPDATE decisions
-            SET outcome = ?, feedback = ?
-            WHERE id = ?
-        """, (outcome, feedback, decision_id))
-        
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self.flush()
+            with self.conn:
+                self.conn.execute("""
+                    UPDATE decisions
+                    SET outcome = ?, feedback = ?
+                    WHERE id = ?
+                """, (outcome, feedback, decision_id))
     
     def get_decision_history(self, agent_name: str = None, 
                             decision_type: str = None,
                             hours: int = 24) -> List[Dict[str, Any]]:
         """Get decision history"""
-        conn = sqlite3.connect(self.history_db)
-        cursor = conn.cursor()
-        
         query = "SELECT * FROM decisions WHERE timestamp > ?"
         params = [int(time.time()) - (hours * 3600)]
         
@@ -378,20 +556,22 @@ Respond with: {"decision": "your_decision", "confidence": 0.0-1.0, "reasoning":
         
         query += " ORDER BY timestamp DESC"
         
-        cursor.execute(query, params)
+        with self._lock:
+            self.flush()
+            cursor = self.conn.execute(query, params)
+            columns = [desc[0] for desc in cursor.description]
+            rows = cursor.fetchall()
         
-        columns = [desc[0] for desc in cursor.description]
-        results = []
-        for row in cursor.fetchall():
-            results.append(dict(zip(columns, row)))
-        
-        conn.close()
-        return results
+        return [dict(zip(columns, row)) for row in rows]
     
     def get_decision_metrics(self, hours: int = 24) -> Dict[str, Any]:
         """Get metrics about AI decisions"""
-        conn = sqlite3.connect(self.history_db)
-        cursor = conn.cursor()
+        with self._lock:
+            self.flush()
+            return self._query_decision_metrics(hours)
+    
+    def _query_decision_metrics(self, hours: int) -> Dict[str, Any]:
+        cursor = self.conn.cursor()
         
         since_timestamp = int(time.time()) - (hours * 3600)
         
@@ -401,7 +581,9 @@ Respond with: {"decision": "your_decision", "confidence": 0.0-1.0, "reasoning":
                 COUNT(*) as total_decisions,
                 AVG(confidence) as avg_confidence,
                 AVG(execution_time_ms) as avg_execution_time,
-                COUNT(CASE WHEN outcome = 'success' THEN 1 END) as successful_outcomes
+                COUNT(CASE WHEN outcome = 'success' THEN 1 END) as successful_outcomes,
+                COUNT(CASE WHEN cache_hit = 1 THEN 1 END) as cache_hits,
+                SUM(llm_time_saved_ms) as llm_time_saved
             FROM decisions
             WHERE timestamp > ?
         """, (since_timestamp,))
@@ -433,7 +615,9 @@ Respond with: {"decision": "your_decision", "confidence": 0.0-1.0, "reasoning":
         by_agent = [{'agent': row[0], 'count': row[1]}
                     for row in cursor.fetchall()]
         
-        conn.close()
+        cursor.execute("SELECT COUNT(*) FROM decision_cache WHERE created_at > ?",
+                       (int(time.time() - self.cache_ttl),))
+        cache_entries = cursor.fetchone()[0]
         
         return {
             'period_hours': hours,
@@ -443,7 +627,14 @@ Respond with: {"decision": "your_decision", "confidence": 0.0-1.0, "reasoning":
             'successful_outcomes': overall[3] or 0,
             'success_rate': round((overall[3] or 0) / (overall[0] or 1) * 100, 2),
             'by_type': by_type,
-            'by_agent': by_agent
+            'by_agent': by_agent,
+            'cache': {
+                'entries': cache_entries,
+                'hits': overall[4] or 0,
+                'hit_rate': round((overall[4] or 0) / (overall[0] or 1) * 100, 2),
+                'llm_time_saved_ms': round(overall[5] or 0, 2),
+                'session': dict(self.cache_stats)
+            }
         }
 
 
@@ -462,10 +653,12 @@ def main():
     parser.add_argument('--history', action='store_true', help="Show decision history")
     parser.add_argument('--metrics', action='store_true', help="Show decision metrics")
     parser.add_argument('--hours', type=int, default=24, help="Hours for history/metrics")
+    parser.add_argument('--no-cache', action='store_true', help="Always query the AI provider")
     
     args = parser.parse_args()
     
-    engine = AIDecisionEngine(provider=args.provider, model=args.model)
+    engine = AIDecisionEngine(provider=args.provider, model=args.model,
+                              cache_ttl=0 if args.no_cache else None)
     
     if args.history:
         history = engine.get_decision_history(
@@ -482,6 +675,8 @@ def main():
         print(f"Avg Confidence: {metrics['avg_confidence']}")
         print(f"Avg Execution Time: {metrics['avg_execution_time_ms']:.2f}ms")
         print(f"Success Rate: {metrics['success_rate']}%")
+        print(f"Cache Hits: {metrics['cache']['hits']} ({metrics['cache']['hit_rate']}%)")
+        print(f"LLM Time Saved: {metrics['cache']['llm_time_saved_ms']:.2f}ms")
         print(f"\nBy Type: {json.dumps(metrics['by_type'], indent=2)}")
         print(f"\nTop Agents: {json.dumps(metrics['by_agent'], indent=2)}")
     
@@ -4,16 +4,28 @@ AI Decision Learning System
 Tracks decision outcomes and improves recommendations over time
 """
 
+import atexit
 import json
 import sqlite3
+import threading
 import time
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 import os
 
+PatternKey = Tuple[str, str, str]
+
+
 class AILearningSystem:
     """Learns from AI decision outcomes to improve future decisions"""
     
+    # Learned patterns are written back in batches
+    WRITE_BATCH_SIZE = 50
+    WRITE_FLUSH_INTERVAL = 5.0
+    
+    # How often lookups check whether another process changed the database
+    REFRESH_INTERVAL = 5.0
+    
     def __init__(self, decisions_db: str = None):
         """Initialize learning system"""
         if decisions_db is None:
@@ -21,11 +33,36 @@ class AILearningSystem:
             decisions_db = workspace / "monitoring" / "ai_decisions.db"
         
         self.decisions_db = str(decisions_db)
+        self._lock = threading.RLock()
+        
+        # (pattern_type, context_pattern, recommended_decision) -> counts
+        self._patterns: Dict[PatternKey, Dict[str, Any]] = {}
+        # (pattern_type, context_pattern) -> best pattern key
+        self._best: Dict[Tuple[str, str], PatternKey] = {}
+        self._by_context: Dict[Tuple[str, str], List[PatternKey]] = {}
+        # pattern_type -> [pattern count, confidence sum]
+        self._type_stats: Dict[str, List[float]] = {}
+        self._outcomes_tracked = 0
+        
+        # Unwritten changes: pattern deltas and decision outcome updates
+        self._pending_patterns: Dict[PatternKey, List[int]] = {}
+        self._pending_outcomes: List[Tuple[str, str, int]] = []
+        self._first_pending_at = 0.0
+        self._flush_timer: Optional[threading.Timer] = None
+        self._data_version = None
+        self._checked_at = 0.0
+        
+        self.conn = sqlite3.connect(self.decisions_db, timeout=10,
+                                    check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
         self._init_db()
+        self._load()
+        atexit.register(self.close)
     
     def _init_db(self):
         """Ensure learning tables exist"""
-        conn = sqlite3.connect(self.decisions_db)
+        conn = self.conn
         cursor = conn.cursor()
         
         # Patterns table for learned patterns
@@ -43,8 +80,140 @@ class AILearningSystem:
             )
         """)
         
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_learned_patterns_key
+            ON learned_patterns(pattern_type, context_pattern, recommended_decision)
+        """)
+        
         conn.commit()
-        conn.close()
+    
+    def _load(self):
+        """Load the learned-pattern table and outcome count into memory"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            self._data_version = cursor.execute("PRAGMA data_version").fetchone()[0]
+            self._checked_at = time.time()
+            
+            self._patterns.clear()
+            self._best.clear()
+            self._by_context.clear()
+            self._type_stats.clear()
+            
+            cursor.execute("""
+                SELECT pattern_type, context_pattern, recommended_decision,
+                       SUM(success_count), SUM(failure_count),
+                       MIN(created_at), MAX(updated_at)
+                FROM learned_patterns
+                GROUP BY pattern_type, context_pattern, recommended_decision
+            """)
+            for row in cursor.fetchall():
+                key = (row[0], row[1], row[2])
+                self._patterns[key] = {
+                    'successes': row[3] or 0,
+                    'failures': row[4] or 0,
+                    'created_at': row[5],
+                    'updated_at': row[6]
+                }
+                self._by_context.setdefault(key[:2], []).append(key)
+                stats = self._type_stats.setdefault(key[0], [0, 0.0])
+                stats[0] += 1
+                stats[1] += self._confidence(key)
+            
+            for context_key in self._by_context:
+                self._rank(context_key)
+            
+            try:
+                cursor.execute("SELECT COUNT(*) FROM decisions WHERE outcome IS NOT NULL")
+                self._outcomes_tracked = cursor.fetchone()[0]
+            except sqlite3.OperationalError:
+                self._outcomes_tracked = 0
+    
+    def _maybe_refresh(self):
+        """Reload when another connection changed the database"""
+        now = time.time()
+        if now - self._checked_at < self.REFRESH_INTERVAL:
+            return
+        with self._lock:
+            self._checked_at = now
+            version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._data_version:
+                self.flush()
+                self._load()
+    
+    def _confidence(self, key: PatternKey) -> float:
+        pattern = self._patterns[key]
+        total = pattern['successes'] + pattern['failures']
+        return pattern['successes'] / total if total > 0 else 0.5
+    
+    def _rank(self, context_key: Tuple[str, str]):
+        """Recompute the best decision for one (type, context) pair"""
+        candidates = self._by_context.get(context_key)
+        if not candidates:
+            self._best.pop(context_key, None)
+            return
+        self._best[context_key] = max(
+            candidates,
+            key=lambda k: (self._confidence(k), self._patterns[k]['successes'])
+        )
+    
+    def close(self):
+        """Write pending changes and close the database"""
+        with self._lock:
+            if self.conn is None:
+                return
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self.flush()
+            self.conn.close()
+            self.conn = None
+    
+    def flush(self):
+        """Write pending outcomes and pattern deltas in one transaction"""
+        with self._lock:
+            if (not self._pending_patterns and not self._pending_outcomes) or self.conn is None:
+                return
+            
+            with self.conn:
+                cursor = self.conn.cursor()
+                cursor.executemany("""
+                    UPDATE decisions
+                    SET outcome = ?, feedback = ?
+                    WHERE id = ?
+                """, self._pending_outcomes)
+                
+                # Deltas keep counts from concurrent processes additive
+                for key, (successes, failures, timestamp) in self._pending_patterns.items():
+                    cursor.execute("""
+                        SELECT id FROM learned_patterns
+                        WHERE pattern_type = ? AND context_pattern = ? AND recommended_decision = ?
+                        LIMIT 1
+                    """, key)
+                    row = cursor.fetchone()
+                    if row:
+                        cursor.execute("""
+                            UPDATE learned_patterns
+                            SET success_count = success_count + ?,
+                                failure_count = failure_count + ?,
+                                confidence_score = CAST(success_count + ? AS REAL) /
+                                    (success_count + failure_count + ? + ?),
+                                updated_at = ?
+                            WHERE id = ?
+                        """, (successes, failures, successes, successes, failures,
+                              timestamp, row[0]))
+                    else:
+                        cursor.execute("""
+                            INSERT INTO learned_patterns
+                            (pattern_type, context_pattern, recommended_decision,
+                             success_count, failure_count, confidence_score, created_at, updated_at)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        """, key + (successes, failures, successes / (successes + failures),
+                                    timestamp, timestamp))
+            
+            self._pending_patterns.clear()
+            self._pending_outcomes.clear()
+            # Our own commit changes data_version for other connections only
+            self._data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
     
     def record_outcome(self, decision_id: int, outcome: str, 
                       success: bool, feedback: str = None):
@@ -57,86 +226,79 @@ class AILearningSystem:
             success: Whether the decision was successful
             feedback: Optional feedback
         """
-        conn = sqlite3.connect(self.decisions_db)
-        cursor = conn.cursor()
-        
-        # Update the decision record
-        cursor.execute("""
-            UPDATE decisions
-            SET outcome = ?, feedback = ?
-            WHERE id = ?
-        """, (outcome, feedback, decision_id))
-        
-        # Learn from this outcome
-        cursor.execute("""
-            SELECT decision_type, context, decision, confidence
-            FROM decisions
-            WHERE id = ?
-        """, (decision_id,))
-        
-        row = cursor.fetchone()
-        if row:
-            decision_type, context, decision, confidence = row
+        with self._lock:
+            # Learn from this outcome
+            row = self.conn.execute("""
+                SELECT decision_type, context, decision, confidence, outcome
+                FROM decisions
+                WHERE id = ?
+            """, (decision_id,)).fetchone()
             
-            # Update or create pattern
-            self._update_pattern(
-                cursor,
-                decision_type=decision_type,
-                context=context,
-                decision=decision,
-                success=success
-            )
-        
-        conn.commit()
-        conn.close()
+            # Update the decision record
+            if not self._pending_outcomes and not self._pending_patterns:
+                self._first_pending_at = time.time()
+            self._pending_outcomes.append((outcome, feedback, decision_id))
+            
+            if row:
+                decision_type, context, decision, confidence, previous_outcome = row
+                if previous_outcome is None and not any(
+                        pending[2] == decision_id for pending in self._pending_outcomes[:-1]):
+                    self._outcomes_tracked += 1
+                
+                # Update or create pattern
+                self._update_pattern(
+                    decision_type=decision_type,
+                    context=context,
+                    decision=decision,
+                    success=success
+                )
+            
+            if (len(self._pending_outcomes) >= self.WRITE_BATCH_SIZE or
+                    time.time() - self._first_pending_at >= self.WRITE_FLUSH_INTERVAL):
+                self.flush()
+            elif self._flush_timer is None:
+                # An idle process still writes its last outcomes within the interval
+                self._flush_timer = threading.Timer(self.WRITE_FLUSH_INTERVAL,
+                                                    self._timed_flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
     
-    def _update_pattern(self, cursor, decision_type: str, context: str,
+    def _timed_flush(self):
+        with self._lock:
+            self._flush_timer = None
+            self.flush()
+    
+    def _update_pattern(self, decision_type: str, context: str,
                        decision: str, success: bool):
         """Update learned pattern based on outcome"""
         
         # Simplified pattern matching (in production, use ML)
         context_key = self._extract_pattern(context)
-        
-        # Check if pattern exists
-        cursor.execute("""
-            SELECT id, success_count, failure_count
-            FROM learned_patterns
-            WHERE pattern_type = ? AND context_pattern = ? AND recommended_decision = ?
-        """, (decision_type, context_key, decision))
-        
-        row = cursor.fetchone()
+        key = (decision_type, context_key, decision)
         timestamp = int(time.time())
         
-        if row:
-            # Update existing pattern
-            pattern_id, successes, failures = row
-            
-            if success:
-                successes += 1
-            else:
-                failures += 1
-            
-            confidence = successes / (successes + failures) if (successes + failures) > 0 else 0.5
-            
-            cursor.execute("""
-                UPDATE learned_patterns
-                SET success_count = ?, failure_count = ?, 
-                    confidence_score = ?, updated_at = ?
-                WHERE id = ?
-            """, (successes, failures, confidence, timestamp, pattern_id))
+        pattern = self._patterns.get(key)
+        stats = self._type_stats.setdefault(decision_type, [0, 0.0])
+        if pattern:
+            stats[1] -= self._confidence(key)
         else:
             # Create new pattern
-            successes = 1 if success else 0
-            failures = 0 if success else 1
-            confidence = successes / (successes + failures)
-            
-            cursor.execute("""
-                INSERT INTO learned_patterns
-                (pattern_type, context_pattern, recommended_decision,
-                 success_count, failure_count, confidence_score, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (decision_type, context_key, decision, successes, failures,
-                  confidence, timestamp, timestamp))
+            pattern = {'successes': 0, 'failures': 0, 'created_at': timestamp}
+            self._patterns[key] = pattern
+            self._by_context.setdefault(key[:2], []).append(key)
+            stats[0] += 1
+        
+        if success:
+            pattern['successes'] += 1
+        else:
+            pattern['failures'] += 1
+        pattern['updated_at'] = timestamp
+        stats[1] += self._confidence(key)
+        self._rank(key[:2])
+        
+        delta = self._pending_patterns.setdefault(key, [0, 0, timestamp])
+        delta[0 if success else 1] += 1
+        delta[2] = timestamp
     
     def _extract_pattern(self, context: str) -> str:
         """Extract simple pattern from context (placeholder for ML)"""
@@ -149,78 +311,57 @@ class AILearningSystem:
         except:
             return "unknown"
     
-    def get_recommendation(self, decision_type: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    def _context_pattern(self, context: Dict[str, Any]) -> str:
+        """_extract_pattern for an already-decoded context"""
+        if isinstance(context, dict):
+            if 'error_type' in context:
+                return f"error:{context['error_type']}"
+            return "general"
+        return self._extract_pattern(json.dumps(context))
+    
+    def get_recommendation(self, decision_type: str, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Get learned recommendation for a decision
         
         Returns recommendation with confidence based on past outcomes
         """
-        context_pattern = self._extract_pattern(json.dumps(context))
-        
-        conn = sqlite3.connect(self.decisions_db)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT recommended_decision, confidence_score, success_count, failure_count
-            FROM learned_patterns
-            WHERE pattern_type = ? AND context_pattern = ?
-            ORDER BY confidence_score DESC, success_count DESC
-            LIMIT 1
-        """, (decision_type, context_pattern))
-        
-        row = cursor.fetchone()
-        conn.close()
+        self._maybe_refresh()
+        context_pattern = self._context_pattern(context)
         
-        if row:
-            decision, confidence, successes, failures = row
-            return {
-                'recommendation': decision,
-                'confidence': confidence,
-                'based_on_outcomes': successes + failures,
-                'success_rate': successes / (successes + failures) if (successes + failures) > 0 else 0
-            }
+        with self._lock:
+            key = self._best.get((decision_type, context_pattern))
+            if key is None:
+                return None
+            pattern = self._patterns[key]
+            successes, failures = pattern['successes'], pattern['failures']
+            confidence = self._confidence(key)
         
-        return None
+        return {
+            'recommendation': key[2],
+            'confidence': confidence,
+            'based_on_outcomes': successes + failures,
+            'success_rate': successes / (successes + failures) if (successes + failures) > 0 else 0
+        }
     
     def get_learning_stats(self) -> Dict[str, Any]:
         """Get statistics about learned patterns"""
-        conn = sqlite3.connect(self.decisions_db)
-        cursor = conn.cursor()
+        self._maybe_refresh()
         
-        # Total patterns learned
-        cursor.execute("SELECT COUNT(*) FROM learned_patterns")
-        total_patterns = cursor.fetchone()[0]
-        
-        # Patterns by type
-        cursor.execute("""
-            SELECT pattern_type, COUNT(*) as count, AVG(confidence_score) as avg_confidence
-            FROM learned_patterns
-            GROUP BY pattern_type
-        """)
-        
-        by_type = [
-            {
-                'type': row[0],
-                'patterns': row[1],
-                'avg_confidence': round(row[2], 2) if row[2] else 0
+        with self._lock:
+            by_type = [
+                {
+                    'type': pattern_type,
+                    'patterns': int(count),
+                    'avg_confidence': round(confidence_sum / count, 2) if count else 0
+                }
+                for pattern_type, (count, confidence_sum) in sorted(self._type_stats.items())
+            ]
+            
+            return {
+                'total_patterns': len(self._patterns),
+                'by_type': by_type,
+                'outcomes_tracked': self._outcomes_tracked
             }
-            for row in cursor.fetchall()
-        ]
-        
-        # Total outcomes tracked
-        cursor.execute("""
-            SELECT COUNT(*) FROM decisions WHERE outcome IS NOT NULL
-        """)
-        outcomes_tracked = cursor.fetchone()[0]
-        
-        conn.close()
-        
-        return {
-            'total_patterns': total_patterns,
-            'by_type': by_type,
-            'outcomes_tracked': outcomes_tracked
-        }
-
 
 def main():
     """CLI for learning system"""
@@ -12,7 +12,164 @@ import requests
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-import glob
+import bisect
+import random
+
+
+# Default number of buckets in downsampled series (30 minute buckets per day)
+DEFAULT_SERIES_POINTS = 48
+
+# Samples kept for quantile estimation; exact below this size
+QUANTILE_RESERVOIR_SIZE = 2048
+
+
+class StreamingStats:
+    """Single-pass count/mean/min/max with reservoir-sampled quantiles"""
+
+    def __init__(self, reservoir_size=QUANTILE_RESERVOIR_SIZE, seed=0):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.reservoir_size = reservoir_size
+        self._reservoir = []
+        self._rng = random.Random(seed)
+
+    def add(self, value):
+        """Fold one sample into the aggregate"""
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            value = 0.0
+
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+        # Algorithm R: every sample has equal probability of being retained
+        if len(self._reservoir) < self.reservoir_size:
+            self._reservoir.append(value)
+        else:
+            slot = self._rng.randrange(self.count)
+            if slot < self.reservoir_size:
+                self._reservoir[slot] = value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def quantile(self, q):
+        """Quantile estimate (exact while count <= reservoir size)"""
+        if not self._reservoir:
+            return 0
+        ordered = sorted(self._reservoir)
+        index = min(len(ordered) - 1, int(len(ordered) * q))
+        return ordered[index]
+
+
+class DownsampledSeries:
+    """Fixed-size bucketed series of per-field means over a time range"""
+
+    def __init__(self, start_time, end_time, points, fields):
+        self.start_time = start_time
+        self.points = max(1, points)
+        self.bucket_seconds = max(1, (end_time - start_time) / self.points)
+        self.fields = fields
+        self._sums = {field: [0.0] * self.points for field in fields}
+        self._counts = [0] * self.points
+
+    def add(self, timestamp, data):
+        bucket = int((timestamp - self.start_time) / self.bucket_seconds)
+        bucket = min(max(bucket, 0), self.points - 1)
+        self._counts[bucket] += 1
+        for field in self.fields:
+            try:
+                self._sums[field][bucket] += float(data.get(field, 0))
+            except (TypeError, ValueError):
+                continue
+
+    def to_dict(self):
+        """Serialize non-empty buckets only"""
+        series = []
+        for bucket, count in enumerate(self._counts):
+            if not count:
+                continue
+            point = {
+                "timestamp": int(self.start_time + bucket * self.bucket_seconds),
+                "count": count,
+            }
+            for field in self.fields:
+                point[field] = self._sums[field][bucket] / count
+            series.append(point)
+        return series
+
+
+class TimeIndexedReader:
+    """Sorted index of ``<prefix>_<epoch>.json`` files in a directory
+
+    The index is rebuilt only when the directory mtime changes, and range
+    lookups bisect on the filename timestamp instead of opening every file.
+    Files without a timestamp in their name are returned for every range so
+    callers can still filter them on their payload.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._mtime = None
+        self._entries = {}
+        self._untimed = []
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            self._mtime = None
+            self._entries = {}
+            self._untimed = []
+            return
+
+        if mtime == self._mtime:
+            return
+
+        entries = {}
+        untimed = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".json") or not entry.is_file():
+                    continue
+                stem = entry.name[: -len(".json")]
+                prefix, _, suffix = stem.rpartition("_")
+                try:
+                    timestamp = int(suffix)
+                except ValueError:
+                    untimed.append(entry.path)
+                    continue
+                entries.setdefault(prefix + "_", []).append((timestamp, entry.path))
+
+        for items in entries.values():
+            items.sort()
+        self._entries = entries
+        self._untimed = sorted(untimed)
+        self._mtime = mtime
+
+    def iter_range(self, start_time, end_time, prefix=None, with_timestamp=False):
+        """Yield files whose filename timestamp is in [start_time, end_time)"""
+        self._refresh()
+
+        prefixes = [prefix] if prefix is not None else sorted(self._entries)
+        for name in prefixes:
+            items = self._entries.get(name, [])
+            lo = bisect.bisect_left(items, (start_time, ""))
+            hi = bisect.bisect_left(items, (end_time, ""))
+            for timestamp, path in items[lo:hi]:
+                yield (timestamp, path) if with_timestamp else path
+
+        if prefix is None:
+            for path in self._untimed:
+                yield (None, path) if with_timestamp else path
 
 
 class HealthCheckReporter:
@@ -30,6 +187,10 @@ class HealthCheckReporter:
         # Ensure directories exist
         os.makedirs(self.reports_dir, exist_ok=True)
 
+        # Filename-timestamp indexes so a report only opens files in its period
+        self.metric_index = TimeIndexedReader(self.metrics_dir)
+        self.alert_index = TimeIndexedReader(self.alerts_dir)
+
     def load_config(self):
         """Load monitoring configuration"""
         config_path = os.path.join(self.monitoring_dir, "config.json")
@@ -89,119 +250,134 @@ class HealthCheckReporter:
 
         return report_data
 
-    def collect_system_metrics(self, start_time, end_time):
+    def collect_system_metrics(self, start_time, end_time, include_series=None):
         """Collect system metrics for the reporting period"""
-        metrics_files = glob.glob(
-            os.path.join(self.metrics_dir, "system_metrics_*.json")
+        fields = ("cpu_usage_percent", "memory_usage_percent", "disk_usage_percent")
+        stats, series = self._aggregate_metrics(
+            "system_metrics_", fields, start_time, end_time, include_series
         )
-        system_data = []
 
-        for file_path in metrics_files:
-            try:
-                timestamp = int(os.path.basename(file_path).split("_")[2].split(".")[0])
-                if start_time <= timestamp < end_time:
-                    with open(file_path, "r") as f:
-                        data = json.load(f)
-                        system_data.append(data)
-            except (ValueError, IndexError, json.JSONDecodeError):
-                continue
-
-        if not system_data:
+        count = stats["cpu_usage_percent"].count
+        if count == 0:
             return {"summary": "No system metrics available", "count": 0}
 
-        # Calculate summary statistics
-        cpu_values = [d.get("cpu_usage_percent", 0) for d in system_data]
-        memory_values = [d.get("memory_usage_percent", 0) for d in system_data]
-        disk_values = [d.get("disk_usage_percent", 0) for d in system_data]
+        cpu = stats["cpu_usage_percent"]
+        memory = stats["memory_usage_percent"]
+        disk = stats["disk_usage_percent"]
 
         summary = {
-            "count": len(system_data),
-            "cpu_avg": sum(cpu_values) / len(cpu_values) if cpu_values else 0,
-            "cpu_peak": max(cpu_values) if cpu_values else 0,
-            "memory_avg": (
-                sum(memory_values) / len(memory_values) if memory_values else 0
-            ),
-            "memory_peak": max(memory_values) if memory_values else 0,
-            "disk_avg": sum(disk_values) / len(disk_values) if disk_values else 0,
-            "disk_peak": max(disk_values) if disk_values else 0,
-            "samples": system_data,
+            "count": count,
+            "cpu_avg": cpu.mean,
+            "cpu_peak": cpu.max,
+            "memory_avg": memory.mean,
+            "memory_peak": memory.max,
+            "disk_avg": disk.mean,
+            "disk_peak": disk.max,
         }
+        if series is not None:
+            summary["series"] = series
 
         return summary
 
-    def collect_performance_metrics(self, start_time, end_time):
+    def collect_performance_metrics(self, start_time, end_time, include_series=None):
         """Collect performance metrics for the reporting period"""
-        metrics_files = glob.glob(
-            os.path.join(self.metrics_dir, "performance_metrics_*.json")
+        fields = ("response_time_ms", "throughput_rps", "error_rate_percent")
+        stats, series = self._aggregate_metrics(
+            "performance_metrics_", fields, start_time, end_time, include_series
         )
-        perf_data = []
-
-        for file_path in metrics_files:
-            try:
-                timestamp = int(os.path.basename(file_path).split("_")[2].split(".")[0])
-                if start_time <= timestamp < end_time:
-                    with open(file_path, "r") as f:
-                        data = json.load(f)
-                        perf_data.append(data)
-            except (ValueError, IndexError, json.JSONDecodeError):
-                continue
 
-        if not perf_data:
+        count = stats["response_time_ms"].count
+        if count == 0:
             return {"summary": "No performance metrics available", "count": 0}
 
-        # Calculate summary statistics
-        response_times = [d.get("response_time_ms", 0) for d in perf_data]
-        throughputs = [d.get("throughput_rps", 0) for d in perf_data]
-        error_rates = [d.get("error_rate_percent", 0) for d in perf_data]
+        response_times = stats["response_time_ms"]
+        throughputs = stats["throughput_rps"]
+        error_rates = stats["error_rate_percent"]
 
         summary = {
-            "count": len(perf_data),
-            "response_time_avg": (
-                sum(response_times) / len(response_times) if response_times else 0
-            ),
-            "response_time_p95": (
-                sorted(response_times)[int(len(response_times) * 0.95)]
-                if response_times
-                else 0
-            ),
-            "throughput_avg": sum(throughputs) / len(throughputs) if throughputs else 0,
-            "throughput_peak": max(throughputs) if throughputs else 0,
-            "error_rate_avg": sum(error_rates) / len(error_rates) if error_rates else 0,
-            "error_rate_peak": max(error_rates) if error_rates else 0,
-            "samples": perf_data,
+            "count": count,
+            "response_time_avg": response_times.mean,
+            "response_time_p95": response_times.quantile(0.95),
+            "throughput_avg": throughputs.mean,
+            "throughput_peak": throughputs.max,
+            "error_rate_avg": error_rates.mean,
+            "error_rate_peak": error_rates.max,
         }
+        if series is not None:
+            summary["series"] = series
 
         return summary
 
     def collect_alerts(self, start_time, end_time):
         """Collect alerts for the reporting period"""
-        alert_files = glob.glob(os.path.join(self.alerts_dir, "*.json"))
         alerts = []
+        counts = {"critical": 0, "warning": 0, "info": 0}
 
-        for file_path in alert_files:
+        for file_path in self.alert_index.iter_range(start_time, end_time):
             try:
                 with open(file_path, "r") as f:
                     alert_data = json.load(f)
-
-                alert_timestamp = alert_data.get("timestamp", 0)
-                if start_time <= alert_timestamp < end_time:
-                    alerts.append(alert_data)
             except (json.JSONDecodeError, IOError):
                 continue
+            if not isinstance(alert_data, dict):
+                continue
+
+            # The filename timestamp only narrows the scan; the payload is authoritative
+            alert_timestamp = alert_data.get("timestamp", 0)
+            if not start_time <= alert_timestamp < end_time:
+                continue
 
-        # Categorize alerts
-        critical_alerts = [a for a in alerts if a.get("severity") == "critical"]
-        warning_alerts = [a for a in alerts if a.get("severity") == "warning"]
-        info_alerts = [a for a in alerts if a.get("severity") == "info"]
+            alerts.append(alert_data)
+            severity = alert_data.get("severity")
+            if severity in counts:
+                counts[severity] += 1
 
         return {
             "total": len(alerts),
-            "critical": len(critical_alerts),
-            "warning": len(warning_alerts),
-            "info": len(info_alerts),
+            "critical": counts["critical"],
+            "warning": counts["warning"],
+            "info": counts["info"],
             "alerts": alerts,
         }
 
+    def _aggregate_metrics(self, prefix, fields, start_time, end_time, include_series):
+        """Fold metric files for the period into streaming stats in a single pass"""
+        if include_series is None:
+            include_series = self._series_enabled()
+
+        stats = {field: StreamingStats() for field in fields}
+        series = (
+            DownsampledSeries(start_time, end_time, self._series_points(), fields)
+            if include_series
+            else None
+        )
+
+        for timestamp, file_path in self.metric_index.iter_range(
+            start_time, end_time, prefix=prefix, with_timestamp=True
+        ):
+            try:
+                with open(file_path, "r") as f:
+                    data = json.load(f)
+            except (IOError, json.JSONDecodeError):
+                continue
+
+            for field in fields:
+                stats[field].add(data.get(field, 0))
+            if series is not None:
+                series.add(timestamp, data)
+
+        return stats, (series.to_dict() if series is not None else None)
+
+    def _series_enabled(self):
+        """Whether reports should embed downsampled series (config: include_charts)"""
+        daily = self.config.get("reporting", {}).get("daily_reports", {})
+        return bool(daily.get("include_charts", False))
+
+    def _series_points(self):
+        """Number of buckets used for downsampled series"""
+        daily = self.config.get("reporting", {}).get("daily_reports", {})
+        return int(daily.get("series_points", DEFAULT_SERIES_POINTS))
+
     def check_service_status(self):
         """Check status of critical services"""
         services = []
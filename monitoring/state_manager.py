@@ -9,10 +9,39 @@ import os
 import sys
 import time
 import threading
+import uuid
 from typing import Dict, List, Optional, Any, Set
 from datetime import datetime, timedelta
 import subprocess
 
+# Delete the lock only if we still own it, then wake one waiter
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    redis.call('del', KEYS[1])
+    redis.call('del', KEYS[2])
+    redis.call('rpush', KEYS[2], '1')
+    redis.call('pexpire', KEYS[2], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# Claim a task unless another agent holds it
+CLAIM_TASK_SCRIPT = """
+local current = redis.call('get', KEYS[1])
+if current then
+    local ok, task = pcall(cjson.decode, current)
+    if ok and type(task) == 'table' and task['agent'] ~= ARGV[1] then
+        return 0
+    end
+end
+redis.call('set', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# How long a release notification waits for a blocked acquirer (ms)
+LOCK_NOTIFY_TTL_MS = 1000
+
 class DistributedStateManager:
     """Manages distributed state across agents with Redis backend"""
     
@@ -24,6 +53,10 @@ class DistributedStateManager:
         self.fallback_store = {}
         self.locks = {}
         self.lock_mutex = threading.Lock()
+        # Waiters for in-memory locks block here instead of polling
+        self.lock_released = threading.Condition(self.lock_mutex)
+        # (lock_name, thread id) -> token of a lock held through this manager
+        self.lock_tokens = {}
         
         if use_redis:
             try:
@@ -36,6 +69,8 @@ class DistributedStateManager:
                     socket_connect_timeout=2
                 )
                 self.redis_client.ping()
+                self._release_script = self.redis_client.register_script(RELEASE_LOCK_SCRIPT)
+                self._claim_script = self.redis_client.register_script(CLAIM_TASK_SCRIPT)
                 print(f"✅ Connected to Redis at {redis_host}:{redis_port}")
             except Exception as e:
                 print(f"⚠️  Redis unavailable ({e}), using in-memory fallback")
@@ -113,13 +148,13 @@ class DistributedStateManager:
             True if lock acquired, False otherwise
         """
         lock_key = f"lock:{lock_name}"
-        lock_value = f"{os.getpid()}:{time.time()}"
-        start_time = time.time()
+        lock_value = f"{os.getpid()}:{uuid.uuid4().hex}"
+        deadline = time.time() + wait_timeout
         
-        while True:
-            try:
-                if self.redis_client:
-                    # Try to acquire lock with Redis
+        try:
+            if self.redis_client:
+                notify_key = f"lock:notify:{lock_name}"
+                while True:
                     acquired = self.redis_client.set(
                         lock_key, 
                         lock_value,
@@ -127,40 +162,69 @@ class DistributedStateManager:
                         ex=timeout  # Expire after timeout
                     )
                     if acquired:
+                        with self.lock_mutex:
+                            self.lock_tokens[(lock_name, threading.get_ident())] = lock_value
                         return True
-                else:
-                    # Fallback to in-memory lock
-                    with self.lock_mutex:
+                    
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return False
+                    
+                    # Block until the holder releases, or until the lock
+                    # can have expired if the holder died
+                    ttl_ms = self.redis_client.pttl(lock_key)
+                    wait = remaining if ttl_ms < 0 else min(remaining, ttl_ms / 1000.0)
+                    self.redis_client.blpop(notify_key, timeout=max(wait, 0.01))
+            else:
+                # Fallback to in-memory lock
+                with self.lock_released:
+                    while True:
+                        now = time.time()
                         entry = self.locks.get(lock_name)
-                        if not entry or entry['expires_at'] < time.time():
+                        if not entry or entry['expires_at'] < now:
                             self.locks[lock_name] = {
                                 'value': lock_value,
-                                'expires_at': time.time() + timeout
+                                'expires_at': now + timeout
                             }
+                            self.lock_tokens[(lock_name, threading.get_ident())] = lock_value
                             return True
-                
-                # Check if we've waited too long
-                if time.time() - start_time > wait_timeout:
-                    return False
-                
-                # Wait a bit before retrying
-                time.sleep(0.1)
-            except Exception as e:
-                print(f"❌ Error acquiring lock {lock_name}: {e}", file=sys.stderr)
-                return False
+                        
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            return False
+                        self.lock_released.wait(min(remaining, entry['expires_at'] - now))
+        except Exception as e:
+            print(f"❌ Error acquiring lock {lock_name}: {e}", file=sys.stderr)
+            return False
     
     def release_lock(self, lock_name: str) -> bool:
-        """Release a distributed lock"""
+        """
+        Release a distributed lock held by this manager
+        
+        Returns False if the lock is not ours (never acquired, or expired
+        and taken over by another agent).
+        """
         lock_key = f"lock:{lock_name}"
         
         try:
+            with self.lock_mutex:
+                token = self.lock_tokens.pop((lock_name, threading.get_ident()), None)
+            if token is None:
+                return False
+            
             if self.redis_client:
-                self.redis_client.delete(lock_key)
-                return True
+                released = self._release_script(
+                    keys=[lock_key, f"lock:notify:{lock_name}"],
+                    args=[token, LOCK_NOTIFY_TTL_MS]
+                )
+                return bool(released)
             else:
-                with self.lock_mutex:
-                    if lock_name in self.locks:
-                        del self.locks[lock_name]
+                with self.lock_released:
+                    entry = self.locks.get(lock_name)
+                    if not entry or entry['value'] != token:
+                        return False
+                    del self.locks[lock_name]
+                    self.lock_released.notify_all()
                 return True
         except Exception as e:
             print(f"❌ Error releasing lock {lock_name}: {e}", file=sys.stderr)
@@ -228,6 +292,53 @@ class DistributedStateManager:
             print(f"❌ Error incrementing counter {counter_name}: {e}", file=sys.stderr)
             return 0
     
+    def set_states(self, values: Dict[str, Any], ttl: int = None) -> bool:
+        """Set several state values in one round trip"""
+        try:
+            if self.redis_client:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key, value in values.items():
+                    if ttl:
+                        pipe.setex(key, ttl, json.dumps(value))
+                    else:
+                        pipe.set(key, json.dumps(value))
+                pipe.execute()
+                return True
+            else:
+                return all(self.set_state(key, value, ttl) for key, value in values.items())
+        except Exception as e:
+            print(f"❌ Error setting states: {e}", file=sys.stderr)
+            return False
+    
+    def get_states(self, keys: List[str], default: Any = None) -> Dict[str, Any]:
+        """Get several state values in one round trip"""
+        try:
+            if self.redis_client:
+                keys = list(keys)
+                values = self.redis_client.mget(keys) if keys else []
+                return {key: json.loads(value) if value else default
+                        for key, value in zip(keys, values)}
+            else:
+                return {key: self.get_state(key, default) for key in keys}
+        except Exception as e:
+            print(f"❌ Error getting states: {e}", file=sys.stderr)
+            return {key: default for key in keys}
+    
+    def increment_counters(self, amounts: Dict[str, int]) -> Dict[str, int]:
+        """Increment several counters in one round trip"""
+        try:
+            if self.redis_client:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for counter_name, amount in amounts.items():
+                    pipe.incrby(counter_name, amount)
+                return dict(zip(amounts, pipe.execute()))
+            else:
+                return {counter_name: self.increment_counter(counter_name, amount)
+                        for counter_name, amount in amounts.items()}
+        except Exception as e:
+            print(f"❌ Error incrementing counters: {e}", file=sys.stderr)
+            return {counter_name: 0 for counter_name in amounts}
+    
     def publish_event(self, channel: str, message: Dict[str, Any]) -> bool:
         """Publish an event to a channel"""
         try:
@@ -262,8 +373,14 @@ class DistributedStateManager:
             }
             
             # Set with 5-minute TTL (agent should refresh periodically)
-            self.set_state(agent_key, agent_data, ttl=300)
-            self.add_to_set('agents:active', agent_name)
+            if self.redis_client:
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.setex(agent_key, 300, json.dumps(agent_data))
+                pipe.sadd('agents:active', agent_name)
+                pipe.execute()
+            else:
+                self.set_state(agent_key, agent_data, ttl=300)
+                self.add_to_set('agents:active', agent_name)
             
             return True
         except Exception as e:
@@ -274,8 +391,14 @@ class DistributedStateManager:
         """Unregister an agent"""
         try:
             agent_key = f"agent:active:{agent_name}"
-            self.delete_state(agent_key)
-            self.remove_from_set('agents:active', agent_name)
+            if self.redis_client:
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.delete(agent_key)
+                pipe.srem('agents:active', agent_name)
+                pipe.execute()
+            else:
+                self.delete_state(agent_key)
+                self.remove_from_set('agents:active', agent_name)
             return True
         except Exception as e:
             print(f"❌ Error unregistering agent {agent_name}: {e}", file=sys.stderr)
@@ -285,14 +408,9 @@ class DistributedStateManager:
         """Get list of all active agents"""
         try:
             agent_names = self.get_set_members('agents:active')
-            agents = []
-            
-            for name in agent_names:
-                agent_data = self.get_state(f"agent:active:{name}")
-                if agent_data:
-                    agents.append(agent_data)
+            agent_data = self.get_states([f"agent:active:{name}" for name in agent_names])
             
-            return agents
+            return [data for data in agent_data.values() if data]
         except Exception as e:
             print(f"❌ Error getting active agents: {e}", file=sys.stderr)
             return []
@@ -310,12 +428,24 @@ class DistributedStateManager:
         Returns:
             True if task claimed, False if already claimed
         """
-        lock_name = f"task_claim:{task_id}"
+        task_key = f"task:active:{task_id}"
+        task_info = {
+            'task_id': task_id,
+            'agent': agent_name,
+            'claimed_at': time.time(),
+            'data': task_data
+        }
         
-        if self.acquire_lock(lock_name, timeout=5, wait_timeout=1):
-            try:
+        try:
+            if self.redis_client:
+                # Check and claim in one atomic round trip
+                return bool(self._claim_script(
+                    keys=[task_key],
+                    args=[agent_name, json.dumps(task_info), 3600]  # 1 hour TTL
+                ))
+            
+            with self.lock_mutex:
                 # Check if task already claimed
-                task_key = f"task:active:{task_id}"
                 existing = self.get_state(task_key)
                 
                 if existing and existing.get('agent') != agent_name:
@@ -323,19 +453,11 @@ class DistributedStateManager:
                     return False
                 
                 # Claim the task
-                task_info = {
-                    'task_id': task_id,
-                    'agent': agent_name,
-                    'claimed_at': time.time(),
-                    'data': task_data
-                }
-                
                 self.set_state(task_key, task_info, ttl=3600)  # 1 hour TTL
                 return True
-            finally:
-                self.release_lock(lock_name)
-        
-        return False
+        except Exception as e:
+            print(f"❌ Error claiming task {task_id}: {e}", file=sys.stderr)
+            return False
     
     def complete_task(self, task_id: str, result: Dict[str, Any]) -> bool:
         """Mark a task as complete"""
@@ -349,8 +471,14 @@ class DistributedStateManager:
                 
                 # Move to completed
                 completed_key = f"task:completed:{task_id}"
-                self.set_state(completed_key, task_info, ttl=86400)  # Keep for 1 day
-                self.delete_state(task_key)
+                if self.redis_client:
+                    pipe = self.redis_client.pipeline()
+                    pipe.setex(completed_key, 86400, json.dumps(task_info))  # Keep for 1 day
+                    pipe.delete(task_key)
+                    pipe.execute()
+                else:
+                    self.set_state(completed_key, task_info, ttl=86400)  # Keep for 1 day
+                    self.delete_state(task_key)
                 
                 return True
             return False
@@ -369,6 +497,102 @@ class DistributedStateManager:
         }
 
 
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_benchmark(manager: DistributedStateManager, workers: int = 8,
+                  iterations: int = 200, hold_ms: float = 1.0) -> Dict[str, Any]:
+    """
+    Benchmark contended locks, task claims and pipelined counters
+    
+    Runs against whatever backend the manager uses (local Redis or the
+    in-memory stand-in) with keys under a unique prefix.
+    """
+    prefix = f"bench:{uuid.uuid4().hex[:8]}"
+    results = {'backend': 'redis' if manager.redis_client else 'in-memory',
+               'workers': workers, 'iterations': iterations}
+    
+    def run_threads(target):
+        threads = [threading.Thread(target=target, args=(i,)) for i in range(workers)]
+        start = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.time() - start
+    
+    # Contended lock: every worker takes the same lock in turn
+    waits = []
+    failures = []
+    per_worker = max(1, iterations // workers)
+    
+    def lock_worker(index):
+        for _ in range(per_worker):
+            started = time.time()
+            if not manager.acquire_lock(f"{prefix}:lock", timeout=10, wait_timeout=30):
+                failures.append(index)
+                continue
+            waits.append((time.time() - started) * 1000)
+            time.sleep(hold_ms / 1000.0)
+            manager.release_lock(f"{prefix}:lock")
+    
+    elapsed = run_threads(lock_worker)
+    results['lock'] = {
+        'acquisitions': len(waits),
+        'failures': len(failures),
+        'ops_per_sec': round(len(waits) / elapsed, 1) if elapsed else 0,
+        'wait_ms_p50': round(_percentile(waits, 50), 2),
+        'wait_ms_p95': round(_percentile(waits, 95), 2),
+        'wait_ms_max': round(max(waits), 2) if waits else 0
+    }
+    
+    # Task claims: every worker races for every task, one must win each
+    winners = {}
+    winners_mutex = threading.Lock()
+    task_ids = [f"{prefix}:task{i}" for i in range(iterations)]
+    
+    def claim_worker(index):
+        for task_id in task_ids[index:] + task_ids[:index]:
+            if manager.coordinate_task(task_id, f"bench-agent-{index}", {}):
+                with winners_mutex:
+                    winners.setdefault(task_id, []).append(index)
+    
+    elapsed = run_threads(claim_worker)
+    attempts = workers * len(task_ids)
+    results['claim'] = {
+        'attempts': attempts,
+        'ops_per_sec': round(attempts / elapsed, 1) if elapsed else 0,
+        'tasks_claimed': len(winners),
+        'double_claims': sum(1 for agents in winners.values() if len(agents) > 1)
+    }
+    
+    # Counters: one round trip per increment vs one pipeline
+    counters = [f"{prefix}:counter{i}" for i in range(iterations)]
+    started = time.time()
+    for counter_name in counters:
+        manager.increment_counter(counter_name)
+    single = time.time() - started
+    started = time.time()
+    manager.increment_counters({counter_name: 1 for counter_name in counters})
+    pipelined = time.time() - started
+    results['counters'] = {
+        'single_ops_per_sec': round(len(counters) / single, 1) if single else 0,
+        'pipelined_ops_per_sec': round(len(counters) / pipelined, 1) if pipelined else 0
+    }
+    
+    # Clean up
+    for task_id in task_ids:
+        manager.delete_state(f"task:active:{task_id}")
+    for counter_name in counters:
+        manager.delete_state(counter_name)
+    
+    return results
+
+
 def main():
     """CLI interface for state manager"""
     import argparse
@@ -404,6 +628,12 @@ def main():
     coord_parser = subparsers.add_parser('test-coord', help='Test coordination')
     coord_parser.add_argument('agent', help='Agent name')
     
+    # Benchmark
+    bench_parser = subparsers.add_parser('bench', help='Benchmark locks, claims and counters')
+    bench_parser.add_argument('--workers', type=int, default=8, help='Concurrent workers')
+    bench_parser.add_argument('--iterations', type=int, default=200, help='Operations per benchmark')
+    bench_parser.add_argument('--hold-ms', type=float, default=1.0, help='Lock hold time (ms)')
+    
     args = parser.parse_args()
     
     # Initialize state manager
@@ -463,6 +693,11 @@ def main():
         # Unregister
         if manager.unregister_agent(args.agent):
             print(f"✅ Unregistered agent")
+    
+    elif args.command == 'bench':
+        results = run_benchmark(manager, workers=args.workers,
+                                iterations=args.iterations, hold_ms=args.hold_ms)
+        print(json.dumps(results, indent=2))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Plugin Event Bus - Asynchronous, isolated event delivery for MCP Server plugins
+
+Publishing an event only enqueues it. Each subscriber (plugin, webhook
+dispatcher, hook callback) owns a bounded queue and a worker thread, so a
+slow or failing plugin only delays its own events.
+"""
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Queue overflow policies
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+BLOCK = "block"
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+_STOP = object()
+
+Event = Tuple[str, Dict[str, Any], float]
+
+
+@dataclass
+class SubscriberMetrics:
+    """Delivery metrics for one subscriber"""
+
+    published: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    batches: int = 0
+    total_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+    last_error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        handled = self.delivered + self.errors
+        return {
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "batches": self.batches,
+            "avg_latency_ms": self.total_latency_ms / handled if handled else 0.0,
+            "max_latency_ms": self.max_latency_ms,
+            "last_error": self.last_error,
+        }
+
+
+@dataclass
+class Subscriber:
+    """A bus subscriber with its own queue and worker"""
+
+    name: str
+    handler: Optional[Callable[[str, Dict[str, Any]], Any]]
+    batch_handler: Optional[Callable[[List[Tuple[str, Dict[str, Any]]]], Any]]
+    event_types: Optional[Set[str]]
+    queue_size: int
+    timeout: float
+    policy: str
+    batch_size: int
+    block_timeout: float
+    max_consecutive_timeouts: int
+    suspend_seconds: float
+    metrics: SubscriberMetrics = field(default_factory=SubscriberMetrics)
+    consecutive_timeouts: int = 0
+    suspended_until: float = 0.0
+
+    def __post_init__(self):
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+
+    def wants(self, event_type: str) -> bool:
+        return self.event_types is None or event_type in self.event_types
+
+    @property
+    def suspended(self) -> bool:
+        return self.suspended_until > time.monotonic()
+
+
+class PluginEventBus:
+    """Bounded, per-subscriber event bus
+
+    Handlers cannot be pre-empted from Python threads, so ``timeout`` is a
+    budget: a handler that repeatedly overruns it is suspended for
+    ``suspend_seconds`` and its events are dropped meanwhile instead of
+    piling up behind it.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 1000,
+        batch_size: int = 50,
+        timeout: float = 5.0,
+        policy: str = DROP_OLDEST,
+        block_timeout: float = 0.05,
+        max_consecutive_timeouts: int = 3,
+        suspend_seconds: float = 30.0,
+    ):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+
+        self.defaults = {
+            "queue_size": queue_size,
+            "batch_size": batch_size,
+            "timeout": timeout,
+            "policy": policy,
+            "block_timeout": block_timeout,
+            "max_consecutive_timeouts": max_consecutive_timeouts,
+            "suspend_seconds": suspend_seconds,
+        }
+        self.subscribers: Dict[str, Subscriber] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def subscribe(
+        self,
+        name: str,
+        handler: Optional[Callable[[str, Dict[str, Any]], Any]] = None,
+        event_types: Optional[List[str]] = None,
+        batch_handler: Optional[
+            Callable[[List[Tuple[str, Dict[str, Any]]]], Any]
+        ] = None,
+        **options,
+    ) -> Subscriber:
+        """Register a subscriber and start its worker
+
+        Either ``handler(event_type, data)`` or ``batch_handler(events)`` must
+        be given; ``options`` override the bus defaults per subscriber.
+        """
+        if handler is None and batch_handler is None:
+            raise ValueError("handler or batch_handler required")
+
+        settings = dict(self.defaults)
+        unknown = set(options) - set(settings)
+        if unknown:
+            raise ValueError(f"Unknown subscriber options: {sorted(unknown)}")
+        settings.update(options)
+        if settings["policy"] not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {settings['policy']}")
+
+        self.unsubscribe(name)
+
+        subscriber = Subscriber(
+            name=name,
+            handler=handler,
+            batch_handler=batch_handler,
+            event_types=set(event_types) if event_types else None,
+            **settings,
+        )
+        subscriber.thread = threading.Thread(
+            target=self._run_subscriber,
+            args=(subscriber,),
+            name=f"event-bus-{name}",
+            daemon=True,
+        )
+
+        with self._lock:
+            self.subscribers[name] = subscriber
+        subscriber.thread.start()
+
+        logger.info(f"Event bus subscriber registered: {name}")
+        return subscriber
+
+    def unsubscribe(self, name: str, timeout: float = 1.0) -> bool:
+        """Stop and remove a subscriber, letting it drain briefly"""
+        with self._lock:
+            subscriber = self.subscribers.pop(name, None)
+        if subscriber is None:
+            return False
+
+        self._stop_subscriber(subscriber, timeout)
+        return True
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> int:
+        """Enqueue an event for every interested subscriber
+
+        Returns the number of subscribers the event was queued for.
+        """
+        if self._closed:
+            return 0
+
+        event = (event_type, data, time.monotonic())
+        queued = 0
+        for subscriber in list(self.subscribers.values()):
+            if not subscriber.wants(event_type):
+                continue
+            with subscriber.lock:
+                subscriber.metrics.published += 1
+            if subscriber.suspended:
+                self._record_drop(subscriber)
+                continue
+            if self._offer(subscriber, event):
+                queued += 1
+        return queued
+
+    def _offer(self, subscriber: Subscriber, event: Event) -> bool:
+        """Apply the subscriber's overflow policy"""
+        try:
+            subscriber.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            pass
+
+        if subscriber.policy == DROP_OLDEST:
+            try:
+                subscriber.queue.get_nowait()
+                self._record_drop(subscriber)
+            except queue.Empty:
+                pass
+            try:
+                subscriber.queue.put_nowait(event)
+                return True
+            except queue.Full:
+                pass
+        elif subscriber.policy == BLOCK:
+            # Bounded backpressure on the publisher, then give up
+            try:
+                subscriber.queue.put(event, timeout=subscriber.block_timeout)
+                return True
+            except queue.Full:
+                pass
+
+        self._record_drop(subscriber)
+        return False
+
+    def _record_drop(self, subscriber: Subscriber) -> None:
+        with subscriber.lock:
+            subscriber.metrics.dropped += 1
+
+    def _run_subscriber(self, subscriber: Subscriber) -> None:
+        """Worker loop: drain events in batches and deliver them"""
+        while True:
+            item = subscriber.queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            stop = False
+            while len(batch) < subscriber.batch_size:
+                try:
+                    item = subscriber.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._deliver(subscriber, batch)
+            if stop:
+                return
+
+    def _deliver(self, subscriber: Subscriber, batch: List[Event]) -> None:
+        with subscriber.lock:
+            subscriber.metrics.batches += 1
+
+        if subscriber.suspended:
+            with subscriber.lock:
+                subscriber.metrics.dropped += len(batch)
+            return
+
+        if subscriber.batch_handler is not None:
+            calls = [(subscriber.batch_handler, ([(e[0], e[1]) for e in batch],))]
+            weights = [len(batch)]
+        else:
+            calls = [(subscriber.handler, (e[0], e[1])) for e in batch]
+            weights = [1] * len(batch)
+
+        for index, ((func, args), weight) in enumerate(zip(calls, weights)):
+            started = time.monotonic()
+            error = None
+            try:
+                func(*args)
+            except Exception as e:
+                error = e
+                logger.error(
+                    f"Error handling event in subscriber {subscriber.name}: {e}"
+                )
+            elapsed = time.monotonic() - started
+            self._record_delivery(subscriber, elapsed, weight, error)
+
+            if subscriber.suspended:
+                # Drop the rest of the batch rather than run it through a stuck handler
+                with subscriber.lock:
+                    subscriber.metrics.dropped += sum(weights[index + 1 :])
+                return
+
+    def _record_delivery(
+        self,
+        subscriber: Subscriber,
+        elapsed: float,
+        weight: int,
+        error: Optional[Exception],
+    ) -> None:
+        latency_ms = elapsed * 1000
+        with subscriber.lock:
+            metrics = subscriber.metrics
+            if error is None:
+                metrics.delivered += weight
+            else:
+                metrics.errors += weight
+                metrics.last_error = str(error)
+            metrics.total_latency_ms += latency_ms
+            metrics.max_latency_ms = max(metrics.max_latency_ms, latency_ms)
+
+            if elapsed > subscriber.timeout:
+                metrics.timeouts += 1
+                subscriber.consecutive_timeouts += 1
+                if (
+                    subscriber.consecutive_timeouts
+                    >= subscriber.max_consecutive_timeouts
+                ):
+                    subscriber.suspended_until = (
+                        time.monotonic() + subscriber.suspend_seconds
+                    )
+                    subscriber.consecutive_timeouts = 0
+                    logger.warning(
+                        f"Subscriber {subscriber.name} suspended for "
+                        f"{subscriber.suspend_seconds}s after repeated timeouts"
+                    )
+            else:
+                subscriber.consecutive_timeouts = 0
+
+    def _stop_subscriber(self, subscriber: Subscriber, timeout: float) -> None:
+        try:
+            subscriber.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            # Queue is still full of work; discard it so the worker can exit
+            while True:
+                try:
+                    subscriber.queue.get_nowait()
+                    self._record_drop(subscriber)
+                except queue.Empty:
+                    break
+            subscriber.queue.put_nowait(_STOP)
+        if subscriber.thread is not None:
+            subscriber.thread.join(timeout)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-subscriber delivery metrics"""
+        metrics = {}
+        for name, subscriber in list(self.subscribers.items()):
+            with subscriber.lock:
+                entry = subscriber.metrics.to_dict()
+            entry["queue_depth"] = subscriber.queue.qsize()
+            entry["queue_size"] = subscriber.queue_size
+            entry["policy"] = subscriber.policy
+            entry["suspended"] = subscriber.suspended
+            metrics[name] = entry
+        return metrics
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop all subscribers, draining queued events up to ``timeout``"""
+        self._closed = True
+        with self._lock:
+            subscribers = list(self.subscribers.values())
+            self.subscribers.clear()
+
+        deadline = time.monotonic() + timeout
+        for subscriber in subscribers:
+            self._stop_subscriber(subscriber, max(0.0, deadline - time.monotonic()))
+
+        logger.info("Plugin event bus shutdown complete")
@@ -25,6 +25,8 @@ except ImportError as e:
     print(f"Advanced plugin managers not available: {e}")
     ADVANCED_MANAGERS_AVAILABLE = False
 
+from plugin_event_bus import PluginEventBus
+
 
 class MCPPluginIntegrator:
     """Integrates advanced plugin and webhook managers with MCP server"""
@@ -34,9 +36,16 @@ class MCPPluginIntegrator:
         self.webhook_manager = None
         self.logger = logging.getLogger(__name__)
 
+        # Request handlers only enqueue; plugins run on their own workers
+        self.event_bus = PluginEventBus()
+
         if ADVANCED_MANAGERS_AVAILABLE:
             self.plugin_manager = PluginManager()
             self.webhook_manager = WebhookManager()
+            self.event_bus.subscribe("webhooks", self._dispatch_webhooks)
+            # Plugins (re)loaded or unloaded at any time keep their subscriber in step
+            self.plugin_manager.add_listener("loaded", self._subscribe_plugin)
+            self.plugin_manager.add_listener("unloaded", self._unsubscribe_plugin)
             self.logger.info("Advanced plugin managers initialized")
         else:
             self.logger.warning("Using fallback plugin system")
@@ -65,6 +74,38 @@ class MCPPluginIntegrator:
         else:
             self.logger.info("No plugins loaded")
 
+        self.subscribe_plugins()
+
+    def subscribe_plugins(self) -> None:
+        """Give every loaded plugin its own event bus subscriber"""
+        if not self.plugin_manager:
+            return
+
+        for name in list(self.plugin_manager.plugins):
+            self._subscribe_plugin(name)
+
+    def _subscribe_plugin(self, name: str) -> None:
+        subscriber = f"plugin:{name}"
+        if subscriber not in self.event_bus.subscribers:
+            self.event_bus.subscribe(subscriber, self._make_plugin_handler(name))
+
+    def _unsubscribe_plugin(self, name: str) -> None:
+        self.event_bus.unsubscribe(f"plugin:{name}")
+
+    def _make_plugin_handler(self, plugin_name: str):
+        """Event handler that re-resolves the plugin so reloads/disables apply"""
+
+        def handle(event_type: str, data: Dict[str, Any]) -> None:
+            plugin = self.plugin_manager.get_plugin(plugin_name)
+            if plugin is not None and plugin.enabled:
+                plugin.instance.handle_event(event_type, data)
+
+        return handle
+
+    def _dispatch_webhooks(self, event_type: str, data: Dict[str, Any]) -> None:
+        # Bus worker thread: the delivery queue is only safe on its own loop
+        self.webhook_manager.emit_event_threadsafe(event_type, data)
+
     def register_webhook(self, path: str, handler, methods=None) -> None:
         """Register a webhook endpoint"""
         if self.webhook_manager:
@@ -72,16 +113,8 @@ class MCPPluginIntegrator:
             self.logger.info(f"Registered webhook: {path}")
 
     def trigger_event(self, event_type: str, data: Dict[str, Any]) -> None:
-        """Trigger an event to plugins and webhooks"""
-        if self.plugin_manager:
-            self.plugin_manager.emit_event(event_type, data)
-
-        if self.webhook_manager:
-            # Emit event to webhooks (webhook manager handles async internally)
-            try:
-                self.webhook_manager.emit_event(event_type, data)
-            except Exception as e:
-                self.logger.error(f"Error in webhook notification: {e}")
+        """Queue an event for plugins and webhooks (never blocks on handlers)"""
+        self.event_bus.publish(event_type, data)
 
     def get_plugin_status(self) -> Dict[str, Any]:
         """Get status of loaded plugins"""
@@ -102,6 +135,7 @@ class MCPPluginIntegrator:
             "plugins_available": True,
             "loaded_plugins": len(plugins_status),
             "plugin_details": plugins_status,
+            "event_bus": self.event_bus.get_metrics(),
         }
 
     def get_webhook_status(self) -> Dict[str, Any]:
@@ -117,6 +151,9 @@ class MCPPluginIntegrator:
 
     def shutdown(self) -> None:
         """Shutdown all plugins and webhooks"""
+        # Drain queued events before the plugins go away
+        self.event_bus.shutdown()
+
         if self.plugin_manager:
             self.plugin_manager.shutdown()
             self.logger.info("Plugin manager shutdown complete")
@@ -166,6 +203,7 @@ class EnhancedPluginManager:
         self.plugins = {}
         self.webhooks = {}
         self.hooks = {}
+        self.hook_bus = PluginEventBus()
 
     def load_plugins(self, plugins_dir):
         """Load plugins from directory"""
@@ -188,6 +226,18 @@ class EnhancedPluginManager:
             self.hooks[hook_name] = []
         self.hooks[hook_name].append(callback)
 
+        # Each callback also gets an isolated bus subscriber for publish_hook
+        index = len(self.hooks[hook_name]) - 1
+        self.hook_bus.subscribe(
+            f"{hook_name}:{index}",
+            lambda _hook, call: callback(*call["args"], **call["kwargs"]),
+            event_types=[hook_name],
+        )
+
+    def publish_hook(self, hook_name, *args, **kwargs):
+        """Fire-and-forget hook trigger: callbacks run on their own workers"""
+        return self.hook_bus.publish(hook_name, {"args": args, "kwargs": kwargs})
+
     def trigger_hook(self, hook_name, *args, **kwargs):
         """Trigger hook"""
         results = []
@@ -203,6 +253,7 @@ class EnhancedPluginManager:
     def shutdown_plugins(self):
         """Shutdown plugins"""
         integrator.shutdown()
+        self.hook_bus.shutdown()
         self.plugins.clear()
         self.webhooks.clear()
         self.hooks.clear()
@@ -120,6 +120,7 @@ class PluginManager:
         self.plugin_dir = Path(plugin_dir)
         self.config_dir = Path(config_dir)
         self.plugins: Dict[str, PluginInstance] = {}
+        # "loaded"/"unloaded" -> callbacks taking the plugin name
         self.event_listeners: Dict[str, List[Callable]] = {}
 
         # Create directories
@@ -129,6 +130,19 @@ class PluginManager:
         # Setup logging
         self.logger = logging.getLogger(__name__)
 
+    def add_listener(self, event: str, callback: Callable[[str], None]) -> None:
+        """Call ``callback(plugin_name)`` whenever a plugin is loaded or unloaded"""
+        self.event_listeners.setdefault(event, []).append(callback)
+
+    def _notify(self, event: str, plugin_name: str) -> None:
+        for callback in self.event_listeners.get(event, []):
+            try:
+                callback(plugin_name)
+            except Exception as e:
+                self.logger.warning(
+                    f"Plugin {event} listener failed for {plugin_name}: {e}"
+                )
+
     def discover_plugins(self) -> List[str]:
         """Discover available plugins"""
         plugins = []
@@ -296,6 +310,7 @@ class PluginManager:
             )
 
             self.plugins[plugin_name] = plugin_instance
+            self._notify("loaded", plugin_name)
 
             self.logger.info(f"Loaded plugin: {plugin_name} v{metadata.version}")
             return plugin_instance
@@ -323,6 +338,7 @@ class PluginManager:
 
         # Remove from plugins dict
         del self.plugins[plugin_name]
+        self._notify("unloaded", plugin_name)
 
         self.logger.info(f"Unloaded plugin: {plugin_name}")
 
@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+Request Telemetry - Low-overhead latency histograms and spans for MCP Server
+
+Request handlers and task threads only append observations to a deque per
+metric family; they never wait for a lock. Observations are folded into fixed
+bucket counts by whoever renders /metrics (or by a writer that finds the
+fold lock free once enough observations are pending). Finished spans are
+handed to a bounded queue and written to JSONL or posted to an OTLP/HTTP
+collector by a background thread.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import urllib.request
+import uuid
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Request latency buckets in seconds
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# Task queue wait and run time buckets in seconds
+TASK_BUCKETS = (0.01, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 1800.0)
+
+# Pending observations after which a writer folds them if nobody else is
+FOLD_THRESHOLD = 1024
+# Distinct routes tracked before new ones are reported as "other"
+MAX_ROUTES = 200
+UNMATCHED_ROUTE = "unmatched"
+OVERFLOW_ROUTE = "other"
+
+SPAN_QUEUE_SIZE = 10000
+SPAN_BATCH_SIZE = 256
+SPAN_FLUSH_INTERVAL = 1.0
+OTLP_TIMEOUT = 2.0
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = (
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Folding:
+    """Lock-free appends, folded in batches under a non-blocking lock"""
+
+    def __init__(self):
+        self._pending = deque()
+        self._fold_lock = threading.Lock()
+
+    def _append(self, item) -> None:
+        # deque.append is atomic, so writers never block each other
+        self._pending.append(item)
+        if len(self._pending) >= FOLD_THRESHOLD and self._fold_lock.acquire(False):
+            try:
+                self._drain()
+            finally:
+                self._fold_lock.release()
+
+    def _drain(self) -> None:
+        pending = self._pending
+        while True:
+            try:
+                item = pending.popleft()
+            except IndexError:
+                return
+            self._fold(item)
+
+    def _fold(self, item) -> None:
+        raise NotImplementedError
+
+    def _folded(self):
+        with self._fold_lock:
+            self._drain()
+            return self._snapshot()
+
+    def _snapshot(self):
+        raise NotImplementedError
+
+
+class HistogramFamily(_Folding):
+    """Fixed-bucket histogram with labels, rendered in Prometheus text format"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__()
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        self._append((labels, value))
+
+    def _fold(self, item) -> None:
+        labels, value = item
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def _snapshot(self):
+        return {labels: list(series) for labels, series in self._series.items()}
+
+    def collect(self) -> Dict[Tuple[str, ...], Dict[str, Any]]:
+        """{labels: {"buckets": [(le, cumulative count)], "count", "sum"}}"""
+        result = {}
+        for labels, series in self._folded().items():
+            cumulative = 0
+            buckets = []
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                buckets.append((bound, cumulative))
+            result[labels] = {
+                "buckets": buckets,
+                "count": cumulative,
+                "sum": series[-1],
+            }
+        return result
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for labels, data in sorted(self.collect().items()):
+            for bound, count in data["buckets"]:
+                label_str = _format_labels(
+                    self.labelnames + ("le",), labels + (_format_value(bound),)
+                )
+                lines.append(f"{self.name}_bucket{label_str} {count}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(data['sum'])}")
+            lines.append(f"{self.name}_count{label_str} {data['count']}")
+        return lines
+
+
+class CounterFamily(_Folding):
+    """Monotonic counter with labels"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__()
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], int] = {}
+
+    def inc(self, *labels: str) -> None:
+        self._append(labels)
+
+    def _fold(self, labels) -> None:
+        self._values[labels] = self._values.get(labels, 0) + 1
+
+    def _snapshot(self):
+        return dict(self._values)
+
+    def collect(self) -> Dict[Tuple[str, ...], int]:
+        return self._folded()
+
+    def render(self) -> List[str]:
+        name = self.name if self.name.endswith("_total") else f"{self.name}_total"
+        lines = [
+            f"# HELP {name} {self.documentation}",
+            f"# TYPE {name} counter",
+        ]
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f"{name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+def trace_id_for(correlation_id: Optional[str]) -> str:
+    """32-hex trace ID; UUID correlation IDs are used as-is"""
+    if correlation_id:
+        compact = correlation_id.replace("-", "").lower()
+        if len(compact) == 32 and all(c in "0123456789abcdef" for c in compact):
+            return compact
+        return hashlib.sha256(correlation_id.encode("utf-8")).hexdigest()[:32]
+    return uuid.uuid4().hex
+
+
+def new_span_id() -> str:
+    return os.urandom(8).hex()
+
+
+class SpanExporter:
+    """
+    Ships finished spans from a background thread.
+
+    ``target`` is ``jsonl:<path>`` (or a path ending in .jsonl) to append one
+    JSON object per span, or ``otlp:<url>`` (or an http(s) URL) to POST
+    OTLP/HTTP JSON batches to a local collector, e.g.
+    ``otlp:http://localhost:4318/v1/traces``.
+    """
+
+    def __init__(self, target: str, service_name: str = "mcp_server"):
+        if target.startswith("jsonl:"):
+            self.kind, self.destination = "jsonl", target[len("jsonl:") :]
+        elif target.startswith("otlp:"):
+            self.kind, self.destination = "otlp", target[len("otlp:") :]
+        elif target.startswith(("http://", "https://")):
+            self.kind, self.destination = "otlp", target
+        else:
+            self.kind, self.destination = "jsonl", target
+        self.service_name = service_name
+        self.exported = 0
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(
+            maxsize=SPAN_QUEUE_SIZE
+        )
+        self._thread = threading.Thread(
+            target=self._run, name="span-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def export(self, span: Dict[str, Any]) -> None:
+        """Queue a finished span; dropped if the exporter is backed up"""
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch = []
+            stop = False
+            try:
+                span = self._queue.get(timeout=SPAN_FLUSH_INTERVAL)
+                if span is None:
+                    stop = True
+                else:
+                    batch.append(span)
+                    while len(batch) < SPAN_BATCH_SIZE:
+                        span = self._queue.get_nowait()
+                        if span is None:
+                            stop = True
+                            break
+                        batch.append(span)
+            except queue.Empty:
+                pass
+
+            if batch:
+                try:
+                    if self.kind == "otlp":
+                        self._post_otlp(batch)
+                    else:
+                        self._write_jsonl(batch)
+                    self.exported += len(batch)
+                except Exception as e:
+                    self.dropped += len(batch)
+                    logger.warning(f"Span export to {self.destination} failed: {e}")
+            if stop:
+                return
+
+    def _write_jsonl(self, batch: List[Dict[str, Any]]) -> None:
+        directory = os.path.dirname(self.destination)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.destination, "a", encoding="utf-8") as f:
+            for span in batch:
+                f.write(json.dumps(span, separators=(",", ":")) + "\n")
+
+    def _post_otlp(self, batch: List[Dict[str, Any]]) -> None:
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes(
+                            {"service.name": self.service_name}
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "request_telemetry"},
+                            "spans": [_otlp_span(span) for span in batch],
+                        }
+                    ],
+                }
+            ]
+        }
+        request = urllib.request.Request(
+            self.destination,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=OTLP_TIMEOUT) as response:
+            response.read()
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    result = []
+    for key, value in attributes.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            encoded = {"boolValue": value}
+        elif isinstance(value, int):
+            encoded = {"intValue": str(value)}
+        elif isinstance(value, float):
+            encoded = {"doubleValue": value}
+        else:
+            encoded = {"stringValue": str(value)}
+        result.append({"key": key, "value": encoded})
+    return result
+
+
+def _otlp_span(span: Dict[str, Any]) -> Dict[str, Any]:
+    encoded = {
+        "traceId": span["trace_id"],
+        "spanId": span["span_id"],
+        "name": span["name"],
+        "kind": span.get("kind", SPAN_KIND_INTERNAL),
+        "startTimeUnixNano": str(span["start_ns"]),
+        "endTimeUnixNano": str(span["end_ns"]),
+        "attributes": _otlp_attributes(span.get("attributes", {})),
+        # 1 = OK, 2 = ERROR
+        "status": {"code": 2 if span.get("error") else 1},
+    }
+    if span.get("parent_span_id"):
+        encoded["parentSpanId"] = span["parent_span_id"]
+    return encoded
+
+
+class RequestTelemetry:
+    """Per-route request latency, task lifecycle timing and optional spans"""
+
+    def __init__(
+        self,
+        span_target: Optional[str] = None,
+        prefix: str = "mcp",
+        known_route: Optional[Callable[[str], bool]] = None,
+    ):
+        self.request_duration = HistogramFamily(
+            f"{prefix}_http_request_duration_seconds",
+            "HTTP request latency by route",
+            ("method", "route"),
+        )
+        self.requests = CounterFamily(
+            f"{prefix}_http_requests_total",
+            "HTTP requests by route and status code",
+            ("method", "route", "status"),
+        )
+        self.task_queue_wait = HistogramFamily(
+            f"{prefix}_task_queue_wait_seconds",
+            "Time from task enqueue to execution start",
+            ("command",),
+            TASK_BUCKETS,
+        )
+        self.task_run = HistogramFamily(
+            f"{prefix}_task_run_seconds",
+            "Time from task execution start to finish",
+            ("command", "status"),
+            TASK_BUCKETS,
+        )
+        self.exporter = SpanExporter(span_target) if span_target else None
+        # The server's route table; without one, any 404 counts as unmatched
+        self.known_route = known_route
+        self._routes = set()
+
+    def route_label(self, path: str, status: int) -> str:
+        """Bounded route label; unknown paths must not create new series"""
+        if self.known_route is not None:
+            if not self.known_route(path):
+                return UNMATCHED_ROUTE
+        elif status == 404:
+            return UNMATCHED_ROUTE
+        if path in self._routes:
+            return path
+        if len(self._routes) >= MAX_ROUTES:
+            return OVERFLOW_ROUTE
+        self._routes.add(path)
+        return path
+
+    def observe_request(
+        self,
+        method: str,
+        path: str,
+        status: int,
+        start_ns: int,
+        duration_ns: int,
+        correlation_id: Optional[str] = None,
+    ) -> None:
+        route = self.route_label(path, status)
+        self.request_duration.observe(duration_ns / 1e9, method, route)
+        self.requests.inc(method, route, str(status))
+
+        if self.exporter is not None:
+            self.exporter.export(
+                {
+                    "trace_id": trace_id_for(correlation_id),
+                    "span_id": new_span_id(),
+                    "name": f"{method} {route}",
+                    "kind": SPAN_KIND_SERVER,
+                    "start_ns": start_ns,
+                    "end_ns": start_ns + duration_ns,
+                    "correlation_id": correlation_id,
+                    "error": status >= 500,
+                    "attributes": {
+                        "http.method": method,
+                        "http.route": route,
+                        "http.status_code": status,
+                        "correlation_id": correlation_id,
+                    },
+                }
+            )
+
+    def task_started(self, task: Dict[str, Any]) -> None:
+        """Stamp start time on a task dict and record its queue wait"""
+        now = time.time()
+        task["started_at"] = now
+        queued_at = task.get("queued_at")
+        if isinstance(queued_at, (int, float)) and queued_at <= now:
+            self.task_queue_wait.observe(now - queued_at, str(task.get("command")))
+
+    def task_finished(self, task: Dict[str, Any]) -> None:
+        """Stamp finish time on a task dict, record run time and export spans"""
+        now = time.time()
+        task["finished_at"] = now
+        started_at = task.get("started_at")
+        if not isinstance(started_at, (int, float)):
+            return
+        command = str(task.get("command"))
+        status = str(task.get("status"))
+        self.task_run.observe(now - started_at, command, status)
+
+        if self.exporter is None:
+            return
+        correlation_id = task.get("correlation_id")
+        trace_id = trace_id_for(correlation_id or task.get("id"))
+        attributes = {
+            "task.id": task.get("id"),
+            "task.command": command,
+            "task.status": status,
+            "task.returncode": task.get("returncode"),
+            "correlation_id": correlation_id,
+        }
+        task_span_id = new_span_id()
+        queued_at = task.get("queued_at")
+        if isinstance(queued_at, (int, float)) and queued_at <= started_at:
+            self.exporter.export(
+                {
+                    "trace_id": trace_id,
+                    "span_id": new_span_id(),
+                    "parent_span_id": task_span_id,
+                    "name": f"task.queue {command}",
+                    "start_ns": int(queued_at * 1e9),
+                    "end_ns": int(started_at * 1e9),
+                    "correlation_id": correlation_id,
+                    "attributes": attributes,
+                }
+            )
+        self.exporter.export(
+            {
+                "trace_id": trace_id,
+                "span_id": task_span_id,
+                "name": f"task.run {command}",
+                "start_ns": int(started_at * 1e9),
+                "end_ns": int(now * 1e9),
+                "correlation_id": correlation_id,
+                "error": status not in ("success", "ok"),
+                "attributes": attributes,
+            }
+        )
+
+    def render(self) -> str:
+        """Prometheus text exposition of all telemetry series"""
+        lines = []
+        for family in (
+            self.request_duration,
+            self.requests,
+            self.task_queue_wait,
+            self.task_run,
+        ):
+            lines.extend(family.render())
+        if self.exporter is not None:
+            lines.append("# HELP mcp_spans_exported_total Spans exported")
+            lines.append("# TYPE mcp_spans_exported_total counter")
+            lines.append(f"mcp_spans_exported_total {self.exporter.exported}")
+            lines.append("# HELP mcp_spans_dropped_total Spans dropped by the exporter")
+            lines.append("# TYPE mcp_spans_dropped_total counter")
+            lines.append(f"mcp_spans_dropped_total {self.exporter.dropped}")
+        return "\n".join(lines) + "\n"
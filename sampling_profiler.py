@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Sampling Profiler - On-demand statistical profiler for long-running services
+
+A background thread snapshots every thread's stack with sys._current_frames()
+at a configurable rate and counts identical stacks, so a slow server can be
+profiled in production without attaching an external tool. The sampler
+stretches its own sleep so that the time it spends sampling stays under
+MAX_OVERHEAD of wall time, and a session stops by itself after its duration.
+Results are served as collapsed stacks (flamegraph.pl / speedscope input)
+together with per-thread CPU time read from /proc.
+
+Servers expose it through ProfilerAdmin, whose routes are disabled unless an
+admin token is configured in PROFILER_ADMIN_TOKEN.
+"""
+
+import hmac
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, Mapping, Optional, Tuple
+from urllib.parse import parse_qs
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 0.01
+MIN_INTERVAL = 0.001
+DEFAULT_DURATION = 30.0
+MAX_DURATION = 600.0
+# Fraction of wall time the sampler may spend sampling
+MAX_OVERHEAD = 0.01
+MAX_DEPTH = 128
+# Distinct stacks kept per session before new ones are counted as truncated
+MAX_STACKS = 20000
+TRUNCATED_STACK = "[truncated]"
+CPU_REFRESH_INTERVAL = 1.0
+
+ADMIN_TOKEN_ENV = "PROFILER_ADMIN_TOKEN"
+ADMIN_PREFIX = "/admin/profiler/"
+
+try:
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):
+    CLOCK_TICKS = 100
+
+
+def thread_cpu_seconds(native_id: Optional[int]) -> Optional[float]:
+    """User plus system CPU time of a thread of this process, if known."""
+    if native_id is None:
+        return None
+    # Unlike pthread_getcpuclockid(), this is safe for threads that just exited
+    try:
+        with open(f"/proc/self/task/{native_id}/stat", "rb") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # Fields after the parenthesised command name; utime and stime are 14 and 15
+    fields = stat[stat.rfind(b")") + 2 :].split()
+    try:
+        return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    except (IndexError, ValueError):
+        return None
+
+
+def frame_label(code) -> str:
+    """Flamegraph frame name for a code object."""
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Counts sampled stacks per thread during one profiling session."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._reset(DEFAULT_INTERVAL, DEFAULT_DURATION)
+
+    def _reset(self, interval: float, duration: float) -> None:
+        self.interval = interval
+        self.duration = duration
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self.samples = 0
+        self.sampling_seconds = 0.0
+        # (thread ident, code objects root first) -> samples
+        self.stacks: Dict[Tuple[int, tuple], int] = {}
+        self.thread_samples: Dict[int, int] = {}
+        # thread ident -> [name, native id, cpu at first sight, latest cpu]
+        self.threads: Dict[int, list] = {}
+        self._labels: Dict[object, str] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(
+        self, interval: float = DEFAULT_INTERVAL, duration: float = DEFAULT_DURATION
+    ) -> Dict:
+        """Start a new session, discarding the previous one's results."""
+        interval = max(MIN_INTERVAL, float(interval))
+        duration = min(MAX_DURATION, max(0.0, float(duration)))
+        with self._lock:
+            if self.running:
+                return self.status()
+            self._reset(interval, duration)
+            self._stop_event.clear()
+            self.started_at = time.monotonic()
+            self._thread = threading.Thread(
+                target=self._run, name="sampling-profiler", daemon=True
+            )
+            self._thread.start()
+            logger.info(
+                "Sampling profiler started (interval %.4fs, %.0fs)", interval, duration
+            )
+            return self.status()
+
+    def stop(self) -> Dict:
+        with self._lock:
+            thread = self._thread
+            self._stop_event.set()
+            if thread is not None and thread is not threading.current_thread():
+                thread.join()
+            return self.status()
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        deadline = self.started_at + self.duration
+        self._refresh_threads(initial=True)
+        next_cpu_refresh = self.started_at + CPU_REFRESH_INTERVAL
+        try:
+            while not self._stop_event.is_set():
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                # CPU time, so waiting for the GIL does not count as overhead
+                began = time.thread_time()
+                if now >= next_cpu_refresh:
+                    self._refresh_threads()
+                    next_cpu_refresh = now + CPU_REFRESH_INTERVAL
+                self._sample(own_ident)
+                cost = time.thread_time() - began
+                self.sampling_seconds += cost
+                self.samples += 1
+
+                # Sleep long enough to keep sampling under MAX_OVERHEAD
+                self._stop_event.wait(max(self.interval, cost / MAX_OVERHEAD - cost))
+        finally:
+            self._refresh_threads()
+            self.stopped_at = time.monotonic()
+            logger.info("Sampling profiler stopped after %d samples", self.samples)
+
+    def _sample(self, own_ident: int) -> None:
+        stacks = self.stacks
+        thread_samples = self.thread_samples
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            codes = []
+            while frame is not None and len(codes) < MAX_DEPTH:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            if frame is not None:
+                codes.append(TRUNCATED_STACK)
+            codes.reverse()
+            key = (ident, tuple(codes))
+            if key in stacks:
+                stacks[key] += 1
+            elif len(stacks) < MAX_STACKS:
+                stacks[key] = 1
+            else:
+                key = (ident, (TRUNCATED_STACK,))
+                stacks[key] = stacks.get(key, 0) + 1
+            thread_samples[ident] = thread_samples.get(ident, 0) + 1
+
+    def _refresh_threads(self, initial: bool = False) -> None:
+        for thread in threading.enumerate():
+            native_id = getattr(thread, "native_id", None)
+            cpu = thread_cpu_seconds(native_id)
+            entry = self.threads.get(thread.ident)
+            if entry is None:
+                # Threads started during the session spent all their CPU in it
+                baseline = cpu if initial or cpu is None else 0.0
+                self.threads[thread.ident] = [thread.name, native_id, baseline, cpu]
+            else:
+                entry[0] = thread.name
+                if cpu is not None:
+                    entry[3] = cpu
+
+    def _label(self, code) -> str:
+        if isinstance(code, str):
+            return code
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = frame_label(code)
+        return label
+
+    def _thread_name(self, ident: int) -> str:
+        entry = self.threads.get(ident)
+        return entry[0] if entry else f"thread-{ident}"
+
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        end = self.stopped_at if self.stopped_at is not None else time.monotonic()
+        return end - self.started_at
+
+    def status(self) -> Dict:
+        """Session summary including per-thread sample counts and CPU time."""
+        elapsed = self.elapsed()
+        threads = []
+        for ident, samples in sorted(self.thread_samples.copy().items()):
+            entry = self.threads.get(ident)
+            cpu = None
+            if entry and entry[2] is not None and entry[3] is not None:
+                cpu = entry[3] - entry[2]
+            threads.append(
+                {
+                    "ident": ident,
+                    "name": self._thread_name(ident),
+                    "samples": samples,
+                    "cpu_seconds": cpu,
+                    "cpu_percent": (
+                        round(100.0 * cpu / elapsed, 2)
+                        if cpu is not None and elapsed
+                        else None
+                    ),
+                }
+            )
+        threads.sort(key=lambda t: t["cpu_seconds"] or 0.0, reverse=True)
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "duration_seconds": self.duration,
+            "elapsed_seconds": round(elapsed, 3),
+            "samples": self.samples,
+            "effective_rate_hz": round(self.samples / elapsed, 1) if elapsed else 0.0,
+            "overhead": round(self.sampling_seconds / elapsed, 5) if elapsed else 0.0,
+            "distinct_stacks": len(self.stacks),
+            "threads": threads,
+        }
+
+    def collapsed(self) -> str:
+        """Stacks as "thread;root;...;leaf count" lines, heaviest first."""
+        lines = []
+        for (ident, codes), count in sorted(
+            self.stacks.copy().items(), key=lambda item: item[1], reverse=True
+        ):
+            frames = [self._thread_name(ident).replace(";", ":")]
+            frames.extend(self._label(code).replace(";", ":") for code in codes)
+            lines.append(f"{';'.join(frames)} {count}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+
+class ProfilerAdmin:
+    """
+    Token-protected admin routes for a SamplingProfiler.
+
+    POST /admin/profiler/start?interval=0.01&duration=30
+    POST /admin/profiler/stop
+    GET  /admin/profiler/status
+    GET  /admin/profiler/collapsed
+    """
+
+    def __init__(
+        self,
+        profiler: Optional[SamplingProfiler] = None,
+        token: Optional[str] = None,
+    ):
+        self.profiler = profiler or SamplingProfiler()
+        self.token = token if token is not None else os.environ.get(ADMIN_TOKEN_ENV, "")
+
+    @staticmethod
+    def matches(path: str) -> bool:
+        return path.startswith(ADMIN_PREFIX)
+
+    def authorized(self, headers: Mapping[str, str]) -> bool:
+        if not self.token:
+            return False
+        supplied = headers.get("X-Admin-Token") or ""
+        authorization = headers.get("Authorization") or ""
+        if authorization.startswith("Bearer "):
+            supplied = authorization[len("Bearer ") :]
+        return hmac.compare_digest(supplied.encode(), self.token.encode())
+
+    def handle(
+        self, method: str, path: str, query: str, headers: Mapping[str, str]
+    ) -> Tuple[int, str, bytes]:
+        """Serve one admin request; returns (status, content type, body)."""
+        if not self.token:
+            # Disabled unless explicitly configured
+            return _json_response(404, {"error": "not_found"})
+        if not self.authorized(headers):
+            return _json_response(401, {"error": "unauthorized"})
+
+        action = path[len(ADMIN_PREFIX) :].strip("/")
+        allowed = {"start": "POST", "stop": "POST", "status": "GET", "collapsed": "GET"}
+        if action not in allowed:
+            return _json_response(404, {"error": "not_found"})
+        if method != allowed[action]:
+            return _json_response(405, {"error": "method_not_allowed"})
+
+        if action == "start":
+            params = parse_qs(query)
+            try:
+                interval = float(params.get("interval", [DEFAULT_INTERVAL])[0])
+                duration = float(params.get("duration", [DEFAULT_DURATION])[0])
+            except ValueError:
+                return _json_response(400, {"error": "invalid_parameters"})
+            return _json_response(200, self.profiler.start(interval, duration))
+        if action == "stop":
+            return _json_response(200, self.profiler.stop())
+        if action == "status":
+            return _json_response(200, self.profiler.status())
+        return 200, "text/plain; charset=utf-8", self.profiler.collapsed().encode()
+
+
+def _json_response(status: int, data: Dict) -> Tuple[int, str, bytes]:
+    return status, "application/json", json.dumps(data).encode()
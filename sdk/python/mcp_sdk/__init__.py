@@ -10,6 +10,7 @@ Features:
 - Automatic retry logic and error handling
 - Type hints and comprehensive documentation
 - Connection pooling and session management
+- Bulk endpoints and bounded concurrent pipelining for batch integrations
 
 Usage:
     from mcp_sdk import MCPClient
@@ -21,9 +22,10 @@ Usage:
 
 import asyncio
 import aiohttp
+import functools
 import json
 import logging
-from typing import Dict, List, Optional, Any, Union
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Any, Union
 from dataclasses import dataclass
 from urllib.parse import urljoin
 import time
@@ -35,6 +37,12 @@ __author__ = "Tools Automation SDK"
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Connection pool and batching defaults
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_BULK_SIZE = 100  # items per /bulk/* request (server accepts up to 500)
+KEEPALIVE_TIMEOUT = 30.0
+DNS_CACHE_TTL = 300
+
 
 @dataclass
 class MCPResponse:
@@ -115,6 +123,8 @@ class MCPClient:
         max_retries: int = 3,
         retry_delay: float = 1.0,
         session: Optional[aiohttp.ClientSession] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        bulk_size: int = DEFAULT_BULK_SIZE,
     ):
         """
         Initialize MCP client
@@ -125,19 +135,32 @@ class MCPClient:
             max_retries: Maximum number of retries for failed requests
             retry_delay: Delay between retries in seconds
             session: Optional aiohttp session (will create one if not provided)
+            max_connections: Connection pool size, also the default number of
+                requests ``pipeline`` keeps in flight
+            bulk_size: Items sent per bulk request
         """
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.max_connections = max_connections
+        self.bulk_size = bulk_size
         self._session = session
         self._session_owner = session is None
 
     async def __aenter__(self):
         """Async context manager entry"""
         if self._session_owner:
+            # Keep connections alive and size the pool for pipelined requests
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=DNS_CACHE_TTL,
+            )
             self._session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=self.timeout)
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
             )
         return self
 
@@ -152,11 +175,13 @@ class MCPClient:
         endpoint: str,
         data: Optional[Dict] = None,
         params: Optional[Dict] = None,
+        retry: bool = True,
     ) -> MCPResponse:
-        """Make HTTP request with retry logic"""
+        """Make HTTP request with retry logic (disabled by ``retry=False``)"""
         url = urljoin(self.base_url + "/", endpoint.lstrip("/"))
+        max_retries = self.max_retries if retry else 0
 
-        for attempt in range(self.max_retries + 1):
+        for attempt in range(max_retries + 1):
             try:
                 start_time = time.time()
 
@@ -167,7 +192,7 @@ class MCPClient:
 
                     if response.status >= 500:
                         # Server error, retry
-                        if attempt < self.max_retries:
+                        if attempt < max_retries:
                             await asyncio.sleep(self.retry_delay * (2**attempt))
                             continue
 
@@ -192,13 +217,13 @@ class MCPClient:
                     )
 
             except asyncio.TimeoutError:
-                if attempt < self.max_retries:
+                if attempt < max_retries:
                     await asyncio.sleep(self.retry_delay * (2**attempt))
                     continue
                 raise MCPTimeoutError(f"Request timeout after {self.timeout}s")
 
             except aiohttp.ClientError as e:
-                if attempt < self.max_retries:
+                if attempt < max_retries:
                     await asyncio.sleep(self.retry_delay * (2**attempt))
                     continue
                 raise MCPConnectionError(f"Connection error: {e}")
@@ -206,6 +231,74 @@ class MCPClient:
         # This should never be reached
         raise MCPError("Request failed after all retries")
 
+    async def pipeline(
+        self,
+        calls: Iterable[Callable[[], Awaitable[Any]]],
+        concurrency: Optional[int] = None,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """
+        Run request factories with at most ``concurrency`` in flight
+
+        Args:
+            calls: Zero-argument callables returning awaitables, e.g.
+                ``functools.partial(client.get_agent_status, name)``
+            concurrency: Requests in flight (defaults to ``max_connections``)
+            return_exceptions: Return errors in place instead of raising
+
+        Returns:
+            Results in the order of ``calls``
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.max_connections)
+
+        async def run(call):
+            async with semaphore:
+                return await call()
+
+        return await asyncio.gather(
+            *(run(call) for call in calls), return_exceptions=return_exceptions
+        )
+
+    async def _bulk_request(
+        self, endpoint: str, key: str, items: List, retry: bool = True
+    ) -> List:
+        """
+        POST items in bulk_size chunks, pipelined
+
+        Returns:
+            ``(chunk, response or exception)`` pairs in order; a failed chunk
+            does not discard the others, whose items the server already applied
+        """
+        chunks = [
+            items[i : i + self.bulk_size] for i in range(0, len(items), self.bulk_size)
+        ]
+        responses = await self.pipeline(
+            (
+                functools.partial(
+                    self._make_request, "POST", endpoint, {key: chunk}, retry=retry
+                )
+                for chunk in chunks
+            ),
+            return_exceptions=True,
+        )
+        return list(zip(chunks, responses))
+
+    async def _bulk_results(
+        self, endpoint: str, key: str, items: List, retry: bool = True
+    ) -> MCPResponse:
+        start_time = time.time()
+        results = []
+        for chunk, response in await self._bulk_request(endpoint, key, items, retry):
+            if isinstance(response, BaseException):
+                results.extend({"ok": False, "error": str(response)} for _ in chunk)
+            else:
+                results.extend(response.data["results"])
+        return MCPResponse(
+            success=all(r.get("ok") for r in results),
+            data={"results": results},
+            response_time=time.time() - start_time,
+        )
+
     # Status and Health Endpoints
 
     async def get_status(self) -> MCPResponse:
@@ -258,6 +351,61 @@ class MCPClient:
         """Cancel a running task"""
         return await self._make_request("POST", f"/tasks/{task_id}/cancel")
 
+    # Bulk Endpoints
+
+    async def register_agents(self, agents: List[Dict]) -> MCPResponse:
+        """
+        Register many agents
+
+        Args:
+            agents: ``{"agent": name, "capabilities": [...]}`` items
+
+        Returns:
+            ``data["results"]`` holds one ``{"ok": ...}`` entry per agent, in order
+        """
+        return await self._bulk_results("/bulk/register", "agents", agents)
+
+    async def submit_tasks(self, tasks: List[Dict]) -> MCPResponse:
+        """
+        Queue many tasks
+
+        Args:
+            tasks: ``{"agent", "command", "project", "execute"}`` items as for /run
+
+        Returns:
+            ``data["results"]`` holds one entry per task with its ``task_id`` or
+            ``error``, in order. Chunks are not retried, since a request that
+            timed out may still have queued its tasks.
+        """
+        return await self._bulk_results("/bulk/run", "tasks", tasks, retry=False)
+
+    async def get_task_statuses(self, task_ids: List[str]) -> MCPResponse:
+        """
+        Look up many tasks
+
+        Returns:
+            ``data["tasks"]`` maps each id to its task, or None if unknown;
+            ids whose request failed are in ``data["errors"]`` instead
+        """
+        start_time = time.time()
+        tasks: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for chunk, response in await self._bulk_request(
+            "/bulk/status", "task_ids", task_ids
+        ):
+            if isinstance(response, BaseException):
+                errors.update((task_id, str(response)) for task_id in chunk)
+            else:
+                tasks.update(response.data["tasks"])
+        data: Dict[str, Any] = {"tasks": tasks}
+        if errors:
+            data["errors"] = errors
+        return MCPResponse(
+            success=not errors,
+            data=data,
+            response_time=time.time() - start_time,
+        )
+
     # AI Endpoints
 
     async def analyze_code(self, code: str, language: str = "python") -> MCPResponse:
@@ -331,6 +479,55 @@ class MCPClient:
             loop.close()
 
 
+class MCPSyncClient:
+    """
+    Blocking facade over MCPClient
+
+    Keeps one event loop and connection pool for its whole lifetime, so
+    synchronous batch integrations reuse connections between calls. Every
+    coroutine method of MCPClient is available as a blocking method.
+
+    Usage:
+        with MCPSyncClient(base_url="http://localhost:5005") as client:
+            results = client.submit_tasks(tasks).data["results"]
+    """
+
+    def __init__(self, **kwargs):
+        self._client = MCPClient(**kwargs)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __enter__(self):
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._client.__aenter__())
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close the connection pool and the event loop"""
+        if self._loop is None:
+            return
+        try:
+            self._loop.run_until_complete(self._client.__aexit__(None, None, None))
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            if self._loop is None:
+                raise MCPError("MCPSyncClient must be used as a context manager")
+            return self._loop.run_until_complete(attr(*args, **kwargs))
+
+        return call
+
+
 # Convenience functions for quick usage
 
 
@@ -142,6 +142,75 @@ class TestCLInterface:
         assert "MCP Python SDK CLI" in output
 
 
+class TestBulkOperations:
+    """Bulk endpoints, pipelining and the sync facade"""
+
+    @pytest.mark.asyncio
+    async def test_pipeline_bounds_concurrency_and_keeps_order(self):
+        """pipeline never exceeds its concurrency and returns results in order"""
+        client = MCPClient(max_connections=3)
+        in_flight = 0
+        peak = 0
+
+        async def call(i):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001 * (10 - i))
+            in_flight -= 1
+            return i
+
+        results = await client.pipeline(lambda i=i: call(i) for i in range(10))
+        assert results == list(range(10))
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_submit_tasks_chunks_and_merges_results(self):
+        """Bulk methods split items into bulk_size requests and merge results"""
+        from mcp_sdk import MCPResponse
+
+        client = MCPClient(bulk_size=2)
+        sent = []
+
+        async def fake_request(method, endpoint, data=None, params=None, retry=True):
+            sent.append((endpoint, data["tasks"]))
+            assert retry is False
+            if data["tasks"][0]["project"] == "2":
+                raise MCPAPIError("rate_limited", 429)
+            results = [{"ok": True, "task_id": t["project"]} for t in data["tasks"]]
+            return MCPResponse(success=True, data={"results": results})
+
+        client._make_request = fake_request
+        tasks = [
+            {"agent": "a", "command": "analyze", "project": str(i)} for i in range(5)
+        ]
+        response = await client.submit_tasks(tasks)
+
+        assert [len(chunk) for _, chunk in sent] == [2, 2, 1]
+        assert all(endpoint == "/bulk/run" for endpoint, _ in sent)
+        # The rejected chunk is reported per item without losing the others
+        results = response.data["results"]
+        assert [r.get("task_id") for r in results] == ["0", "1", None, None, "4"]
+        assert results[2] == {"ok": False, "error": "rate_limited"}
+        assert response.success is False
+
+    def test_sync_client_wraps_coroutines(self):
+        """MCPSyncClient runs coroutine methods on its own loop"""
+        from mcp_sdk import MCPResponse, MCPSyncClient
+
+        with MCPSyncClient(base_url="http://localhost:1") as client:
+
+            async def fake_request(method, endpoint, data=None, params=None, **kw):
+                return MCPResponse(success=True, data={"tasks": {"t": None}})
+
+            client._client._make_request = fake_request
+            assert client.get_task_statuses(["t"]).data == {"tasks": {"t": None}}
+            assert client.base_url == "http://localhost:1"
+
+        with pytest.raises(MCPError):
+            client.get_status()
+
+
 class TestIntegration:
     """Integration tests that require MCP server to be running"""
 
@@ -4,71 +4,152 @@
 import subprocess
 import json
 import os
+import re
 import sys
+import tempfile
 import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import argparse
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from flaky_test_history import OutcomeHistory  # noqa: E402
+
+# Node IDs per re-run invocation; keeps command lines short and spreads
+# large re-run sets over several workers
+RERUN_CHUNK_SIZE = 50
+
+_STDOUT_RESULT = re.compile(
+    r"^(\S+::\S+)\s+(PASSED|FAILED|ERROR|SKIPPED|XFAIL|XPASS)\b"
+)
+
 
 class FlakyTestDetector:
     """Detect and manage flaky tests."""
 
-    def __init__(self, test_dir="tests", runs=5, threshold=0.02):
+    def __init__(self, test_dir="tests", runs=5, threshold=0.02, workers=None):
         """
         Initialize flaky test detector.
 
         Args:
             test_dir: Directory containing tests
-            runs: Number of times to run each test
+            runs: Number of times to re-run each failing or suspect test
             threshold: Failure rate threshold for flakiness (2%)
+            workers: Parallel pytest processes for re-runs (default: CPU count)
         """
         self.test_dir = Path(test_dir)
         self.runs = runs
         self.threshold = threshold
+        self.workers = workers or os.cpu_count() or 1
         self.results_file = self.test_dir / "flaky_test_results.json"
         self.quarantine_file = self.test_dir / "quarantine_tests.json"
+        self.history_file = self.test_dir / "flaky_test_history.json"
 
     def run_test_suite(self):
-        """Run the test suite multiple times and collect results."""
-        print(f"Running test suite {self.runs} times to detect flaky tests...")
-
-        all_results = []
-
-        for run in range(self.runs):
-            print(f"\n--- Run {run + 1}/{self.runs} ---")
-            start_time = time.time()
-
-            # Run pytest and capture output
-            result = subprocess.run(
-                [
-                    "python",
-                    "-m",
-                    "pytest",
-                    str(self.test_dir),
-                    "--tb=no",  # Minimal traceback
-                    "--json-report",
-                    "--json-report-file=temp_results.json",
-                ],
-                capture_output=True,
-                text=True,
-                cwd=self.test_dir.parent,
-            )
-
-            end_time = time.time()
-            duration = end_time - start_time
-
-            # Parse results
-            run_results = self._parse_pytest_results(run, result, duration)
-            all_results.append(run_results)
-
-            print(f"Run {run + 1} completed in {duration:.2f}s")
+        """
+        Run the suite once, then re-run only failing or suspect tests.
 
+        Suspects are tests that failed within the outcome history window or
+        are currently quarantined. Re-runs are split into chunks of node IDs
+        and executed as parallel pytest processes.
+        """
+        print("Running full test suite once...")
+        baseline = self._run_pytest(0, [str(self.test_dir)])
+        print(
+            f"Baseline run completed in {baseline['duration']:.2f}s "
+            f"({len(baseline['tests'])} tests)"
+        )
+
+        history = OutcomeHistory.load(self.history_file)
+        history.record({t["nodeid"]: t["outcome"] for t in baseline["tests"]})
+        history.save(self.history_file)
+
+        targets = self._select_rerun_targets(baseline, history)
+        if not targets or self.runs < 1:
+            print("No failing or suspect tests to re-run")
+            return [baseline]
+
+        chunks = [
+            targets[i : i + RERUN_CHUNK_SIZE]
+            for i in range(0, len(targets), RERUN_CHUNK_SIZE)
+        ]
+        print(
+            f"Re-running {len(targets)} failing or suspect tests {self.runs} times "
+            f"with {self.workers} workers..."
+        )
+
+        all_results = [baseline]
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(self._run_pytest, run, chunk)
+                for run in range(1, self.runs + 1)
+                for chunk in chunks
+            ]
+            for future in as_completed(futures):
+                all_results.append(future.result())
+
+        all_results.sort(key=lambda r: r["run"])
+        print(f"Re-runs completed in {time.time() - start_time:.2f}s")
         return all_results
 
-    def _parse_pytest_results(self, run_number, result, duration):
+    def _select_rerun_targets(self, baseline, history):
+        """Failing tests plus collected tests with recent failures or quarantine."""
+        collected = {t["nodeid"] for t in baseline["tests"]}
+        targets = {
+            t["nodeid"]
+            for t in baseline["tests"]
+            if t["outcome"] in ("failed", "error")
+        }
+        targets.update(history.suspects())
+
+        if self.quarantine_file.exists():
+            try:
+                with open(self.quarantine_file, "r") as f:
+                    quarantined = json.load(f).get("tests", [])
+                targets.update(t["nodeid"] for t in quarantined)
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                pass
+
+        # Unknown node IDs would make pytest abort the whole invocation
+        return sorted(targets & collected)
+
+    def _run_pytest(self, run_number, targets):
+        """Run pytest on targets with a private JSON report file."""
+        fd, report_path = tempfile.mkstemp(prefix="flaky_run_", suffix=".json")
+        os.close(fd)
+        os.unlink(report_path)
+
+        start_time = time.time()
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "pytest",
+                *targets,
+                "-v",
+                "--tb=no",  # Minimal traceback
+                "-p",
+                "no:cacheprovider",  # Parallel runs must not race on .pytest_cache
+                "--json-report",
+                f"--json-report-file={report_path}",
+            ],
+            capture_output=True,
+            text=True,
+            cwd=self.test_dir.parent,
+        )
+        duration = time.time() - start_time
+
+        return self._parse_pytest_results(
+            run_number, result, duration, Path(report_path)
+        )
+
+    def _parse_pytest_results(self, run_number, result, duration, results_file=None):
         """Parse pytest JSON results."""
-        results_file = self.test_dir.parent / "temp_results.json"
+        if results_file is None:
+            results_file = self.test_dir.parent / "temp_results.json"
 
         try:
             if results_file.exists():
@@ -117,17 +198,13 @@ class FlakyTestDetector:
         lines = stdout.split("\n")
 
         for line in lines:
-            if line.startswith("tests/") or line.startswith("::"):
-                # Extract test name and outcome
-                parts = line.split()
-                if len(parts) >= 2:
-                    nodeid = parts[0]
-                    outcome = (
-                        "passed"
-                        if "PASSED" in line
-                        else "failed" if "FAILED" in line else "unknown"
-                    )
-                    tests.append({"nodeid": nodeid, "outcome": outcome, "duration": 0})
+            # Verbose lines look like "tests/test_x.py::test_y PASSED [ 50%]"
+            match = _STDOUT_RESULT.match(line)
+            if match:
+                nodeid, outcome = match.groups()
+                tests.append(
+                    {"nodeid": nodeid, "outcome": outcome.lower(), "duration": 0}
+                )
 
         return {"tests": tests}
 
@@ -293,16 +370,24 @@ def skip_quarantined_tests(request):
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(description="Detect flaky tests")
-    parser.add_argument("--runs", type=int, default=5, help="Number of test runs")
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Re-runs per failing or suspect test"
+    )
     parser.add_argument(
         "--threshold", type=float, default=0.02, help="Flakiness threshold"
     )
     parser.add_argument("--test-dir", default="tests", help="Test directory")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Parallel re-run processes"
+    )
 
     args = parser.parse_args()
 
     detector = FlakyTestDetector(
-        test_dir=args.test_dir, runs=args.runs, threshold=args.threshold
+        test_dir=args.test_dir,
+        runs=args.runs,
+        threshold=args.threshold,
+        workers=args.workers,
     )
 
     # Run detection
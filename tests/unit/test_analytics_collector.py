@@ -0,0 +1,30 @@
+"""Unit tests for the incremental analytics collector."""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "agents"))
+
+import analytics_collector  # noqa: E402
+
+
+def test_fix_history_dict_is_counted_and_rewrites_are_picked_up(tmp_path, monkeypatch):
+    monkeypatch.setattr(analytics_collector, "KNOWLEDGE_DIR", str(tmp_path))
+    state_path = str(tmp_path / "analytics_state.json")
+    history_path = tmp_path / "fix_history.json"
+
+    # DecisionEngine layout: a dict keyed by fix id
+    fixes = {
+        "fix-1": {"error_pattern": "timeout", "success": True},
+        "fix-2": {"error_pattern": "import", "success": False},
+    }
+    history_path.write_text(json.dumps(fixes))
+    metrics = analytics_collector.collect_metrics(state_path)
+    assert metrics["learning_velocity_per_week"] == 2
+
+    # Compaction rewrites the file in place
+    fixes["fix-3"] = {"error_pattern": "timeout", "success": True}
+    history_path.write_text(json.dumps(fixes, indent=2))
+    metrics = analytics_collector.collect_metrics(state_path)
+    assert metrics["learning_velocity_per_week"] == 3
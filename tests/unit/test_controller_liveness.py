@@ -0,0 +1,45 @@
+"""Unit tests for the controller liveness table."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from controller_liveness import NEW, PROJECT_CHANGED, REVIVED, LivenessTable
+
+
+def test_only_liveness_transitions_bump_the_version():
+    table = LivenessTable(stale_after=10, tick=1)
+    assert table.beat("a", "P", now=100.0) == NEW
+    assert table.version == 1
+
+    # Routine heartbeats update the timestamp and nothing else
+    assert table.beat("a", "P", now=105.0) is None
+    assert table.version == 1
+    assert table.controllers()[0]["last_heartbeat"] == 105.0
+
+    assert table.beat("a", "Q", now=106.0) == PROJECT_CHANGED
+    assert table.version == 2
+    assert table.alive == 1
+
+
+def test_expiry_wheel_marks_silent_agents_stale():
+    table = LivenessTable(stale_after=10, tick=1)
+    table.advance(now=100.0)
+    table.beat("quiet", now=100.0)
+    table.beat("busy", now=100.0)
+    for ts in range(102, 120, 3):
+        table.beat("busy", now=float(ts))
+        expired = table.advance(now=float(ts))
+        if ts < 111:
+            assert expired == []
+
+    states = {entry["agent"]: entry["alive"] for entry in table.controllers()}
+    assert states == {"quiet": False, "busy": True}
+    assert table.alive == 1
+
+    # A long idle gap expires the rest, and a new beat revives it
+    assert [e["agent"] for e in table.advance(now=10_000.0)] == ["busy"]
+    assert table.beat("busy", now=10_001.0) == REVIVED
+    assert table.advance(now=10_005.0) == []
+    assert table.alive == 1
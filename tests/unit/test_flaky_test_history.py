@@ -0,0 +1,64 @@
+"""Unit tests for the rolling test outcome history."""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from flaky_test_history import OutcomeHistory
+
+
+def test_rates_and_recent_outcomes():
+    history = OutcomeHistory(window=4)
+    for outcome in ["passed", "failed", "skipped", "failed", "passed"]:
+        history.record({"t": outcome})
+
+    # Oldest run fell out of the window
+    assert history.runs == 4
+    assert history.failure_rate("t") == 0.5
+    assert history.pass_rate("t") == 0.25
+    assert history.recent_outcomes("t") == ["failed", "missing", "failed", "passed"]
+    assert history.suspects() == ["t"]
+
+
+def test_errors_count_as_neither_failure_nor_pass():
+    history = OutcomeHistory(window=4)
+    for outcome in ["failed", "error", "passed"]:
+        history.record({"t": outcome})
+
+    assert history.failure_rate("t") == 1 / 3
+    assert history.pass_rate("t") == 1 / 3
+    assert history.recent_outcomes("t") == ["failed", "missing", "passed"]
+
+    history = OutcomeHistory()
+    history.record({"only_errors": "error"})
+    assert history.suspects() == []
+
+
+def test_tests_without_outcomes_in_window_are_dropped():
+    history = OutcomeHistory(window=2)
+    history.record({"gone": "failed"})
+    history.record({"other": "passed"})
+    history.record({"other": "passed"})
+
+    assert "gone" not in history.tests
+    assert history.suspects() == []
+
+
+def test_save_load_and_legacy_migration(tmp_path):
+    path = tmp_path / "history.json"
+    history = OutcomeHistory()
+    history.record({"a": "failed", "b": "passed"})
+    history.save(path)
+    assert OutcomeHistory.load(path).to_dict() == history.to_dict()
+
+    legacy = {
+        "2026-01-01T00:00:00": {"a": "passed"},
+        "2026-01-02T00:00:00": {"a": "failed", "b": "passed"},
+    }
+    path.write_text(json.dumps(legacy))
+    migrated = OutcomeHistory.load(path)
+    assert migrated.runs == 2
+    assert migrated.recent_outcomes("a") == ["passed", "failed"]
+    assert migrated.recent_outcomes("b") == ["missing", "passed"]
@@ -0,0 +1,89 @@
+"""Unit tests for the resident intelligence daemon."""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+AGENTS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "agents")
+sys.path.insert(0, AGENTS_DIR)
+
+import intelligence_daemon  # noqa: E402
+import prediction_engine  # noqa: E402
+from intelligence_client import DAEMON_ENV, SOCKET_ENV, send_request  # noqa: E402
+
+STDIN_TOOL = """
+import subprocess
+import sys
+
+
+def main():
+    if sys.argv[1:] == ["child"]:
+        sys.stdout.flush()
+        subprocess.run(["cat"], check=True)
+    else:
+        print(sys.stdin.read().upper(), end="")
+"""
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    (tmp_path / "stdin_tool.py").write_text(STDIN_TOOL)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setitem(intelligence_daemon.TOOLS, "stdin_tool", ("stdin_tool", None))
+
+    path = str(tmp_path / "daemon.sock")
+    server = intelligence_daemon.IntelligenceServer(
+        path, intelligence_daemon.IntelligenceHost()
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _run(server, argv, stdin_path):
+    with open(stdin_path) as stdin:
+        return send_request(
+            {"tool": "stdin_tool", "argv": argv, "cwd": os.getcwd()},
+            path=server.server_address,
+            fds=[stdin.fileno()],
+        )
+
+
+def test_caller_stdin_reaches_tool_and_child_processes(daemon, tmp_path):
+    stdin_path = tmp_path / "input.txt"
+    stdin_path.write_text("a.py\nb.py\n")
+
+    response = _run(daemon, [], stdin_path)
+    assert response == {"stdout": "A.PY\nB.PY\n", "stderr": "", "exit_code": 0}
+
+    response = _run(daemon, ["child"], stdin_path)
+    assert response == {"stdout": "a.py\nb.py\n", "stderr": "", "exit_code": 0}
+
+
+def test_analyze_batch_reads_piped_paths_through_daemon(daemon, tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        prediction_engine, "PREDICTIONS_FILE", tmp_path / "predictions.json"
+    )
+    env = dict(os.environ, **{SOCKET_ENV: daemon.server_address, DAEMON_ENV: "1"})
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            os.path.join(AGENTS_DIR, "prediction_engine.py"),
+            "analyze-batch",
+            "-",
+        ],
+        input="a.py\nb.py\n",
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    assert json.loads(result.stdout)["summary"]["total_files"] == 2
+    assert daemon.host.stats["prediction_engine"]["calls"] == 1
@@ -0,0 +1,118 @@
+"""Unit tests for the plugin event bus."""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from plugin_event_bus import DROP_NEWEST, PluginEventBus
+
+
+def wait_for(predicate, timeout=2.0):
+    """Poll until predicate() is true or timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture
+def bus():
+    bus = PluginEventBus()
+    yield bus
+    bus.shutdown(timeout=1.0)
+
+
+def test_publish_does_not_wait_for_slow_subscriber(bus):
+    """A slow plugin must not add latency to the publisher."""
+    release = threading.Event()
+    received = []
+    bus.subscribe("slow", lambda event, data: release.wait(2.0))
+    bus.subscribe("fast", lambda event, data: received.append(data["n"]))
+
+    started = time.monotonic()
+    for n in range(5):
+        bus.publish("agent_heartbeat", {"n": n})
+    assert time.monotonic() - started < 0.5
+
+    assert wait_for(lambda: received == [0, 1, 2, 3, 4])
+    release.set()
+
+
+def test_event_type_filter(bus):
+    received = []
+    bus.subscribe(
+        "tasks", lambda event, data: received.append(event), event_types=["task_queued"]
+    )
+
+    assert bus.publish("agent_heartbeat", {}) == 0
+    assert bus.publish("task_queued", {}) == 1
+    assert wait_for(lambda: received == ["task_queued"])
+
+
+def test_drop_newest_policy_counts_drops(bus):
+    release = threading.Event()
+    bus.subscribe(
+        "blocked",
+        lambda event, data: release.wait(2.0),
+        queue_size=1,
+        batch_size=1,
+        policy=DROP_NEWEST,
+    )
+
+    for n in range(5):
+        bus.publish("event", {"n": n})
+    release.set()
+
+    metrics = bus.get_metrics()["blocked"]
+    assert metrics["published"] == 5
+    assert metrics["dropped"] >= 3
+
+
+def test_errors_are_isolated_and_counted(bus):
+    def broken(event, data):
+        raise RuntimeError("plugin failure")
+
+    bus.subscribe("broken", broken)
+    bus.publish("event", {})
+
+    assert wait_for(lambda: bus.get_metrics()["broken"]["errors"] == 1)
+    assert bus.get_metrics()["broken"]["last_error"] == "plugin failure"
+
+
+def test_repeated_timeouts_suspend_subscriber(bus):
+    bus.subscribe(
+        "sluggish",
+        lambda event, data: time.sleep(0.02),
+        timeout=0.001,
+        max_consecutive_timeouts=2,
+        batch_size=1,
+    )
+    bus.publish("event", {})
+    bus.publish("event", {})
+
+    assert wait_for(lambda: bus.get_metrics()["sluggish"]["suspended"])
+    bus.publish("event", {})
+    assert bus.get_metrics()["sluggish"]["dropped"] >= 1
+
+
+def test_batch_handler_receives_batches(bus):
+    batches = []
+    gate = threading.Event()
+
+    def first(events):
+        gate.wait(2.0)
+        batches.append(len(events))
+
+    bus.subscribe("batched", batch_handler=first, batch_size=10)
+    for n in range(4):
+        bus.publish("event", {"n": n})
+    gate.set()
+
+    assert wait_for(lambda: sum(batches) == 4)
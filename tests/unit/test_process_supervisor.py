@@ -0,0 +1,71 @@
+"""Unit tests for the event-driven agent process supervisor."""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "agents"))
+
+import agent_recovery  # noqa: E402
+import process_supervisor  # noqa: E402
+from agent_recovery import auto_scale_plan  # noqa: E402
+from process_supervisor import ProcessSupervisor, agent_running  # noqa: E402
+
+
+def test_auto_scale_plan_follows_depth_and_drain_rate():
+    assert auto_scale_plan(999, {"build": 999}, None, threshold=1000) == {}
+    # Backlog drains within the target time: no extra workers
+    assert auto_scale_plan(1200, {"build": 1200}, 100.0, threshold=1000) == {}
+
+    plan = auto_scale_plan(1200, {"build": 700, "agent_debug": 500}, 0.0, 1000)
+    assert plan["agent_build.sh"] == 3
+    assert plan["agent_debug.sh"] == 2
+    assert plan["agent_codegen.sh"] == 1
+
+
+def test_unsupervised_agents_fall_back_to_pid_probe(monkeypatch):
+    state = {"agents": {"agent_build.sh": {"workers": [{"pid": 4242}, {"pid": None}]}}}
+    monkeypatch.setattr(process_supervisor, "send_to_supervisor", lambda *a, **k: state)
+    supervised = process_supervisor.supervised_pids()
+    assert supervised["agent_build"] == {4242}
+
+    # Owned agents are judged by the supervisor, others by kill -0
+    assert not agent_running("agent_build", os.getpid(), supervised)
+    assert agent_running("agent_build.sh", 4242, supervised)
+    assert agent_running("LearningAgent", os.getpid(), supervised)
+    assert not agent_running("LearningAgent", 0, supervised)
+
+
+def test_crashed_worker_is_reaped_and_restarted_with_backoff(tmp_path, monkeypatch):
+    (tmp_path / "agent_flaky.sh").write_text("exit 3\n")
+    monkeypatch.setattr(agent_recovery, "AGENTS_DIR", tmp_path)
+    monkeypatch.setattr(agent_recovery, "LOGS_DIR", tmp_path / "logs")
+    monkeypatch.setattr(agent_recovery, "STATUS_PATH", tmp_path / "status.json")
+    monkeypatch.setattr(process_supervisor, "QUEUE_PATH", tmp_path / "queue.json")
+    monkeypatch.setattr(process_supervisor, "METRICS_STATE_PATH", tmp_path / "m.json")
+
+    supervisor = ProcessSupervisor(["agent_flaky.sh"])
+    try:
+        supervisor.reconcile()
+        worker = supervisor.workers["agent_flaky.sh"][0]
+        assert worker.running
+
+        deadline = time.monotonic() + 5
+        while worker.running and time.monotonic() < deadline:
+            if supervisor.use_pidfd:
+                for key, _ in supervisor.selector.select(0.1):
+                    key.data()
+            else:
+                worker.process.wait(1)
+                supervisor._on_exit(worker)
+
+        assert worker.last_exit == 3
+        assert worker.state == "backoff"
+        assert worker.failures == 1
+        assert worker.restart_at > time.monotonic()
+
+        state = supervisor.status()["agents"]["agent_flaky.sh"]
+        assert state["desired"] == 1
+        assert state["workers"][0]["last_exit"] == 3
+    finally:
+        supervisor.shutdown()
@@ -0,0 +1,86 @@
+"""Unit tests for MCP request telemetry."""
+
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from request_telemetry import (
+    UNMATCHED_ROUTE,
+    HistogramFamily,
+    RequestTelemetry,
+    trace_id_for,
+)
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = HistogramFamily("latency", "test", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        hist.observe(value, "/a")
+
+    data = hist.collect()[("/a",)]
+    assert data["buckets"] == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+    assert data["count"] == 4
+    assert abs(data["sum"] - 2.65) < 1e-9
+    assert 'latency_bucket{route="/a",le="+Inf"} 4' in hist.render()
+
+
+def test_concurrent_observations_are_not_lost():
+    hist = HistogramFamily("latency", "test")
+
+    def worker():
+        for _ in range(5000):
+            hist.observe(0.01)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert hist.collect()[()]["count"] == 20000
+
+
+def test_unknown_routes_share_one_label():
+    telemetry = RequestTelemetry()
+    telemetry.observe_request("GET", "/random-1", 404, 0, 1000)
+    telemetry.observe_request("GET", "/random-2", 404, 0, 1000)
+
+    assert telemetry.requests.collect() == {("GET", UNMATCHED_ROUTE, "404"): 2}
+
+
+def test_route_table_decides_labels_regardless_of_status():
+    telemetry = RequestTelemetry(known_route=lambda path: path == "/execute_task")
+    telemetry.observe_request("POST", "/made-up", 400, 0, 1000)
+    telemetry.observe_request("POST", "/made-up-too", 500, 0, 1000)
+    telemetry.observe_request("POST", "/execute_task", 404, 0, 1000)
+
+    assert telemetry.requests.collect() == {
+        ("POST", UNMATCHED_ROUTE, "400"): 1,
+        ("POST", UNMATCHED_ROUTE, "500"): 1,
+        ("POST", "/execute_task", "404"): 1,
+    }
+
+
+def test_task_lifecycle_spans_exported_as_jsonl(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    telemetry = RequestTelemetry(span_target=f"jsonl:{path}")
+    correlation_id = "1b4e28ba-2fa1-11d2-883f-0016d3cca427"
+    task = {
+        "id": "t1",
+        "command": "status",
+        "status": "running",
+        "queued_at": 1.0,
+        "correlation_id": correlation_id,
+    }
+    telemetry.task_started(task)
+    task["status"] = "success"
+    telemetry.task_finished(task)
+    telemetry.exporter.shutdown()
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [s["name"] for s in spans] == ["task.queue status", "task.run status"]
+    assert {s["trace_id"] for s in spans} == {trace_id_for(correlation_id)}
+    assert telemetry.task_run.collect()[("status", "success")]["count"] == 1
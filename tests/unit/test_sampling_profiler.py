@@ -0,0 +1,61 @@
+"""Unit tests for the on-demand sampling profiler."""
+
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from sampling_profiler import ProfilerAdmin, SamplingProfiler
+
+
+def _spin_until(event):
+    while not event.is_set():
+        sum(range(1000))
+
+
+def test_collapsed_stacks_and_thread_report():
+    profiler = SamplingProfiler()
+    done = threading.Event()
+    worker = threading.Thread(target=_spin_until, args=(done,), name="spinner")
+    worker.start()
+    try:
+        profiler.start(interval=0.001, duration=10)
+        time.sleep(0.3)
+        status = profiler.stop()
+    finally:
+        done.set()
+        worker.join()
+
+    assert not status["running"]
+    assert status["samples"] > 0
+    spinner = [t for t in status["threads"] if t["name"] == "spinner"]
+    assert spinner and spinner[0]["samples"] > 0
+
+    lines = profiler.collapsed().splitlines()
+    spinner_lines = [line for line in lines if line.startswith("spinner;")]
+    assert any(
+        "_spin_until (test_sampling_profiler.py:" in line for line in spinner_lines
+    )
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_admin_routes_require_configured_token():
+    disabled = ProfilerAdmin(SamplingProfiler(), token="")
+    status, _, _ = disabled.handle("GET", "/admin/profiler/status", "", {})
+    assert status == 404
+
+    admin = ProfilerAdmin(SamplingProfiler(), token="secret")
+    assert admin.handle("GET", "/admin/profiler/status", "", {})[0] == 401
+    bearer = {"Authorization": "Bearer secret"}
+    assert admin.handle("POST", "/admin/profiler/status", "", bearer)[0] == 405
+    assert admin.handle("POST", "/admin/profiler/start", "interval=x", bearer)[0] == 400
+
+    status, content_type, body = admin.handle(
+        "GET", "/admin/profiler/status", "", {"X-Admin-Token": "secret"}
+    )
+    assert status == 200
+    assert content_type == "application/json"
+    assert json.loads(body)["running"] is False
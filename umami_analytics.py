@@ -8,10 +8,188 @@ import os
 import json
 import subprocess
 import requests
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+from datetime import date, datetime, timedelta
 import time
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+class DailyEventStore:
+    """Day-partitioned event segments with incrementally maintained counters
+
+    Events are appended to ``<events_dir>/events-YYYY-MM-DD.jsonl``. Per-day,
+    per-website counters are kept next to each segment together with the byte
+    offset they cover, so a stats query only parses lines appended since the
+    last query and closed days cost a dictionary lookup.
+    """
+
+    def __init__(self, events_dir: str = "umami_events", legacy_log: str = None):
+        self.events_dir = events_dir
+        self.legacy_log = legacy_log
+        self._counters: Dict[str, Dict] = {}  # day -> {"offset", "websites"}
+
+    def _segment_path(self, day: str) -> str:
+        return os.path.join(self.events_dir, f"events-{day}.jsonl")
+
+    def _counters_path(self, day: str) -> str:
+        return os.path.join(self.events_dir, f"stats-{day}.json")
+
+    @staticmethod
+    def _event_day(event: Dict) -> str:
+        # ISO timestamps start with the date, so no datetime parsing is needed
+        return str(event.get("timestamp", ""))[:10]
+
+    def append(self, event: Dict) -> None:
+        """Append an event to its day segment"""
+        os.makedirs(self.events_dir, exist_ok=True)
+        with open(self._segment_path(self._event_day(event)), "a") as f:
+            f.write(json.dumps(event) + "\n")
+
+    def migrate_legacy_log(self) -> None:
+        """Split a single legacy event log into day segments (once)"""
+        if not self.legacy_log or not os.path.exists(self.legacy_log):
+            return
+
+        os.makedirs(self.events_dir, exist_ok=True)
+        # Managers starting together must not both append the legacy events
+        with open(os.path.join(self.events_dir, ".migrate.lock"), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            self._migrate_legacy_log_locked()
+
+    def _migrate_legacy_log_locked(self) -> None:
+        marker = os.path.join(self.events_dir, ".legacy-migrated")
+        if not os.path.exists(self.legacy_log):
+            return
+        if os.path.exists(marker):
+            # Segments were written but the log was not renamed yet
+            os.replace(self.legacy_log, self.legacy_log + ".migrated")
+            return
+
+        segments: Dict[str, List[str]] = {}
+        with open(self.legacy_log, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                segments.setdefault(self._event_day(event), []).append(line)
+
+        for day, lines in segments.items():
+            with open(self._segment_path(day), "a") as f:
+                f.write("\n".join(lines) + "\n")
+
+        with open(marker, "w") as f:
+            f.write(datetime.now().isoformat() + "\n")
+        os.replace(self.legacy_log, self.legacy_log + ".migrated")
+        self._counters.clear()
+
+    def _load_counters(self, day: str) -> Dict:
+        counters = self._counters.get(day)
+        if counters is not None:
+            return counters
+
+        counters = {"offset": 0, "websites": {}}
+        try:
+            with open(self._counters_path(day), "r") as f:
+                stored = json.load(f)
+            counters["offset"] = stored.get("offset", 0)
+            for website_id, site in stored.get("websites", {}).items():
+                counters["websites"][website_id] = {
+                    "total": site.get("total", 0),
+                    "event_types": site.get("event_types", {}),
+                    "visitors": set(site.get("visitors", [])),
+                }
+        except (OSError, json.JSONDecodeError):
+            pass
+
+        self._counters[day] = counters
+        return counters
+
+    def _save_counters(self, day: str, counters: Dict) -> None:
+        stored = {
+            "offset": counters["offset"],
+            "websites": {
+                website_id: {
+                    "total": site["total"],
+                    "event_types": site["event_types"],
+                    "visitors": sorted(site["visitors"]),
+                }
+                for website_id, site in counters["websites"].items()
+            },
+        }
+        tmp_path = self._counters_path(day) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(stored, f)
+        os.replace(tmp_path, self._counters_path(day))
+
+    def day_stats(self, day: str) -> Dict[str, Dict]:
+        """Per-website counters for one day, folding in any new events"""
+        counters = self._load_counters(day)
+        segment = self._segment_path(day)
+
+        try:
+            size = os.path.getsize(segment)
+        except OSError:
+            return counters["websites"]
+
+        if size < counters["offset"]:
+            # Segment was truncated or replaced; rebuild from scratch
+            counters = {"offset": 0, "websites": {}}
+            self._counters[day] = counters
+
+        if size == counters["offset"]:
+            return counters["websites"]
+
+        with open(segment, "rb") as f:
+            f.seek(counters["offset"])
+            chunk = f.read(size - counters["offset"])
+
+        # Only fold complete lines; a partially written tail is picked up next time
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            try:
+                event = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            site = counters["websites"].setdefault(
+                event.get("website_id"),
+                {"total": 0, "event_types": {}, "visitors": set()},
+            )
+            site["total"] += 1
+            event_type = event.get("event_type", "unknown")
+            site["event_types"][event_type] = site["event_types"].get(event_type, 0) + 1
+            site["visitors"].add(event.get("ip"))
+
+        if end:
+            counters["offset"] += end
+            try:
+                self._save_counters(day, counters)
+            except OSError as e:
+                print(f"Error saving event counters: {e}")
+
+        return counters["websites"]
+
+    def iter_events(self, days: List[str]) -> Iterator[Dict]:
+        """Yield raw events from the given day segments"""
+        for day in days:
+            segment = self._segment_path(day)
+            if not os.path.exists(segment):
+                continue
+            with open(segment, "r") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+
 
 class UmamiAnalyticsManager:
     """Manage Umami analytics server and data collection"""
@@ -24,6 +202,10 @@ class UmamiAnalyticsManager:
         self.container_name = "umami-analytics"
         self.base_url = f"http://localhost:{port}"
         self.api_url = f"{self.base_url}/api"
+        self.event_store = DailyEventStore(
+            events_dir="umami_events", legacy_log="umami_events.log"
+        )
+        self.event_store.migrate_legacy_log()
 
     def start_umami_server(self) -> bool:
         """Start the Umami analytics server using Docker"""
@@ -208,12 +390,9 @@ class UmamiAnalyticsManager:
             return False
 
     def _log_event(self, event: Dict) -> None:
-        """Log event to analytics file"""
-        log_file = "umami_events.log"
-
+        """Log event to its day partition"""
         try:
-            with open(log_file, "a") as f:
-                f.write(json.dumps(event) + "\n")
+            self.event_store.append(event)
 
         except Exception as e:
             print(f"Error logging event: {e}")
@@ -221,27 +400,29 @@ class UmamiAnalyticsManager:
     def get_website_stats(self, website_id: str, days: int = 30) -> Dict:
         """Get basic statistics for a website (simulated)"""
         try:
-            # Read events from log file
-            events = self._read_events(website_id, days)
-
-            # Calculate basic stats
-            total_events = len(events)
-            unique_visitors = len(set(e.get("ip") for e in events))
-
-            # Events by type
+            total_events = 0
+            visitors = set()
             event_types = {}
-            for event in events:
-                event_type = event.get("event_type", "unknown")
-                event_types[event_type] = event_types.get(event_type, 0) + 1
+            daily_stats = {}
+
+            # Only the day partitions in range are consulted
+            for day in self._period_days(days):
+                site = self.event_store.day_stats(day).get(website_id)
+                if site is None:
+                    daily_stats[day] = 0
+                    continue
 
-            # Daily breakdown
-            daily_stats = self._calculate_daily_stats(events, days)
+                daily_stats[day] = site["total"]
+                total_events += site["total"]
+                visitors.update(site["visitors"])
+                for event_type, count in site["event_types"].items():
+                    event_types[event_type] = event_types.get(event_type, 0) + count
 
             return {
                 "website_id": website_id,
                 "period_days": days,
                 "total_events": total_events,
-                "unique_visitors": unique_visitors,
+                "unique_visitors": len(visitors),
                 "event_types": event_types,
                 "daily_stats": daily_stats,
                 "generated_at": datetime.now().isoformat(),
@@ -251,52 +432,10 @@ class UmamiAnalyticsManager:
             print(f"Error getting website stats: {e}")
             return {}
 
-    def _read_events(self, website_id: str, days: int) -> List[Dict]:
-        """Read events from log file for the specified website and time period"""
-        log_file = "umami_events.log"
-        cutoff_date = datetime.now() - timedelta(days=days)
-
-        events = []
-
-        try:
-            if os.path.exists(log_file):
-                with open(log_file, "r") as f:
-                    for line in f:
-                        try:
-                            event = json.loads(line.strip())
-                            if (
-                                event.get("website_id") == website_id
-                                and datetime.fromisoformat(event["timestamp"])
-                                > cutoff_date
-                            ):
-                                events.append(event)
-                        except:
-                            continue
-
-        except Exception as e:
-            print(f"Error reading events: {e}")
-
-        return events
-
-    def _calculate_daily_stats(self, events: List[Dict], days: int) -> Dict:
-        """Calculate daily statistics"""
-        daily_stats = {}
-
-        for i in range(days):
-            date = (datetime.now() - timedelta(days=i)).date().isoformat()
-            daily_stats[date] = 0
-
-        for event in events:
-            try:
-                event_date = (
-                    datetime.fromisoformat(event["timestamp"]).date().isoformat()
-                )
-                if event_date in daily_stats:
-                    daily_stats[event_date] += 1
-            except:
-                continue
-
-        return daily_stats
+    def _period_days(self, days: int) -> List[str]:
+        """ISO dates covered by a stats period, most recent first"""
+        today = date.today()
+        return [(today - timedelta(days=i)).isoformat() for i in range(days)]
 
 
 class AgentAnalyticsTracker:
@@ -11,20 +11,28 @@ Features:
 - Real-time status monitoring and reporting
 """
 
+import atexit
+import contextlib
 import json
 import os
 import sys
 import time
 import uuid
+from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Set
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields
 from enum import Enum
 import threading
 import queue
 import requests
 from pathlib import Path
 
+try:
+    import fcntl  # type: ignore
+except ImportError:  # pragma: no cover - fcntl should exist on macOS/Linux
+    fcntl = None  # type: ignore
+
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
@@ -105,15 +113,47 @@ class TodoItem:
             self.metadata = {}
 
 
+# Journal entries before unified_todos.json is rewritten
+JOURNAL_COMPACT_THRESHOLD = 500
+# Maximum age of un-compacted journal entries (seconds)
+COMPACT_INTERVAL = 60
+# Background workers for AI analysis and assignment
+QUEUE_WORKERS = 4
+QUEUE_BATCH_SIZE = 16
+
+INDEXED_FIELDS = ("status", "priority", "category", "assignee")
+TODO_FIELDS = frozenset(f.name for f in fields(TodoItem))
+
+
+def _index_value(todo: TodoItem, field: str):
+    value = getattr(todo, field)
+    return value.value if isinstance(value, Enum) else value
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    return value.timestamp() if value else 0.0
+
+
 class TodoManager:
-    """Unified Todo Management System"""
+    """Unified Todo Management System
+
+    Todos live in memory with secondary indexes on status, priority,
+    category and assignee. Each change is appended to a journal next to
+    unified_todos.json, and the JSON snapshot is rewritten only when the
+    journal is compacted.
+    """
 
     def __init__(self, workspace_root: str = None):
         self.workspace_root = Path(workspace_root or project_root)
         self.todos_file = self.workspace_root / "unified_todos.json"
+        self.journal_file = self.workspace_root / "unified_todos.journal.jsonl"
+        self.journal_lock_file = self.workspace_root / ".unified_todos.lock"
         self.agents_file = self.workspace_root / "todo_agents.json"
         self.queue = queue.Queue()
+        # Guards the in-memory todos and indexes; never held during disk I/O
         self.lock = threading.Lock()
+        # Serializes journal appends and compaction within this process
+        self.io_lock = threading.Lock()
 
         # Initialize MCP client if available
         self.mcp_client = None
@@ -125,39 +165,162 @@ class TodoManager:
 
         # Load existing data
         self.todos: Dict[str, TodoItem] = {}
+        self.indexes: Dict[str, Dict[Any, Set[str]]] = {
+            field: defaultdict(set) for field in INDEXED_FIELDS
+        }
         self.agent_capabilities: Dict[str, Set[str]] = {}
+        # Fields other tools add to unified_todos.json (e.g. root_cause),
+        # kept so compaction does not drop them
+        self.extra_fields: Dict[str, Dict[str, Any]] = {}
+        self.journal_id = None
+        self.journal_offset = 0
+        self.journal_entries = 0
+        self.last_compact = time.time()
+        # Compacts journaled changes that no later append would pick up
+        self.compact_timer: Optional[threading.Timer] = None
         self.load_data()
+        atexit.register(self.close)
 
         # Start background processing
-        self.processing_thread = threading.Thread(
-            target=self._process_queue, daemon=True
-        )
-        self.processing_thread.start()
+        self.processing_threads = [
+            threading.Thread(target=self._process_queue, daemon=True)
+            for _ in range(QUEUE_WORKERS)
+        ]
+        for thread in self.processing_threads:
+            thread.start()
+        self.processing_thread = self.processing_threads[0]
+
+    @contextlib.contextmanager
+    def _journal_lock(self):
+        """Exclusive lock shared with other processes using this workspace"""
+        self.journal_lock_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_lock_file, "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _todo_from_dict(self, todo_data: Dict[str, Any]) -> TodoItem:
+        extra = {k: v for k, v in todo_data.items() if k not in TODO_FIELDS}
+        todo_data = {k: v for k, v in todo_data.items() if k in TODO_FIELDS}
+        if extra:
+            self.extra_fields[todo_data["id"]] = extra
+        # Convert string dates back to datetime
+        for date_field in ["created_at", "updated_at", "due_date"]:
+            if todo_data.get(date_field):
+                todo_data[date_field] = datetime.fromisoformat(todo_data[date_field])
+
+        # Convert category and priority back to enums
+        todo_data["category"] = TodoCategory(todo_data["category"])
+        todo_data["priority"] = TodoPriority(todo_data["priority"])
+        todo_data["status"] = TodoStatus(todo_data["status"])
+        if todo_data.get("tags") is not None:
+            todo_data["tags"] = set(todo_data["tags"])
+
+        return TodoItem(**todo_data)
+
+    def _todo_to_dict(self, todo: TodoItem) -> Dict[str, Any]:
+        return {
+            **self.extra_fields.get(todo.id, {}),
+            **asdict(todo),
+            "category": todo.category.value,
+            "priority": todo.priority.value,
+            "status": todo.status.value,
+            "created_at": todo.created_at.isoformat(),
+            "updated_at": todo.updated_at.isoformat(),
+            "due_date": (todo.due_date.isoformat() if todo.due_date else None),
+            "tags": list(todo.tags),
+        }
 
-    def load_data(self):
-        """Load todos and agent capabilities from disk"""
-        # Load todos
-        if self.todos_file.exists():
+    def _index_add(self, todo: TodoItem):
+        for field in INDEXED_FIELDS:
+            self.indexes[field][_index_value(todo, field)].add(todo.id)
+
+    def _index_remove(self, todo: TodoItem):
+        for field in INDEXED_FIELDS:
+            ids = self.indexes[field].get(_index_value(todo, field))
+            if ids is not None:
+                ids.discard(todo.id)
+                if not ids:
+                    del self.indexes[field][_index_value(todo, field)]
+
+    def _merge_todo(self, todo: TodoItem):
+        """Insert a loaded todo unless memory already holds a newer version"""
+        current = self.todos.get(todo.id)
+        if current is not None:
+            if _timestamp(current.updated_at) >= _timestamp(todo.updated_at):
+                return
+            self._index_remove(current)
+        self.todos[todo.id] = todo
+        self._index_add(todo)
+
+    def _merge_records(self, records: List[Dict[str, Any]]):
+        todos = []
+        for todo_data in records:
             try:
-                with open(self.todos_file, "r") as f:
-                    data = json.load(f)
-                    for todo_data in data.get("todos", []):
-                        # Convert string dates back to datetime
-                        for date_field in ["created_at", "updated_at", "due_date"]:
-                            if todo_data.get(date_field):
-                                todo_data[date_field] = datetime.fromisoformat(
-                                    todo_data[date_field]
-                                )
-
-                        # Convert category and priority back to enums
-                        todo_data["category"] = TodoCategory(todo_data["category"])
-                        todo_data["priority"] = TodoPriority(todo_data["priority"])
-                        todo_data["status"] = TodoStatus(todo_data["status"])
-
-                        todo = TodoItem(**todo_data)
-                        self.todos[todo.id] = todo
+                todos.append(self._todo_from_dict(todo_data))
             except Exception as e:
-                print(f"Error loading todos: {e}")
+                print(f"Error loading todo: {e}")
+        with self.lock:
+            for todo in todos:
+                self._merge_todo(todo)
+
+    def _journal_identity(self):
+        try:
+            st = os.stat(self.journal_file)
+        except OSError:
+            return None
+        return (st.st_dev, st.st_ino)
+
+    def _replay_journal(self):
+        """Apply journal entries appended since the last replay"""
+        identity = self._journal_identity()
+        if identity is None:
+            return
+        if identity != self.journal_id:
+            # Compacted by another process: its snapshot has everything
+            # that was in the previous journal
+            self._load_snapshot()
+            self.journal_id = identity
+            self.journal_offset = 0
+            self.journal_entries = 0
+
+        records = []
+        with open(self.journal_file, "rb") as f:
+            f.seek(self.journal_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial write in progress
+                self.journal_offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("op") == "upsert":
+                    records.append(entry["todo"])
+        self.journal_entries += len(records)
+        self._merge_records(records)
+
+    def _load_snapshot(self):
+        if not self.todos_file.exists():
+            return
+        try:
+            with open(self.todos_file, "r") as f:
+                data = json.load(f)
+            self._merge_records(data.get("todos", []))
+        except Exception as e:
+            print(f"Error loading todos: {e}")
+
+    def load_data(self):
+        """Load todos and agent capabilities from disk"""
+        # Load todos: snapshot plus journal
+        with self.io_lock:
+            self._load_snapshot()
+            self.journal_id = self._journal_identity()
+            self._replay_journal()
 
         # Load agent capabilities
         if self.agents_file.exists():
@@ -167,34 +330,91 @@ class TodoManager:
             except Exception as e:
                 print(f"Error loading agent capabilities: {e}")
 
-    def save_data(self):
-        """Save todos and agent capabilities to disk"""
-        with self.lock:
-            # Save todos
-            todos_data = {
-                "todos": [
-                    {
-                        **asdict(todo),
-                        "category": todo.category.value,
-                        "priority": todo.priority.value,
-                        "status": todo.status.value,
-                        "created_at": todo.created_at.isoformat(),
-                        "updated_at": todo.updated_at.isoformat(),
-                        "due_date": (
-                            todo.due_date.isoformat() if todo.due_date else None
-                        ),
-                        "tags": list(todo.tags),
+    def _append_journal(self, todos: List[Dict[str, Any]]):
+        """Persist changed todos (already serialized) to the journal"""
+        if not todos:
+            return
+        lines = "".join(
+            json.dumps({"op": "upsert", "todo": todo}) + "\n" for todo in todos
+        )
+        with self.io_lock:
+            with self._journal_lock():
+                with open(self.journal_file, "a") as f:
+                    f.write(lines)
+                if self.journal_id is None:
+                    self.journal_id = self._journal_identity()
+            self.journal_entries += len(todos)
+            due = (
+                self.journal_entries >= JOURNAL_COMPACT_THRESHOLD
+                or time.time() - self.last_compact >= COMPACT_INTERVAL
+            )
+            if not due and self.compact_timer is None:
+                # Tools reading unified_todos.json see the change within
+                # COMPACT_INTERVAL even if this manager stays idle
+                self.compact_timer = threading.Timer(
+                    COMPACT_INTERVAL, self._timed_compact
+                )
+                self.compact_timer.daemon = True
+                self.compact_timer.start()
+        if due:
+            self.compact()
+
+    def _timed_compact(self):
+        with self.io_lock:
+            self.compact_timer = None
+            pending = self.journal_entries
+        try:
+            if pending:
+                self.compact()
+        except Exception as e:
+            print(f"Error compacting todos: {e}")
+
+    def compact(self):
+        """Rewrite unified_todos.json and start an empty journal"""
+        with self.io_lock:
+            with self._journal_lock():
+                # Pick up changes other processes journaled since our last read
+                self._replay_journal()
+
+                with self.lock:
+                    todos_data = {
+                        "todos": [self._todo_to_dict(t) for t in self.todos.values()]
                     }
-                    for todo in self.todos.values()
-                ]
-            }
 
-            with open(self.todos_file, "w") as f:
-                json.dump(todos_data, f, indent=2)
+                self.todos_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.todos_file.with_suffix(".json.tmp")
+                with open(tmp_file, "w") as f:
+                    json.dump(todos_data, f, indent=2)
+                tmp_file.replace(self.todos_file)
+
+                # A new (empty) journal file tells other processes to reload
+                tmp_journal = self.journal_file.with_suffix(".jsonl.tmp")
+                tmp_journal.write_text("")
+                tmp_journal.replace(self.journal_file)
+                self.journal_id = self._journal_identity()
+                self.journal_offset = 0
+                self.journal_entries = 0
+                self.last_compact = time.time()
 
-            # Save agent capabilities
-            with open(self.agents_file, "w") as f:
-                json.dump(self.agent_capabilities, f, indent=2)
+    def save_data(self):
+        """Save todos and agent capabilities to disk"""
+        self.compact()
+
+        # Save agent capabilities
+        with open(self.agents_file, "w") as f:
+            json.dump(self.agent_capabilities, f, indent=2)
+
+    def close(self):
+        """Fold the journal into unified_todos.json"""
+        with self.io_lock:
+            if self.compact_timer is not None:
+                self.compact_timer.cancel()
+                self.compact_timer = None
+        try:
+            if self.journal_entries:
+                self.compact()
+        except Exception as e:
+            print(f"Error compacting todos: {e}")
 
     def create_todo(
         self,
@@ -224,8 +444,10 @@ class TodoManager:
 
         with self.lock:
             self.todos[todo_id] = todo
+            self._index_add(todo)
+            record = self._todo_to_dict(todo)
 
-        self.save_data()
+        self._append_journal([record])
 
         # Queue for agent processing
         self.queue.put(("analyze", todo_id))
@@ -234,23 +456,40 @@ class TodoManager:
 
     def update_todo(self, todo_id: str, **updates) -> bool:
         """Update an existing todo item"""
+        return bool(self.update_todos({todo_id: updates}))
+
+    def update_todos(self, updates_by_id: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Apply updates to several todos with one journal write
+
+        Returns the ids that were found and updated.
+        """
+        updated = []
+        records = []
         with self.lock:
-            if todo_id not in self.todos:
-                return False
+            for todo_id, updates in updates_by_id.items():
+                if todo_id not in self.todos:
+                    continue
+
+                todo = self.todos[todo_id]
+                self._index_remove(todo)
+                for key, value in updates.items():
+                    if hasattr(todo, key):
+                        setattr(todo, key, value)
 
-            todo = self.todos[todo_id]
-            for key, value in updates.items():
-                if hasattr(todo, key):
-                    setattr(todo, key, value)
+                todo.updated_at = datetime.now()
+                self._index_add(todo)
+                records.append(self._todo_to_dict(todo))
+                updated.append(todo_id)
 
-            todo.updated_at = datetime.now()
-            self.save_data()
+        self._append_journal(records)
 
+        for todo_id in updated:
             # Queue for reassignment if needed
+            updates = updates_by_id[todo_id]
             if "assignee" in updates or "status" in updates:
                 self.queue.put(("reassign", todo_id))
 
-            return True
+        return updated
 
     def get_todos(
         self,
@@ -260,16 +499,25 @@ class TodoManager:
         priority: TodoPriority = None,
     ) -> List[TodoItem]:
         """Get todos with optional filtering"""
-        todos = list(self.todos.values())
-
-        if status:
-            todos = [t for t in todos if t.status == status]
-        if category:
-            todos = [t for t in todos if t.category == category]
-        if assignee:
-            todos = [t for t in todos if t.assignee == assignee]
-        if priority:
-            todos = [t for t in todos if t.priority == priority]
+        filters = {
+            "status": status.value if status else None,
+            "category": category.value if category else None,
+            "assignee": assignee,
+            "priority": priority.value if priority else None,
+        }
+        with self.lock:
+            matches = [
+                self.indexes[field].get(value, set())
+                for field, value in filters.items()
+                if value
+            ]
+            if matches:
+                # Intersect starting from the most selective index
+                matches.sort(key=len)
+                ids = set(matches[0]).intersection(*matches[1:])
+                todos = [self.todos[todo_id] for todo_id in ids]
+            else:
+                todos = list(self.todos.values())
 
         return sorted(todos, key=lambda t: (t.priority.value, t.created_at))
 
@@ -308,14 +556,8 @@ class TodoManager:
 
         return {}
 
-    def assign_todo_to_agent(self, todo_id: str) -> Optional[str]:
-        """Assign todo to most suitable agent based on capabilities"""
-        if todo_id not in self.todos:
-            return None
-
-        todo = self.todos[todo_id]
-
-        # Find best agent match
+    def _best_agent(self, todo: TodoItem) -> Optional[str]:
+        """Most suitable agent for a todo based on capabilities"""
         best_agent = None
         best_score = 0
 
@@ -334,13 +576,21 @@ class TodoManager:
                 score += 2
 
             # Tag matching
-            tag_matches = len(todo.tags & capabilities)
+            tag_matches = len(todo.tags & set(capabilities))
             score += tag_matches
 
             if score > best_score:
                 best_score = score
                 best_agent = agent
 
+        return best_agent
+
+    def assign_todo_to_agent(self, todo_id: str) -> Optional[str]:
+        """Assign todo to most suitable agent based on capabilities"""
+        if todo_id not in self.todos:
+            return None
+
+        best_agent = self._best_agent(self.todos[todo_id])
         if best_agent:
             self.update_todo(
                 todo_id, assignee=best_agent, status=TodoStatus.IN_PROGRESS
@@ -379,64 +629,103 @@ class TodoManager:
 
         return False
 
-    def _process_queue(self):
-        """Background queue processor"""
-        while True:
+    def _analysis_updates(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Todo updates suggested by an AI analysis"""
+        updates = {}
+        if "suggested_priority" in analysis:
             try:
-                action, todo_id = self.queue.get(timeout=1)
-
-                if action == "analyze":
-                    # AI analysis
-                    analysis = self.analyze_todo_with_ai(todo_id)
-                    if analysis:
-                        # Update todo with AI insights
-                        updates = {}
-                        if "suggested_priority" in analysis:
-                            try:
-                                updates["priority"] = TodoPriority(
-                                    analysis["suggested_priority"]
-                                )
-                            except:
-                                pass
+                updates["priority"] = TodoPriority(analysis["suggested_priority"])
+            except:
+                pass
 
-                        if "subtasks" in analysis:
-                            updates["subtasks"] = analysis["subtasks"]
+        if "subtasks" in analysis:
+            updates["subtasks"] = analysis["subtasks"]
 
-                        if updates:
-                            self.update_todo(todo_id, **updates)
+        return updates
 
-                    # Auto-assign
-                    self.assign_todo_to_agent(todo_id)
+    def _process_batch(self, batch: List[tuple]):
+        """Analyze and assign a batch of queued todos with batched writes"""
+        analyze_ids = [todo_id for action, todo_id in batch if action == "analyze"]
+        reassign_ids = [todo_id for action, todo_id in batch if action == "reassign"]
 
-                elif action == "reassign":
-                    # Reassign if needed
-                    self.assign_todo_to_agent(todo_id)
-
-                self.queue.task_done()
+        # AI analysis (network round trips happen without holding any lock)
+        updates = {}
+        for todo_id in analyze_ids:
+            analysis = self.analyze_todo_with_ai(todo_id)
+            if analysis:
+                todo_updates = self._analysis_updates(analysis)
+                if todo_updates:
+                    updates[todo_id] = todo_updates
+
+        # Update todos with AI insights, without triggering reassignment
+        if updates:
+            self.update_todos(updates)
+
+        # Auto-assign
+        assignments = {}
+        for todo_id in dict.fromkeys(analyze_ids + reassign_ids):
+            todo = self.todos.get(todo_id)
+            # Finished and blocked todos keep their status
+            if todo is None or todo.status not in (
+                TodoStatus.PENDING,
+                TodoStatus.IN_PROGRESS,
+            ):
+                continue
+            best_agent = self._best_agent(todo)
+            if best_agent and (
+                todo.assignee != best_agent or todo.status != TodoStatus.IN_PROGRESS
+            ):
+                assignments[todo_id] = {
+                    "assignee": best_agent,
+                    "status": TodoStatus.IN_PROGRESS,
+                }
+        if assignments:
+            self.update_todos(assignments)
 
+    def _process_queue(self):
+        """Background queue processor (one of QUEUE_WORKERS)"""
+        while True:
+            try:
+                batch = [self.queue.get(timeout=1)]
             except queue.Empty:
                 continue
+
+            while len(batch) < QUEUE_BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._process_batch(batch)
             except Exception as e:
                 print(f"Queue processing error: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
 
     def get_dashboard_data(self) -> Dict[str, Any]:
         """Get dashboard data for todo management"""
-        todos = list(self.todos.values())
-
-        return {
-            "total_todos": len(todos),
-            "by_status": {
-                status.value: len([t for t in todos if t.status == status])
+        with self.lock:
+            todos = list(self.todos.values())
+            by_status = {
+                status.value: len(self.indexes["status"].get(status.value, ()))
                 for status in TodoStatus
-            },
-            "by_category": {
-                category.value: len([t for t in todos if t.category == category])
+            }
+            by_category = {
+                category.value: len(self.indexes["category"].get(category.value, ()))
                 for category in TodoCategory
-            },
-            "by_priority": {
-                priority.value: len([t for t in todos if t.priority == priority])
+            }
+            by_priority = {
+                priority.value: len(self.indexes["priority"].get(priority.value, ()))
                 for priority in TodoPriority
-            },
+            }
+
+        return {
+            "total_todos": len(todos),
+            "by_status": by_status,
+            "by_category": by_category,
+            "by_priority": by_priority,
             "overdue": len(
                 [
                     t
@@ -482,7 +771,15 @@ def main():
     parser = argparse.ArgumentParser(description="Unified Todo Management System")
     parser.add_argument(
         "action",
-        choices=["create", "list", "update", "assign", "complete", "dashboard"],
+        choices=[
+            "create",
+            "list",
+            "update",
+            "assign",
+            "complete",
+            "dashboard",
+            "compact",
+        ],
     )
     parser.add_argument("--id", help="Todo ID")
     parser.add_argument("--title", help="Todo title")
@@ -562,6 +859,10 @@ def main():
         data = todo_manager.get_dashboard_data()
         print(json.dumps(data, indent=2))
 
+    elif args.action == "compact":
+        todo_manager.compact()
+        print(f"Compacted {len(todo_manager.todos)} todos")
+
 
 if __name__ == "__main__":
     main()
@@ -7,16 +7,20 @@ Provides webhook registration, event publishing, and delivery management.
 
 import asyncio
 import hashlib
+import heapq
 import hmac
+import itertools
 import json
 import logging
 import os
 import sys
+import time
 import uuid
 from abc import ABC, abstractmethod
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Callable
+from typing import Any, Deque, Dict, List, Optional, Callable, Tuple
 from urllib.parse import urlparse
 
 import aiohttp
@@ -61,6 +65,60 @@ class WebhookDelivery:
     next_retry_at: Optional[str] = None
 
 
+@dataclass
+class TokenBucket:
+    """O(1) token-bucket rate limiter (capacity tokens refilled per minute)"""
+
+    capacity: float
+    tokens: float = -1.0
+    updated_at: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self):
+        if self.tokens < 0:
+            self.tokens = self.capacity
+
+    def try_acquire(self, now: Optional[float] = None) -> bool:
+        """Take one token if available"""
+        now = time.monotonic() if now is None else now
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.capacity / 60.0)
+        self.updated_at = now
+
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+@dataclass
+class WebhookDeliveryMetrics:
+    """Rolling per-webhook delivery metrics"""
+
+    window: int = 1024
+    delivered: int = 0
+    failed: int = 0
+    retried: int = 0
+    latencies_ms: Deque[float] = field(default_factory=deque)
+
+    def record(self, latency_ms: float, status: str) -> None:
+        if status == "success":
+            self.delivered += 1
+        elif status == "retry":
+            self.retried += 1
+        else:
+            self.failed += 1
+
+        self.latencies_ms.append(latency_ms)
+        if len(self.latencies_ms) > self.window:
+            self.latencies_ms.popleft()
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
 class WebhookError(Exception):
     """Base webhook error"""
 
@@ -86,13 +144,33 @@ class WebhookManager:
         self,
         config_file: str = "config/webhooks.json",
         delivery_log: str = "logs/webhook_deliveries.jsonl",
+        concurrency: int = 8,
+        per_host_limit: int = 4,
+        log_batch_size: int = 100,
+        log_flush_interval: float = 1.0,
     ):
         self.config_file = config_file
         self.delivery_log = delivery_log
         self.webhooks: Dict[str, WebhookConfig] = {}
         self.event_subscriptions: Dict[str, List[str]] = {}  # event -> [webhook_ids]
         self.delivery_queue: asyncio.Queue = asyncio.Queue()
-        self.rate_limiters: Dict[str, Dict] = {}  # webhook_id -> rate limit info
+        self.rate_limiters: Dict[str, TokenBucket] = {}  # webhook_id -> bucket
+
+        # Delivery engine settings
+        self.concurrency = concurrency
+        self.per_host_limit = per_host_limit
+        self.log_batch_size = log_batch_size
+        self.log_flush_interval = log_flush_interval
+
+        # Delayed retries: heap of (due monotonic time, seq, delivery)
+        self._retry_heap: List[Tuple[float, int, WebhookDelivery]] = []
+        self._retry_seq = itertools.count()
+        self._retry_wakeup: Optional[asyncio.Event] = None
+        # Loop running process_deliveries(); the delivery queue belongs to it
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._log_buffer: List[Dict[str, Any]] = []
+        self.delivery_metrics: Dict[str, WebhookDeliveryMetrics] = {}
 
         # Create directories
         import os
@@ -252,52 +330,101 @@ class WebhookManager:
                 webhook_id=webhook.id, event_type=event_type, payload=payload
             )
 
-            # Add to delivery queue
-            asyncio.create_task(self.delivery_queue.put(delivery))
+            # Add to delivery queue (unbounded, so this never blocks)
+            self.delivery_queue.put_nowait(delivery)
+
+    def emit_event_threadsafe(self, event_type: str, payload: Dict[str, Any]) -> None:
+        """emit_event() for callers outside the delivery loop's thread"""
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(self.emit_event, event_type, payload)
+        else:
+            # No delivery loop yet: deliveries just wait in the queue
+            self.emit_event(event_type, payload)
 
     def check_rate_limit(self, webhook_id: str) -> bool:
         """Check if webhook is within rate limit"""
-        now = datetime.now()
-        rate_info = self.rate_limiters.get(
-            webhook_id, {"requests": [], "window_start": now}
-        )
-
-        # Clean old requests (older than 1 minute)
-        cutoff = now - timedelta(minutes=1)
-        rate_info["requests"] = [
-            req_time for req_time in rate_info["requests"] if req_time > cutoff
-        ]
-
         webhook = self.webhooks.get(webhook_id)
         if not webhook:
             return False
 
-        # Check rate limit
-        if len(rate_info["requests"]) >= webhook.rate_limit:
-            return False
-
-        # Add current request
-        rate_info["requests"].append(now)
-        self.rate_limiters[webhook_id] = rate_info
+        bucket = self.rate_limiters.get(webhook_id)
+        if bucket is None or bucket.capacity != webhook.rate_limit:
+            bucket = TokenBucket(capacity=webhook.rate_limit)
+            self.rate_limiters[webhook_id] = bucket
 
-        return True
+        return bucket.try_acquire()
 
-    async def process_deliveries(self) -> None:
-        """Process webhook deliveries"""
-        async with aiohttp.ClientSession() as session:
-            while True:
-                try:
-                    delivery = await self.delivery_queue.get()
+    async def process_deliveries(self, concurrency: Optional[int] = None) -> None:
+        """Process webhook deliveries with concurrent workers
 
-                    if delivery.status == "success":
-                        continue
+        Runs ``concurrency`` delivery workers sharing one connection pool that
+        is capped per host, a timer loop that re-queues delayed retries, and a
+        flusher that writes the delivery log in batches.
+        """
+        workers = concurrency or self.concurrency
+        self._retry_wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
 
+        connector = aiohttp.TCPConnector(
+            limit=max(workers, self.per_host_limit), limit_per_host=self.per_host_limit
+        )
+        async with aiohttp.ClientSession(connector=connector) as session:
+            tasks = [
+                asyncio.create_task(self._delivery_worker(session))
+                for _ in range(workers)
+            ]
+            tasks.append(asyncio.create_task(self._retry_scheduler()))
+            tasks.append(asyncio.create_task(self._log_flusher()))
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                self.flush_delivery_log()
+
+    async def _delivery_worker(self, session: aiohttp.ClientSession) -> None:
+        """Pull deliveries off the queue until cancelled"""
+        while True:
+            delivery = await self.delivery_queue.get()
+            try:
+                if delivery.status != "success":
                     await self.deliver_webhook(session, delivery)
-                    self.delivery_queue.task_done()
-
-                except Exception as e:
-                    self.logger.error(f"Error processing delivery: {e}")
-                    await asyncio.sleep(1)
+            except Exception as e:
+                self.logger.error(f"Error processing delivery: {e}")
+            finally:
+                self.delivery_queue.task_done()
+
+    def schedule_retry(self, delivery: WebhookDelivery, delay: float) -> None:
+        """Queue a delivery for re-delivery after ``delay`` seconds"""
+        heapq.heappush(
+            self._retry_heap,
+            (time.monotonic() + delay, next(self._retry_seq), delivery),
+        )
+        if self._retry_wakeup is not None:
+            self._retry_wakeup.set()
+
+    async def _retry_scheduler(self) -> None:
+        """Move due retries from the timer heap back onto the delivery queue"""
+        while True:
+            now = time.monotonic()
+            while self._retry_heap and self._retry_heap[0][0] <= now:
+                _, _, delivery = heapq.heappop(self._retry_heap)
+                self.delivery_queue.put_nowait(delivery)
+
+            timeout = self._retry_heap[0][0] - now if self._retry_heap else None
+            self._retry_wakeup.clear()
+            try:
+                await asyncio.wait_for(self._retry_wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _log_flusher(self) -> None:
+        """Periodically flush buffered delivery log records"""
+        while True:
+            await asyncio.sleep(self.log_flush_interval)
+            self.flush_delivery_log()
 
     async def deliver_webhook(
         self, session: aiohttp.ClientSession, delivery: WebhookDelivery
@@ -309,6 +436,7 @@ class WebhookManager:
             return
 
         delivery.attempt_count += 1
+        started = time.monotonic()
 
         try:
             # Prepare payload
@@ -361,20 +489,26 @@ class WebhookManager:
             delivery.error_message = str(e)
             self.logger.error(f"Webhook delivery error: {delivery.webhook_id} - {e}")
 
-        # Handle retries
+        # Handle retries without holding a worker during the backoff
         if delivery.status == "failed" and delivery.attempt_count < webhook.retry_count:
+            delay = 2**delivery.attempt_count
             delivery.status = "retry"
             delivery.next_retry_at = (
-                datetime.now() + timedelta(seconds=2**delivery.attempt_count)
+                datetime.now() + timedelta(seconds=delay)
             ).isoformat()
-            # Re-queue for retry
-            await asyncio.sleep(2**delivery.attempt_count)
-            await self.delivery_queue.put(delivery)
+            self.schedule_retry(delivery, delay)
         elif delivery.status == "failed":
             self.logger.error(
                 f"Webhook delivery failed permanently: {delivery.webhook_id}"
             )
 
+        metrics = self.delivery_metrics.get(delivery.webhook_id)
+        if metrics is None:
+            metrics = self.delivery_metrics[delivery.webhook_id] = (
+                WebhookDeliveryMetrics()
+            )
+        metrics.record((time.monotonic() - started) * 1000, delivery.status)
+
         # Log delivery
         self.log_delivery(delivery)
 
@@ -383,24 +517,32 @@ class WebhookManager:
         return hmac.new(secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
 
     def log_delivery(self, delivery: WebhookDelivery) -> None:
-        """Log webhook delivery"""
+        """Buffer a webhook delivery record for the next batched log write"""
+        self._log_buffer.append(
+            {
+                "id": delivery.id,
+                "webhook_id": delivery.webhook_id,
+                "event_type": delivery.event_type,
+                "status": delivery.status,
+                "status_code": delivery.status_code,
+                "attempt_count": delivery.attempt_count,
+                "created_at": delivery.created_at,
+                "delivered_at": delivery.delivered_at,
+                "error_message": delivery.error_message,
+            }
+        )
+        if len(self._log_buffer) >= self.log_batch_size:
+            self.flush_delivery_log()
+
+    def flush_delivery_log(self) -> None:
+        """Write buffered delivery records in a single append"""
+        if not self._log_buffer:
+            return
+
+        records, self._log_buffer = self._log_buffer, []
         try:
             with open(self.delivery_log, "a") as f:
-                json.dump(
-                    {
-                        "id": delivery.id,
-                        "webhook_id": delivery.webhook_id,
-                        "event_type": delivery.event_type,
-                        "status": delivery.status,
-                        "status_code": delivery.status_code,
-                        "attempt_count": delivery.attempt_count,
-                        "created_at": delivery.created_at,
-                        "delivered_at": delivery.delivered_at,
-                        "error_message": delivery.error_message,
-                    },
-                    f,
-                )
-                f.write("\n")
+                f.write("".join(json.dumps(record) + "\n" for record in records))
         except Exception as e:
             self.logger.error(f"Failed to log delivery: {e}")
 
@@ -448,6 +590,7 @@ class WebhookManager:
         }
 
         # Count deliveries from log (simplified - in production use a database)
+        self.flush_delivery_log()
         try:
             if os.path.exists(self.delivery_log):
                 with open(self.delivery_log, "r") as f:
@@ -459,12 +602,27 @@ class WebhookManager:
         except Exception as e:
             self.logger.error(f"Failed to read delivery stats: {e}")
 
+        stats["backlog"] = {
+            "queued": self.delivery_queue.qsize(),
+            "scheduled_retries": len(self._retry_heap),
+        }
+        stats["webhooks"] = {
+            webhook_id: {
+                "delivered": metrics.delivered,
+                "failed": metrics.failed,
+                "retried": metrics.retried,
+                "latency_p50_ms": metrics.percentile(0.50),
+                "latency_p99_ms": metrics.percentile(0.99),
+            }
+            for webhook_id, metrics in self.delivery_metrics.items()
+        }
+
+        return stats
+
     def shutdown(self) -> None:
         """Shutdown the webhook manager"""
-        # Cancel any pending deliveries
-        if hasattr(self, "delivery_queue") and self.delivery_queue:
-            # Note: In a real implementation, you'd want to properly cancel pending tasks
-            pass
+        # Persist any buffered delivery records
+        self.flush_delivery_log()
 
         self.logger.info("Webhook manager shutdown complete")
 